@@ -1,9 +1,23 @@
 from .engine import BacktestEngine
+from .engine import VectorizedBacktestEngine
+from .engine import PaperTradingEngine
 from .engine import downloadData
+from .engine import downloadMany
 from .data import TickerData
 from .data import TickerFeed
+from .data import StreamingTickerFeed
+from .data import Tick
+from .data import TickAggregator
+from .cache import DataCache
 from .broker import BrokerStandard
+from .ledger import FillLedger
 from .strategy import Strategy
+from .strategy import VectorStrategy
 from .stats import StatisticTracker
 from .stats import StatID
+from .optimizer import Optimizer
+from . import indicators
+from . import analytics
+from . import sources
+from . import feeds
 from . import order
\ No newline at end of file
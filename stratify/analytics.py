@@ -0,0 +1,272 @@
+'''
+Risk and performance analytics computed with NumPy over equity curves.
+
+Every function works along the last axis of its arrays, so a single curve is passed as a 1D array and the curves of
+many strategies sharing the same dates as a 2D array with a row per strategy. Statistics of a 1D array are returned as
+floats and those of a 2D array as an array with a value per row. Statistics that are undefined for a curve, e.g. a
+Sharpe ratio of returns that never change, are NaN.
+'''
+
+from typing import Union
+import numpy as np
+
+TRADING_DAYS_IN_YEAR: int = 252
+DAYS_IN_TROPICAL_YEAR: float = 365.25
+
+def __toResult__(statistics: np.ndarray) -> Union[float, np.ndarray]:
+    '''
+    Converts a statistic computed along the last axis into a float for 1D inputs.
+
+    :param statistics: The statistic of every row.
+    :return: A float if there is a single value, otherwise the array of values.
+    '''
+
+    return float(statistics) if np.ndim(statistics) == 0 else statistics
+
+def getTimestampValues(values: np.ndarray, dateTimes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Keeps the last value of every timestamp of a curve, as curves are updated once per bar of every ticker.
+
+    :param values: The values of the curve, along the last axis.
+    :param dateTimes: The date of every value, in time order, as datetime64 values.
+    :return: The values and dates of the curve with a single value per timestamp.
+    '''
+
+    isLast: np.ndarray = np.append(dateTimes[1:] != dateTimes[:-1], True) if len(dateTimes) > 0 else np.zeros(0, dtype=bool)
+    return values[..., isLast], dateTimes[isLast]
+
+def getPeriodsPerYear(dateTimes: np.ndarray) -> float:
+    '''
+    Estimates how many periods of a curve make up a year from the time the curve spans, e.g. about 252 for daily bars.
+
+    :param dateTimes: The date of every value of the curve, one per timestamp, as datetime64 values.
+    :return: The average number of periods per year, or TRADING_DAYS_IN_YEAR if the curve spans no time.
+    '''
+
+    if len(dateTimes) < 2 or dateTimes[-1] <= dateTimes[0]:
+        return float(TRADING_DAYS_IN_YEAR)
+
+    years: float = (dateTimes[-1] - dateTimes[0]) / np.timedelta64(1, 'D') / DAYS_IN_TROPICAL_YEAR
+    return (len(dateTimes) - 1) / years
+
+def getReturns(values: np.ndarray) -> np.ndarray:
+    '''
+    Calculates the simple return of every period of a curve, returns from a zero value being taken as zero.
+
+    :param values: The values of the curve, along the last axis.
+    :return: The return of every period, one fewer than the values.
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    previousValues: np.ndarray = values[..., :-1]
+    return np.divide(np.diff(values, axis=-1), previousValues, out=np.zeros(previousValues.shape), where=previousValues != 0)
+
+def annualizedReturn(values: np.ndarray, periodsPerYear: float = TRADING_DAYS_IN_YEAR) -> Union[float, np.ndarray]:
+    '''
+    Calculates the compound annual growth rate of a curve.
+
+    :param values: The values of the curve, along the last axis.
+    :param periodsPerYear: The number of periods in a year.
+    :return: The annualized return as a fraction.
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    years: float = (values.shape[-1] - 1) / periodsPerYear
+    if years <= 0:
+        return __toResult__(np.full(values.shape[:-1], np.nan))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return __toResult__((values[..., -1] / values[..., 0]) ** (1 / years) - 1)
+
+def maxDrawdown(values: np.ndarray) -> Union[float, np.ndarray]:
+    '''
+    Calculates the largest fall of a curve from a previous high, relative to that high.
+
+    :param values: The values of the curve, along the last axis.
+    :return: The max drawdown as a positive fraction, 0 if the curve never falls.
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] == 0:
+        return __toResult__(np.full(values.shape[:-1], np.nan))
+
+    peaks: np.ndarray = np.maximum.accumulate(values, axis=-1)
+    drawdowns: np.ndarray = np.divide(peaks - values, peaks, out=np.zeros(values.shape), where=peaks != 0)
+    return __toResult__(drawdowns.max(axis=-1))
+
+def sharpeRatio(returns: np.ndarray, riskFreeRate: float = 0.0, periodsPerYear: float = TRADING_DAYS_IN_YEAR) -> Union[float, np.ndarray]:
+    '''
+    Calculates the annualized Sharpe ratio, the mean excess return over its standard deviation.
+
+    :param returns: The return of every period, along the last axis.
+    :param riskFreeRate: The annual risk free rate, as a fraction.
+    :param periodsPerYear: The number of periods in a year.
+    :return: The annualized Sharpe ratio.
+    '''
+
+    excessReturns: np.ndarray = np.asarray(returns, dtype=np.float64) - riskFreeRate / periodsPerYear
+    if excessReturns.shape[-1] < 2:
+        return __toResult__(np.full(excessReturns.shape[:-1], np.nan))
+
+    deviations: np.ndarray = excessReturns.std(axis=-1, ddof=1)
+    return __toResult__(np.divide(excessReturns.mean(axis=-1), deviations, out=np.full(deviations.shape, np.nan), where=deviations > 0) * np.sqrt(periodsPerYear))
+
+def sortinoRatio(returns: np.ndarray, riskFreeRate: float = 0.0, periodsPerYear: float = TRADING_DAYS_IN_YEAR) -> Union[float, np.ndarray]:
+    '''
+    Calculates the annualized Sortino ratio, the mean excess return over its downside deviation.
+
+    :param returns: The return of every period, along the last axis.
+    :param riskFreeRate: The annual risk free rate, as a fraction.
+    :param periodsPerYear: The number of periods in a year.
+    :return: The annualized Sortino ratio.
+    '''
+
+    excessReturns: np.ndarray = np.asarray(returns, dtype=np.float64) - riskFreeRate / periodsPerYear
+    if excessReturns.shape[-1] == 0:
+        return __toResult__(np.full(excessReturns.shape[:-1], np.nan))
+
+    downsideDeviations: np.ndarray = np.sqrt(np.mean(np.minimum(excessReturns, 0.0) ** 2, axis=-1))
+    return __toResult__(np.divide(excessReturns.mean(axis=-1), downsideDeviations, out=np.full(downsideDeviations.shape, np.nan), where=downsideDeviations > 0) * np.sqrt(periodsPerYear))
+
+def calmarRatio(values: np.ndarray, periodsPerYear: float = TRADING_DAYS_IN_YEAR) -> Union[float, np.ndarray]:
+    '''
+    Calculates the Calmar ratio, the annualized return over the max drawdown.
+
+    :param values: The values of the curve, along the last axis.
+    :param periodsPerYear: The number of periods in a year.
+    :return: The Calmar ratio.
+    '''
+
+    drawdowns: np.ndarray = np.asarray(maxDrawdown(values))
+    returns: np.ndarray = np.asarray(annualizedReturn(values, periodsPerYear))
+    return __toResult__(np.divide(returns, drawdowns, out=np.full(drawdowns.shape, np.nan), where=drawdowns > 0))
+
+def omegaRatio(returns: np.ndarray, threshold: float = 0.0) -> Union[float, np.ndarray]:
+    '''
+    Calculates the Omega ratio, the sum of the returns above a threshold over the sum of the shortfalls below it.
+
+    :param returns: The return of every period, along the last axis.
+    :param threshold: The return per period separating gains from losses.
+    :return: The Omega ratio.
+    '''
+
+    excessReturns: np.ndarray = np.asarray(returns, dtype=np.float64) - threshold
+    gains: np.ndarray = np.maximum(excessReturns, 0.0).sum(axis=-1)
+    losses: np.ndarray = np.maximum(-excessReturns, 0.0).sum(axis=-1)
+    return __toResult__(np.divide(gains, losses, out=np.full(losses.shape, np.nan), where=losses > 0))
+
+def tailRatio(returns: np.ndarray, percentile: float = 95.0) -> Union[float, np.ndarray]:
+    '''
+    Calculates the tail ratio, the size of the right tail of the returns over the size of the left tail.
+
+    :param returns: The return of every period, along the last axis.
+    :param percentile: The percentile of the right tail, the left tail being at 100 minus it.
+    :return: The tail ratio.
+    '''
+
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.shape[-1] == 0:
+        return __toResult__(np.full(returns.shape[:-1], np.nan))
+
+    rightTails: np.ndarray = np.abs(np.percentile(returns, percentile, axis=-1))
+    leftTails: np.ndarray = np.abs(np.percentile(returns, 100.0 - percentile, axis=-1))
+    return __toResult__(np.divide(rightTails, leftTails, out=np.full(leftTails.shape, np.nan), where=leftTails > 0))
+
+def valueAtRisk(returns: np.ndarray, confidence: float = 0.95) -> Union[float, np.ndarray]:
+    '''
+    Calculates the historical value at risk, the loss per period that is only exceeded with 1 - confidence probability.
+
+    :param returns: The return of every period, along the last axis.
+    :param confidence: The confidence level of the value at risk.
+    :return: The value at risk as a positive fraction for losses.
+    '''
+
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.shape[-1] == 0:
+        return __toResult__(np.full(returns.shape[:-1], np.nan))
+
+    return __toResult__(-np.quantile(returns, 1.0 - confidence, axis=-1))
+
+def conditionalValueAtRisk(returns: np.ndarray, confidence: float = 0.95) -> Union[float, np.ndarray]:
+    '''
+    Calculates the historical conditional value at risk (expected shortfall), the mean loss of the periods at or past
+    the value at risk.
+
+    :param returns: The return of every period, along the last axis.
+    :param confidence: The confidence level of the value at risk.
+    :return: The conditional value at risk as a positive fraction for losses.
+    '''
+
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.shape[-1] == 0:
+        return __toResult__(np.full(returns.shape[:-1], np.nan))
+
+    isTail: np.ndarray = returns <= np.quantile(returns, 1.0 - confidence, axis=-1, keepdims=True)
+    return __toResult__(-(returns * isTail).sum(axis=-1) / isTail.sum(axis=-1))
+
+def rollingSharpeRatio(returns: np.ndarray, window: int, riskFreeRate: float = 0.0, periodsPerYear: float = TRADING_DAYS_IN_YEAR) -> np.ndarray:
+    '''
+    Calculates the annualized Sharpe ratio of every window of consecutive returns, see `sharpeRatio`.
+
+    Window sums are taken from cumulative sums, so every window is computed in constant time.
+
+    :param returns: The return of every period, along the last axis.
+    :param window: The number of returns in a window, at least 2.
+    :param riskFreeRate: The annual risk free rate, as a fraction.
+    :param periodsPerYear: The number of periods in a year.
+    :return: The Sharpe ratio of the window ending at every return from the `window`th on.
+    '''
+
+    if window < 2:
+        raise ValueError(f'Rolling window must hold at least 2 returns, got {window}')
+
+    excessReturns: np.ndarray = np.asarray(returns, dtype=np.float64) - riskFreeRate / periodsPerYear
+    if excessReturns.shape[-1] < window:
+        return np.zeros(excessReturns.shape[:-1] + (0,))
+
+    # Returns are centered on their overall mean first, so the window variances do not lose precision
+    centeredReturns: np.ndarray = excessReturns - excessReturns.mean(axis=-1, keepdims=True)
+    zeros: np.ndarray = np.zeros(excessReturns.shape[:-1] + (1,))
+    sums: np.ndarray = np.concatenate((zeros, np.cumsum(centeredReturns, axis=-1)), axis=-1)
+    squaredSums: np.ndarray = np.concatenate((zeros, np.cumsum(centeredReturns ** 2, axis=-1)), axis=-1)
+
+    windowSums: np.ndarray = sums[..., window:] - sums[..., :-window]
+    windowSquaredSums: np.ndarray = squaredSums[..., window:] - squaredSums[..., :-window]
+    windowMeans: np.ndarray = windowSums / window
+    windowVariances: np.ndarray = (windowSquaredSums - window * windowMeans ** 2) / (window - 1)
+
+    # Variances within rounding error of zero are windows of constant returns
+    isVarying: np.ndarray = windowVariances > 1e-10 * windowSquaredSums / window
+    windowDeviations: np.ndarray = np.sqrt(np.where(isVarying, windowVariances, 1.0))
+
+    windowExcessMeans: np.ndarray = windowMeans + excessReturns.mean(axis=-1, keepdims=True)
+    return np.where(isVarying, windowExcessMeans / windowDeviations, np.nan) * np.sqrt(periodsPerYear)
+
+def monthlyReturns(values: np.ndarray, dateTimes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Calculates the return of every calendar month of a curve, as a table of years by months.
+
+    Each month's return is taken from the last value of the previous month, or from the first value of the curve for
+    its first month, to the last value of the month.
+
+    :param values: The values of the curve, along the last axis.
+    :param dateTimes: The date of every value, in time order, as datetime64 values.
+    :return: The years of the table, and the return of every month as an array of shape (..., years, 12), NaN for months without values.
+    '''
+
+    values = np.asarray(values, dtype=np.float64)
+    if len(dateTimes) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(values.shape[:-1] + (0, 12))
+
+    months: np.ndarray = dateTimes.astype('datetime64[M]').astype(np.int64)
+    monthEnds: np.ndarray = np.flatnonzero(np.append(months[1:] != months[:-1], True))
+    monthValues: np.ndarray = values[..., monthEnds]
+    startValues: np.ndarray = np.concatenate((values[..., :1], monthValues[..., :-1]), axis=-1)
+    returns: np.ndarray = np.divide(monthValues - startValues, startValues, out=np.full(monthValues.shape, np.nan), where=startValues != 0)
+
+    # Months are counted from 1970, so each month's year and calendar month index the table
+    firstYear: int = int(months[0] // 12) + 1970
+    years: np.ndarray = np.arange(firstYear, int(months[-1] // 12) + 1970 + 1)
+    table: np.ndarray = np.full(values.shape[:-1] + (len(years) * 12,), np.nan)
+    table[..., months[monthEnds] - (firstYear - 1970) * 12] = returns
+    return years, table.reshape(values.shape[:-1] + (len(years), 12))
@@ -1,10 +1,13 @@
-from .order import Order, BuyOrder, SellOrder, CloseOrder, FillStatus
+from .order import Order, BuyOrder, SellOrder, CloseOrder, ConditionalOrder, OrderSide, FillStatus, OpenOrders, OrderLogView
+from typing import Union, Mapping
 from dataclasses import dataclass
+from types import MappingProxyType
 from datetime import datetime
 from .data import TickerData
-from .data import TickerFeed
 from .data import Position
-from typing import Union
+from .order_book import OrderBook
+from .ledger import FillLedger
+import numpy as np
 import random
 
 class BrokerStandard():
@@ -23,11 +26,19 @@ class BrokerStandard():
 
         self._positions: dict[str, Position] = {}
 
-        self._openOrders: list[Order] = []
-        self._closedOrders: list[Order] = []
+        # Closed orders are only kept as rows of the fill ledger, they are rebuilt from it when read
+        self._openOrders: OpenOrders = OpenOrders()
+        self._fills: FillLedger = FillLedger()
+
+        # Conditional orders waiting for their trigger price, in a book per ticker and all together by order id
+        self._orderBooks: dict[str, OrderBook] = {}
+        self._restingOrders: dict[int, Order] = {}
+
+        # Latest bar seen for each ticker, and the value of all positions marked to those bars
+        self._currentBars: dict[str, TickerData] = {}
+        self._marketValue: float = 0.0
 
         self._dateTime: Union[None, datetime] = None
-        self._tickerFeeds: list[TickerFeed] = []
 
     def setCash(self, cashAmount: float) -> None:
         '''
@@ -73,6 +84,20 @@ class BrokerStandard():
         
         self.slippagePercent = slippagePercent
 
+    def __createSubAccount__(self) -> 'BrokerStandard':
+        '''
+        Creates an empty broker with this broker's cash, commission and slippage, to isolate a strategy's trading.
+
+        :return: The new broker.
+        '''
+
+        broker: BrokerStandard = BrokerStandard()
+        broker.setCash(self.cash)
+        broker.setCommissionPercent(self.commissionPercent)
+        broker.setSlippagePercent(self.slippagePercent)
+        broker._dateTime = self._dateTime
+        return broker
+
     def getPosition(self, ticker) -> int:
         '''
         Gets the number of units held for a given ticker.
@@ -81,68 +106,182 @@ class BrokerStandard():
         :return: Number of units held for the ticker.
         '''
 
-        tickers: list[str] = [position.ticker for position in self._positions]
-        if ticker not in tickers: return 0
-        for position in self._positions:
-            if position.ticker == ticker:
-                return position.units
+        position: Union[None, Position] = self._positions.get(ticker)
+        return position.units if position != None else 0
             
     def getPortfolioValue(self) -> float:
         '''
         Calculates the total portfolio value (cash + value of positions).
 
+        Positions are valued at the close of the latest bar seen for their ticker. The value of the positions is
+        maintained incrementally as bars arrive and orders fill, so this is O(1).
+
         :return: The total portfolio value.
         '''
 
-        value: float = self.cash
+        return self.cash + self._marketValue
 
-        timestampTickerFeed: TickerFeed = TickerFeed()
-        for tickerFeed in self._tickerFeeds:
-            for tickerData in tickerFeed:
-                if tickerData.dateTime == self._dateTime:
-                    timestampTickerFeed.append(tickerData)
-        
-        for tickerData in timestampTickerFeed:
-            position: Position = self._positions.get(tickerData.ticker, Position(tickerData.ticker))
-            value += tickerData.close * position.units
+    def __updateCurrentBar__(self, tickerData: TickerData) -> None:
+        '''
+        Records the latest bar for a ticker and marks any position held in it to the bar's close.
+
+        :param tickerData: The latest market data for the ticker.
+        :return: None
+        '''
+
+        previousTickerData: Union[None, TickerData] = self._currentBars.get(tickerData.ticker)
+        previousClose: float = previousTickerData.close if previousTickerData != None else 0.0
+
+        self._marketValue += self.getPosition(tickerData.ticker) * (tickerData.close - previousClose)
+        self._currentBars[tickerData.ticker] = tickerData
+
+    def getCurrentBar(self, ticker: str) -> Union[None, TickerData]:
+        '''
+        Gets the latest bar seen for a given ticker.
+
+        :param ticker: The stock ticker symbol.
+        :return: The latest TickerData for the ticker, or None if no bar has been seen yet.
+        '''
+
+        return self._currentBars.get(ticker)
+
+    def __setPosition__(self, position: Position) -> None:
+        '''
+        Stores an updated position.
+
+        The positions dict is replaced instead of mutated (copy-on-write), so snapshots handed out by
+        `__getPositionsSnapshot__` keep the holdings they were taken with.
+
+        :param position: The updated position.
+        :return: None
+        '''
+
+        currentTickerData: Union[None, TickerData] = self._currentBars.get(position.ticker)
+        if currentTickerData != None:
+            self._marketValue += (position.units - self.getPosition(position.ticker)) * currentTickerData.close
+
+        positions: dict[str, Position] = dict(self._positions)
+        positions[position.ticker] = position
+        self._positions = positions
+
+    def __getPositionsSnapshot__(self) -> Mapping[str, Position]:
+        '''
+        Returns a read-only snapshot of the current positions without copying them.
+
+        :return: A read-only mapping of positions keyed by ticker.
+        '''
 
-        return value
+        return MappingProxyType(self._positions)
+
+    def __getOrdersSnapshot__(self) -> tuple[OrderLogView, OrderLogView, OrderLogView]:
+        '''
+        Returns read-only views of the broker's orders as they stand now.
+
+        Only the open orders are copied (by reference), the append-only fill ledger is shared. Orders resting in the
+        order books are open orders too. Closed orders are rebuilt from the fill ledger, see `FillLedger.__getitem__`.
+
+        :return: Views of all orders, the open orders and the closed orders.
+        '''
+
+        openOrders: tuple[Order, ...] = tuple(self._openOrders) + tuple(self._restingOrders.values())
+        openOrderStatuses: dict[int, FillStatus] = {id(order): order.fillStatus for order in openOrders}
+        fillsLength: int = len(self._fills)
+
+        return (OrderLogView([(openOrders, len(openOrders)), (self._fills, fillsLength)], openOrderStatuses),
+                OrderLogView([(openOrders, len(openOrders))], openOrderStatuses),
+                OrderLogView([(self._fills, fillsLength)], openOrderStatuses))
     
     def __closeOrder__(self, order: Order) -> None:
         '''
-        Moves an order from open to closed.
+        Moves a filled order from open to closed, dated by the latest bar of its ticker, recording it in the fill ledger.
 
         :param order: The order to close.
         :return: None
         '''
 
-        order._closedEndTime = datetime.now()
-        self._closedOrders.append(order)
-        self._openOrders.remove(order)
+        order._closedEndTime = self._currentBars[order.ticker].dateTime
+        self._fills.appendOrder(order)
+        if self._restingOrders.pop(id(order), None) == None:
+            self._openOrders.remove(order)
+        if order._onClose != None:
+            order._onClose(order)
+
+        # A filled order cancels the orders it is one-cancels-other with, and places the orders attached to it
+        for ocoOrder in order._ocoOrders:
+            if ocoOrder is not order and ocoOrder.fillStatus == FillStatus.PENDING:
+                ocoOrder.cancel()
+
+        for child in order._children:
+            child.units = order._unitsActuallyTraded
+            self.__restOrder__(self._currentBars[child.ticker], child)
 
     def __rejectOrder__(self, order: Order) -> None:
         '''
         Removes an order entirely. Order is not counted as closed.
 
+        The orders attached to it, which would only be placed once it fills, are cancelled.
+
         :param order: The order to reject.
         :return: None
         '''
 
-        self._openOrders.remove(order)
+        if self._restingOrders.pop(id(order), None) == None:
+            self._openOrders.remove(order)
+        if order._onClose != None:
+            order._onClose(order)
+
+        for child in order._children:
+            if child.fillStatus == FillStatus.PENDING:
+                child.cancel()
+
+    def __restOrder__(self, tickerData: TickerData, order: ConditionalOrder) -> None:
+        '''
+        Places a conditional order in its ticker's order book, or fills it right away if it is already marketable.
 
-    def __executeBuyOrder__(self, tickerData: TickerData, order: Order) -> None:
+        :param tickerData: The bar the order is placed on.
+        :param order: The conditional order.
+        :return: None
+        '''
+
+        if order.fillStatus != FillStatus.PENDING:
+            return
+
+        orderBook: Union[None, OrderBook] = self._orderBooks.get(order.ticker)
+        if orderBook == None:
+            orderBook = OrderBook(order.ticker, self._restingOrders)
+            self._orderBooks[order.ticker] = orderBook
+
+        fillPrice: Union[None, float] = orderBook.add(order, tickerData)
+        if fillPrice != None:
+            self.__executeOrderAt__(tickerData, order, fillPrice)
+
+    def __executeOrderAt__(self, tickerData: TickerData, order: ConditionalOrder, price: float) -> None:
+        '''
+        Executes a triggered conditional order at the price it was triggered at.
+
+        :param tickerData: The market data used for order execution.
+        :param order: The triggered order.
+        :param price: The price to fill the order at, before slippage.
+        :return: None
+        '''
+
+        if order.side == OrderSide.BUY: self.__executeBuyOrder__(tickerData, order, price)
+        else: self.__executeSellOrder__(tickerData, order, price)
+
+    def __executeBuyOrder__(self, tickerData: TickerData, order: Order, price: Union[None, float] = None) -> None:
         '''
         Executes a BuyOrder if sufficient cash and volume are available.
 
         :param tickerData: The market data used for order execution.
         :param order: The BuyOrder to execute.
+        :param price: The price to buy at before slippage, defaults to the bar's close.
         :return: None
         '''
 
         tickerVolume: int = tickerData.volume
         unitsNeeded: int = min(order.units, tickerVolume)
         randomSlippagePercent: float = (1 + random.uniform(0.0, self.slippagePercent))
-        unitPrice: float = tickerData.close * randomSlippagePercent
+        unitPrice: float = (price if price != None else tickerData.close) * randomSlippagePercent
 
 
         if (unitPrice * (1 + self.commissionPercent)) > self.cash or self.cash <= 0.0 or tickerVolume < 1 or order.units < 1:
@@ -158,26 +297,28 @@ class BrokerStandard():
         tradeValue: float = orderCost + commisionCash
         self.cash -= tradeValue
         order._portfolioCashImpact = (-1.0 * tradeValue)
-        position.units += tangibleUnits
-        self._positions[order.ticker] = position
+        order._fillPrice = unitPrice
+        order._commission = commisionCash
+        self.__setPosition__(position.withUnits(position.units + tangibleUnits))
 
         order._unitsActuallyTraded = tangibleUnits
         order.fillStatus = FillStatus.PARTIALLY_FILLED if tangibleUnits < order.units else FillStatus.FILLED
 
         self.__closeOrder__(order)
 
-    def __executeSellOrder__(self, tickerData: TickerData, order: Order) -> None:
+    def __executeSellOrder__(self, tickerData: TickerData, order: Order, price: Union[None, float] = None) -> None:
         '''
         Executes a SellOrder based on current holdings.
 
         :param tickerData: The market data used for order execution.
         :param order: The SellOrder to execute.
+        :param price: The price to sell at before slippage, defaults to the bar's close.
         :return: None
         '''
 
         position: Position = self._positions.get(order.ticker, Position(order.ticker))
         randomSlippagePercent: float = (1 - random.uniform(0.0, self.slippagePercent))
-        unitPrice: float = tickerData.close * randomSlippagePercent
+        unitPrice: float = (price if price != None else tickerData.close) * randomSlippagePercent
 
         if position.units == 0 or unitPrice == 0 or order.units < 1:
             order.fillStatus = FillStatus.REJECTED
@@ -190,8 +331,9 @@ class BrokerStandard():
         netCashReceived = sellValue - commissionCash
         self.cash += netCashReceived
         order._portfolioCashImpact = netCashReceived
-        position.units -= unitsToSell
-        self._positions[order.ticker] = position
+        order._fillPrice = unitPrice
+        order._commission = commissionCash
+        self.__setPosition__(position.withUnits(position.units - unitsToSell))
 
         order._unitsActuallyTraded = unitsToSell
         order.fillStatus = FillStatus.PARTIALLY_FILLED if unitsToSell < order.units else FillStatus.FILLED
@@ -221,16 +363,133 @@ class BrokerStandard():
         '''
         Executes all open orders relevant to the provided ticker data.
 
+        The orders resting in the ticker's order book are matched against the bar first, then the orders placed since
+        the last bar are executed at its close, conditional ones being placed in the order book instead unless they
+        are already marketable.
+
         :param tickerData: The TickerData against which to match and execute orders.
         :return: None
         '''
 
-        for order in self._openOrders:
+        orderBook: Union[None, OrderBook] = self._orderBooks.get(tickerData.ticker)
+        if orderBook != None:
+            for order, fillPrice in orderBook.match(tickerData):
+                # Orders triggered by the same bar may have been cancelled by the fill of one triggered before them
+                if order.fillStatus == FillStatus.PENDING: self.__executeOrderAt__(tickerData, order, fillPrice)
+                else: self._restingOrders.pop(id(order), None)
+
+        # Only the ticker's own queue is visited, cancelled orders are dropped without being executed
+        for order in self._openOrders.getTickerOrders(tickerData.ticker):
             if order.fillStatus == FillStatus.CANCELLED:
                 self.__rejectOrder__(order)
+                continue
+
+            match order:
+                case BuyOrder(): self.__executeBuyOrder__(tickerData, order)
+                case SellOrder(): self.__executeSellOrder__(tickerData, order)
+                case CloseOrder(): self.__executeCloseOrder__(tickerData, order)
+                case ConditionalOrder():
+                    self._openOrders.remove(order)
+                    self.__restOrder__(tickerData, order)
+
+    def __simulateOrders__(self, signals: np.ndarray, isTargets: bool, tickerIds: np.ndarray, closes: np.ndarray, volumes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Simulates executing one signal per bar, with the same rules as the event driven order execution, without
+        changing the broker's state.
+
+        Orders are first filled optimistically with NumPy, as if cash never ran out: buys are capped by the bar's
+        volume and sells by the units held, which is a running sum clipped at zero. From the first bar where that is not
+        what the broker would do (a buy the cash does not cover, or, for targets, a partial fill that changes every
+        later order), the remaining bars are executed one at a time.
+
+        :param signals: The signal of every bar, in execution order.
+        :param isTargets: Whether the signals are target positions, otherwise they are signed order units.
+        :param tickerIds: The ticker of every bar as an integer ID starting at 0.
+        :param closes: The close of every bar, which orders are executed at.
+        :param volumes: The volume of every bar.
+        :return: The signed units ordered, the signed units traded, the cash impact and whether the order was rejected, for every bar.
+        '''
 
-            if order.ticker == tickerData.ticker:
-                match order:
-                    case BuyOrder(): self.__executeBuyOrder__(tickerData, order)
-                    case SellOrder(): self.__executeSellOrder__(tickerData, order)
-                    case CloseOrder(): self.__executeCloseOrder__(tickerData, order)
\ No newline at end of file
+        numBars: int = len(signals)
+        numTickers: int = int(tickerIds.max()) + 1 if numBars != 0 else 0
+
+        slippagePercents: np.ndarray = np.random.uniform(0.0, self.slippagePercent, numBars) if self.slippagePercent != 0.0 else np.zeros(numBars)
+        buyPrices: np.ndarray = closes * (1 + slippagePercents)
+        sellPrices: np.ndarray = closes * (1 - slippagePercents)
+        unitCosts: np.ndarray = buyPrices * (1 + self.commissionPercent)
+
+        # Optimistic pass, every ticker's holdings evolve independently of the cash
+        orderUnits: np.ndarray = np.zeros(numBars, dtype=np.int64)
+        tradedUnits: np.ndarray = np.zeros(numBars, dtype=np.int64)
+        for tickerId in range(numTickers):
+            tickerBars: np.ndarray = np.flatnonzero(tickerIds == tickerId)
+            tickerSignals: np.ndarray = signals[tickerBars]
+            tickerOrderUnits: np.ndarray = np.diff(tickerSignals, prepend=0) if isTargets else tickerSignals
+
+            requestedUnits: np.ndarray = np.where(tickerOrderUnits > 0, np.clip(np.minimum(tickerOrderUnits, volumes[tickerBars]), 0, None), tickerOrderUnits)
+            cumulativeUnits: np.ndarray = np.cumsum(requestedUnits)
+            heldUnits: np.ndarray = cumulativeUnits - np.minimum(np.minimum.accumulate(cumulativeUnits), 0)
+
+            orderUnits[tickerBars] = tickerOrderUnits
+            tradedUnits[tickerBars] = np.diff(heldUnits, prepend=0)
+
+        buyCosts: np.ndarray = buyPrices * tradedUnits
+        sellValues: np.ndarray = sellPrices * -tradedUnits
+        cashImpacts: np.ndarray = np.where(tradedUnits > 0, -1.0 * (buyCosts + buyCosts * self.commissionPercent), 0.0)
+        cashImpacts = np.where(tradedUnits < 0, sellValues - sellValues * self.commissionPercent, cashImpacts)
+        cashBefore: np.ndarray = np.cumsum(np.concatenate(([self.cash], cashImpacts)))[:-1]
+
+        isBuy: np.ndarray = orderUnits > 0
+        isSell: np.ndarray = orderUnits < 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            isUnaffordable: np.ndarray = (unitCosts > cashBefore) | (cashBefore <= 0.0) | (np.floor(cashBefore / unitCosts) < tradedUnits)
+        violations: np.ndarray = (isBuy & (volumes >= 1) & isUnaffordable) | (isSell & (tradedUnits != 0) & (sellPrices == 0))
+        if isTargets:
+            violations |= tradedUnits != orderUnits
+
+        rejected: np.ndarray = (orderUnits != 0) & (tradedUnits == 0)
+        violationIndices: np.ndarray = np.flatnonzero(violations)
+        if len(violationIndices) == 0:
+            return orderUnits, tradedUnits, cashImpacts, rejected
+
+        # Sequential repair, from the first violation on every bar depends on the cash left by the ones before it
+        firstViolation: int = int(violationIndices[0])
+        cash: float = float(cashBefore[firstViolation])
+        positions: list[int] = np.bincount(tickerIds[:firstViolation], weights=tradedUnits[:firstViolation], minlength=numTickers).astype(np.int64).tolist()
+
+        signalsList: list[int] = signals.tolist()
+        tickerIdsList: list[int] = tickerIds.tolist()
+        volumesList: list[int] = volumes.tolist()
+        buyPricesList: list[float] = buyPrices.tolist()
+        sellPricesList: list[float] = sellPrices.tolist()
+
+        for barIndex in range(firstViolation, numBars):
+            tickerId: int = tickerIdsList[barIndex]
+            units: int = signalsList[barIndex] - positions[tickerId] if isTargets else signalsList[barIndex]
+
+            traded: int = 0
+            cashImpact: float = 0.0
+            if units > 0:
+                unitPrice: float = buyPricesList[barIndex]
+                tickerVolume: int = volumesList[barIndex]
+                if not ((unitPrice * (1 + self.commissionPercent)) > cash or cash <= 0.0 or tickerVolume < 1):
+                    traded = min(min(units, tickerVolume), int(cash / (unitPrice * (1 + self.commissionPercent))))
+                    orderCost: float = unitPrice * traded
+                    tradeValue: float = orderCost + orderCost * self.commissionPercent
+                    cash -= tradeValue
+                    cashImpact = -1.0 * tradeValue
+            elif units < 0:
+                unitPrice: float = sellPricesList[barIndex]
+                if not (positions[tickerId] == 0 or unitPrice == 0):
+                    traded = -min(-units, positions[tickerId])
+                    sellValue: float = unitPrice * -traded
+                    cashImpact = sellValue - sellValue * self.commissionPercent
+                    cash += cashImpact
+
+            positions[tickerId] += traded
+            orderUnits[barIndex] = units
+            tradedUnits[barIndex] = traded
+            cashImpacts[barIndex] = cashImpact
+            rejected[barIndex] = units != 0 and traded == 0
+
+        return orderUnits, tradedUnits, cashImpacts, rejected
@@ -0,0 +1,243 @@
+from datetime import datetime, timedelta
+from typing import Union, Any, Callable
+from .data import TickerFeed
+import numpy as np
+import shutil
+import pickle
+import os
+
+class DataCache():
+    '''
+    A persistent on-disk cache of downloaded ticker feeds.
+
+    Each ticker and adjustment mode has one entry, holding a contiguous range of bars saved with `TickerFeed.save`
+    and the date range it covers. Requests only download the parts of their range the entry does not cover yet, and
+    cache hits are memory mapped, so they need no network and do not read the bars until they are used.
+
+    Entries older than the cache's time to live are downloaded again, as adjusted prices of past bars change with
+    every split and dividend.
+    '''
+
+    DEFAULT_DIRECTORY: str = os.path.join(os.path.expanduser('~'), '.stratify', 'cache')
+    DEFAULT_TIME_TO_LIVE: timedelta = timedelta(days=1)
+    ENTRY_FILE_NAME: str = 'entry.pkl'
+
+    def __init__(self, directory: Union[None, str] = None, timeToLive: Union[None, timedelta] = DEFAULT_TIME_TO_LIVE):
+        '''
+        Initializes the cache.
+
+        :param directory: The directory entries are stored in, defaults to `~/.stratify/cache`.
+        :param timeToLive: How long downloaded bars are used before downloading them again, None to never refresh them.
+        '''
+
+        self.directory: str = directory if directory != None else DataCache.DEFAULT_DIRECTORY
+        self.timeToLive: Union[None, timedelta] = timeToLive
+
+    def __getEntryPath__(self, ticker: str, autoAdjust: bool) -> str:
+        '''
+        Returns the directory of the entry for a ticker and adjustment mode.
+
+        :param ticker: The stock ticker symbol.
+        :param autoAdjust: Whether the entry holds adjusted prices.
+        :return: The entry's directory.
+        '''
+
+        safeTicker: str = ''.join(character if character.isalnum() or character in '-_.^=' else f'%{ord(character):02X}' for character in ticker)
+        return os.path.join(self.directory, f'{safeTicker}_{"adjusted" if autoAdjust else "raw"}')
+
+    def __readEntry__(self, entryPath: str) -> Union[None, dict[str, Any]]:
+        '''
+        Reads the covered range and download time of an entry.
+
+        :param entryPath: The entry's directory.
+        :return: The entry's 'start', 'end' and 'downloadedAt' datetimes, or None if there is no entry.
+        '''
+
+        try:
+            with open(os.path.join(entryPath, DataCache.ENTRY_FILE_NAME), 'rb') as entryFile:
+                return pickle.load(entryFile)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def __writeEntry__(self, entryPath: str, tickerFeed: TickerFeed, entry: dict[str, Any]) -> None:
+        '''
+        Replaces an entry, writing it aside first so readers never see a partially written entry.
+
+        The old entry is renamed aside before the new one is moved into its place and only deleted afterwards, so the
+        entry is never left half deleted and readers see either the old or the new entry, or briefly none at all.
+
+        :param entryPath: The entry's directory.
+        :param tickerFeed: The bars of the entry.
+        :param entry: The entry's covered range and download time.
+        :return: None
+        '''
+
+        temporaryPath: str = f'{entryPath}.{os.getpid()}.tmp'
+        oldPath: str = f'{entryPath}.{os.getpid()}.old'
+        shutil.rmtree(temporaryPath, ignore_errors=True)
+        shutil.rmtree(oldPath, ignore_errors=True)
+
+        tickerFeed.save(temporaryPath)
+        with open(os.path.join(temporaryPath, DataCache.ENTRY_FILE_NAME), 'wb') as entryFile:
+            pickle.dump(entry, entryFile)
+
+        try:
+            os.replace(entryPath, oldPath)
+        except FileNotFoundError:
+            pass
+        os.replace(temporaryPath, entryPath)
+        shutil.rmtree(oldPath, ignore_errors=True)
+
+    def get(self, ticker: str, start: datetime, end: datetime, autoAdjust: bool = True) -> Union[None, TickerFeed]:
+        '''
+        Returns cached bars of a ticker, without downloading anything.
+
+        :param ticker: The stock ticker symbol.
+        :param start: The start date of the range (inclusive).
+        :param end: The end date of the range (exclusive).
+        :param autoAdjust: Whether to return adjusted prices.
+        :return: A memory mapped TickerFeed of the bars in the range, or None if the range is not cached or is stale.
+        '''
+
+        entryPath: str = self.__getEntryPath__(ticker, autoAdjust)
+        entry: Union[None, dict[str, Any]] = self.__readEntry__(entryPath)
+        if entry == None or self.__isStale__(entry) or start < entry['start'] or end > entry['end']:
+            return None
+
+        return TickerFeed.load(entryPath).getByDateRange(start, end)
+
+    def __holdsPartOf__(self, ticker: str, start: datetime, end: datetime, autoAdjust: bool = True) -> bool:
+        '''
+        Checks whether a fresh entry of a ticker touches or overlaps a range, so `getOrDownload` only downloads the
+        parts of the range it does not hold and the downloaded bars are merged into the entry.
+
+        :param ticker: The stock ticker symbol.
+        :param start: The start date of the range (inclusive).
+        :param end: The end date of the range (exclusive).
+        :param autoAdjust: Whether the entry holds adjusted prices.
+        :return: True if the entry holds part of the range, or touches it.
+        '''
+
+        entry: Union[None, dict[str, Any]] = self.__readEntry__(self.__getEntryPath__(ticker, autoAdjust))
+        return entry != None and not self.__isStale__(entry) and start <= entry['end'] and end >= entry['start']
+
+    def getOrDownload(self, ticker: str,
+                      start: datetime,
+                      end: datetime,
+                      download: Callable[[str, datetime, datetime, bool], TickerFeed],
+                      autoAdjust: bool = True) -> TickerFeed:
+        '''
+        Returns bars of a ticker, downloading and caching only the parts of the range that are not cached yet.
+
+        :param ticker: The stock ticker symbol.
+        :param start: The start date of the range (inclusive).
+        :param end: The end date of the range (exclusive).
+        :param download: Function downloading the bars of a ticker between a start (inclusive) and end (exclusive) date, with or without adjusted prices.
+        :param autoAdjust: Whether to return adjusted prices.
+        :return: A memory mapped TickerFeed of the bars in the range, raises a ValueError if the range has no bars.
+        '''
+
+        tickerFeed: Union[None, TickerFeed] = self.get(ticker, start, end, autoAdjust)
+        if tickerFeed != None:
+            return tickerFeed
+
+        entryPath: str = self.__getEntryPath__(ticker, autoAdjust)
+        entry: Union[None, dict[str, Any]] = self.__readEntry__(entryPath)
+
+        if entry == None or self.__isStale__(entry):
+            # Download the whole range again, including what a stale entry covered, as it may have been adjusted since
+            coveredStart: datetime = min(start, entry['start']) if entry != None else start
+            coveredEnd: datetime = max(end, entry['end']) if entry != None else end
+            self.put(ticker, download(ticker, coveredStart, coveredEnd, autoAdjust), coveredStart, coveredEnd, autoAdjust)
+        else:
+            if start < entry['start']: self.put(ticker, download(ticker, start, entry['start'], autoAdjust), start, entry['start'], autoAdjust)
+            if end > entry['end']: self.put(ticker, download(ticker, entry['end'], end, autoAdjust), entry['end'], end, autoAdjust)
+
+        # Empty downloads are not cached, so there may be no entry to read from
+        tickerFeed = TickerFeed.load(entryPath).getByDateRange(start, end) if self.__readEntry__(entryPath) != None else TickerFeed()
+        if len(tickerFeed) == 0:
+            raise ValueError(f'No bars of {ticker} between {start} and {end}.')
+        return tickerFeed
+
+    def put(self, ticker: str, tickerFeed: TickerFeed, start: datetime, end: datetime, autoAdjust: bool = True) -> None:
+        '''
+        Stores downloaded bars of a ticker, merging them into the cached entry when their ranges touch or overlap.
+        An entry covers a single range, so bars whose range is apart from a fresh entry's are not stored, keeping the
+        entry's bars. Without an entry, or when the entry is stale, the bars replace the entry. A download without bars
+        in its range is only merged, never cached on its own, so an unknown ticker or a failed download is not served
+        as an empty feed.
+
+        :param ticker: The stock ticker symbol.
+        :param tickerFeed: The downloaded bars, bars outside the range are ignored.
+        :param start: The start date of the downloaded range (inclusive).
+        :param end: The end date of the downloaded range (exclusive).
+        :param autoAdjust: Whether the bars hold adjusted prices.
+        :return: None
+        '''
+
+        entryPath: str = self.__getEntryPath__(ticker, autoAdjust)
+        entry: Union[None, dict[str, Any]] = self.__readEntry__(entryPath)
+        tickerFeed = tickerFeed.getByDateRange(start, end)
+
+        if entry != None and not self.__isStale__(entry) and (start > entry['end'] or end < entry['start']):
+            return
+
+        if entry == None or self.__isStale__(entry):
+            if len(tickerFeed) == 0:
+                return
+            self.__writeEntry__(entryPath, DataCache.__concatenateTickerFeeds__(ticker, [tickerFeed]), {'start': start, 'end': end, 'downloadedAt': datetime.now()})
+            return
+
+        # Downloaded bars take the place of cached bars in their range, so no bar is stored twice
+        cachedTickerFeed: TickerFeed = TickerFeed.load(entryPath, memoryMap=False)
+        tickerFeeds: list[TickerFeed] = [cachedTickerFeed.getByDateRange(None, start), tickerFeed, cachedTickerFeed.getByDateRange(end, None)]
+        self.__writeEntry__(entryPath, DataCache.__concatenateTickerFeeds__(ticker, tickerFeeds), {'start': min(start, entry['start']), 'end': max(end, entry['end']), 'downloadedAt': entry['downloadedAt']})
+
+    def clear(self, ticker: Union[None, str] = None) -> None:
+        '''
+        Removes cached entries.
+
+        :param ticker: The ticker whose entries to remove, None removes every entry.
+        :return: None
+        '''
+
+        if ticker == None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+
+        for autoAdjust in (True, False):
+            shutil.rmtree(self.__getEntryPath__(ticker, autoAdjust), ignore_errors=True)
+
+    def __isStale__(self, entry: dict[str, Any]) -> bool:
+        '''
+        Checks whether an entry has outlived the cache's time to live.
+
+        :param entry: The entry's covered range and download time.
+        :return: True if the entry must be downloaded again.
+        '''
+
+        return self.timeToLive != None and datetime.now() - entry['downloadedAt'] > self.timeToLive
+
+    @staticmethod
+    def __concatenateTickerFeeds__(ticker: str, tickerFeeds: list[TickerFeed]) -> TickerFeed:
+        '''
+        Joins feeds of adjacent date ranges of a ticker into a single feed in time order.
+
+        :param ticker: The stock ticker symbol.
+        :param tickerFeeds: The feeds, in the order of their date ranges.
+        :return: The joined feed.
+        '''
+
+        tickerFeeds = [tickerFeed.getByTicker(ticker) for tickerFeed in tickerFeeds if len(tickerFeed) != 0]
+        if len(tickerFeeds) == 0:
+            return TickerFeed()
+
+        timeZones: list[Any] = [tickerFeed._timeZone for tickerFeed in tickerFeeds if tickerFeed._timeZone != None]
+        return TickerFeed.fromArrays(ticker,
+                                     np.concatenate([tickerFeed.dateTimes for tickerFeed in tickerFeeds]),
+                                     np.concatenate([tickerFeed.opens for tickerFeed in tickerFeeds]),
+                                     np.concatenate([tickerFeed.closes for tickerFeed in tickerFeeds]),
+                                     np.concatenate([tickerFeed.lows for tickerFeed in tickerFeeds]),
+                                     np.concatenate([tickerFeed.highs for tickerFeed in tickerFeeds]),
+                                     np.concatenate([tickerFeed.volumes for tickerFeed in tickerFeeds]),
+                                     timeZones[0] if timeZones else None).sortedByDate()
@@ -1,8 +1,17 @@
+from datetime import datetime, timedelta, timezone, tzinfo, time
+from typing import Iterator, Union, Any, Callable
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Iterator
+import dataclasses
+import numpy as np
+import itertools
+import pickle
+import pandas
+import heapq
+import os
 
 class TickerData():
+    __slots__ = ('ticker', 'dateTime', 'open', 'close', 'low', 'high', 'volume')
+
     def __init__(self, ticker: str, dateTime: datetime, open: float, close: float, low: float, high: float, volume: int):
         '''
         Initializes a TickerData object with the provided parameters.
@@ -45,30 +54,441 @@ class TickerData():
     def __repr__(self) -> str:
         return self.__str__()
 
-class TickerFeed():
+    def __setstate__(self, state: Union[dict[str, Any], tuple[None, dict[str, Any]]]) -> None:
+        # TickerData objects pickled before __slots__ was introduced carry a plain instance dict
+        if isinstance(state, tuple): state = state[1]
+        for name, value in state.items():
+            setattr(self, name, value)
+
+class Tick():
+    __slots__ = ('ticker', 'dateTime', 'price', 'size')
+
+    def __init__(self, ticker: str, dateTime: datetime, price: float, size: int = 0):
+        '''
+        Initializes a Tick object with the provided parameters.
+
+        :param ticker: The stock ticker symbol.
+        :param dateTime: The date and time of the trade or quote.
+        :param price: The price traded at, or the quoted price, e.g. the midpoint of the bid and ask.
+        :param size: The number of units traded, 0 for quotes.
+        '''
+
+        self.ticker = ticker
+        self.dateTime = dateTime
+        self.price = price
+        self.size = size
+
+    def __str__(self) -> str:
+        return f'Tick(ticker={self.ticker}, dateTime={self.dateTime.strftime("%Y-%m-%d %H:%M:%S.%f")}, price={self.price:.2f}, size={self.size})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class FeedList(list):
+    '''
+    A read-only list of the bars of a TickerFeed, returned by `TickerFeed.feed`.
+
+    The list is a snapshot of the feed, so mutating it would not change the feed. Every mutating method raises a
+    TypeError instead of silently doing nothing, use `TickerFeed.append` or assign to `TickerFeed.feed` to change a feed.
+    '''
+
+    def __readOnly__(self, *args, **kwargs) -> None:
+        '''
+        Raises on any attempt to mutate the list.
+
+        :return: None
+        '''
+
+        raise TypeError('TickerFeed.feed is read-only, use TickerFeed.append or assign to TickerFeed.feed to change the feed.')
+
+    append = extend = insert = remove = pop = clear = sort = reverse = __readOnly__
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = __readOnly__
+
+    def __reduce__(self) -> tuple:
+        # Copies and pickles are rebuilt from a plain list, as the default list protocol appends to the new list
+        return (FeedList, (list(self),))
+
+class __ColumnStore__():
+    '''
+    Base class of the growable columnar records, keeping each field in its own contiguous NumPy array.
+
+    Subclasses list their column attributes in `COLUMN_NAMES` and keep the number of rows in use in `_size`. The
+    columns are preallocated and grown geometrically from `INITIAL_CAPACITY`, so appending a row is amortized constant
+    time, and dates are stored as naive UTC datetime64 values, restored to the time zone in `_timeZone` when read.
+    '''
+
+    INITIAL_CAPACITY: int = 16
+    COLUMN_NAMES: tuple[str, ...] = ()
+
+    def __init__(self):
+        '''
+        Initializes an empty record, subclasses then create their empty columns.
+        '''
+
+        self._size: int = 0
+        self._timeZone: Union[None, tzinfo] = None
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of rows in use.
+
+        :return: The number of rows.
+        '''
+
+        return self._size
+
+    @staticmethod
+    def __toDateTime64__(dateTime: datetime) -> np.datetime64:
+        '''
+        Converts a datetime into a naive datetime64, normalizing timezone aware datetimes to UTC.
+
+        :param dateTime: The datetime to convert.
+        :return: The equivalent datetime64 value in microseconds.
+        '''
+
+        if dateTime.tzinfo != None:
+            dateTime = dateTime.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(dateTime, 'us')
+
+    def __toDateTime__(self, dateTime64: np.datetime64) -> Union[None, datetime]:
+        '''
+        Converts a stored datetime64 back into a datetime, restoring the record's timezone if it has one.
+
+        :param dateTime64: The stored datetime64 value.
+        :return: The equivalent datetime, or None for a missing (NaT) date.
+        '''
+
+        if np.isnat(dateTime64):
+            return None
+
+        dateTime: datetime = dateTime64.astype('datetime64[us]').item()
+        if self._timeZone != None:
+            dateTime = dateTime.replace(tzinfo=timezone.utc).astimezone(self._timeZone)
+        return dateTime
+
+    def __reserve__(self, capacity: int) -> None:
+        '''
+        Grows every column so that at least `capacity` rows fit without reallocating.
+
+        :param capacity: The minimum number of rows the columns must be able to hold.
+        :return: None
+        '''
+
+        currentCapacity: int = len(getattr(self, self.COLUMN_NAMES[0]))
+        if capacity <= currentCapacity:
+            return
+
+        newCapacity: int = max(capacity, 2 * currentCapacity, self.INITIAL_CAPACITY)
+        for columnName in self.COLUMN_NAMES:
+            column: np.ndarray = getattr(self, columnName)
+            grownColumn: np.ndarray = np.empty(newCapacity, dtype=column.dtype)
+            grownColumn[:self._size] = column[:self._size]
+            setattr(self, columnName, grownColumn)
+
+    def __getColumnView__(self, columnName: str) -> np.ndarray:
+        '''
+        Returns a read-only view of a column, trimmed to the rows in use.
+
+        :param columnName: The name of the column, one of `COLUMN_NAMES`.
+        :return: A read-only view of the column.
+        '''
+
+        column: np.ndarray = getattr(self, columnName)[:self._size]
+        column.flags.writeable = False
+        return column
+
+    def __getstate__(self) -> dict[str, Any]:
+        '''
+        Returns the state used to pickle the record, trimming any unused column capacity.
+
+        :return: The pickled state of the record.
+        '''
+
+        state: dict[str, Any] = dict(self.__dict__)
+        for columnName in self.COLUMN_NAMES:
+            state[columnName] = state[columnName][:self._size]
+        return state
+
+class TickerFeed(__ColumnStore__):
     '''
-    A container for storing a list of TickerData objects and accessing them in time order.
+    A columnar container for storing market data bars and accessing them in time order.
+
+    Each field is kept in its own contiguous NumPy array (datetime64 for dates, float64 for prices and
+    int64 for volume), and TickerData objects are only created when the feed is iterated or indexed.
     '''
 
+    ITERATION_CHUNK_SIZE: int = 4096
+    COLUMN_NAMES: tuple[str, ...] = ('_tickerIndices', '_dateTimes', '_opens', '_closes', '_lows', '_highs', '_volumes')
+    METADATA_FILE_NAME: str = 'metadata.pkl'
+
     def __init__(self, data: list[TickerData] = None):
         '''
         Initializes the TickerFeed with optional data.
 
-        :param data: Optional list of TickerData objects. If None, initializes with an empty list.
+        :param data: Optional list of TickerData objects. If None, initializes an empty feed.
         '''
 
-        if data == None: data = []
-        self.feed: list[TickerData] = data
+        super().__init__()
 
-    def __len__(self) -> int:
+        self._tickers: list[str] = []
+        self._tickerIds: dict[str, int] = {}
+
+        self._tickerIndices: np.ndarray = np.empty(0, dtype=np.int32)
+        self._dateTimes: np.ndarray = np.empty(0, dtype='datetime64[us]')
+        self._opens: np.ndarray = np.empty(0, dtype=np.float64)
+        self._closes: np.ndarray = np.empty(0, dtype=np.float64)
+        self._lows: np.ndarray = np.empty(0, dtype=np.float64)
+        self._highs: np.ndarray = np.empty(0, dtype=np.float64)
+        self._volumes: np.ndarray = np.empty(0, dtype=np.int64)
+
+        if data != None:
+            for tickerData in data:
+                self.append(tickerData)
+
+    @classmethod
+    def fromArrays(cls, ticker: str,
+                   dateTimes: np.ndarray,
+                   opens: np.ndarray,
+                   closes: np.ndarray,
+                   lows: np.ndarray,
+                   highs: np.ndarray,
+                   volumes: np.ndarray,
+                   timeZone: Union[None, tzinfo] = None) -> 'TickerFeed':
         '''
-        Returns the number of TickerData items in the feed.
+        Builds a TickerFeed for a single ticker directly from column arrays.
 
-        :return: The number of TickerData items.
+        Arrays that already have the feed's dtypes are adopted as-is without copying, so columns pulled
+        out of a pandas DataFrame with `to_numpy()` can back the feed directly.
+
+        :param ticker: The stock ticker symbol of every bar.
+        :param dateTimes: The date and time of each bar, as anything convertible to datetime64.
+        :param opens: The opening price of each bar.
+        :param closes: The closing price of each bar.
+        :param lows: The lowest price of each bar.
+        :param highs: The highest price of each bar.
+        :param volumes: The trading volume of each bar.
+        :param timeZone: Optional timezone of the bars, when `dateTimes` holds naive UTC times.
+        :return: A TickerFeed backed by the provided arrays.
         '''
 
-        return len(self.feed)
-    
+        tickerFeed: TickerFeed = cls()
+        tickerFeed._timeZone = timeZone
+
+        dateTimes = np.asarray(dateTimes)
+        if dateTimes.dtype == object and len(dateTimes) != 0 and getattr(dateTimes[0], 'tzinfo', None) != None:
+            tickerFeed._timeZone = dateTimes[0].tzinfo
+            dateTimes = np.array([TickerFeed.__toDateTime64__(dateTime) for dateTime in dateTimes], dtype='datetime64[us]')
+
+        tickerFeed._dateTimes = dateTimes.astype('datetime64[us]', copy=False)
+        tickerFeed._opens = np.asarray(opens, dtype=np.float64)
+        tickerFeed._closes = np.asarray(closes, dtype=np.float64)
+        tickerFeed._lows = np.asarray(lows, dtype=np.float64)
+        tickerFeed._highs = np.asarray(highs, dtype=np.float64)
+        tickerFeed._volumes = np.asarray(volumes, dtype=np.int64)
+
+        tickerFeed._size = len(tickerFeed._dateTimes)
+        tickerFeed._tickers = [ticker]
+        tickerFeed._tickerIds = {ticker: 0}
+        tickerFeed._tickerIndices = np.zeros(tickerFeed._size, dtype=np.int32)
+
+        columnLengths: set[int] = {len(tickerFeed._opens), len(tickerFeed._closes), len(tickerFeed._lows), len(tickerFeed._highs), len(tickerFeed._volumes)}
+        if columnLengths != {tickerFeed._size}:
+            raise ValueError('All TickerFeed columns must have the same length.')
+
+        return tickerFeed
+
+    @classmethod
+    def fromDataFrame(cls, dataFrame: pandas.DataFrame, ticker: str) -> 'TickerFeed':
+        '''
+        Builds a TickerFeed for a single ticker from a pandas DataFrame of bars indexed by date, such as one
+        returned by `yfinance.download`, converting whole columns at once.
+
+        The columns may be flat (e.g. 'Open', 'Close', ...) or a MultiIndex with a level of field names and a level
+        of tickers, in which case the ticker's columns are selected. Field names are matched case-insensitively, and
+        bars without a closing price (e.g. days the ticker did not trade in a multi-ticker frame) are skipped. Bars
+        with a closing price but no volume (e.g. indices and currencies) are given a volume of 0.
+
+        :param dataFrame: The DataFrame of bars, indexed by date.
+        :param ticker: The stock ticker symbol of the bars.
+        :return: A TickerFeed holding the bars.
+        '''
+
+        if isinstance(dataFrame.columns, pandas.MultiIndex):
+            tickerLevels: list[int] = [level for level in range(dataFrame.columns.nlevels) if ticker in dataFrame.columns.get_level_values(level)]
+            if len(tickerLevels) == 0:
+                raise ValueError(f'Ticker \'{ticker}\' not found in the DataFrame columns.')
+            dataFrame = dataFrame.xs(ticker, axis=1, level=tickerLevels[0])
+
+        columns: dict[str, Any] = {str(column).lower(): column for column in dataFrame.columns}
+        missingFields: list[str] = [field for field in ('open', 'close', 'low', 'high', 'volume') if field not in columns]
+        if len(missingFields) != 0:
+            raise ValueError(f'DataFrame is missing the {", ".join(missingFields)} column(s).')
+
+        closes: np.ndarray = dataFrame[columns['close']].to_numpy(dtype=np.float64)
+        hasClose: np.ndarray = ~np.isnan(closes)
+        if not hasClose.all():
+            dataFrame, closes = dataFrame[hasClose], closes[hasClose]
+
+        dateTimes: pandas.DatetimeIndex = pandas.DatetimeIndex(dataFrame.index)
+        timeZone: Union[None, tzinfo] = dateTimes.tz
+        if timeZone != None:
+            dateTimes = dateTimes.tz_convert('UTC').tz_localize(None)
+
+        return cls.fromArrays(ticker,
+                              dateTimes.to_numpy(dtype='datetime64[us]'),
+                              dataFrame[columns['open']].to_numpy(dtype=np.float64),
+                              closes,
+                              dataFrame[columns['low']].to_numpy(dtype=np.float64),
+                              dataFrame[columns['high']].to_numpy(dtype=np.float64),
+                              __toVolumes__(dataFrame[columns['volume']].to_numpy(dtype=np.float64, na_value=np.nan)),
+                              timeZone)
+
+    @classmethod
+    def load(cls, path: str, memoryMap: bool = True) -> 'TickerFeed':
+        '''
+        Loads a TickerFeed previously written with `save`.
+
+        When memory mapped, the columns are read lazily from disk and the operating system shares their pages
+        between every process that loads the same feed.
+
+        :param path: The directory the feed was saved to.
+        :param memoryMap: Whether to memory map the columns (read-only) instead of reading them into memory.
+        :return: The loaded TickerFeed.
+        '''
+
+        with open(os.path.join(path, TickerFeed.METADATA_FILE_NAME), 'rb') as metadataFile:
+            metadata: dict[str, Any] = pickle.load(metadataFile)
+
+        tickerFeed: TickerFeed = cls()
+        tickerFeed._timeZone = metadata['timeZone']
+        tickerFeed._tickers = metadata['tickers']
+        tickerFeed._tickerIds = {ticker: tickerId for tickerId, ticker in enumerate(tickerFeed._tickers)}
+
+        for columnName in TickerFeed.COLUMN_NAMES:
+            setattr(tickerFeed, columnName, np.load(os.path.join(path, f'{columnName[1:]}.npy'), mmap_mode='r' if memoryMap else None))
+        tickerFeed._size = len(tickerFeed._dateTimes)
+
+        return tickerFeed
+
+    def __getTickerId__(self, ticker: str) -> int:
+        '''
+        Gets the integer id used to store a ticker symbol in the feed, registering it if it is new.
+
+        :param ticker: The stock ticker symbol.
+        :return: The ticker's integer id.
+        '''
+
+        tickerId: Union[None, int] = self._tickerIds.get(ticker)
+        if tickerId == None:
+            tickerId = len(self._tickers)
+            self._tickers.append(ticker)
+            self._tickerIds[ticker] = tickerId
+        return tickerId
+
+    def __getTickerColumn__(self) -> np.ndarray:
+        '''
+        Returns the ticker symbol of every bar in the feed.
+
+        :return: An object array holding the ticker symbol of each bar.
+        '''
+
+        return np.array(self._tickers, dtype=object)[self._tickerIndices[:self._size]]
+
+    @property
+    def feed(self) -> FeedList:
+        '''
+        Returns every bar in the feed as a read-only list of TickerData objects.
+
+        This materializes the whole feed and is kept for compatibility, prefer iterating the feed instead. The bars are
+        no longer stored in a list, so the returned list is a snapshot and mutating it (e.g. `feed.feed.append(...)`)
+        raises a TypeError, append to the feed itself instead.
+
+        :return: A read-only list of TickerData objects.
+        '''
+
+        return FeedList(self)
+
+    @feed.setter
+    def feed(self, data: list[TickerData]) -> None:
+        '''
+        Replaces every bar in the feed with the provided TickerData objects.
+
+        :param data: A list of TickerData objects.
+        :return: None
+        '''
+
+        self.__init__(data)
+
+    @property
+    def tickers(self) -> np.ndarray:
+        '''
+        Returns the ticker symbol of every bar in the feed, in feed order.
+
+        :return: An object array of ticker symbols.
+        '''
+
+        return self.__getTickerColumn__()
+
+    @property
+    def dateTimes(self) -> np.ndarray:
+        '''
+        Returns the dateTime of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only datetime64 array of the date of every bar, naive in UTC.
+        '''
+
+        return self.__getColumnView__('_dateTimes')
+
+    @property
+    def opens(self) -> np.ndarray:
+        '''
+        Returns the open of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only float64 array of the open of every bar.
+        '''
+
+        return self.__getColumnView__('_opens')
+
+    @property
+    def closes(self) -> np.ndarray:
+        '''
+        Returns the close of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only float64 array of the close of every bar.
+        '''
+
+        return self.__getColumnView__('_closes')
+
+    @property
+    def lows(self) -> np.ndarray:
+        '''
+        Returns the low of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only float64 array of the low of every bar.
+        '''
+
+        return self.__getColumnView__('_lows')
+
+    @property
+    def highs(self) -> np.ndarray:
+        '''
+        Returns the high of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only float64 array of the high of every bar.
+        '''
+
+        return self.__getColumnView__('_highs')
+
+    @property
+    def volumes(self) -> np.ndarray:
+        '''
+        Returns the volume of every bar in the feed, in feed order, without copying.
+
+        :return: A read-only int64 array of the volume of every bar.
+        '''
+
+        return self.__getColumnView__('_volumes')
+
     def __str__(self) -> str:
         '''
         Returns a string representation of the TickerFeed.
@@ -76,9 +496,9 @@ class TickerFeed():
         :return: A string representation of the TickerFeed.
         '''
 
-        result: str = f'TickerFeed:{{{self.feed[0]} ... {len(self.feed) - 2} others ... {self.feed[-1]}}}' if len(self.feed) != 0 else 'TickerFeed:{Empty}'
-        if len(self.feed) == 2: result = f'TickerFeed:{{{self.feed[0]}, {self.feed[1]}}}'
-        elif len(self.feed) == 1: result = f'TickerFeed:{{{self.feed[0]}}}'
+        result: str = f'TickerFeed:{{{self[0]} ... {len(self) - 2} others ... {self[-1]}}}' if len(self) != 0 else 'TickerFeed:{Empty}'
+        if len(self) == 2: result = f'TickerFeed:{{{self[0]}, {self[1]}}}'
+        elif len(self) == 1: result = f'TickerFeed:{{{self[0]}}}'
 
         return result
     
@@ -100,24 +520,90 @@ class TickerFeed():
         '''
 
         if isinstance(other, TickerFeed):
-            for tickerData, tickerDataOther in zip(self.feed, other.feed):
-                if tickerData != tickerDataOther:
-                    return False
-                
-            if len(self.feed) != len(other.feed):
+            if len(self) != len(other) or (self._timeZone == None) != (other._timeZone == None):
                 return False
-            
-            return True
+
+            size: int = self._size
+            return bool(np.array_equal(self.__getTickerColumn__(), other.__getTickerColumn__()) and
+                        np.array_equal(self._dateTimes[:size], other._dateTimes[:size]) and
+                        np.array_equal(np.round(self._opens[:size], 3), np.round(other._opens[:size], 3)) and
+                        np.array_equal(np.round(self._closes[:size], 3), np.round(other._closes[:size], 3)) and
+                        np.array_equal(np.round(self._lows[:size], 3), np.round(other._lows[:size], 3)) and
+                        np.array_equal(np.round(self._highs[:size], 3), np.round(other._highs[:size], 3)) and
+                        np.array_equal(self._volumes[:size], other._volumes[:size]))
         return False
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TickerData, 'TickerFeed']:
+        '''
+        Returns the bar at the given position, or a TickerFeed sharing the underlying columns for a slice.
+
+        :param index: The position of the bar, or a slice of positions.
+        :return: The TickerData at the position, or a TickerFeed view for a slice.
+        '''
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            tickerFeed: TickerFeed = TickerFeed()
+            tickerFeed._timeZone = self._timeZone
+            tickerFeed._tickers = list(self._tickers)
+            tickerFeed._tickerIds = dict(self._tickerIds)
+            for columnName in TickerFeed.COLUMN_NAMES:
+                setattr(tickerFeed, columnName, getattr(self, columnName)[start:stop:step])
+            tickerFeed._size = len(tickerFeed._dateTimes)
+            return tickerFeed
+
+        if index < 0: index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('TickerFeed index out of range')
+
+        return TickerData(self._tickers[self._tickerIndices[index]],
+                          self.__toDateTime__(self._dateTimes[index]),
+                          float(self._opens[index]),
+                          float(self._closes[index]),
+                          float(self._lows[index]),
+                          float(self._highs[index]),
+                          int(self._volumes[index]))
     
     def __iter__(self) -> Iterator[TickerData]:
         '''
         Returns an iterator over the TickerData items in the feed.
 
+        TickerData objects are created lazily, a chunk of rows at a time, so iterating never
+        materializes the whole feed at once.
+
         :return: An iterator of TickerData objects.
         '''
 
-        return iter(self.feed)
+        for chunkStart in range(0, self._size, TickerFeed.ITERATION_CHUNK_SIZE):
+            chunkEnd: int = min(chunkStart + TickerFeed.ITERATION_CHUNK_SIZE, self._size)
+
+            tickers: list[str] = [self._tickers[tickerId] for tickerId in self._tickerIndices[chunkStart:chunkEnd].tolist()]
+            dateTimes: list[datetime] = self._dateTimes[chunkStart:chunkEnd].tolist()
+            if self._timeZone != None:
+                dateTimes = [dateTime.replace(tzinfo=timezone.utc).astimezone(self._timeZone) for dateTime in dateTimes]
+
+            for tickerData in zip(tickers,
+                                  dateTimes,
+                                  self._opens[chunkStart:chunkEnd].tolist(),
+                                  self._closes[chunkStart:chunkEnd].tolist(),
+                                  self._lows[chunkStart:chunkEnd].tolist(),
+                                  self._highs[chunkStart:chunkEnd].tolist(),
+                                  self._volumes[chunkStart:chunkEnd].tolist()):
+                yield TickerData(*tickerData)
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        '''
+        Restores a pickled feed, including feeds pickled with the older list based layout.
+
+        :param state: The pickled state of the feed.
+        :return: None
+        '''
+
+        if 'feed' in state:
+            self.__init__(state['feed'])
+            return
+
+        self.__dict__.update(state)
     
     def append(self, tickerData: TickerData) -> None:
         '''
@@ -126,9 +612,95 @@ class TickerFeed():
         :param tickerData: The TickerData object to append.
         :return: None
         '''
-        
-        self.feed.append(tickerData)
+
+        if self._size == 0:
+            self._timeZone = getattr(tickerData.dateTime, 'tzinfo', None)
+
+        self.__reserve__(self._size + 1)
+
+        index: int = self._size
+        self._tickerIndices[index] = self.__getTickerId__(tickerData.ticker)
+        self._dateTimes[index] = TickerFeed.__toDateTime64__(tickerData.dateTime)
+        self._opens[index] = tickerData.open
+        self._closes[index] = tickerData.close
+        self._lows[index] = tickerData.low
+        self._highs[index] = tickerData.high
+        self._volumes[index] = tickerData.volume
+        self._size += 1
+
+    def save(self, path: str) -> None:
+        '''
+        Saves the feed to a directory, writing each column to its own .npy file so it can be memory mapped by `load`.
+
+        :param path: The directory to save the feed to, created if it does not exist.
+        :return: None
+        '''
+
+        os.makedirs(path, exist_ok=True)
+
+        for columnName in TickerFeed.COLUMN_NAMES:
+            np.save(os.path.join(path, f'{columnName[1:]}.npy'), getattr(self, columnName)[:self._size])
+
+        with open(os.path.join(path, TickerFeed.METADATA_FILE_NAME), 'wb') as metadataFile:
+            pickle.dump({'tickers': self._tickers, 'timeZone': self._timeZone}, metadataFile)
+
+    def sortedByDate(self) -> 'TickerFeed':
+        '''
+        Returns the feed ordered by date, keeping the original order of bars that share a date.
+
+        :return: This feed if it is already in time order, otherwise a sorted copy.
+        '''
+
+        dateTimes: np.ndarray = self._dateTimes[:self._size]
+        if np.all(dateTimes[1:] >= dateTimes[:-1]):
+            return self
+
+        sortedIndices: np.ndarray = np.argsort(dateTimes, kind='stable')
+        tickerFeed: TickerFeed = self[:]
+        for columnName in TickerFeed.COLUMN_NAMES:
+            setattr(tickerFeed, columnName, getattr(tickerFeed, columnName)[sortedIndices])
+        return tickerFeed
     
+    def getByDateRange(self, start: Union[None, datetime] = None, end: Union[None, datetime] = None) -> 'TickerFeed':
+        '''
+        Returns the bars dated from `start` (inclusive) up to `end` (exclusive), in time order.
+
+        The returned TickerFeed shares the columns of this feed when it is already in time order.
+
+        :param start: The earliest datetime to include, or None to start from the first bar.
+        :param end: The datetime to stop before, or None to include every bar up to the last one.
+        :return: A TickerFeed holding the bars within the range.
+        '''
+
+        tickerFeed: TickerFeed = self.sortedByDate()
+        dateTimes: np.ndarray = tickerFeed._dateTimes[:tickerFeed._size]
+
+        startIndex: int = int(np.searchsorted(dateTimes, TickerFeed.__toDateTime64__(start), side='left')) if start != None else 0
+        endIndex: int = int(np.searchsorted(dateTimes, TickerFeed.__toDateTime64__(end), side='left')) if end != None else tickerFeed._size
+        return tickerFeed[startIndex:endIndex]
+
+    def getByTicker(self, ticker: str) -> 'TickerFeed':
+        '''
+        Returns the bars of a single ticker, in time order.
+
+        :param ticker: The stock ticker symbol.
+        :return: This feed's sorted bars if it only holds the ticker, otherwise a copy holding only the ticker's bars.
+        '''
+
+        tickerFeed: TickerFeed = self.sortedByDate()
+        if tickerFeed._tickers == [ticker]:
+            return tickerFeed
+
+        isTicker: np.ndarray = tickerFeed._tickerIndices[:tickerFeed._size] == tickerFeed._tickerIds.get(ticker, -1)
+        return TickerFeed.fromArrays(ticker,
+                                     tickerFeed.dateTimes[isTicker],
+                                     tickerFeed.opens[isTicker],
+                                     tickerFeed.closes[isTicker],
+                                     tickerFeed.lows[isTicker],
+                                     tickerFeed.highs[isTicker],
+                                     tickerFeed.volumes[isTicker],
+                                     tickerFeed._timeZone)
+
     def getByFirstDate(self) -> datetime:
         '''
         Returns the earliest date in the TickerFeed.
@@ -136,8 +708,7 @@ class TickerFeed():
         :return: The earliest datetime in the feed.
         '''
 
-        allDateTimes: list[datetime] = [tickerData.dateTime for tickerData in self.feed]
-        return min(allDateTimes)
+        return self.__toDateTime__(self._dateTimes[:self._size].min())
 
     def getByLastDate(self) -> datetime:
         '''
@@ -146,17 +717,718 @@ class TickerFeed():
         :return: The latest datetime in the feed.
         '''
 
-        allDateTimes: list[datetime] = [tickerData.dateTime for tickerData in self.feed]
-        return max(allDateTimes)
-    
-@dataclass
+        return self.__toDateTime__(self._dateTimes[:self._size].max())
+
+    def resample(self, interval: timedelta, origin: Union[None, datetime] = None) -> 'TickerFeed':
+        '''
+        Aggregates the bars of each ticker into bars of a longer interval, e.g. minute bars into 5 minute bars.
+
+        Bars are taken as dated when they close, as the engine steps through them, so each interval ends at a
+        multiple of `interval` from `origin` and includes the bars dated after its start, up to and including its
+        end. The aggregated bars are dated at the end of their interval, when their last bar is known, so they never
+        reveal a bar before the engine reaches it.
+
+        :param interval: The length of the aggregated bars.
+        :param origin: A datetime intervals end at, defaults to midnight UTC on 1970-01-01.
+        :return: A TickerFeed of the aggregated bars, in time order.
+        '''
+
+        tickerFeed: TickerFeed = self.sortedByDate()
+        return tickerFeed.__aggregate__(__getIntervalEnds__(tickerFeed._dateTimes[:tickerFeed._size], interval, origin))
+
+    def resampleSessions(self, sessionStart: time = time(9, 30), sessionEnd: time = time(16, 0), timeZone: Union[None, str, tzinfo] = None) -> 'TickerFeed':
+        '''
+        Aggregates the intraday bars of each ticker into a bar per trading session, leaving out the bars outside the
+        session's hours (e.g. pre and post market bars). Sessions ending before they start span midnight.
+
+        As with `resample`, bars are taken as dated when they close, and each session's bar is dated at its close.
+
+        :param sessionStart: The local time the session opens.
+        :param sessionEnd: The local time the session closes.
+        :param timeZone: The time zone of the session's hours, defaults to the feed's time zone, or the feed's dates if it has none.
+        :return: A TickerFeed of the session bars, in time order.
+        '''
+
+        tickerFeed: TickerFeed = self.sortedByDate()
+        timeZone = timeZone if timeZone != None else tickerFeed._timeZone
+
+        dateTimes: pandas.DatetimeIndex = pandas.DatetimeIndex(tickerFeed._dateTimes[:tickerFeed._size])
+        if timeZone != None:
+            dateTimes = dateTimes.tz_localize('UTC').tz_convert(timeZone).tz_localize(None)
+
+        # Shift local times so every session starts at midnight of its date, bars at midnight closing the previous date
+        startOffset: pandas.Timedelta = pandas.Timedelta(hours=sessionStart.hour, minutes=sessionStart.minute, seconds=sessionStart.second)
+        endOffset: pandas.Timedelta = pandas.Timedelta(hours=sessionEnd.hour, minutes=sessionEnd.minute, seconds=sessionEnd.second)
+        sessionLength: pandas.Timedelta = (endOffset - startOffset) % pandas.Timedelta(days=1) or pandas.Timedelta(days=1)
+
+        shiftedDateTimes: pandas.DatetimeIndex = dateTimes - startOffset
+        sessionDates: pandas.DatetimeIndex = (shiftedDateTimes - pandas.Timedelta(microseconds=1)).floor('D')
+        timesInSession: pandas.TimedeltaIndex = shiftedDateTimes - sessionDates
+        isInSession: np.ndarray = np.asarray(timesInSession <= sessionLength)
+
+        sessionCloses: pandas.DatetimeIndex = sessionDates + startOffset + sessionLength
+        if timeZone != None:
+            sessionCloses = sessionCloses.tz_localize(timeZone, ambiguous='NaT', nonexistent='shift_forward').tz_convert('UTC').tz_localize(None)
+
+        sessionFeed: TickerFeed = tickerFeed.__aggregate__(sessionCloses.to_numpy(dtype='datetime64[us]'), isInSession)
+        sessionFeed._timeZone = tickerFeed._timeZone if tickerFeed._timeZone != None or timeZone == None else pandas.Timestamp(0, tz=timeZone).tzinfo
+        return sessionFeed
+
+    def alignTo(self, tickerFeed: 'TickerFeed') -> np.ndarray:
+        '''
+        Finds, for every bar of a feed, the latest bar of this feed of the same ticker dated no later than it.
+        Used to read the bars of a longer interval made with `resample` from a feed of shorter bars, without reading
+        bars that are not yet closed.
+
+        :param tickerFeed: The feed whose bars to align this feed's bars to.
+        :return: For each bar of `tickerFeed` in time order, the position of the aligned bar in this feed in time order, or -1 if there is none.
+        '''
+
+        alignedFeed: TickerFeed = self.sortedByDate()
+        tickerFeed = tickerFeed.sortedByDate()
+
+        alignedIndices: np.ndarray = np.full(tickerFeed._size, -1, dtype=np.int64)
+        for ticker, tickerId in tickerFeed._tickerIds.items():
+            if ticker not in alignedFeed._tickerIds:
+                continue
+
+            barIndices: np.ndarray = np.flatnonzero(tickerFeed._tickerIndices[:tickerFeed._size] == tickerId)
+            alignedBarIndices: np.ndarray = np.flatnonzero(alignedFeed._tickerIndices[:alignedFeed._size] == alignedFeed._tickerIds[ticker])
+            positions: np.ndarray = np.searchsorted(alignedFeed._dateTimes[alignedBarIndices], tickerFeed._dateTimes[barIndices], side='right') - 1
+            alignedIndices[barIndices] = np.where(positions >= 0, alignedBarIndices[np.maximum(positions, 0)], -1)
+        return alignedIndices
+
+    def __aggregate__(self, groupDateTimes: np.ndarray, isKept: Union[None, np.ndarray] = None) -> 'TickerFeed':
+        '''
+        Aggregates consecutive bars of each ticker sharing a group date into a single bar dated at the group date.
+
+        :param groupDateTimes: The group date of every bar, non-decreasing within each ticker.
+        :param isKept: Optional mask of the bars to aggregate, the others are left out.
+        :return: A TickerFeed of the aggregated bars, in time order.
+        '''
+
+        rows: np.ndarray = np.arange(self._size) if isKept is None else np.flatnonzero(isKept)
+        rows = rows[np.argsort(self._tickerIndices[rows], kind='stable')]
+
+        tickerIndices: np.ndarray = self._tickerIndices[rows]
+        groupDateTimes = groupDateTimes[rows]
+
+        tickerFeed: TickerFeed = TickerFeed()
+        tickerFeed._timeZone = self._timeZone
+        tickerFeed._tickers = list(self._tickers)
+        tickerFeed._tickerIds = dict(self._tickerIds)
+        if len(rows) == 0:
+            return tickerFeed
+
+        isGroupStart: np.ndarray = np.ones(len(rows), dtype=bool)
+        isGroupStart[1:] = (tickerIndices[1:] != tickerIndices[:-1]) | (groupDateTimes[1:] != groupDateTimes[:-1])
+        groupStarts: np.ndarray = np.flatnonzero(isGroupStart)
+        groupEnds: np.ndarray = np.append(groupStarts[1:], len(rows)) - 1
+
+        tickerFeed._tickerIndices = tickerIndices[groupStarts]
+        tickerFeed._dateTimes = groupDateTimes[groupStarts]
+        tickerFeed._opens = self._opens[rows[groupStarts]]
+        tickerFeed._closes = self._closes[rows[groupEnds]]
+        tickerFeed._lows = np.minimum.reduceat(self._lows[rows], groupStarts)
+        tickerFeed._highs = np.maximum.reduceat(self._highs[rows], groupStarts)
+        tickerFeed._volumes = np.add.reduceat(self._volumes[rows], groupStarts)
+        tickerFeed._size = len(groupStarts)
+        return tickerFeed.sortedByDate()
+
+class StreamingTickerFeed():
+    '''
+    A ticker feed whose bars are read lazily, one chunk at a time, so it never holds more than a chunk in memory.
+
+    The chunks are produced by a function that is called again every time the feed is iterated. It must yield
+    TickerFeeds in time order, each holding a chunk of bars that starts no earlier than the previous chunk ends.
+    Streaming feeds can be backtested by the `BacktestEngine`, whose strategies then update their indicators and
+    histories one bar at a time instead of reading ahead from the feed.
+    '''
+
+    def __init__(self, tickers: list[str], readChunks: Callable[[], Iterator[TickerFeed]]):
+        '''
+        Initializes the streaming feed.
+
+        :param tickers: The stock ticker symbols of the bars the feed holds.
+        :param readChunks: Function returning a new iterator over the feed's chunks, in time order.
+        '''
+
+        self._tickers: list[str] = list(tickers)
+        self._tickerIds: dict[str, int] = {ticker: tickerId for tickerId, ticker in enumerate(self._tickers)}
+        self._readChunks: Callable[[], Iterator[TickerFeed]] = readChunks
+
+        # First date of the feed, read once, as engines ask for it every time a feed is added
+        self._firstDate: Union[None, datetime] = None
+
+    def chunks(self) -> Iterator[TickerFeed]:
+        '''
+        Reads the feed's chunks from the start, skipping empty chunks.
+
+        :return: An iterator of TickerFeeds, each in time order.
+        '''
+
+        lastDateTime: Union[None, np.datetime64] = None
+        for chunk in self._readChunks():
+            if len(chunk) == 0:
+                continue
+
+            chunk = chunk.sortedByDate()
+            if lastDateTime != None and chunk._dateTimes[0] < lastDateTime:
+                raise ValueError('StreamingTickerFeed chunks must be in time order.')
+            lastDateTime = chunk._dateTimes[len(chunk) - 1]
+            yield chunk
+
+    def __iter__(self) -> Iterator[TickerData]:
+        '''
+        Returns an iterator over the bars of the feed, in time order.
+
+        :return: An iterator of TickerData objects.
+        '''
+
+        for chunk in self.chunks():
+            yield from chunk
+
+    def sortedByDate(self) -> 'StreamingTickerFeed':
+        '''
+        Returns the feed, whose bars are always streamed in time order.
+
+        :return: This feed.
+        '''
+
+        return self
+
+    def getByFirstDate(self) -> datetime:
+        '''
+        Returns the earliest date in the feed, reading only its first chunk the first time it is called.
+
+        :return: The earliest datetime in the feed.
+        '''
+
+        if self._firstDate != None:
+            return self._firstDate
+
+        for chunk in self.chunks():
+            self._firstDate = chunk.getByFirstDate()
+            return self._firstDate
+        raise ValueError('StreamingTickerFeed is empty.')
+
+    def getByLastDate(self) -> datetime:
+        '''
+        Returns the latest date in the feed, streaming through every chunk.
+
+        :return: The latest datetime in the feed.
+        '''
+
+        lastChunk: Union[None, TickerFeed] = None
+        for chunk in self.chunks():
+            lastChunk = chunk
+        if lastChunk == None:
+            raise ValueError('StreamingTickerFeed is empty.')
+        return lastChunk.getByLastDate()
+
+@dataclass(frozen=True)
 class Position:
     '''
-    Represents a position held in a specific ticker.
+    Represents an immutable record of a position held in a specific ticker.
+
+    Positions are shared with strategies and trackers without copying, so their fields cannot be assigned to. Use
+    `withUnits` to get the position with a different number of units.
 
     :param ticker: The stock ticker symbol.
     :param units: The number of units currently held. Defaults to 0.
     '''
 
     ticker: str
-    units: int = 0
\ No newline at end of file
+    units: int = 0
+
+    def withUnits(self, units: int) -> 'Position':
+        '''
+        Returns a copy of the position holding a different number of units, leaving this position unchanged.
+
+        :param units: The number of units held by the new position.
+        :return: The new position.
+        '''
+
+        return dataclasses.replace(self, units=units)
+
+class RingBuffer():
+    '''
+    A fixed capacity buffer of the latest values appended to it, backed by a NumPy array.
+
+    Every value is written twice, at its slot and at its slot plus the capacity, so the latest values are always
+    contiguous and can be returned as a view in chronological order without copying.
+    '''
+
+    def __init__(self, capacity: int, dtype: Any = np.float64):
+        '''
+        Initializes an empty ring buffer.
+
+        :param capacity: The maximum number of values held, older values are dropped as new ones are appended.
+        :param dtype: The NumPy dtype of the values.
+        '''
+
+        if capacity < 1:
+            raise ValueError('Ring buffer capacity must be at least 1.')
+
+        self.capacity: int = capacity
+
+        self._buffer: np.ndarray = np.zeros(2 * capacity, dtype=dtype)
+        self._head: int = 0
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of values held.
+
+        :return: The number of values held.
+        '''
+
+        return self._size
+
+    def __getitem__(self, index: int) -> Any:
+        '''
+        Returns a held value, 0 being the oldest and -1 the latest.
+
+        :param index: The position of the value.
+        :return: The value.
+        '''
+
+        if index < 0: index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('RingBuffer index out of range')
+
+        return self._buffer[self._head + self.capacity - self._size + index]
+
+    @property
+    def isFull(self) -> bool:
+        '''
+        Whether the buffer holds as many values as its capacity, so the next append drops the oldest value.
+
+        :return: True if the buffer is full.
+        '''
+
+        return self._size == self.capacity
+
+    def append(self, value: Any) -> Any:
+        '''
+        Appends a value in O(1), dropping the oldest value if the buffer is full.
+
+        :param value: The value to append.
+        :return: The dropped value, or None if the buffer was not full.
+        '''
+
+        droppedValue: Any = self._buffer[self._head] if self._size == self.capacity else None
+
+        self._buffer[self._head] = value
+        self._buffer[self._head + self.capacity] = value
+        self._head = self._head + 1 if self._head + 1 < self.capacity else 0
+        if self._size < self.capacity: self._size += 1
+
+        return droppedValue
+
+    def latest(self, count: Union[None, int] = None) -> np.ndarray:
+        '''
+        Returns the latest values in chronological order as a read-only view, without copying.
+
+        The view is only valid until the next append, copy it to keep the values.
+
+        :param count: The number of latest values to return, None for every value held. Raises a ValueError if larger
+                      than the buffer's capacity, fewer values are returned while the buffer is not full.
+        :return: A read-only array view of at most `count` values, oldest first.
+        '''
+
+        if count == None:
+            count = self._size
+        elif count > self.capacity:
+            raise ValueError(f'Cannot read {count} values from a ring buffer with a capacity of {self.capacity} values.')
+        else:
+            count = max(0, min(count, self._size))
+        end: int = self._head + self.capacity
+
+        values: np.ndarray = self._buffer[end - count:end]
+        values.flags.writeable = False
+        return values
+
+class TickerHistory():
+    '''
+    The latest bars of a single ticker, up to a fixed window, readable as NumPy arrays without copying.
+
+    When the ticker's whole feed is known up front (in a backtest), the history is a sliding window over the feed's
+    columns and only the number of bars seen is tracked. Otherwise each field is kept in a ring buffer.
+    '''
+
+    FIELDS: tuple[str, ...] = ('open', 'close', 'low', 'high', 'volume')
+
+    def __init__(self, window: int, tickerFeed: Union[None, TickerFeed] = None):
+        '''
+        Initializes an empty history.
+
+        :param window: The maximum number of bars held.
+        :param tickerFeed: Optional feed holding every bar of the ticker in time order, to read the history from.
+        '''
+
+        if window < 1:
+            raise ValueError('History window must be at least 1.')
+
+        self.window: int = window
+
+        self._columns: Union[None, dict[str, np.ndarray]] = None
+        self._ringBuffers: Union[None, dict[str, RingBuffer]] = None
+        self._size: int = 0
+
+        if tickerFeed != None:
+            self._columns = {field: getattr(tickerFeed, f'{field}s') for field in TickerHistory.FIELDS}
+        else:
+            self._ringBuffers = {field: RingBuffer(window, np.int64 if field == 'volume' else np.float64) for field in TickerHistory.FIELDS}
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of bars held.
+
+        :return: The number of bars held, at most the window.
+        '''
+
+        return min(self._size, self.window)
+
+    def update(self, tickerData: TickerData) -> None:
+        '''
+        Adds the next bar of the ticker.
+
+        :param tickerData: The next bar.
+        :return: None
+        '''
+
+        self._size += 1
+        if self._ringBuffers != None:
+            for field, ringBuffer in self._ringBuffers.items():
+                ringBuffer.append(getattr(tickerData, field))
+
+    def get(self, field: str, count: Union[None, int] = None) -> np.ndarray:
+        '''
+        Returns the latest values of a field, oldest first, as a read-only view that is only valid until the next bar.
+
+        :param field: One of 'open', 'close', 'low', 'high' or 'volume'.
+        :param count: The number of latest values, None for the whole window. Raises a ValueError if larger than the
+                      window, fewer values are returned until the window is filled, as with `RingBuffer.latest`.
+        :return: A read-only array of at most `count` values.
+        '''
+
+        if field not in TickerHistory.FIELDS:
+            raise ValueError(f'Unknown field \'{field}\', expected one of open, close, low, high or volume.')
+        if count == None:
+            count = self.window
+        elif count > self.window:
+            raise ValueError(f'Cannot read {count} bars from a history window of {self.window} bars.')
+
+        if self._ringBuffers != None:
+            return self._ringBuffers[field].latest(count)
+
+        return self._columns[field][max(0, self._size - count):self._size]
+
+def __toVolumes__(values: np.ndarray) -> np.ndarray:
+    '''
+    Converts volumes read as floats to integers, missing (NaN) volumes becoming 0 as they cannot be held by an integer.
+
+    :param values: The volumes, as floats.
+    :return: The volumes, as 64 bit integers.
+    '''
+
+    return np.nan_to_num(values, nan=0.0).astype(np.int64)
+
+def __getIntervalEnds__(dateTimes: np.ndarray, interval: timedelta, origin: Union[None, datetime] = None) -> np.ndarray:
+    '''
+    Finds the end of the interval each date falls in, intervals ending at multiples of `interval` from `origin` and
+    including their end.
+
+    :param dateTimes: Naive UTC dates, as datetime64 values.
+    :param interval: The length of the intervals.
+    :param origin: A datetime intervals end at, defaults to midnight UTC on 1970-01-01.
+    :return: The end of each date's interval, as datetime64 values in microseconds.
+    '''
+
+    intervalLength: int = int(interval / timedelta(microseconds=1))
+    if intervalLength < 1:
+        raise ValueError('Resampling interval must be positive.')
+
+    originDateTime: np.datetime64 = TickerFeed.__toDateTime64__(origin) if origin != None else np.datetime64(0, 'us')
+    elapsed: np.ndarray = (np.asarray(dateTimes, dtype='datetime64[us]') - originDateTime).astype(np.int64)
+    return originDateTime + (-(-elapsed // intervalLength) * intervalLength).astype('timedelta64[us]')
+
+class BarAggregator():
+    '''
+    Aggregates the bars of a ticker into bars of a longer interval one bar at a time, as `TickerFeed.resample` does
+    for a whole feed.
+
+    An aggregated bar is completed by the bar dated at the end of its interval, or otherwise by the first bar of a
+    later interval, and never holds a bar the aggregator has not been updated with.
+    '''
+
+    def __init__(self, interval: timedelta, origin: Union[None, datetime] = None):
+        '''
+        Initializes the aggregator.
+
+        :param interval: The length of the aggregated bars.
+        :param origin: A datetime intervals end at, defaults to midnight UTC on 1970-01-01.
+        '''
+
+        self.interval: timedelta = interval
+        self.origin: Union[None, datetime] = origin
+
+        self._bar: Union[None, TickerData] = None
+        self._barEnd: Union[None, np.datetime64] = None
+
+    def update(self, tickerData: TickerData) -> list[TickerData]:
+        '''
+        Adds the next bar to the aggregated bar of its interval.
+
+        :param tickerData: The next bar, no earlier than the previous one.
+        :return: The aggregated bars completed by the bar, oldest first.
+        '''
+
+        completedBars: list[TickerData] = []
+        dateTime: np.datetime64 = TickerFeed.__toDateTime64__(tickerData.dateTime)
+        barEnd: np.datetime64 = __getIntervalEnds__(np.array([dateTime]), self.interval, self.origin)[0]
+
+        if self._bar != None and barEnd != self._barEnd:
+            completedBars.append(self._bar)
+            self._bar = None
+
+        if self._bar == None:
+            barDateTime: datetime = barEnd.item()
+            if tickerData.dateTime.tzinfo != None:
+                barDateTime = barDateTime.replace(tzinfo=timezone.utc).astimezone(tickerData.dateTime.tzinfo)
+            self._bar = TickerData(tickerData.ticker, barDateTime, tickerData.open, tickerData.close, tickerData.low, tickerData.high, tickerData.volume)
+            self._barEnd = barEnd
+        else:
+            self._bar.close = tickerData.close
+            self._bar.low = min(self._bar.low, tickerData.low)
+            self._bar.high = max(self._bar.high, tickerData.high)
+            self._bar.volume += tickerData.volume
+
+        if dateTime == barEnd:
+            completedBars.append(self._bar)
+            self._bar = None
+        return completedBars
+
+class TickAggregator():
+    '''
+    Aggregates the trades and quotes of any number of tickers into bars, one tick at a time.
+
+    Ticks are aggregated into time bars of a fixed interval, into volume bars of a fixed number of units traded, or
+    into tick bars of a fixed number of ticks. Each ticker holds only its open bars, and a tick does a constant amount
+    of work unless it opens or completes a bar.
+
+    Time bars are dated at the end of their interval, as `BarAggregator` dates them, and hold the ticks after their
+    start up to and including their end. Since more ticks dated at the end of an interval may still arrive, a time bar
+    is only completed by the first tick of any ticker dated after its end plus `maxDelay`, so ticks arriving out of
+    order by up to `maxDelay` are still added to their bar. Ticks of a time bar that was already completed are late,
+    and are dropped. Volume and tick bars are dated at the tick that completes them, and ticks of a ticker older than
+    its previous tick are dropped as late. Late ticks are counted in `numLateTicks`.
+    '''
+
+    def __init__(self,
+                 interval: Union[None, timedelta] = None,
+                 volume: Union[None, int] = None,
+                 numTicks: Union[None, int] = None,
+                 origin: Union[None, datetime] = None,
+                 maxDelay: timedelta = timedelta(0)):
+        '''
+        Initializes the aggregator, exactly one of `interval`, `volume` and `numTicks` must be given.
+
+        :param interval: The length of time bars.
+        :param volume: The number of units traded that completes a volume bar.
+        :param numTicks: The number of ticks that completes a tick bar.
+        :param origin: A datetime time bar intervals end at, defaults to midnight UTC on 1970-01-01.
+        :param maxDelay: How long after its end a time bar still takes ticks arriving out of order.
+        '''
+
+        if sum(barSize != None for barSize in (interval, volume, numTicks)) != 1:
+            raise ValueError('Exactly one of interval, volume and numTicks must be given.')
+        if (interval != None and interval <= timedelta(0)) or (volume != None and volume < 1) or (numTicks != None and numTicks < 1):
+            raise ValueError('Bar size must be positive.')
+        if maxDelay < timedelta(0):
+            raise ValueError('Maximum delay must not be negative.')
+
+        self.interval: Union[None, timedelta] = interval
+        self.volume: Union[None, int] = volume
+        self.numTicks: Union[None, int] = numTicks
+        self.origin: Union[None, datetime] = origin
+        self.maxDelay: timedelta = maxDelay
+
+        self.numLateTicks: int = 0
+
+        self._origin: datetime = TickerFeed.__toDateTime64__(origin).item() if origin != None else datetime(1970, 1, 1)
+
+        # Open bars are kept as [bar, first tick date, last tick date, number of ticks] so ticks can be added in place
+        self._openBars: dict[str, dict[datetime, list]] = {}
+        self._latestBars: dict[str, tuple[datetime, datetime, list]] = {}
+        self._barEnds: list[tuple[datetime, int, str]] = []
+        self._sequence: int = 0
+        self._watermark: Union[None, datetime] = None
+
+        self._countBars: dict[str, list] = {}
+        self._lastTickDateTimes: dict[str, datetime] = {}
+
+    def update(self, tick: Tick) -> list[TickerData]:
+        '''
+        Adds the next tick to the open bar of its ticker.
+
+        :param tick: The next tick.
+        :return: The bars completed by the tick, oldest first.
+        '''
+
+        if self.interval == None:
+            return self.__updateCountBar__(tick)
+
+        # Most ticks fall in the latest bar of their ticker, which is checked without computing their interval
+        latestBar: Union[None, tuple[datetime, datetime, list]] = self._latestBars.get(tick.ticker)
+        if latestBar != None and latestBar[0] < tick.dateTime <= latestBar[1]:
+            self.__addTick__(latestBar[2], tick)
+        else:
+            barEnd: datetime = self.__getIntervalEnd__(tick.dateTime)
+            if self._watermark != None and barEnd + self.maxDelay < self._watermark:
+                self.numLateTicks += 1
+                return []
+
+            tickerBars: dict[datetime, list] = self._openBars.setdefault(tick.ticker, {})
+            openBar: Union[None, list] = tickerBars.get(barEnd)
+            if openBar == None:
+                openBar = tickerBars[barEnd] = [TickerData(tick.ticker, barEnd, tick.price, tick.price, tick.price, tick.price, tick.size), tick.dateTime, tick.dateTime, 1]
+                self._sequence += 1
+                heapq.heappush(self._barEnds, (barEnd, self._sequence, tick.ticker))
+            else:
+                self.__addTick__(openBar, tick)
+
+            if latestBar == None or latestBar[1] < barEnd:
+                self._latestBars[tick.ticker] = (barEnd - self.interval, barEnd, openBar)
+
+        # Bars can only be completed by a tick later than every tick before it
+        if self._watermark != None and tick.dateTime <= self._watermark:
+            return []
+        self._watermark = tick.dateTime
+
+        completedBars: list[TickerData] = []
+        while self._barEnds and self._barEnds[0][0] + self.maxDelay < tick.dateTime:
+            barEnd, _, ticker = heapq.heappop(self._barEnds)
+            completedBars.append(self.__completeTimeBar__(ticker, barEnd))
+        return completedBars
+
+    def flush(self) -> list[TickerData]:
+        '''
+        Completes every open bar, e.g. at the end of a session, even if it is only partially filled.
+
+        :return: The bars that were open, oldest first.
+        '''
+
+        completedBars: list[TickerData] = []
+        if self.interval != None:
+            while self._barEnds:
+                barEnd, _, ticker = heapq.heappop(self._barEnds)
+                completedBars.append(self.__completeTimeBar__(ticker, barEnd))
+        else:
+            for openBar in sorted(self._countBars.values(), key=lambda openBar: openBar[2]):
+                openBar[0].dateTime = openBar[2]
+                completedBars.append(openBar[0])
+            self._countBars.clear()
+        return completedBars
+
+    def __updateCountBar__(self, tick: Tick) -> list[TickerData]:
+        '''
+        Adds the next tick to the open volume or tick bar of its ticker.
+
+        :param tick: The next tick.
+        :return: The bar completed by the tick, if any.
+        '''
+
+        lastTickDateTime: Union[None, datetime] = self._lastTickDateTimes.get(tick.ticker)
+        if lastTickDateTime != None and tick.dateTime < lastTickDateTime:
+            self.numLateTicks += 1
+            return []
+        self._lastTickDateTimes[tick.ticker] = tick.dateTime
+
+        openBar: Union[None, list] = self._countBars.get(tick.ticker)
+        if openBar == None:
+            openBar = self._countBars[tick.ticker] = [TickerData(tick.ticker, tick.dateTime, tick.price, tick.price, tick.price, tick.price, tick.size), tick.dateTime, tick.dateTime, 1]
+        else:
+            self.__addTick__(openBar, tick)
+
+        if (openBar[0].volume < self.volume) if self.volume != None else (openBar[3] < self.numTicks):
+            return []
+
+        del self._countBars[tick.ticker]
+        openBar[0].dateTime = tick.dateTime
+        return [openBar[0]]
+
+    def __completeTimeBar__(self, ticker: str, barEnd: datetime) -> TickerData:
+        '''
+        Removes a time bar from the open bars of its ticker.
+
+        :param ticker: The stock ticker symbol.
+        :param barEnd: The end of the bar's interval.
+        :return: The completed bar.
+        '''
+
+        tickerBars: dict[datetime, list] = self._openBars[ticker]
+        openBar: list = tickerBars.pop(barEnd)
+        if not tickerBars:
+            del self._openBars[ticker]
+
+        latestBar: Union[None, tuple[datetime, datetime, list]] = self._latestBars.get(ticker)
+        if latestBar != None and latestBar[2] is openBar:
+            del self._latestBars[ticker]
+        return openBar[0]
+
+    def __getIntervalEnd__(self, dateTime: datetime) -> datetime:
+        '''
+        Finds the end of the time bar interval a date falls in, see `__getIntervalEnds__`.
+
+        :param dateTime: The date of a tick.
+        :return: The end of the date's interval, in the time zone of the date.
+        '''
+
+        naiveDateTime: datetime = dateTime if dateTime.tzinfo == None else dateTime.astimezone(timezone.utc).replace(tzinfo=None)
+        barEnd: datetime = self._origin + -((self._origin - naiveDateTime) // self.interval) * self.interval
+        if dateTime.tzinfo != None:
+            barEnd = barEnd.replace(tzinfo=timezone.utc).astimezone(dateTime.tzinfo)
+        return barEnd
+
+    @staticmethod
+    def __addTick__(openBar: list, tick: Tick) -> None:
+        '''
+        Adds a tick to an open bar, ticks older than the bar's first or last tick only extending its range and volume.
+
+        :param openBar: The open bar, as [bar, first tick date, last tick date, number of ticks].
+        :param tick: The tick.
+        :return: None
+        '''
+
+        bar: TickerData = openBar[0]
+        if tick.price < bar.low: bar.low = tick.price
+        elif tick.price > bar.high: bar.high = tick.price
+        bar.volume += tick.size
+        openBar[3] += 1
+
+        if tick.dateTime >= openBar[2]:
+            bar.close = tick.price
+            openBar[2] = tick.dateTime
+        elif tick.dateTime < openBar[1]:
+            bar.open = tick.price
+            openBar[1] = tick.dateTime
+
+def __mergeTickerFeeds__(tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]]) -> Iterator[tuple[datetime, list[TickerData]]]:
+    '''
+    Merges ticker feeds into a single chronological stream of bars using a k-way heap merge.
+
+    Each feed is put in time order once, then the feeds are merged in O(total bars * log feeds).
+    Bars that share a timestamp are grouped together, in the order of the feeds and, within a feed, in the order
+    they appear in that feed.
+
+    :param tickerFeeds: The ticker feeds to merge.
+    :return: An iterator of (datetime, bars at that datetime) tuples in chronological order.
+    '''
+
+    sortedTickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = [tickerFeed.sortedByDate() for tickerFeed in tickerFeeds]
+    mergedTickerData: Iterator[TickerData] = heapq.merge(*sortedTickerFeeds, key=lambda tickerData: tickerData.dateTime)
+
+    for dateTime, timestampTickerData in itertools.groupby(mergedTickerData, key=lambda tickerData: tickerData.dateTime):
+        yield dateTime, list(timestampTickerData)
@@ -1,15 +1,33 @@
+from .stats import StatisticTracker, StatisticsManager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from .order import Order, BuyOrder, SellOrder, FillStatus, OrderLogView
+from typing import Iterator, Union, Any, Mapping, Callable
+from .strategy import Strategy, VectorStrategy
 from abc import ABC, abstractmethod
-from .stats import StatisticTracker
+from types import MappingProxyType
 from .broker import BrokerStandard
-from .strategy import Strategy
 from datetime import datetime
 from .data import TickerData
 from .data import TickerFeed
-import yfinance
-import pandas
-import copy
-
-def downloadData(ticker: str, start: datetime, end: datetime) -> TickerFeed:
+from .data import StreamingTickerFeed
+from .data import __mergeTickerFeeds__
+from .data import Position
+from .cache import DataCache
+from .sources import DataSource, YFinanceSource
+from .feeds import BarFeed, ReplayFeed
+from functools import partial
+import numpy as np
+import tempfile
+import asyncio
+import time
+import os
+
+def downloadData(ticker: str,
+                 start: datetime,
+                 end: datetime,
+                 autoAdjust: bool = True,
+                 cache: Union[None, DataCache] = None,
+                 source: Union[None, DataSource] = None) -> TickerFeed:
     '''
     Downloads historical stock data for a given ticker between start and end dates using yfinance,
     and converts it into a TickerFeed object.
@@ -17,22 +35,285 @@ def downloadData(ticker: str, start: datetime, end: datetime) -> TickerFeed:
     :param ticker: The stock ticker symbol (e.g., 'AAPL').
     :param start: The start date of the data range.
     :param end: The end date of the data range.
+    :param autoAdjust: Whether to adjust prices for splits and dividends.
+    :param cache: Optional DataCache to read the data from, only downloading the parts of the range it does not hold yet.
+    :param source: Optional DataSource to download the data from instead of yfinance.
     :return: A TickerFeed containing TickerData for each trading day in the given range.
     '''
-    
-    yfinanceData: pandas.DataFrame = yfinance.download(ticker, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), progress=True, auto_adjust=True)
-    data: list[TickerData] = []
 
-    for date in yfinanceData.index:
-        open: float = float(yfinanceData.loc[date, ('Open', ticker)])
-        close: float = float(yfinanceData.loc[date, ('Close', ticker)])
-        low: float = float(yfinanceData.loc[date, ('Low', ticker)])
-        high: float = float(yfinanceData.loc[date, ('High', ticker)])
-        volume: int = int(yfinanceData.loc[date, ('Volume', ticker)])
-        tickerData: TickerData = TickerData(ticker, date, open, close, low, high, volume)
-        data.append(tickerData)
+    return downloadMany([ticker], start, end, autoAdjust, cache, source)[ticker]
+
+def downloadMany(tickers: list[str],
+                 start: datetime,
+                 end: datetime,
+                 autoAdjust: bool = True,
+                 cache: Union[None, DataCache] = None,
+                 source: Union[None, DataSource] = None,
+                 maxWorkers: int = 8,
+                 retries: int = 3,
+                 backoff: float = 1.0) -> dict[str, TickerFeed]:
+    '''
+    Downloads historical stock data for many tickers between start and end dates.
+
+    Tickers are grouped into batches of the source's `BATCH_SIZE`, each downloaded with a single request, and the
+    batches are downloaded concurrently by a pool of threads. Tickers that fail to download are retried, waiting
+    `backoff` seconds before the first retry and twice as long before each following one. Tickers the cache holds
+    part of the range of are downloaded on their own, only over the parts of the range it does not hold.
+
+    :param tickers: The stock ticker symbols.
+    :param start: The start date of the data range.
+    :param end: The end date of the data range.
+    :param autoAdjust: Whether to adjust prices for splits and dividends.
+    :param cache: Optional DataCache to read the data from, only downloading the parts of each ticker's range it does not hold yet.
+    :param source: The DataSource to download the data from, defaults to yfinance.
+    :param maxWorkers: The maximum number of batches downloaded at once.
+    :param retries: The number of times a ticker is retried before giving up.
+    :param backoff: The number of seconds to wait before the first retry.
+    :return: A TickerFeed for each ticker.
+    '''
+
+    source = source if source != None else YFinanceSource()
+    tickers = list(dict.fromkeys(tickers))
+
+    tickerFeeds: dict[str, TickerFeed] = {}
+    partiallyCachedTickers: list[str] = []
+    if cache != None:
+        # Tickers are downloaded over the whole range unless the cache holds part or all of it
+        for ticker in tickers:
+            tickerFeed: Union[None, TickerFeed] = cache.get(ticker, start, end, autoAdjust)
+            if tickerFeed != None:
+                tickerFeeds[ticker] = tickerFeed
+            elif cache.__holdsPartOf__(ticker, start, end, autoAdjust):
+                partiallyCachedTickers.append(ticker)
+
+    missingTickers: list[str] = [ticker for ticker in tickers if ticker not in tickerFeeds and ticker not in partiallyCachedTickers]
+    batches: list[list[str]] = [missingTickers[index:index + source.BATCH_SIZE] for index in range(0, len(missingTickers), source.BATCH_SIZE)]
+
+    downloads: list[Callable[[], dict[str, TickerFeed]]] = [partial(__downloadBatch__, source, batch, start, end, autoAdjust, retries, backoff) for batch in batches]
+    downloads += [partial(__downloadPartiallyCached__, cache, source, ticker, start, end, autoAdjust, retries, backoff) for ticker in partiallyCachedTickers]
+
+    if len(downloads) == 1:
+        tickerFeeds.update(downloads[0]())
+    elif len(downloads) > 1:
+        with ThreadPoolExecutor(max_workers=min(maxWorkers, len(downloads))) as executor:
+            futures: list[Future] = [executor.submit(download) for download in downloads]
+            for future in futures:
+                tickerFeeds.update(future.result())
+
+    if cache != None:
+        for ticker in missingTickers:
+            cache.put(ticker, tickerFeeds[ticker], start, end, autoAdjust)
+
+    return {ticker: tickerFeeds[ticker] for ticker in tickers}
+
+def __downloadBatch__(source: DataSource, tickers: list[str], start: datetime, end: datetime, autoAdjust: bool, retries: int, backoff: float) -> dict[str, TickerFeed]:
+    '''
+    Downloads a batch of tickers from a source, retrying the tickers that fail with exponential backoff.
+
+    :param source: The DataSource to download from.
+    :param tickers: The stock ticker symbols of the batch.
+    :param start: The start date of the data range.
+    :param end: The end date of the data range.
+    :param autoAdjust: Whether to adjust prices for splits and dividends.
+    :param retries: The number of times a ticker is retried before giving up.
+    :param backoff: The number of seconds to wait before the first retry.
+    :return: A TickerFeed for each ticker of the batch.
+    '''
+
+    tickerFeeds: dict[str, TickerFeed] = {}
+    pendingTickers: list[str] = tickers
+
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+        try:
+            tickerFeeds.update(source.download(pendingTickers, start, end, autoAdjust))
+        except Exception:
+            if attempt == retries:
+                raise
+
+        pendingTickers = [ticker for ticker in pendingTickers if ticker not in tickerFeeds]
+        if len(pendingTickers) == 0:
+            return tickerFeeds
+
+    raise RuntimeError(f'Failed to download {", ".join(pendingTickers)} after {retries + 1} attempts.')
+
+def __downloadPartiallyCached__(cache: DataCache, source: DataSource, ticker: str, start: datetime, end: datetime, autoAdjust: bool, retries: int, backoff: float) -> dict[str, TickerFeed]:
+    '''
+    Downloads a ticker the cache holds part of the range of, only downloading the parts of the range it does not hold.
+
+    :param cache: The DataCache holding part of the range.
+    :param source: The DataSource to download from.
+    :param ticker: The stock ticker symbol.
+    :param start: The start date of the data range.
+    :param end: The end date of the data range.
+    :param autoAdjust: Whether to adjust prices for splits and dividends.
+    :param retries: The number of times the ticker is retried before giving up.
+    :param backoff: The number of seconds to wait before the first retry.
+    :return: The TickerFeed of the ticker.
+    '''
+
+    download: Callable[[str, datetime, datetime, bool], TickerFeed] = lambda ticker, start, end, autoAdjust: __downloadBatch__(source, [ticker], start, end, autoAdjust, retries, backoff)[ticker]
+    return {ticker: cache.getOrDownload(ticker, start, end, download, autoAdjust)}
+
+# Ticker feeds memory mapped by each worker process of `BacktestEngine.runParallel`
+_workerTickerFeeds: list[TickerFeed] = []
+
+def __saveTickerFeeds__(tickerFeeds: list[TickerFeed], directory: str) -> list[str]:
+    '''
+    Saves ticker feeds so that worker processes can memory map them with `__initializeWorker__`.
+
+    :param tickerFeeds: The ticker feeds to share.
+    :param directory: The directory to save the ticker feeds into.
+    :return: The path of each saved ticker feed.
+    '''
+
+    tickerFeedPaths: list[str] = []
+    for tickerFeedIndex, tickerFeed in enumerate(tickerFeeds):
+        tickerFeedPath: str = os.path.join(directory, f'ticker_feed_{tickerFeedIndex}')
+        tickerFeed.save(tickerFeedPath)
+        tickerFeedPaths.append(tickerFeedPath)
+    return tickerFeedPaths
+
+def __initializeWorker__(tickerFeedPaths: list[str]) -> None:
+    '''
+    Initializes a worker process by memory mapping the ticker feeds shared by the parent process.
+
+    :param tickerFeedPaths: The directories the parent process saved its ticker feeds to.
+    :return: None
+    '''
+
+    global _workerTickerFeeds
+    _workerTickerFeeds = [TickerFeed.load(tickerFeedPath) for tickerFeedPath in tickerFeedPaths]
+
+def __backtestInWorker__(strategyClass: type[Strategy],
+                         params: dict[str, Any],
+                         statisticTrackerClasses: list[type[StatisticTracker]],
+                         cash: float,
+                         commissionPercent: float,
+                         slippagePercent: float,
+                         end: Union[None, datetime] = None) -> Strategy:
+    '''
+    Backtests a single strategy against the worker's ticker feeds with its own broker.
+
+    :param strategyClass: The Strategy subclass to backtest.
+    :param params: The parameters to set on the strategy.
+    :param statisticTrackerClasses: The custom StatisticTracker classes added to the strategy.
+    :param cash: The starting cash of the strategy's broker.
+    :param commissionPercent: The commission percentage of the strategy's broker.
+    :param slippagePercent: The max slippage percentage of the strategy's broker.
+    :param end: Optional datetime to stop the backtest before, None runs over every bar.
+    :return: The backtested strategy.
+    '''
+
+    backtestEngine: BacktestEngine = BacktestEngine()
+    for tickerFeed in _workerTickerFeeds:
+        if end != None:
+            # Feeds that only start at or after the end have no bars to backtest
+            tickerFeed = tickerFeed.getByDateRange(end=end)
+            if len(tickerFeed) == 0:
+                continue
+        backtestEngine.addTickerFeed(tickerFeed)
+
+    backtestEngine.addStrategy(strategyClass, params)
+    for statisticTrackerClass in statisticTrackerClasses:
+        backtestEngine.addStatistic(statisticTrackerClass)
+
+    backtestEngine.broker.setCash(cash)
+    backtestEngine.broker.setCommissionPercent(commissionPercent)
+    backtestEngine.broker.setSlippagePercent(slippagePercent)
+
+    backtestEngine.run()
+
+    return backtestEngine.strategies[0]
+
+def __runStrategyInWorker__(*args) -> list[StatisticTracker]:
+    '''
+    Backtests a single strategy in a worker process, see `__backtestInWorker__` for the arguments.
+
+    :return: The strategy's statistic trackers after the backtest.
+    '''
+
+    return __backtestInWorker__(*args)._statisticsManager._statisticTrackers
+
+def __evaluateStrategyInWorker__(*args) -> dict[str, Any]:
+    '''
+    Backtests a single strategy in a worker process, see `__backtestInWorker__` for the arguments.
+
+    Only the computed statistics are sent back, which keeps the per-trial overhead of optimizations small.
+
+    :return: The strategy's statistics keyed by statistic ID.
+    '''
+
+    strategy: Strategy = __backtestInWorker__(*args)
+    return {statisticTracker.statisticID: statisticTracker.getStats() for statisticTracker in strategy._statisticsManager._statisticTrackers}
+
+def __stepStrategies__(strategies: list[Strategy], brokers: list[BrokerStandard], dateTime: datetime, timestampTickerData: list[TickerData]) -> None:
+    '''
+    Steps strategies through the bars of a single timestamp.
+
+    Every bar is first marked to every broker, then each strategy sees each bar in turn, placing its orders with its
+    broker and updating its statistics, and every broker executes the orders of the bar once all strategies have
+    seen it.
+
+    :param strategies: The strategies to step.
+    :param brokers: The broker of each strategy, brokers shared by several strategies are only updated once.
+    :param dateTime: The timestamp of the bars.
+    :param timestampTickerData: The bars of every ticker at the timestamp.
+    :return: None
+    '''
+
+    uniqueBrokers: list[BrokerStandard] = list({id(broker): broker for broker in brokers}.values())
+    for broker in uniqueBrokers:
+        broker._dateTime = dateTime
+        for tickerData in timestampTickerData:
+            broker.__updateCurrentBar__(tickerData)
+
+    for tickerData in timestampTickerData:
+        for strategy, broker in zip(strategies, brokers):
+            strategy.ticker = tickerData.ticker
+            strategy.dateTime = tickerData.dateTime
+            strategy.open = tickerData.open
+            strategy.close = tickerData.close
+            strategy.low = tickerData.low
+            strategy.high = tickerData.high
+            strategy.volume = tickerData.volume
+
+            if not strategy._hasStarted:
+                strategy.start()
+                strategy._hasStarted = True
+
+            strategy.__updateBar__(tickerData)
+            strategy.next()
+
+            broker._openOrders += strategy._orders
+            strategy._orders.clear()
 
-    return TickerFeed(data)
+            orders, openOrders, closedOrders = broker.__getOrdersSnapshot__()
+            strategy._statisticsManager.updateStatisticsInfo(strategy.ticker,
+                                                            strategy.dateTime,
+                                                            strategy.open,
+                                                            strategy.close,
+                                                            strategy.low,
+                                                            strategy.high,
+                                                            strategy.volume,
+                                                            broker.cash,
+                                                            broker.getPortfolioValue(),
+                                                            broker.commissionPercent,
+                                                            broker.slippagePercent,
+                                                            broker.__getPositionsSnapshot__(),
+                                                            orders,
+                                                            openOrders,
+                                                            closedOrders)
+            if not strategy._statisticsManager.hasStarted:
+                strategy._statisticsManager.start()
+                strategy._statisticsManager.hasStarted = True
+
+            strategy._statisticsManager.update()
+
+        for broker in uniqueBrokers:
+            broker.__executeOrders__(tickerData)
 
 class __Engine__(ABC):
     '''
@@ -51,16 +332,30 @@ class __Engine__(ABC):
 
         pass
 
-    @abstractmethod
-    def addStrategy(self, strategy: Strategy) -> None:
+    def addStrategy(self, strategyClass: type[Strategy], params: Union[None, dict[str, Any]] = None) -> None:
         '''
-        Adds a trading strategy to the engine.
+        Instantiates and adds a strategy to the engine's `strategies`.
 
-        :param strategy: A strategy class that inherits from the Strategy base class.
+        :param strategyClass: A subclass of Strategy to be added and instantiated.
+        :param params: Optional dictionary of strategy parameters to override, see `Strategy.setParams`.
         :return: None
         '''
 
-        pass
+        strategy: Strategy = strategyClass()
+        if params != None:
+            strategy.setParams(params)
+        self.strategies.append(strategy)
+
+    def addStatistic(self, statisticTrackerClass: type[StatisticTracker]) -> None:
+        '''
+        Adds a statistic tracker class to the statistics manager of each strategy.
+
+        :param statisticTrackerClass: A class that inherits from StatisticTracker and will be used to track strategy statistics.
+        :return: None
+        '''
+
+        for strategy in self.strategies:
+            strategy._statisticsManager.addStatisticTracker(statisticTrackerClass)
 
     @abstractmethod
     def run(self) -> None:
@@ -75,6 +370,9 @@ class __Engine__(ABC):
 class BacktestEngine(__Engine__):
     '''
     Backtesting engine that simulates historical trading using strategies and historical ticker data.
+
+    The bars of every ticker feed are stepped through in a single forward merge, so feeds streamed from disk with a
+    StreamingTickerFeed are backtested holding only a chunk of each feed in memory at a time.
     '''
 
     def __init__(self):
@@ -84,10 +382,13 @@ class BacktestEngine(__Engine__):
         '''
 
         super().__init__()
-        self.tickerFeeds: list[TickerFeed] = []
+        self.tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = []
         self.strategies: list[Strategy] = []
         self.broker: BrokerStandard = BrokerStandard()
 
+        # Broker each strategy traded through in the latest run, in the order of the strategies
+        self.brokers: list[BrokerStandard] = []
+
     def __getFirstDate__(self) -> datetime:
         '''
         Gets the earliest date from all ticker feeds.
@@ -108,122 +409,461 @@ class BacktestEngine(__Engine__):
         allLastDates: list[datetime] = [tickerFeed.getByLastDate() for tickerFeed in self.tickerFeeds]
         return max(allLastDates)
 
-    def addTickerFeed(self, tickerFeed: TickerFeed) -> None:
+    def __mergeTickerFeeds__(self) -> Iterator[tuple[datetime, list[TickerData]]]:
+        '''
+        Merges all ticker feeds into a single chronological stream of bars, see `data.__mergeTickerFeeds__`.
+
+        Bars that share a timestamp are grouped in the order their feeds were added to the engine.
+
+        :return: An iterator of (datetime, bars at that datetime) tuples in chronological order.
+        '''
+
+        return __mergeTickerFeeds__(self.tickerFeeds)
+
+    def addTickerFeed(self, tickerFeed: Union[TickerFeed, StreamingTickerFeed]) -> None:
         '''
         Adds a ticker feed to the engine and updates the broker with the initial date.
 
-        :param tickerFeed: A TickerFeed object containing historical market data.
+        :param tickerFeed: A TickerFeed object containing historical market data, or a StreamingTickerFeed reading it from disk.
         :return: None
         '''
 
         self.tickerFeeds.append(tickerFeed)
-        self.broker._tickerFeeds = self.tickerFeeds
         self.broker._dateTime = self.__getFirstDate__()
 
-    def addStrategy(self, strategyClass: type[Strategy]) -> None:
+    def run(self, subAccounts: bool = False, onlineStatistics: bool = False) -> None:
+        '''
+        Runs all added strategies on the historical data in chronological order.
+        Simulates order execution using the broker.
+
+        By default every strategy trades through the engine's broker, sharing its cash, positions and orders. With
+        sub-accounts, every strategy trades through its own broker configured like the engine's broker, so strategies
+        run together get the same statistics as when each is run on its own, while the feeds are still only read and
+        merged once. The broker of each strategy is kept in `brokers`.
+
+        :param subAccounts: Whether to give every strategy its own isolated broker.
+        :param onlineStatistics: Whether to compute statistics online in constant memory, see `StatisticsManager.setOnline`.
+        :return: None.
+        '''
+
+        self.brokers = [self.broker.__createSubAccount__() for _ in self.strategies] if subAccounts else [self.broker] * len(self.strategies)
+        uniqueBrokers: list[BrokerStandard] = list({id(broker): broker for broker in self.brokers}.values())
+
+        for strategy, broker in zip(self.strategies, self.brokers):
+            strategy._statisticsManager.setOnline(onlineStatistics)
+            strategy._statisticsManager.setCurrentBars(broker._currentBars)
+            strategy.__addDefaultStatisticTrackers__()
+            strategy.__setTickerFeeds__(self.tickerFeeds)
+
+        for dateTime, timestampTickerData in self.__mergeTickerFeeds__():
+            __stepStrategies__(self.strategies, self.brokers, dateTime, timestampTickerData)
+
+        for strategy, broker in zip(self.strategies, self.brokers):
+            strategy.end()
+            strategy._statisticsManager.end()
+
+            strategy.next()
+
+            broker._openOrders += strategy._orders
+            strategy._orders.clear()
+
+        for dateTime, timestampTickerData in self.__mergeTickerFeeds__():
+            if not any(broker._openOrders for broker in uniqueBrokers):
+                break
+
+            for tickerData in timestampTickerData:
+                for broker in uniqueBrokers:
+                    broker.__executeOrders__(tickerData)
+
+    def runParallel(self, maxWorkers: Union[None, int] = None) -> None:
+        '''
+        Runs every added strategy in its own process, each against its own isolated broker configured like the
+        engine's broker.
+
+        The ticker feeds are saved once to a temporary directory and memory mapped by every worker, so they are not
+        pickled per strategy. Once a strategy finishes, its statistic trackers replace the ones held by the
+        strategy in this process, so `Strategy.getStatistic` works as it does after `run`.
+
+        :param maxWorkers: The maximum number of worker processes, defaults to the number of CPUs.
+        :return: None.
         '''
-        Instantiates and adds a strategy to the engine.
 
-        :param strategy: A subclass of Strategy to be added and instantiated.
+        if any(isinstance(tickerFeed, StreamingTickerFeed) for tickerFeed in self.tickerFeeds):
+            raise TypeError('Streaming ticker feeds cannot be shared with worker processes, use run instead.')
+
+        with tempfile.TemporaryDirectory() as tickerFeedsDirectory:
+            tickerFeedPaths: list[str] = __saveTickerFeeds__(self.tickerFeeds, tickerFeedsDirectory)
+
+            with ProcessPoolExecutor(max_workers=maxWorkers, initializer=__initializeWorker__, initargs=(tickerFeedPaths,)) as executor:
+                futures: list[Future] = []
+                for strategy in self.strategies:
+                    statisticTrackerClasses: list[type[StatisticTracker]] = [type(statisticTracker) for statisticTracker in strategy._statisticsManager._statisticTrackers]
+                    futures.append(executor.submit(__runStrategyInWorker__,
+                                                   type(strategy),
+                                                   strategy._params,
+                                                   statisticTrackerClasses,
+                                                   self.broker.cash,
+                                                   self.broker.commissionPercent,
+                                                   self.broker.slippagePercent))
+
+                for strategy, future in zip(self.strategies, futures):
+                    strategy._statisticsManager._statisticTrackers = future.result()
+                    strategy._statisticsManager.hasStarted = True
+
+class VectorizedBacktestEngine(__Engine__):
+    '''
+    Backtesting engine for vector strategies, which compute their signals for a whole ticker feed at once.
+
+    Signals are executed with the broker's rules for cash, volume, commission and slippage using NumPy, and the
+    resulting portfolio history is fed to the same statistic trackers as the `BacktestEngine`. Each strategy is
+    backtested against its own broker configured like the engine's broker, so for a single strategy the statistics
+    match an event driven backtest of the same orders.
+    '''
+
+    def __init__(self):
+        '''
+        Initializes the VectorizedBacktestEngine with an empty list of ticker feeds and strategies,
+        and a standard broker used as the template of every strategy's broker.
+        '''
+
+        super().__init__()
+        self.tickerFeeds: list[TickerFeed] = []
+        self.strategies: list[VectorStrategy] = []
+        self.broker: BrokerStandard = BrokerStandard()
+
+    def addTickerFeed(self, tickerFeed: TickerFeed) -> None:
+        '''
+        Adds a ticker feed to the engine.
+
+        :param tickerFeed: A TickerFeed object containing historical market data.
         :return: None
         '''
 
-        self.strategies.append(strategyClass())
+        if isinstance(tickerFeed, StreamingTickerFeed):
+            raise TypeError('Vector strategies need whole ticker feeds in memory, use the BacktestEngine to stream ticker feeds.')
 
-    def addStatistic(self, statisticTrackerClass: type[StatisticTracker]) -> None:
+        self.tickerFeeds.append(tickerFeed)
+
+    def addStrategy(self, strategyClass: type[VectorStrategy], params: Union[None, dict[str, Any]] = None) -> None:
         '''
-        Adds a statistic tracker class to the statistics manager of each strategy.
+        Instantiates and adds a vector strategy to the engine.
 
-        :param statisticTrackerClass: A class that inherits from StatisticTracker and will be used to track strategy statistics.
+        :param strategyClass: A subclass of VectorStrategy to be added and instantiated.
+        :param params: Optional dictionary of strategy parameters to override, see `Strategy.setParams`.
         :return: None
         '''
-        
-        for strategy in self.strategies:
-            strategy._statisticsManager.addStatisticTracker(statisticTrackerClass)
+
+        if not issubclass(strategyClass, VectorStrategy):
+            raise TypeError(f'{strategyClass.__name__} is not a VectorStrategy, use the BacktestEngine instead.')
+
+        super().addStrategy(strategyClass, params)
+
+    def __mergeTickerFeeds__(self, sortedTickerFeeds: list[TickerFeed]) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        '''
+        Finds the chronological order of every bar across the ticker feeds, the same order the `BacktestEngine` steps through them.
+
+        :param sortedTickerFeeds: The ticker feeds, each in time order.
+        :return: The position of every merged bar in the concatenated feeds, the ticker ID of every bar in the concatenated feeds, and the ticker symbol of each ID.
+        '''
+
+        tickers: list[str] = []
+        tickerIds: dict[str, int] = {}
+        feedTickerIds: list[np.ndarray] = []
+        for tickerFeed in sortedTickerFeeds:
+            for ticker in tickerFeed._tickers:
+                tickerIds.setdefault(ticker, len(tickerIds))
+                if len(tickers) < len(tickerIds): tickers.append(ticker)
+            tickerIdMap: np.ndarray = np.array([tickerIds[ticker] for ticker in tickerFeed._tickers], dtype=np.int64)
+            feedTickerIds.append(tickerIdMap[tickerFeed._tickerIndices[:len(tickerFeed)]])
+
+        dateTimes: np.ndarray = np.concatenate([tickerFeed.dateTimes for tickerFeed in sortedTickerFeeds])
+        mergeOrder: np.ndarray = np.argsort(dateTimes, kind='stable')
+        return mergeOrder, np.concatenate(feedTickerIds), tickers
 
     def run(self) -> None:
         '''
-        Runs all added strategies on the historical data in chronological order.
-        Simulates order execution using the broker.
+        Backtests all added strategies on the historical data.
 
         :return: None.
         '''
 
+        sortedTickerFeeds: list[TickerFeed] = [tickerFeed.sortedByDate() for tickerFeed in self.tickerFeeds]
+        mergeOrder, tickerIds, tickers = self.__mergeTickerFeeds__(sortedTickerFeeds)
+
+        tickerIds = tickerIds[mergeOrder]
+        dateTimes: np.ndarray = np.concatenate([tickerFeed.dateTimes for tickerFeed in sortedTickerFeeds])[mergeOrder]
+        closes: np.ndarray = np.concatenate([tickerFeed.closes for tickerFeed in sortedTickerFeeds])[mergeOrder]
+        volumes: np.ndarray = np.concatenate([tickerFeed.volumes for tickerFeed in sortedTickerFeeds])[mergeOrder]
+
+        # Bars are only materialized once, to hand their fields to the statistic trackers
+        bars: list[TickerData] = [tickerData for tickerFeed in sortedTickerFeeds for tickerData in tickerFeed]
+        bars = [bars[barIndex] for barIndex in mergeOrder.tolist()]
+
+        # Every bar of a timestamp is seen by the broker before any of them is stepped through
+        timestampEnds: np.ndarray = np.searchsorted(dateTimes, dateTimes, side='right')
+
         for strategy in self.strategies:
-            strategy._statisticsManager.setTickerFeeds(self.tickerFeeds)
             strategy.__addDefaultStatisticTrackers__()
+            strategy.__setTickerFeeds__(self.tickerFeeds)
 
-        allDateTimes: list[datetime] = []
-        for tickerFeed in self.tickerFeeds:
-            for tickerData in tickerFeed:
-                allDateTimes.append(tickerData.dateTime)
-        allDateTimes = sorted(set(allDateTimes))
+            strategy.start()
+            strategy._hasStarted = True
 
-        for dateTime in allDateTimes:
-            self.broker._dateTime = dateTime
+            signals: list[np.ndarray] = []
+            for tickerFeed in sortedTickerFeeds:
+                tickerFeedSignals: np.ndarray = np.asarray(strategy.signals(tickerFeed), dtype=np.int64)
+                if tickerFeedSignals.shape != (len(tickerFeed),):
+                    raise ValueError(f'{type(strategy).__name__}.signals returned {tickerFeedSignals.shape[0] if tickerFeedSignals.ndim == 1 else tickerFeedSignals.shape} signals for a feed of {len(tickerFeed)} bars.')
+                signals.append(tickerFeedSignals)
 
-            timestampTickerFeed: TickerFeed = TickerFeed()
-            for tickerFeed in self.tickerFeeds:
-                for tickerData in tickerFeed:
-                    if tickerData.dateTime == dateTime:
-                        timestampTickerFeed.append(tickerData)
+            orderUnits, tradedUnits, cashImpacts, rejected = self.broker.__simulateOrders__(np.concatenate(signals)[mergeOrder],
+                                                                                            strategy.signalType == VectorStrategy.TARGETS,
+                                                                                            tickerIds,
+                                                                                            closes,
+                                                                                            volumes)
 
-            for tickerData in timestampTickerFeed:
-                for strategy in self.strategies:
-                    strategy.ticker = tickerData.ticker
-                    strategy.dateTime = tickerData.dateTime
-                    strategy.open = tickerData.open
-                    strategy.close = tickerData.close
-                    strategy.low = tickerData.low
-                    strategy.high = tickerData.high
-                    strategy.volume = tickerData.volume
-
-                    if not strategy._hasStarted:
-                        strategy.start()
-                        strategy._hasStarted = True
-
-                    strategy.next()
-
-                    self.broker._openOrders += strategy._orders
-                    strategy._orders.clear()
-
-                    strategy._statisticsManager.updateStatisticsInfo(strategy.ticker,
-                                                                    strategy.dateTime,
-                                                                    strategy.open,
-                                                                    strategy.close,
-                                                                    strategy.low,
-                                                                    strategy.high,
-                                                                    strategy.volume,
-                                                                    self.broker.cash,
-                                                                    self.broker.getPortfolioValue(),
-                                                                    self.broker.commissionPercent,
-                                                                    self.broker.slippagePercent,
-                                                                    copy.deepcopy(self.broker._positions),
-                                                                    copy.deepcopy(self.broker._openOrders) + copy.deepcopy(self.broker._closedOrders),
-                                                                    copy.deepcopy(self.broker._openOrders),
-                                                                    copy.deepcopy(self.broker._closedOrders))
-                    if not strategy._statisticsManager.hasStarted:
-                        strategy._statisticsManager.start()
-                        strategy._statisticsManager.hasStarted = True
-
-                    strategy._statisticsManager.update()
-
-                self.broker.__executeOrders__(tickerData)
+            strategy.end()
+            self.__updateStatistics__(strategy, bars, tickers, tickerIds, closes, timestampEnds, orderUnits, tradedUnits, cashImpacts, rejected)
+
+    def __updateStatistics__(self, strategy: VectorStrategy,
+                             bars: list[TickerData],
+                             tickers: list[str],
+                             tickerIds: np.ndarray,
+                             closes: np.ndarray,
+                             timestampEnds: np.ndarray,
+                             orderUnits: np.ndarray,
+                             tradedUnits: np.ndarray,
+                             cashImpacts: np.ndarray,
+                             rejected: np.ndarray) -> None:
+        '''
+        Creates the orders of a simulated backtest and steps the strategy's statistic trackers through it.
+
+        The trackers see every bar the way the `BacktestEngine` shows it to them: after the bar's order is made, and
+        before it is executed.
+
+        :param strategy: The backtested strategy.
+        :param bars: Every bar in merged order.
+        :param tickers: The ticker symbol of each ticker ID.
+        :param tickerIds: The ticker ID of every bar.
+        :param closes: The close of every bar.
+        :param timestampEnds: The index after the last bar sharing each bar's timestamp.
+        :param orderUnits: The signed units ordered on every bar.
+        :param tradedUnits: The signed units traded on every bar.
+        :param cashImpacts: The cash impact of every bar's order.
+        :param rejected: Whether every bar's order was rejected.
+        :return: None
+        '''
+
+        numBars: int = len(bars)
+        barIndices: np.ndarray = np.arange(numBars)
+
+        # Portfolio state before each bar's order executes
+        cashBefore: np.ndarray = np.cumsum(np.concatenate(([self.broker.cash], cashImpacts)))[:-1]
+        netCashBefore: np.ndarray = np.cumsum(np.concatenate(([0.0], cashImpacts)))[:-1]
+        marketValues: np.ndarray = np.zeros(numBars)
+        for tickerId in range(len(tickers)):
+            tickerBars: np.ndarray = np.flatnonzero(tickerIds == tickerId)
+            heldUnits: np.ndarray = np.cumsum(tradedUnits[tickerBars])
+
+            lastTradedBar: np.ndarray = np.searchsorted(tickerBars, barIndices, side='left') - 1
+            lastSeenBar: np.ndarray = np.searchsorted(tickerBars, timestampEnds, side='left') - 1
+            unitsBefore: np.ndarray = np.where(lastTradedBar >= 0, heldUnits[np.maximum(lastTradedBar, 0)], 0)
+            latestCloses: np.ndarray = np.where(lastSeenBar >= 0, closes[tickerBars][np.maximum(lastSeenBar, 0)], 0.0)
+            marketValues += unitsBefore * latestCloses
+
+        portfolioValues: list[float] = (cashBefore + marketValues).tolist()
+        netValuesBefore: list[float] = (netCashBefore + marketValues).tolist()
+        cashBeforeList: list[float] = cashBefore.tolist()
+        netCashBeforeList: list[float] = netCashBefore.tolist()
+
+        # Orders are created with their final fill, views show each one pending on the bar it is made and closed orders
+        # are read from the strategy's fill ledger, so no order is kept once the run ends
+        orders: list[Order] = []
+        barOrders: list[Union[None, Order]] = [None] * numBars
+        for barIndex in np.flatnonzero(orderUnits).tolist():
+            units: int = int(orderUnits[barIndex])
+            order: Order = BuyOrder(tickers[tickerIds[barIndex]], units) if units > 0 else SellOrder(tickers[tickerIds[barIndex]], -units)
+            order._openedStartTime = bars[barIndex].dateTime
+            if rejected[barIndex]:
+                order.fillStatus = FillStatus.REJECTED
+            else:
+                order._unitsActuallyTraded = abs(int(tradedUnits[barIndex]))
+                order._portfolioCashImpact = float(cashImpacts[barIndex])
+                order.fillStatus = FillStatus.PARTIALLY_FILLED if order._unitsActuallyTraded < order.units else FillStatus.FILLED
+                order._closedEndTime = bars[barIndex].dateTime
+
+                # The traded value is recovered from the cash impact, which includes the commission
+                tradeValue: float = abs(order._portfolioCashImpact) / (1 + self.broker.commissionPercent if units > 0 else 1 - self.broker.commissionPercent)
+                order._fillPrice = tradeValue / order._unitsActuallyTraded
+                order._commission = tradeValue * self.broker.commissionPercent
+            orders.append(order)
+            barOrders[barIndex] = order
+
+        statisticsManager: StatisticsManager = strategy._statisticsManager
+        positions: dict[str, Position] = {}
+        previousOrder: Union[None, Order] = None
+        ordersMade: int = 0
+        for barIndex, tickerData in enumerate(bars):
+            if previousOrder != None and previousOrder.fillStatus != FillStatus.REJECTED:
+                statisticsManager.fills.appendOrder(previousOrder)
+                positions = dict(positions)
+                heldUnits: int = positions[previousOrder.ticker].units if previousOrder.ticker in positions else 0
+                positions[previousOrder.ticker] = Position(previousOrder.ticker, heldUnits + int(tradedUnits[barIndex - 1]))
+
+            order: Union[None, Order] = barOrders[barIndex]
+            if order != None or barIndex == 0 or previousOrder != None:
+                if order != None: ordersMade += 1
+                openOrderStatuses: dict[int, FillStatus] = {id(order): FillStatus.PENDING} if order != None else {}
+                openOrders: tuple[Order, ...] = (order,) if order != None else ()
+                openOrdersView: OrderLogView = OrderLogView([(openOrders, len(openOrders))], openOrderStatuses)
+                closedOrdersView: OrderLogView = OrderLogView([(statisticsManager.fills, len(statisticsManager.fills))], openOrderStatuses)
+                ordersView: OrderLogView = OrderLogView([(openOrders, len(openOrders)), (statisticsManager.fills, len(statisticsManager.fills))], openOrderStatuses)
+                strategyOrdersMadeView: OrderLogView = OrderLogView([(orders, ordersMade)], openOrderStatuses)
+                positionsView: Mapping[str, Position] = MappingProxyType(positions)
+            previousOrder = order
+
+            statisticsManager.__updateStatisticTrackers__(tickerData.ticker,
+                                                          tickerData.dateTime,
+                                                          tickerData.open,
+                                                          tickerData.close,
+                                                          tickerData.low,
+                                                          tickerData.high,
+                                                          tickerData.volume,
+                                                          cashBeforeList[barIndex],
+                                                          portfolioValues[barIndex],
+                                                          self.broker.commissionPercent,
+                                                          self.broker.slippagePercent,
+                                                          positionsView,
+                                                          ordersView,
+                                                          openOrdersView,
+                                                          closedOrdersView,
+                                                          netCashBeforeList[barIndex],
+                                                          netValuesBefore[barIndex],
+                                                          strategyOrdersMadeView)
+            if not statisticsManager.hasStarted:
+                statisticsManager.start()
+                statisticsManager.hasStarted = True
+
+            statisticsManager.update()
+
+        statisticsManager.end()
+
+class PaperTradingEngine(__Engine__):
+    '''
+    Paper trading engine that runs strategies on bars as they arrive from an asynchronous feed.
+
+    The engine runs on asyncio: it awaits every timestamp's bars from a `BarFeed`, steps the strategies through them
+    exactly as the `BacktestEngine` does, routing their orders through a simulated broker and updating their
+    statistics, then hands control back to the event loop until the next bars arrive. Bars are handed to strategies
+    and indicators one at a time, without any look ahead into the feed.
+
+    Stepping a timestamp does a constant amount of work per bar and never blocks on the feed, so the time taken to
+    process every bar of a timestamp only grows with the number of tickers and strategies. The time taken by the
+    latest timestamp is kept in `latency`, and the slowest so far in `maxLatency`.
+    '''
+
+    def __init__(self, feed: Union[None, BarFeed] = None):
+        '''
+        Initializes the PaperTradingEngine with an empty list of strategies and a standard broker.
+
+        :param feed: Optional feed to stream the bars from, the added ticker feeds are replayed if None.
+        '''
+
+        super().__init__()
+        self.feed: Union[None, BarFeed] = feed
+        self.tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = []
+        self.strategies: list[Strategy] = []
+        self.broker: BrokerStandard = BrokerStandard()
+
+        # Broker each strategy traded through in the latest run, in the order of the strategies
+        self.brokers: list[BrokerStandard] = []
+
+        # Seconds taken to process every bar of the latest timestamp, and of the slowest timestamp of the latest run
+        self.latency: float = 0.0
+        self.maxLatency: float = 0.0
+
+        self._isStopped: bool = False
+
+    def setFeed(self, feed: BarFeed) -> None:
+        '''
+        Sets the feed to stream the bars from.
+
+        :param feed: A BarFeed yielding the bars of every ticker, one timestamp at a time.
+        :return: None
+        '''
+
+        self.feed = feed
+
+    def addTickerFeed(self, tickerFeed: Union[TickerFeed, StreamingTickerFeed]) -> None:
+        '''
+        Adds a ticker feed to replay as fast as possible when no feed is set, see `ReplayFeed`.
+
+        :param tickerFeed: A TickerFeed object containing historical market data, or a StreamingTickerFeed reading it from disk.
+        :return: None
+        '''
+
+        self.tickerFeeds.append(tickerFeed)
+
+    def stop(self) -> None:
+        '''
+        Stops the running session once the bars of the current timestamp are processed.
+
+        :return: None
+        '''
+
+        self._isStopped = True
+
+    async def runAsync(self, subAccounts: bool = False, onlineStatistics: bool = False) -> None:
+        '''
+        Runs all added strategies on the bars of the feed until it ends or the session is stopped.
+
+        Orders still open when the session ends are left open with the broker.
+
+        :param subAccounts: Whether to give every strategy its own isolated broker, see `BacktestEngine.run`.
+        :param onlineStatistics: Whether to compute statistics online in constant memory, see `StatisticsManager.setOnline`.
+        :return: None.
+        '''
+
+        feed: BarFeed = self.feed if self.feed != None else ReplayFeed(self.tickerFeeds)
+
+        self.brokers = [self.broker.__createSubAccount__() for _ in self.strategies] if subAccounts else [self.broker] * len(self.strategies)
+        self.latency = 0.0
+        self.maxLatency = 0.0
+        self._isStopped = False
+
+        for strategy, broker in zip(self.strategies, self.brokers):
+            strategy._statisticsManager.setOnline(onlineStatistics)
+            strategy._statisticsManager.setCurrentBars(broker._currentBars)
+            strategy.__addDefaultStatisticTrackers__()
+            strategy.__setTickerFeeds__([])
+
+        try:
+            async for timestampTickerData in feed.bars():
+                # Custom feeds may yield a timestamp without bars, which has nothing to step
+                if len(timestampTickerData) == 0:
+                    continue
+
+                startTime: float = time.perf_counter()
+                __stepStrategies__(self.strategies, self.brokers, timestampTickerData[0].dateTime, timestampTickerData)
+                self.latency = time.perf_counter() - startTime
+                self.maxLatency = max(self.maxLatency, self.latency)
+
+                if self._isStopped:
+                    break
+        finally:
+            await feed.close()
 
         for strategy in self.strategies:
             strategy.end()
             strategy._statisticsManager.end()
 
-            strategy.next()
+    def run(self, subAccounts: bool = False, onlineStatistics: bool = False) -> None:
+        '''
+        Runs the session in a new event loop, blocking until it ends, see `runAsync`.
 
-            self.broker._openOrders += strategy._orders
-            strategy._orders.clear()
+        :param subAccounts: Whether to give every strategy its own isolated broker.
+        :param onlineStatistics: Whether to compute statistics online in constant memory.
+        :return: None.
+        '''
 
-        for dateTime in allDateTimes:
-            timestampTickerFeed: TickerFeed = TickerFeed()
-            for tickerFeed in self.tickerFeeds:
-                for tickerData in tickerFeed:
-                    if tickerData.dateTime == dateTime:
-                        timestampTickerFeed.append(tickerData)
-            for tickerData in timestampTickerFeed:
-                self.broker.__executeOrders__(tickerData)
\ No newline at end of file
+        asyncio.run(self.runAsync(subAccounts, onlineStatistics))
@@ -0,0 +1,7 @@
+from .feed import BarFeed
+
+# Local Feeds
+from .replay_feed import ReplayFeed
+
+# Aggregating Feeds
+from .tick_bar_feed import TickBarFeed
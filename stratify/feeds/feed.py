@@ -0,0 +1,31 @@
+from typing import AsyncIterator
+from abc import ABC, abstractmethod
+from ..data import TickerData
+
+class BarFeed(ABC):
+    '''
+    Base class for asynchronous sources of live bars, consumed by `PaperTradingEngine`.
+
+    Subclass this to stream bars from a broker or market data provider. A feed yields the bars of every ticker that
+    share a timestamp together, one timestamp at a time in chronological order, and awaits the next bars while none
+    are available so the event loop stays free.
+    '''
+
+    @abstractmethod
+    def bars(self) -> AsyncIterator[list[TickerData]]:
+        '''
+        Streams the bars of the feed, grouped by timestamp.
+
+        :return: An async iterator of the bars of every ticker at each timestamp, in chronological order.
+        '''
+
+        pass
+
+    async def close(self) -> None:
+        '''
+        Releases the resources held by the feed, called once the engine stops consuming it.
+
+        :return: None
+        '''
+
+        pass
@@ -0,0 +1,47 @@
+from ..data import TickerFeed, StreamingTickerFeed, TickerData
+from ..data import __mergeTickerFeeds__
+from typing import AsyncIterator, Union
+from datetime import datetime
+from .feed import BarFeed
+import asyncio
+
+class ReplayFeed(BarFeed):
+    '''
+    A feed that replays historical ticker feeds as if their bars were arriving live, for testing offline.
+
+    The bars of every feed are merged in time order and yielded one timestamp at a time. With a speed, the time
+    between two timestamps is replayed scaled down by that speed, e.g. a speed of 60 replays an hour of minute bars in
+    a minute. Without one, the bars are replayed as fast as the consumer takes them.
+    '''
+
+    def __init__(self, tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]], speed: Union[None, float] = None):
+        '''
+        Initializes the replay feed.
+
+        :param tickerFeeds: The ticker feeds to replay.
+        :param speed: Optional multiple of real time to replay the bars at, as fast as possible if None.
+        '''
+
+        if speed != None and speed <= 0:
+            raise ValueError(f'Replay speed must be positive, got {speed}')
+
+        self.tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = list(tickerFeeds)
+        self.speed: Union[None, float] = speed
+
+    async def bars(self) -> AsyncIterator[list[TickerData]]:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        startTime: float = loop.time()
+        firstDateTime: Union[None, datetime] = None
+
+        for dateTime, timestampTickerData in __mergeTickerFeeds__(self.tickerFeeds):
+            if firstDateTime == None:
+                firstDateTime = dateTime
+
+            if self.speed != None:
+                # Sleep until the bar is due rather than for a fixed delay, so slow consumers do not drift further behind
+                dueTime: float = startTime + (dateTime - firstDateTime).total_seconds() / self.speed
+                await asyncio.sleep(max(0.0, dueTime - loop.time()))
+            else:
+                await asyncio.sleep(0)
+
+            yield timestampTickerData
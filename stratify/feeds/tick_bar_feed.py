@@ -0,0 +1,38 @@
+from ..data import Tick, TickAggregator, TickerData
+from typing import AsyncIterable, AsyncIterator
+from .feed import BarFeed
+import itertools
+
+class TickBarFeed(BarFeed):
+    '''
+    A feed that aggregates a stream of trades and quotes into bars, see `TickAggregator`.
+
+    Every tick is added to the aggregator as it arrives, and the bars it completes are yielded right away, grouped by
+    timestamp. Once the tick stream ends, the bars still open are completed and yielded as partial bars.
+    '''
+
+    def __init__(self, ticks: AsyncIterable[Tick], aggregator: TickAggregator):
+        '''
+        Initializes the tick bar feed.
+
+        :param ticks: The stream of ticks, of any number of tickers, in the order they arrive.
+        :param aggregator: The aggregator defining the bars to build from the ticks.
+        '''
+
+        self.ticks: AsyncIterable[Tick] = ticks
+        self.aggregator: TickAggregator = aggregator
+
+    async def bars(self) -> AsyncIterator[list[TickerData]]:
+        async for tick in self.ticks:
+            completedBars: list[TickerData] = self.aggregator.update(tick)
+            if completedBars:
+                for _, timestampTickerData in itertools.groupby(completedBars, key=lambda tickerData: tickerData.dateTime):
+                    yield list(timestampTickerData)
+
+        for _, timestampTickerData in itertools.groupby(self.aggregator.flush(), key=lambda tickerData: tickerData.dateTime):
+            yield list(timestampTickerData)
+
+    async def close(self) -> None:
+        # Async generators producing the ticks are closed so the connections they hold are released
+        if hasattr(self.ticks, 'aclose'):
+            await self.ticks.aclose()
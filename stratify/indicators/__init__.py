@@ -0,0 +1,14 @@
+from .indicator import Indicator, BoundIndicator
+
+# Moving Averages
+from .sma import SMA
+from .ema import EMA
+
+# Volatility Indicators
+from .rolling_std import RollingStd
+from .bollinger import Bollinger
+from .atr import ATR
+
+# Momentum Indicators
+from .rsi import RSI
+from .macd import MACD
@@ -0,0 +1,55 @@
+from .indicator import Indicator, __validatePeriod__, __exponentialSmoothing__
+from ..data import TickerData, TickerFeed
+from typing import Union
+import numpy as np
+
+class ATR(Indicator):
+    '''
+    Average true range, Wilder's smoothed average of the true range over `period` bars.
+
+    The true range of a bar is its high minus its low, widened to include the previous close when there is one.
+    '''
+
+    def __init__(self, period: int = 14):
+        '''
+        Initializes the average true range.
+
+        :param period: The number of bars averaged, the smoothing factor is `1 / period`.
+        '''
+
+        super().__init__()
+
+        self.period: int = __validatePeriod__(period)
+
+        self._previousClose: Union[None, float] = None
+        self._count: int = 0
+        self._sum: float = 0.0
+
+    def update(self, tickerData: TickerData) -> None:
+        trueRange: float = tickerData.high - tickerData.low
+        if self._previousClose != None:
+            trueRange = max(trueRange, abs(tickerData.high - self._previousClose), abs(tickerData.low - self._previousClose))
+        self._previousClose = tickerData.close
+
+        if self.value != None:
+            self.value += (trueRange - self.value) / self.period
+            return
+
+        self._count += 1
+        self._sum += trueRange
+        if self._count == self.period:
+            self.value = self._sum / self.period
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        highs: np.ndarray = np.asarray(tickerFeed.highs)
+        lows: np.ndarray = np.asarray(tickerFeed.lows)
+        previousCloses: np.ndarray = np.asarray(tickerFeed.closes)[:-1]
+
+        trueRanges: np.ndarray = highs - lows
+        trueRanges[1:] = np.maximum.reduce([trueRanges[1:], np.abs(highs[1:] - previousCloses), np.abs(lows[1:] - previousCloses)])
+
+        values: np.ndarray = np.full(len(tickerFeed), np.nan)
+        if len(tickerFeed) >= self.period:
+            values[self.period - 1] = trueRanges[:self.period].mean()
+            values[self.period:] = __exponentialSmoothing__(trueRanges[self.period:], 1.0 / self.period, values[self.period - 1])
+        return {'value': values}
@@ -0,0 +1,46 @@
+from ..data import TickerData, TickerFeed
+from .rolling_std import RollingStd
+from .indicator import Indicator
+from typing import Union
+from .sma import SMA
+import numpy as np
+
+class Bollinger(Indicator):
+    '''
+    Bollinger bands, a simple moving average (`value`) with bands `numStd` population standard deviations above
+    (`upper`) and below (`lower`) it.
+    '''
+
+    OUTPUTS: tuple[str, ...] = ('value', 'upper', 'lower')
+
+    def __init__(self, period: int = 20, numStd: float = 2.0, field: str = 'close'):
+        '''
+        Initializes the Bollinger bands.
+
+        :param period: The number of bars in the window.
+        :param numStd: The number of standard deviations between the average and each band.
+        :param field: The bar field measured, one of 'open', 'close', 'low', 'high' or 'volume'.
+        '''
+
+        super().__init__()
+
+        self.numStd: float = numStd
+        self.upper: Union[None, float] = None
+        self.lower: Union[None, float] = None
+
+        self._sma: SMA = SMA(period, field)
+        self._std: RollingStd = RollingStd(period, field)
+
+    def update(self, tickerData: TickerData) -> None:
+        self._sma.update(tickerData)
+        self._std.update(tickerData)
+
+        if self._sma.value != None:
+            self.value = self._sma.value
+            self.upper = self.value + self.numStd * self._std.value
+            self.lower = self.value - self.numStd * self._std.value
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        averages: np.ndarray = self._sma.precompute(tickerFeed)['value']
+        deviations: np.ndarray = self._std.precompute(tickerFeed)['value']
+        return {'value': averages, 'upper': averages + self.numStd * deviations, 'lower': averages - self.numStd * deviations}
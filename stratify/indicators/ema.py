@@ -0,0 +1,65 @@
+from .indicator import Indicator, __getColumn__, __validateField__, __validatePeriod__, __exponentialSmoothing__
+from ..data import TickerData, TickerFeed
+import numpy as np
+
+class EMA(Indicator):
+    '''
+    Exponential moving average of a field, seeded with the simple average of its first `period` bars.
+    '''
+
+    def __init__(self, period: int, field: str = 'close'):
+        '''
+        Initializes the exponential moving average.
+
+        :param period: The span of the average, the smoothing factor is `2 / (period + 1)`.
+        :param field: The bar field averaged, one of 'open', 'close', 'low', 'high' or 'volume'.
+        '''
+
+        super().__init__()
+
+        self.period: int = __validatePeriod__(period)
+        self.field: str = __validateField__(field)
+        self.alpha: float = 2.0 / (period + 1)
+
+        self._count: int = 0
+        self._sum: float = 0.0
+
+    def update(self, tickerData: TickerData) -> None:
+        self.updateValue(getattr(tickerData, self.field))
+
+    def updateValue(self, value: float) -> None:
+        '''
+        Updates the average with the next value.
+
+        :param value: The next value.
+        :return: None
+        '''
+
+        if self.value != None:
+            self.value += self.alpha * (value - self.value)
+            return
+
+        self._count += 1
+        self._sum += value
+        if self._count == self.period:
+            self.value = self._sum / self.period
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        return {'value': EMA.__precomputeValues__(__getColumn__(tickerFeed, self.field), self.period, self.alpha)}
+
+    @staticmethod
+    def __precomputeValues__(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+        '''
+        Computes the exponential moving average after each value.
+
+        :param values: The values averaged.
+        :param period: The number of values the average is seeded with.
+        :param alpha: The smoothing factor.
+        :return: The average after each value, NaN until `period` values have been seen.
+        '''
+
+        averages: np.ndarray = np.full(len(values), np.nan)
+        if len(values) >= period:
+            averages[period - 1] = values[:period].mean()
+            averages[period:] = __exponentialSmoothing__(values[period:], alpha, averages[period - 1])
+        return averages
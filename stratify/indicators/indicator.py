@@ -0,0 +1,217 @@
+from ..data import TickerData, TickerFeed
+from typing import Union, Any
+import numpy as np
+import copy
+
+class Indicator():
+    '''
+    Base class for technical indicators.
+
+    An indicator is updated with one bar at a time in O(1) with `update`, and can compute its value for every bar of
+    a ticker feed at once with `precompute`. Both give the same values, `None` (or NaN when precomputed) until the
+    indicator has seen enough bars.
+
+    Subclass this to implement custom indicators. Indicators with more than one output list the names of the
+    attributes holding them in `OUTPUTS`, the first one always being `value`.
+    '''
+
+    OUTPUTS: tuple[str, ...] = ('value',)
+
+    def __init__(self):
+        '''
+        Initializes the indicator.
+        '''
+
+        self.value: Union[None, float] = None
+
+    @property
+    def isReady(self) -> bool:
+        '''
+        Whether the indicator has seen enough bars to have a value.
+
+        :return: True if the indicator has a value.
+        '''
+
+        return self.value != None
+
+    def update(self, tickerData: TickerData) -> None:
+        '''
+        Updates the indicator with the next bar.
+        Intended to be overridden by custom indicators.
+
+        :param tickerData: The next bar.
+        :return: None
+        '''
+
+        pass
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        '''
+        Computes the indicator for every bar of a ticker feed, without changing the indicator's state.
+        Intended to be overridden by custom indicators.
+
+        :param tickerFeed: A ticker feed holding a single ticker, in time order.
+        :return: An array of values for each output in `OUTPUTS`, NaN until the indicator has seen enough bars.
+        '''
+
+        return {output: np.full(len(tickerFeed), np.nan) for output in self.OUTPUTS}
+
+class BoundIndicator():
+    '''
+    An indicator declared by a strategy, holding a separate instance of the indicator for every ticker.
+
+    Attributes of the indicator (e.g. `value` or `isReady`) read from the instance of the strategy's current ticker,
+    index it with a ticker (e.g. `indicator['AAPL'].value`) to read another ticker's instance.
+
+    In a backtest each ticker's values are precomputed over its whole feed the first time the ticker is seen, and
+    every bar then only looks its values up, unless precomputing was disabled when the indicator was added.
+    '''
+
+    def __init__(self, indicator: Indicator, strategy: Any, precompute: bool = True):
+        '''
+        Initializes the bound indicator.
+
+        :param indicator: The indicator every ticker's instance is copied from.
+        :param strategy: The strategy that declared the indicator, whose current ticker attribute reads default to.
+        :param precompute: Whether to precompute each ticker's values when the strategy knows its ticker feed.
+        '''
+
+        self._indicator: Indicator = indicator
+        self._strategy: Any = strategy
+        self._precompute: bool = precompute
+
+        self._tickerIndicators: dict[str, Indicator] = {}
+        self._precomputedValues: dict[str, Union[None, list[tuple[str, np.ndarray]]]] = {}
+        self._barIndices: dict[str, int] = {}
+
+    def __getitem__(self, ticker: str) -> Indicator:
+        '''
+        Returns the indicator instance of a ticker.
+
+        :param ticker: The stock ticker symbol.
+        :return: The ticker's indicator instance, which has no value until the ticker's first bar.
+        '''
+
+        tickerIndicator: Union[None, Indicator] = self._tickerIndicators.get(ticker)
+        if tickerIndicator == None:
+            tickerIndicator = copy.deepcopy(self._indicator)
+            self._tickerIndicators[ticker] = tickerIndicator
+        return tickerIndicator
+
+    def __getattr__(self, name: str) -> Any:
+        '''
+        Reads an attribute from the indicator instance of the strategy's current ticker.
+
+        :param name: The attribute name.
+        :return: The attribute value.
+        '''
+
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self[self._strategy.ticker], name)
+
+    def __update__(self, tickerData: TickerData) -> None:
+        '''
+        Updates the indicator instance of a bar's ticker with the bar.
+
+        :param tickerData: The next bar.
+        :return: None
+        '''
+
+        ticker: str = tickerData.ticker
+        tickerIndicator: Indicator = self[ticker]
+
+        if self._precompute and ticker not in self._precomputedValues:
+            tickerFeed: Union[None, TickerFeed] = self._strategy.__getTickerFeed__(ticker)
+            self._precomputedValues[ticker] = list(tickerIndicator.precompute(tickerFeed).items()) if tickerFeed != None else None
+
+            # Values are anchored to the bar's position in the feed, as the indicator may be declared after the first bar
+            self._barIndices[ticker] = self._strategy.__getBarIndex__(ticker)
+
+        precomputedValues: Union[None, list[tuple[str, np.ndarray]]] = self._precomputedValues.get(ticker)
+        if precomputedValues == None:
+            tickerIndicator.update(tickerData)
+            return
+
+        barIndex: int = self._barIndices[ticker]
+        for output, outputValues in precomputedValues:
+            value: float = float(outputValues[barIndex])
+            setattr(tickerIndicator, output, value if value == value else None)
+        self._barIndices[ticker] = barIndex + 1
+
+def __getColumn__(tickerFeed: TickerFeed, field: str) -> np.ndarray:
+    '''
+    Reads a price or volume column from a ticker feed.
+
+    :param tickerFeed: The ticker feed.
+    :param field: One of 'open', 'close', 'low', 'high' or 'volume'.
+    :return: The column as a float64 array.
+    '''
+
+    return np.asarray(getattr(tickerFeed, f'{field}s'), dtype=np.float64)
+
+def __validateField__(field: str) -> str:
+    '''
+    Checks that a field name is a price or volume field of a bar.
+
+    :param field: The field name.
+    :return: The field name.
+    '''
+
+    if field not in ('open', 'close', 'low', 'high', 'volume'):
+        raise ValueError(f'Unknown field \'{field}\', expected one of open, close, low, high or volume.')
+    return field
+
+def __validatePeriod__(period: int) -> int:
+    '''
+    Checks that an indicator period is a positive number of bars.
+
+    :param period: The period.
+    :return: The period.
+    '''
+
+    if period < 1:
+        raise ValueError('Indicator period must be at least 1.')
+    return period
+
+def __rollingWindows__(values: np.ndarray, period: int) -> np.ndarray:
+    '''
+    Returns every window of `period` consecutive values as rows of a view, without copying.
+
+    :param values: The values.
+    :param period: The window length.
+    :return: A (len(values) - period + 1, period) view, empty if there are fewer values than the period.
+    '''
+
+    if len(values) < period:
+        return np.empty((0, period))
+    return np.lib.stride_tricks.sliding_window_view(values, period)
+
+def __exponentialSmoothing__(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    '''
+    Applies `smoothed = smoothed + alpha * (value - smoothed)` over the values, starting from `initial`.
+
+    The recursion is evaluated in blocks with a matrix of decay weights, so only one Python iteration runs per block.
+
+    :param values: The values to smooth.
+    :param alpha: The smoothing factor, between 0 and 1.
+    :param initial: The smoothed value before the first value.
+    :return: The smoothed value after each value.
+    '''
+
+    blockSize: int = 128
+    decay: float = 1.0 - alpha
+
+    offsets: np.ndarray = np.arange(blockSize)
+    lags: np.ndarray = offsets[:, None] - offsets[None, :]
+    weights: np.ndarray = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    initialWeights: np.ndarray = decay ** (offsets + 1)
+
+    smoothed: np.ndarray = np.empty(len(values))
+    previous: float = initial
+    for start in range(0, len(values), blockSize):
+        block: np.ndarray = values[start:start + blockSize]
+        size: int = len(block)
+        smoothed[start:start + size] = weights[:size, :size] @ block + initialWeights[:size] * previous
+        previous = smoothed[start + size - 1]
+    return smoothed
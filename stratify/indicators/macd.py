@@ -0,0 +1,61 @@
+from .indicator import Indicator, __getColumn__, __validateField__
+from ..data import TickerData, TickerFeed
+from typing import Union
+from .ema import EMA
+import numpy as np
+
+class MACD(Indicator):
+    '''
+    Moving average convergence divergence, the difference between a fast and a slow exponential moving average
+    (`value`), an exponential moving average of that difference (`signal`) and the gap between the two (`histogram`).
+    '''
+
+    OUTPUTS: tuple[str, ...] = ('value', 'signal', 'histogram')
+
+    def __init__(self, fastPeriod: int = 12, slowPeriod: int = 26, signalPeriod: int = 9, field: str = 'close'):
+        '''
+        Initializes the moving average convergence divergence.
+
+        :param fastPeriod: The span of the fast exponential moving average.
+        :param slowPeriod: The span of the slow exponential moving average.
+        :param signalPeriod: The span of the signal line's exponential moving average.
+        :param field: The bar field measured, one of 'open', 'close', 'low', 'high' or 'volume'.
+        '''
+
+        super().__init__()
+
+        if fastPeriod >= slowPeriod:
+            raise ValueError('MACD fast period must be shorter than the slow period.')
+
+        self.field: str = __validateField__(field)
+        self.signal: Union[None, float] = None
+        self.histogram: Union[None, float] = None
+
+        self._fastEMA: EMA = EMA(fastPeriod, field)
+        self._slowEMA: EMA = EMA(slowPeriod, field)
+        self._signalEMA: EMA = EMA(signalPeriod)
+
+    def update(self, tickerData: TickerData) -> None:
+        self._fastEMA.update(tickerData)
+        self._slowEMA.update(tickerData)
+        if self._slowEMA.value == None:
+            return
+
+        self.value = self._fastEMA.value - self._slowEMA.value
+        self._signalEMA.updateValue(self.value)
+
+        if self._signalEMA.value != None:
+            self.signal = self._signalEMA.value
+            self.histogram = self.value - self.signal
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        values: np.ndarray = __getColumn__(tickerFeed, self.field)
+        differences: np.ndarray = (EMA.__precomputeValues__(values, self._fastEMA.period, self._fastEMA.alpha) -
+                                   EMA.__precomputeValues__(values, self._slowEMA.period, self._slowEMA.alpha))
+
+        signals: np.ndarray = np.full(len(values), np.nan)
+        firstDifference: int = self._slowEMA.period - 1
+        if len(values) > firstDifference:
+            signals[firstDifference:] = EMA.__precomputeValues__(differences[firstDifference:], self._signalEMA.period, self._signalEMA.alpha)
+
+        return {'value': differences, 'signal': signals, 'histogram': differences - signals}
@@ -0,0 +1,64 @@
+from .indicator import Indicator, __getColumn__, __validateField__, __validatePeriod__, __rollingWindows__
+from ..data import TickerData, TickerFeed
+from ..data import RingBuffer
+from typing import Union
+import numpy as np
+import math
+
+class RollingStd(Indicator):
+    '''
+    Standard deviation of a field over the last `period` bars.
+    '''
+
+    def __init__(self, period: int, field: str = 'close', ddof: int = 0):
+        '''
+        Initializes the rolling standard deviation.
+
+        :param period: The number of bars in the window.
+        :param field: The bar field measured, one of 'open', 'close', 'low', 'high' or 'volume'.
+        :param ddof: Delta degrees of freedom, 0 for the population standard deviation and 1 for the sample one.
+        '''
+
+        super().__init__()
+
+        if period <= ddof:
+            raise ValueError('Rolling standard deviation period must be greater than ddof.')
+
+        self.period: int = __validatePeriod__(period)
+        self.field: str = __validateField__(field)
+        self.ddof: int = ddof
+
+        # Welford's running mean and sum of squared deviations over the window
+        self._values: RingBuffer = RingBuffer(period)
+        self._mean: float = 0.0
+        self._squaredDeviations: float = 0.0
+
+    def update(self, tickerData: TickerData) -> None:
+        self.updateValue(getattr(tickerData, self.field))
+
+    def updateValue(self, value: float) -> None:
+        '''
+        Updates the standard deviation with the next value.
+
+        :param value: The next value.
+        :return: None
+        '''
+
+        droppedValue: Union[None, float] = self._values.append(value)
+
+        if droppedValue == None:
+            delta: float = value - self._mean
+            self._mean += delta / len(self._values)
+            self._squaredDeviations += delta * (value - self._mean)
+        else:
+            previousMean: float = self._mean
+            self._mean += (value - droppedValue) / self.period
+            self._squaredDeviations += (value - droppedValue) * (value - self._mean + droppedValue - previousMean)
+
+        if self._values.isFull:
+            self.value = math.sqrt(max(self._squaredDeviations, 0.0) / (self.period - self.ddof))
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        values: np.ndarray = np.full(len(tickerFeed), np.nan)
+        values[self.period - 1:] = __rollingWindows__(__getColumn__(tickerFeed, self.field), self.period).std(axis=1, ddof=self.ddof)
+        return {'value': values}
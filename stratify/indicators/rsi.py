@@ -0,0 +1,88 @@
+from .indicator import Indicator, __getColumn__, __validateField__, __validatePeriod__, __exponentialSmoothing__
+from ..data import TickerData, TickerFeed
+from typing import Union
+import numpy as np
+
+class RSI(Indicator):
+    '''
+    Relative strength index of a field, from Wilder's smoothed average gain and loss over `period` bars.
+
+    The index is 100 when there were no losses, and 50 when the field did not change at all.
+    '''
+
+    def __init__(self, period: int = 14, field: str = 'close'):
+        '''
+        Initializes the relative strength index.
+
+        :param period: The number of changes averaged, the smoothing factor is `1 / period`.
+        :param field: The bar field measured, one of 'open', 'close', 'low', 'high' or 'volume'.
+        '''
+
+        super().__init__()
+
+        self.period: int = __validatePeriod__(period)
+        self.field: str = __validateField__(field)
+
+        self._previousValue: Union[None, float] = None
+        self._count: int = 0
+        self._averageGain: float = 0.0
+        self._averageLoss: float = 0.0
+
+    def update(self, tickerData: TickerData) -> None:
+        value: float = getattr(tickerData, self.field)
+        previousValue: Union[None, float] = self._previousValue
+        self._previousValue = value
+        if previousValue == None:
+            return
+
+        gain: float = max(value - previousValue, 0.0)
+        loss: float = max(previousValue - value, 0.0)
+
+        if self._count < self.period:
+            self._count += 1
+            self._averageGain += gain / self.period
+            self._averageLoss += loss / self.period
+            if self._count < self.period:
+                return
+        else:
+            self._averageGain += (gain - self._averageGain) / self.period
+            self._averageLoss += (loss - self._averageLoss) / self.period
+
+        self.value = RSI.__calculateIndex__(self._averageGain, self._averageLoss)
+
+    @staticmethod
+    def __calculateIndex__(averageGain: float, averageLoss: float) -> float:
+        '''
+        Calculates the relative strength index from the average gain and loss.
+
+        :param averageGain: The average gain.
+        :param averageLoss: The average loss.
+        :return: The relative strength index, between 0 and 100.
+        '''
+
+        if averageLoss == 0.0:
+            return 100.0 if averageGain > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + averageGain / averageLoss)
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        values: np.ndarray = np.full(len(tickerFeed), np.nan)
+        if len(tickerFeed) <= self.period:
+            return {'value': values}
+
+        changes: np.ndarray = np.diff(__getColumn__(tickerFeed, self.field))
+        gains: np.ndarray = np.maximum(changes, 0.0)
+        losses: np.ndarray = np.maximum(-changes, 0.0)
+
+        averageGains: np.ndarray = np.empty(len(changes) - self.period + 1)
+        averageLosses: np.ndarray = np.empty(len(changes) - self.period + 1)
+        averageGains[0] = (gains[:self.period] / self.period).sum()
+        averageLosses[0] = (losses[:self.period] / self.period).sum()
+        averageGains[1:] = __exponentialSmoothing__(gains[self.period:], 1.0 / self.period, averageGains[0])
+        averageLosses[1:] = __exponentialSmoothing__(losses[self.period:], 1.0 / self.period, averageLosses[0])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indices: np.ndarray = 100.0 - 100.0 / (1.0 + averageGains / averageLosses)
+        indices = np.where(averageLosses == 0.0, np.where(averageGains > 0.0, 100.0, 50.0), indices)
+
+        values[self.period:] = indices
+        return {'value': values}
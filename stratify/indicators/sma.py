@@ -0,0 +1,51 @@
+from .indicator import Indicator, __getColumn__, __validateField__, __validatePeriod__, __rollingWindows__
+from ..data import TickerData, TickerFeed
+from ..data import RingBuffer
+from typing import Union
+import numpy as np
+
+class SMA(Indicator):
+    '''
+    Simple moving average of a field over the last `period` bars.
+    '''
+
+    def __init__(self, period: int, field: str = 'close'):
+        '''
+        Initializes the simple moving average.
+
+        :param period: The number of bars averaged.
+        :param field: The bar field averaged, one of 'open', 'close', 'low', 'high' or 'volume'.
+        '''
+
+        super().__init__()
+
+        self.period: int = __validatePeriod__(period)
+        self.field: str = __validateField__(field)
+
+        self._values: RingBuffer = RingBuffer(period)
+        self._sum: float = 0.0
+
+    def update(self, tickerData: TickerData) -> None:
+        self.updateValue(getattr(tickerData, self.field))
+
+    def updateValue(self, value: float) -> None:
+        '''
+        Updates the average with the next value.
+
+        :param value: The next value.
+        :return: None
+        '''
+
+        droppedValue: Union[None, float] = self._values.append(value)
+        self._sum += value - (droppedValue if droppedValue != None else 0.0)
+
+        # Resum the window once per period, so rounding errors of the running sum do not accumulate
+        if self._values._head == 0:
+            self._sum = float(self._values.latest().sum())
+
+        self.value = self._sum / self.period if self._values.isFull else None
+
+    def precompute(self, tickerFeed: TickerFeed) -> dict[str, np.ndarray]:
+        values: np.ndarray = np.full(len(tickerFeed), np.nan)
+        values[self.period - 1:] = __rollingWindows__(__getColumn__(tickerFeed, self.field), self.period).mean(axis=1)
+        return {'value': values}
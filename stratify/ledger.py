@@ -0,0 +1,225 @@
+from .order import Order, BuyOrder, SellOrder, OrderSide, FillStatus
+from .data import __ColumnStore__
+from datetime import datetime
+from typing import Union
+import numpy as np
+
+class FillLedger(__ColumnStore__):
+    '''
+    An append-only columnar record of fills.
+
+    Each field is kept in its own contiguous NumPy array (an integer id for tickers, datetime64 for dates, +1 or -1
+    for buys and sells, int64 for units and float64 for prices and cash), so a fill takes a few dozen bytes instead of
+    a whole order object, and trackers can read the columns directly.
+
+    The ledger is also the record of closed orders: indexing it rebuilds the order of a fill, so closed orders do not
+    have to be kept once they are recorded.
+    '''
+
+    COLUMN_NAMES: tuple[str, ...] = ('_tickerIndices', '_dateTimes', '_sides', '_units', '_prices', '_commissions', '_cashImpacts',
+                                     '_orderUnits', '_openedDateTimes')
+
+    def __init__(self):
+        '''
+        Initializes an empty ledger.
+        '''
+
+        super().__init__()
+
+        self._tickers: list[str] = []
+        self._tickerIds: dict[str, int] = {}
+
+        self._tickerIndices: np.ndarray = np.empty(0, dtype=np.int32)
+        self._dateTimes: np.ndarray = np.empty(0, dtype='datetime64[us]')
+        self._sides: np.ndarray = np.empty(0, dtype=np.int8)
+        self._units: np.ndarray = np.empty(0, dtype=np.int64)
+        self._prices: np.ndarray = np.empty(0, dtype=np.float64)
+        self._commissions: np.ndarray = np.empty(0, dtype=np.float64)
+        self._cashImpacts: np.ndarray = np.empty(0, dtype=np.float64)
+
+        # Units the filled orders asked for and the dates they were placed on, kept to rebuild the orders
+        self._orderUnits: np.ndarray = np.empty(0, dtype=np.int64)
+        self._openedDateTimes: np.ndarray = np.empty(0, dtype='datetime64[us]')
+
+    def __getitem__(self, index: int) -> Order:
+        '''
+        Rebuilds the order of a fill, as the BuyOrder or SellOrder it filled as.
+
+        A new order is built on every call, holding the fill's ticker, units, price, commission, cash impact and dates.
+
+        :param index: The position of the fill, negative positions counting from the end.
+        :return: The filled or partially filled order.
+        '''
+
+        if index < 0: index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('FillLedger index out of range')
+
+        ticker: str = self._tickers[self._tickerIndices[index]]
+        order: Order = BuyOrder(ticker, int(self._orderUnits[index])) if self._sides[index] == 1 else SellOrder(ticker, int(self._orderUnits[index]))
+        order._unitsActuallyTraded = int(self._units[index])
+        order.fillStatus = FillStatus.FILLED if order._unitsActuallyTraded >= order.units else FillStatus.PARTIALLY_FILLED
+        order._fillPrice = float(self._prices[index])
+        order._commission = float(self._commissions[index])
+        order._portfolioCashImpact = float(self._cashImpacts[index])
+        order._openedStartTime = self.__toDateTime__(self._openedDateTimes[index])
+        order._closedEndTime = self.__toDateTime__(self._dateTimes[index])
+        return order
+
+    def append(self, ticker: str,
+               dateTime: datetime,
+               side: OrderSide,
+               units: int,
+               price: float,
+               commission: float,
+               cashImpact: float,
+               orderUnits: Union[None, int] = None,
+               openedDateTime: Union[None, datetime] = None) -> None:
+        '''
+        Records a fill at the end of the ledger.
+
+        :param ticker: The stock ticker symbol.
+        :param dateTime: The date and time of the bar the fill happened on.
+        :param side: Whether the fill bought or sold.
+        :param units: The number of units traded.
+        :param price: The price per unit traded at, including slippage.
+        :param commission: The commission paid.
+        :param cashImpact: The net change of cash caused by the fill.
+        :param orderUnits: The number of units the order asked for, defaults to the units traded.
+        :param openedDateTime: The date and time of the bar the order was placed on, if known.
+        :return: None
+        '''
+
+        if self._size == 0:
+            self._timeZone = getattr(dateTime, 'tzinfo', None)
+
+        self.__reserve__(self._size + 1)
+
+        tickerId: Union[None, int] = self._tickerIds.get(ticker)
+        if tickerId == None:
+            tickerId = len(self._tickers)
+            self._tickers.append(ticker)
+            self._tickerIds[ticker] = tickerId
+
+        index: int = self._size
+        self._tickerIndices[index] = tickerId
+        self._dateTimes[index] = FillLedger.__toDateTime64__(dateTime)
+        self._sides[index] = 1 if side == OrderSide.BUY else -1
+        self._units[index] = units
+        self._prices[index] = price
+        self._commissions[index] = commission
+        self._cashImpacts[index] = cashImpact
+        self._orderUnits[index] = orderUnits if orderUnits != None else units
+        self._openedDateTimes[index] = FillLedger.__toDateTime64__(openedDateTime) if openedDateTime != None else np.datetime64('NaT', 'us')
+        self._size += 1
+
+    def appendOrder(self, order: Order) -> None:
+        '''
+        Records the fill of a filled or partially filled order.
+
+        :param order: The filled order.
+        :return: None
+        '''
+
+        self.append(order.ticker, order._closedEndTime, order.side, order._unitsActuallyTraded, order._fillPrice, order._commission, order._portfolioCashImpact,
+                    order.units, order._openedStartTime)
+
+    @property
+    def tickers(self) -> list[str]:
+        '''
+        Returns the ticker symbols of the ledger, indexed by the ids in `tickerIds`.
+
+        :return: The ticker symbols, in the order they were first filled.
+        '''
+
+        return list(self._tickers)
+
+    @property
+    def tickerIds(self) -> np.ndarray:
+        '''
+        Returns the ticker id of every fill, an index into `tickers`.
+
+        :return: An int32 array of ticker ids.
+        '''
+
+        return self.__getColumnView__('_tickerIndices')
+
+    @property
+    def dateTimes(self) -> np.ndarray:
+        '''
+        Returns the date and time of the bar every fill happened on, in UTC if the dates had a time zone.
+
+        :return: A datetime64[us] array of dates.
+        '''
+
+        return self.__getColumnView__('_dateTimes')
+
+    @property
+    def sides(self) -> np.ndarray:
+        '''
+        Returns the side of every fill, 1 for buys and -1 for sells.
+
+        :return: An int8 array of sides.
+        '''
+
+        return self.__getColumnView__('_sides')
+
+    @property
+    def units(self) -> np.ndarray:
+        '''
+        Returns the number of units traded by every fill.
+
+        :return: An int64 array of units.
+        '''
+
+        return self.__getColumnView__('_units')
+
+    @property
+    def prices(self) -> np.ndarray:
+        '''
+        Returns the price per unit of every fill, including slippage.
+
+        :return: A float64 array of prices.
+        '''
+
+        return self.__getColumnView__('_prices')
+
+    @property
+    def commissions(self) -> np.ndarray:
+        '''
+        Returns the commission paid for every fill.
+
+        :return: A float64 array of commissions.
+        '''
+
+        return self.__getColumnView__('_commissions')
+
+    @property
+    def cashImpacts(self) -> np.ndarray:
+        '''
+        Returns the net change of cash caused by every fill.
+
+        :return: A float64 array of cash impacts.
+        '''
+
+        return self.__getColumnView__('_cashImpacts')
+
+    @property
+    def orderUnits(self) -> np.ndarray:
+        '''
+        Returns the number of units the order of every fill asked for, more than its units for partial fills.
+
+        :return: An int64 array of units.
+        '''
+
+        return self.__getColumnView__('_orderUnits')
+
+    @property
+    def openedDateTimes(self) -> np.ndarray:
+        '''
+        Returns the date and time of the bar the order of every fill was placed on, NaT if it is not known.
+
+        :return: A datetime64[us] array of dates.
+        '''
+
+        return self.__getColumnView__('_openedDateTimes')
@@ -0,0 +1,363 @@
+from .engine import __saveTickerFeeds__, __initializeWorker__, __evaluateStrategyInWorker__
+from concurrent.futures import ProcessPoolExecutor
+from .stats import StatisticTracker
+from typing import Union, Any
+from .broker import BrokerStandard
+from .strategy import Strategy
+from datetime import datetime
+from .data import TickerFeed
+import numpy as np
+import itertools
+import tempfile
+import pandas
+import random
+import math
+import os
+
+class Optimizer():
+    '''
+    Searches a strategy's parameter space for the parameters that optimize a target statistic.
+
+    Every trial is a backtest of the strategy with one combination of parameters, run against its own broker configured
+    like the optimizer's broker. Trials run in a pool of worker processes that memory map the ticker feeds once, so
+    only the parameters and the computed statistics are sent between processes per trial.
+    '''
+
+    def __init__(self,
+                 strategyClass: type[Strategy],
+                 paramSpace: dict[str, list[Any]],
+                 targetStatisticID: str,
+                 targetKey: Union[None, str] = None,
+                 maximize: bool = True):
+        '''
+        Initializes the optimizer.
+
+        :param strategyClass: The Strategy subclass to optimize.
+        :param paramSpace: The candidate values of each parameter, keyed by parameter name, see `Strategy.setParams`.
+        :param targetStatisticID: The ID of the statistic to optimize, see `StatID`.
+        :param targetKey: The key of the value to optimize when the statistic is a dictionary (e.g. 'percent' for `StatID.MAX_DRAWDOWN`).
+        :param maximize: Whether higher target values are better, set to False for statistics like drawdown.
+        '''
+
+        self.strategyClass: type[Strategy] = strategyClass
+        self.paramSpace: dict[str, list[Any]] = paramSpace
+        self.targetStatisticID: str = targetStatisticID
+        self.targetKey: Union[None, str] = targetKey
+        self.maximize: bool = maximize
+
+        self.tickerFeeds: list[TickerFeed] = []
+        self.statisticTrackerClasses: list[type[StatisticTracker]] = []
+        self.broker: BrokerStandard = BrokerStandard()
+
+    def addTickerFeed(self, tickerFeed: TickerFeed) -> None:
+        '''
+        Adds a ticker feed that every trial is backtested against.
+
+        :param tickerFeed: A TickerFeed object containing market data.
+        :return: None
+        '''
+
+        self.tickerFeeds.append(tickerFeed)
+
+    def addStatistic(self, statisticTrackerClass: type[StatisticTracker]) -> None:
+        '''
+        Adds a custom statistic tracker to every trial, so that it can be used as the target statistic.
+
+        :param statisticTrackerClass: A StatisticTracker class to be added.
+        :return: None
+        '''
+
+        self.statisticTrackerClasses.append(statisticTrackerClass)
+
+    def gridSearch(self, maxWorkers: Union[None, int] = None) -> pandas.DataFrame:
+        '''
+        Backtests every combination of parameters in the parameter space.
+
+        :param maxWorkers: The maximum number of worker processes, defaults to the number of CPUs.
+        :return: The ranked results, see `__rankResults__`.
+        '''
+
+        self.__checkTargetStatisticID__()
+
+        paramsList: list[dict[str, Any]] = self.__getParamsGrid__()
+        with self.__createExecutor__(maxWorkers) as executor:
+            results: list[dict[str, Any]] = self.__evaluate__(executor, paramsList, None)
+        return self.__rankResults__(paramsList, results)
+
+    def randomSearch(self, numTrials: int, seed: Union[None, int] = None, maxWorkers: Union[None, int] = None) -> pandas.DataFrame:
+        '''
+        Backtests randomly sampled combinations of parameters, without repeating a combination.
+
+        :param numTrials: The number of combinations to backtest, capped at the size of the parameter space.
+        :param seed: Optional seed for reproducible sampling.
+        :param maxWorkers: The maximum number of worker processes, defaults to the number of CPUs.
+        :return: The ranked results, see `__rankResults__`.
+        '''
+
+        self.__checkTargetStatisticID__()
+
+        paramsList: list[dict[str, Any]] = self.__sampleParams__(numTrials, random.Random(seed))
+        with self.__createExecutor__(maxWorkers) as executor:
+            results: list[dict[str, Any]] = self.__evaluate__(executor, paramsList, None)
+        return self.__rankResults__(paramsList, results)
+
+    def successiveHalving(self,
+                          numTrials: Union[None, int] = None,
+                          reductionFactor: int = 3,
+                          minBudget: float = 0.1,
+                          seed: Union[None, int] = None,
+                          maxWorkers: Union[None, int] = None) -> pandas.DataFrame:
+        '''
+        Backtests combinations of parameters on a growing share of the data, keeping only the best combinations of
+        each round for the next one.
+
+        Each round backtests the survivors from the first bar up to the round's budget, a fraction of the bars that
+        grows by `reductionFactor` every round until the last round runs over every bar. After each round only the best
+        `1 / reductionFactor` of the combinations go on, so most of the backtesting time is spent on promising ones.
+
+        :param numTrials: The number of randomly sampled combinations to start with, None starts with the full grid.
+        :param reductionFactor: The factor by which the combinations shrink, and the budget grows, each round.
+        :param minBudget: The smallest fraction of the bars a first round may use.
+        :param seed: Optional seed for reproducible sampling.
+        :param maxWorkers: The maximum number of worker processes, defaults to the number of CPUs.
+        :return: The ranked results of each combination's last round, with a 'budget' column, see `__rankResults__`.
+        '''
+
+        if reductionFactor < 2:
+            raise ValueError('Reduction factor must be at least 2.')
+
+        self.__checkTargetStatisticID__()
+
+        if numTrials != None: paramsList: list[dict[str, Any]] = self.__sampleParams__(numTrials, random.Random(seed))
+        else: paramsList: list[dict[str, Any]] = self.__getParamsGrid__()
+
+        numRounds: int = 1 + int(math.log(1.0 / minBudget, reductionFactor)) if 0.0 < minBudget < 1.0 else 1
+        numRounds = max(1, min(numRounds, 1 + int(math.log(max(len(paramsList), 1), reductionFactor))))
+        dateTimes: np.ndarray = self.__getDateTimes__()
+
+        budgets: list[float] = [0.0] * len(paramsList)
+        results: list[dict[str, Any]] = [{}] * len(paramsList)
+        survivors: list[int] = list(range(len(paramsList)))
+        with self.__createExecutor__(maxWorkers) as executor:
+            for roundIndex in range(numRounds):
+                budget: float = float(reductionFactor) ** (roundIndex - numRounds + 1)
+                endIndex: int = max(1, math.ceil(budget * len(dateTimes)))
+                end: Union[None, datetime] = dateTimes[endIndex].astype('datetime64[us]').item() if endIndex < len(dateTimes) else None
+
+                roundResults: list[dict[str, Any]] = self.__evaluate__(executor, [paramsList[index] for index in survivors], end, roundIndex == 0)
+                for index, result in zip(survivors, roundResults):
+                    budgets[index] = budget
+                    results[index] = result
+
+                if roundIndex < numRounds - 1:
+                    survivors.sort(key=lambda index: self.__getSortKey__(results[index]))
+                    survivors = survivors[:max(1, len(survivors) // reductionFactor)]
+
+        return self.__rankResults__(paramsList, results, budgets)
+
+    def __checkTargetStatisticID__(self) -> None:
+        '''
+        Checks that a trial will compute the target statistic, before any trial runs.
+
+        A trial computes the statistics of the strategy's default trackers, of the trackers the strategy adds itself
+        and of the trackers added to the optimizer.
+
+        :return: None
+        '''
+
+        strategy: Strategy = self.strategyClass()
+        statisticIDs: set[str] = {statisticTracker.statisticID for statisticTracker in strategy._statisticsManager._statisticTrackers}
+        for statisticTrackerClass in itertools.chain(Strategy.DEFAULT_STATISTIC_TRACKERS, self.statisticTrackerClasses):
+            statisticIDs.add(statisticTrackerClass().statisticID)
+
+        if self.targetStatisticID not in statisticIDs:
+            raise ValueError(f'Statistic \'{self.targetStatisticID}\' is not tracked, set targetStatisticID to one of {", ".join(sorted(statisticIDs))} or add its tracker with addStatistic.')
+
+    def __getParamsGrid__(self) -> list[dict[str, Any]]:
+        '''
+        Lists every combination of parameters in the parameter space.
+
+        :return: A list of parameter dictionaries.
+        '''
+
+        names: list[str] = list(self.paramSpace.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*self.paramSpace.values())]
+
+    def __sampleParams__(self, numTrials: int, randomGenerator: random.Random) -> list[dict[str, Any]]:
+        '''
+        Samples distinct combinations of parameters from the parameter space, without building the full grid.
+
+        :param numTrials: The number of combinations to sample, capped at the size of the parameter space.
+        :param randomGenerator: The random generator to sample with.
+        :return: A list of parameter dictionaries.
+        '''
+
+        names: list[str] = list(self.paramSpace.keys())
+        sizes: list[int] = [len(values) for values in self.paramSpace.values()]
+        numCombinations: int = math.prod(sizes)
+
+        paramsList: list[dict[str, Any]] = []
+        for combinationIndex in randomGenerator.sample(range(numCombinations), min(numTrials, numCombinations)):
+            params: dict[str, Any] = {}
+            for name, size in zip(reversed(names), reversed(sizes)):
+                combinationIndex, valueIndex = divmod(combinationIndex, size)
+                params[name] = self.paramSpace[name][valueIndex]
+            paramsList.append({name: params[name] for name in names})
+        return paramsList
+
+    def __getDateTimes__(self) -> np.ndarray:
+        '''
+        Lists the unique bar datetimes across every ticker feed, which successive halving budgets are measured in.
+
+        :return: A sorted array of datetime64 values.
+        '''
+
+        if len(self.tickerFeeds) == 0:
+            return np.array([], dtype='datetime64[us]')
+        return np.unique(np.concatenate([tickerFeed._dateTimes[:tickerFeed._size] for tickerFeed in self.tickerFeeds]))
+
+    def __createExecutor__(self, maxWorkers: Union[None, int]) -> '__OptimizerExecutor__':
+        '''
+        Creates the worker pool that trials run in, sharing the ticker feeds through a temporary directory.
+
+        :param maxWorkers: The maximum number of worker processes, defaults to the number of CPUs.
+        :return: A context manager yielding the worker pool.
+        '''
+
+        return __OptimizerExecutor__(self.tickerFeeds, maxWorkers)
+
+    def __evaluate__(self, executor: '__OptimizerExecutor__', paramsList: list[dict[str, Any]], end: Union[None, datetime], checkTarget: bool = True) -> list[dict[str, Any]]:
+        '''
+        Backtests every combination of parameters in the worker pool.
+
+        :param executor: The worker pool to run the trials in.
+        :param paramsList: The combinations of parameters to backtest.
+        :param end: Optional datetime to stop each backtest before, None runs over every bar.
+        :param checkTarget: Whether to backtest the first combination on its own and check its target before the others run.
+        :return: The statistics of each trial keyed by statistic ID, in the order of `paramsList`.
+        '''
+
+        results: list[dict[str, Any]] = []
+        if checkTarget and len(paramsList) != 0:
+            # An invalid target key only shows in a trial's statistics, so it is found before the rest of the trials run
+            results.append(executor.executor.submit(__evaluateStrategyInWorker__,
+                                                    self.strategyClass,
+                                                    paramsList[0],
+                                                    self.statisticTrackerClasses,
+                                                    self.broker.cash,
+                                                    self.broker.commissionPercent,
+                                                    self.broker.slippagePercent,
+                                                    end).result())
+            self.__getTarget__(results[0])
+
+        numTrials: int = len(paramsList) - len(results)
+        results.extend(executor.executor.map(__evaluateStrategyInWorker__,
+                                             [self.strategyClass] * numTrials,
+                                             paramsList[len(results):],
+                                             [self.statisticTrackerClasses] * numTrials,
+                                             [self.broker.cash] * numTrials,
+                                             [self.broker.commissionPercent] * numTrials,
+                                             [self.broker.slippagePercent] * numTrials,
+                                             [end] * numTrials,
+                                             chunksize=executor.getChunkSize(numTrials)))
+        return results
+
+    def __getTarget__(self, statistics: dict[str, Any]) -> Any:
+        '''
+        Extracts the target statistic from a trial's statistics.
+
+        :param statistics: The statistics of a trial keyed by statistic ID.
+        :return: The target value.
+        '''
+
+        target: Any = statistics[self.targetStatisticID]
+        if self.targetKey != None:
+            if not isinstance(target, dict) or self.targetKey not in target:
+                raise ValueError(f'Statistic \'{self.targetStatisticID}\' has no \'{self.targetKey}\' key to set targetKey to.')
+            target = target[self.targetKey]
+        elif isinstance(target, dict):
+            raise ValueError(f'Statistic \'{self.targetStatisticID}\' is a dictionary, set targetKey to one of {", ".join(map(str, target.keys()))}.')
+        return target
+
+    def __getSortKey__(self, statistics: dict[str, Any]) -> float:
+        '''
+        Orders trials from best to worst target value, with invalid targets last.
+
+        :param statistics: The statistics of a trial keyed by statistic ID.
+        :return: A value that sorts ascending from the best trial.
+        '''
+
+        target: Any = self.__getTarget__(statistics)
+        if not isinstance(target, (int, float)) or math.isnan(target):
+            return math.inf
+        return -target if self.maximize else target
+
+    def __rankResults__(self, paramsList: list[dict[str, Any]], results: list[dict[str, Any]], budgets: Union[None, list[float]] = None) -> pandas.DataFrame:
+        '''
+        Builds the results table, ranked from the best trial to the worst.
+
+        The table has a column per parameter, a 'target' column with the target statistic and a column per computed
+        statistic, indexed by rank starting at 1.
+
+        :param paramsList: The combinations of parameters that were backtested.
+        :param results: The statistics of each trial keyed by statistic ID.
+        :param budgets: Optional fraction of the bars each trial was last backtested on, trials with bigger budgets rank first.
+        :return: The ranked results.
+        '''
+
+        rows: list[dict[str, Any]] = []
+        sortKeys: list[tuple[float, float]] = []
+        for trialIndex, (params, statistics) in enumerate(zip(paramsList, results)):
+            row: dict[str, Any] = dict(params)
+            if budgets != None:
+                row['budget'] = budgets[trialIndex]
+            row['target'] = self.__getTarget__(statistics)
+            row.update(statistics)
+            rows.append(row)
+            sortKeys.append((-budgets[trialIndex] if budgets != None else 0.0, self.__getSortKey__(statistics)))
+
+        order: list[int] = sorted(range(len(rows)), key=lambda trialIndex: sortKeys[trialIndex])
+        rankedResults: pandas.DataFrame = pandas.DataFrame([rows[trialIndex] for trialIndex in order])
+        rankedResults.index = pandas.RangeIndex(1, len(rows) + 1, name='rank')
+        return rankedResults
+
+class __OptimizerExecutor__():
+    '''
+    Context manager owning an optimization's worker pool and the temporary directory the ticker feeds are shared through.
+    '''
+
+    # Upper bound on the trials sent to a worker at once, keeping the pool balanced while amortizing the IPC round trips
+    MAX_CHUNK_SIZE: int = 16
+
+    def __init__(self, tickerFeeds: list[TickerFeed], maxWorkers: Union[None, int]):
+        self.tickerFeeds: list[TickerFeed] = tickerFeeds
+        self.maxWorkers: int = maxWorkers if maxWorkers != None else (os.cpu_count() or 1)
+        self.tickerFeedsDirectory: Union[None, tempfile.TemporaryDirectory] = None
+        self.executor: Union[None, ProcessPoolExecutor] = None
+
+    def getChunkSize(self, numTrials: int) -> int:
+        '''
+        Splits trials into chunks that spread evenly over the workers, so each worker receives few large messages.
+
+        :param numTrials: The number of trials about to run.
+        :return: The number of trials to send to a worker at once.
+        '''
+
+        return max(1, min(self.MAX_CHUNK_SIZE, math.ceil(numTrials / self.maxWorkers)))
+
+    def __enter__(self) -> '__OptimizerExecutor__':
+        self.tickerFeedsDirectory = tempfile.TemporaryDirectory()
+        try:
+            tickerFeedPaths: list[str] = __saveTickerFeeds__(self.tickerFeeds, self.tickerFeedsDirectory.name)
+            self.executor = ProcessPoolExecutor(max_workers=self.maxWorkers, initializer=__initializeWorker__, initargs=(tickerFeedPaths,))
+        except BaseException:
+            self.tickerFeedsDirectory.cleanup()
+            raise
+        return self
+
+    def __exit__(self, *exceptionInfo) -> None:
+        try:
+            # Trials that have not started are cancelled when the optimization fails
+            self.executor.shutdown(cancel_futures=exceptionInfo[0] != None)
+        finally:
+            self.tickerFeedsDirectory.cleanup()
@@ -1,6 +1,13 @@
+from collections.abc import Sequence, Iterable
+from typing import Union, Iterator, Callable, Any, TYPE_CHECKING
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Union
+from .data import TickerData
 from enum import Enum
+import copy
+
+if TYPE_CHECKING:
+    from .order_book import OrderBook
 
 class FillStatus(Enum):
     '''
@@ -13,11 +20,27 @@ class FillStatus(Enum):
     REJECTED: str = 'rejected'
     CANCELLED: str = 'cancelled'
 
+class OrderSide(Enum):
+    '''
+    Enum representing whether an order buys or sells.
+    '''
+
+    BUY: str = 'buy'
+    SELL: str = 'sell'
+
 class Order():
     '''
     Base class representing a trade order.
+
+    Orders are slotted, so they carry no instance dict. Their open and close times are the dates of the bars they
+    were placed and closed on.
     '''
 
+    __slots__ = ('ticker', 'units', 'fillStatus', '_unitsActuallyTraded', '_portfolioCashImpact', '_fillPrice', '_commission',
+                 '_openedStartTime', '_closedEndTime', '_ocoOrders', '_children', '_orderBook', '_onClose')
+
+    side: Union[None, OrderSide] = None
+
     def __init__(self, ticker: str, units: int):
         '''
         Initializes a new order.
@@ -32,27 +55,73 @@ class Order():
 
         self._unitsActuallyTraded: int = 0.0
 
-        # Net impact on the total cash in the portfolio this order has
+        # Net impact on the total cash in the portfolio this order has, and the price and commission it filled with
         self._portfolioCashImpact: float = 0.0
+        self._fillPrice: float = 0.0
+        self._commission: float = 0.0
 
-        # Used to determine deltatime for how long order was open for
-        self._openedStartTime: datetime = datetime.now()
+        # Bar dates the order was placed and closed on, used to determine how long the order was open for
+        self._openedStartTime: Union[None, datetime] = None
         self._closedEndTime: Union[None, datetime] = None
 
+        # Orders cancelled when this order fills (one-cancels-other), and orders only placed once it fills (brackets)
+        self._ocoOrders: Sequence[Order] = ()
+        self._children: Sequence[Order] = ()
+
+        # Book the order rests in while waiting for its trigger price, if any
+        self._orderBook: Union[None, 'OrderBook'] = None
+
+        # Called with the order once it fills, is rejected or is cancelled, so the strategy that placed it can record
+        # its fill and stop holding on to it
+        self._onClose: Union[None, Callable[['Order'], None]] = None
+
+    def __getstate__(self) -> tuple[None, dict[str, Any]]:
+        '''
+        Returns the state used to copy or pickle the order.
+
+        The hook called when the order closes is left out, so copies of an order are never recorded as fills and
+        pickled orders do not carry the statistics of the strategy that placed them.
+
+        :return: The state of the order's slots.
+        '''
+
+        state: dict[str, Any] = {name: getattr(self, name) for orderClass in type(self).__mro__ for name in getattr(orderClass, '__slots__', ()) if hasattr(self, name)}
+        state['_onClose'] = None
+        return (None, state)
+
     def cancel(self) -> None:
         '''
         Cancels the order by setting its status to CANCELLED.
+
+        A pending order is also taken out of the order book it rests in, and the orders attached to it that would only
+        be placed once it fills are cancelled with it.
         
         :return: None
         '''
 
+        wasPending: bool = self.fillStatus == FillStatus.PENDING
         self.fillStatus = FillStatus.CANCELLED
+        if not wasPending:
+            return
+
+        if self._orderBook != None:
+            self._orderBook.remove(self)
+        if self._onClose != None:
+            self._onClose(self)
+
+        for child in self._children:
+            if child.fillStatus == FillStatus.PENDING:
+                child.cancel()
 
 class BuyOrder(Order):
     '''
     Represents a buy order.
     '''
 
+    __slots__ = ()
+
+    side: OrderSide = OrderSide.BUY
+
     def __init__(self, ticker: str, units: int = 1):
         '''
         Initializes a buy order.
@@ -67,7 +136,11 @@ class SellOrder(Order):
     '''
     Represents a sell order.
     '''
-    
+
+    __slots__ = ()
+
+    side: OrderSide = OrderSide.SELL
+
     def __init__(self, ticker: str, units: int = 1):
         '''
         Initializes a sell order.
@@ -83,6 +156,10 @@ class CloseOrder(Order):
     Represents an order to close a position by selling all held units.
     '''
 
+    __slots__ = ()
+
+    side: OrderSide = OrderSide.SELL
+
     def __init__(self, ticker, units: int = 1):
         '''
         Initializes a close order.
@@ -91,4 +168,446 @@ class CloseOrder(Order):
         :param units: Placeholder value (will be overridden with full position units).
         '''
 
-        super().__init__(ticker, units)
\ No newline at end of file
+        super().__init__(ticker, units)
+
+class ConditionalOrder(Order, ABC):
+    '''
+    Base class representing an order that rests in the broker's order book until the market reaches its trigger price.
+
+    An order is triggered either when the price rises to its trigger price or when it falls to it. Once triggered,
+    it fills at the price it was triggered at, which is the trigger price itself, or the bar's open if the market
+    gapped through it.
+
+    Conditional orders sell unless given a side, as they most often close a position (e.g. a take profit or a stop
+    loss). Subclass this to add an order type, implementing `isTriggeredByRise` and `triggerPrice`.
+    '''
+
+    __slots__ = ('side',)
+
+    def __init__(self, ticker: str, units: int, side: OrderSide):
+        '''
+        Initializes a conditional order.
+
+        :param ticker: The stock ticker symbol.
+        :param units: The number of units to trade.
+        :param side: Whether the order buys or sells.
+        '''
+
+        super().__init__(ticker, units)
+        self.side: OrderSide = side
+
+    @property
+    @abstractmethod
+    def isTriggeredByRise(self) -> bool:
+        '''
+        Whether the order triggers when the price rises to its trigger price, otherwise when it falls to it.
+
+        :return: True if the order triggers on a rising price.
+        '''
+
+        pass
+
+    @property
+    @abstractmethod
+    def triggerPrice(self) -> float:
+        '''
+        The price at which the order currently triggers.
+
+        :return: The trigger price.
+        '''
+
+        pass
+
+    def __activate__(self, price: float) -> None:
+        '''
+        Called once when the order is placed in the order book.
+
+        :param price: The latest price of the ticker.
+        :return: None
+        '''
+
+        pass
+
+    def __trigger__(self, price: float) -> Union[None, float]:
+        '''
+        Called when the market reaches the order's trigger price.
+
+        :param price: The first price at or through the trigger price.
+        :return: The price to fill the order at, or None if the order keeps resting with a new trigger price.
+        '''
+
+        return price
+
+    def __updateWatermark__(self, tickerData: TickerData) -> bool:
+        '''
+        Called with every bar the order rests through, for orders whose trigger price follows the market.
+
+        :param tickerData: The latest bar of the ticker.
+        :return: Whether the trigger price changed.
+        '''
+
+        return False
+
+class LimitOrder(ConditionalOrder):
+    '''
+    Represents an order to buy at or below, or sell at or above, a limit price.
+    '''
+
+    __slots__ = ('limitPrice',)
+
+    def __init__(self, ticker: str, units: int, limitPrice: float, side: OrderSide = OrderSide.SELL):
+        '''
+        Initializes a limit order.
+
+        :param ticker: The stock ticker symbol.
+        :param units: The number of units to trade.
+        :param limitPrice: The worst price the order may fill at.
+        :param side: Whether the order buys or sells.
+        '''
+
+        super().__init__(ticker, units, side)
+        self.limitPrice: float = limitPrice
+
+    @property
+    def isTriggeredByRise(self) -> bool:
+        return self.side == OrderSide.SELL
+
+    @property
+    def triggerPrice(self) -> float:
+        return self.limitPrice
+
+class StopOrder(ConditionalOrder):
+    '''
+    Represents an order that becomes a market order once the price rises to (buy) or falls to (sell) a stop price.
+    '''
+
+    __slots__ = ('stopPrice',)
+
+    def __init__(self, ticker: str, units: int, stopPrice: float, side: OrderSide = OrderSide.SELL):
+        '''
+        Initializes a stop order.
+
+        :param ticker: The stock ticker symbol.
+        :param units: The number of units to trade.
+        :param stopPrice: The price that triggers the order.
+        :param side: Whether the order buys or sells.
+        '''
+
+        super().__init__(ticker, units, side)
+        self.stopPrice: float = stopPrice
+
+    @property
+    def isTriggeredByRise(self) -> bool:
+        return self.side == OrderSide.BUY
+
+    @property
+    def triggerPrice(self) -> float:
+        return self.stopPrice
+
+class StopLimitOrder(ConditionalOrder):
+    '''
+    Represents an order that becomes a limit order once the price rises to (buy) or falls to (sell) a stop price.
+    '''
+
+    __slots__ = ('stopPrice', 'limitPrice', 'isStopTriggered')
+
+    def __init__(self, ticker: str, units: int, stopPrice: float, limitPrice: float, side: OrderSide = OrderSide.SELL):
+        '''
+        Initializes a stop limit order.
+
+        :param ticker: The stock ticker symbol.
+        :param units: The number of units to trade.
+        :param stopPrice: The price that triggers the order.
+        :param limitPrice: The worst price the order may fill at once triggered.
+        :param side: Whether the order buys or sells.
+        '''
+
+        super().__init__(ticker, units, side)
+        self.stopPrice: float = stopPrice
+        self.limitPrice: float = limitPrice
+        self.isStopTriggered: bool = False
+
+    @property
+    def isTriggeredByRise(self) -> bool:
+        return (self.side == OrderSide.BUY) != self.isStopTriggered
+
+    @property
+    def triggerPrice(self) -> float:
+        return self.limitPrice if self.isStopTriggered else self.stopPrice
+
+    def __trigger__(self, price: float) -> Union[None, float]:
+        if self.isStopTriggered:
+            return price
+
+        # Once stopped, the order fills right away if the price is within the limit, otherwise it rests as a limit order
+        self.isStopTriggered = True
+        isWithinLimit: bool = price <= self.limitPrice if self.side == OrderSide.BUY else price >= self.limitPrice
+        return price if isWithinLimit else None
+
+class TrailingStopOrder(ConditionalOrder):
+    '''
+    Represents a stop order whose stop price trails the best price seen since it was placed, by a fixed amount or a
+    percentage of that price.
+
+    A sell order trails below the highest high, and a buy order trails above the lowest low.
+    '''
+
+    __slots__ = ('trailAmount', 'trailPercent', 'watermark')
+
+    def __init__(self, ticker: str, units: int, trailAmount: Union[None, float] = None, trailPercent: Union[None, float] = None, side: OrderSide = OrderSide.SELL):
+        '''
+        Initializes a trailing stop order.
+
+        :param ticker: The stock ticker symbol.
+        :param units: The number of units to trade.
+        :param trailAmount: The distance of the stop price from the best price.
+        :param trailPercent: The distance of the stop price from the best price, as a decimal (e.g., 0.05 for 5%).
+        :param side: Whether the order buys or sells.
+        '''
+
+        if (trailAmount == None) == (trailPercent == None):
+            raise ValueError('Exactly one of trailAmount and trailPercent must be given')
+
+        super().__init__(ticker, units, side)
+        self.trailAmount: Union[None, float] = trailAmount
+        self.trailPercent: Union[None, float] = trailPercent
+        self.watermark: Union[None, float] = None
+
+    @property
+    def isTriggeredByRise(self) -> bool:
+        return self.side == OrderSide.BUY
+
+    @property
+    def triggerPrice(self) -> float:
+        direction: int = 1 if self.side == OrderSide.BUY else -1
+        if self.trailAmount != None:
+            return self.watermark + direction * self.trailAmount
+        return self.watermark * (1 + direction * self.trailPercent)
+
+    def __activate__(self, price: float) -> None:
+        self.watermark = price
+
+    def __updateWatermark__(self, tickerData: TickerData) -> bool:
+        if self.side == OrderSide.SELL and tickerData.high > self.watermark:
+            self.watermark = tickerData.high
+            return True
+
+        if self.side == OrderSide.BUY and tickerData.low < self.watermark:
+            self.watermark = tickerData.low
+            return True
+
+        return False
+
+class OpenOrders():
+    '''
+    The orders placed with a broker that have not been executed yet, in a queue per ticker.
+
+    Each queue is a dict keyed by order id, so orders are kept in the order they were placed and removed in O(1). A
+    bar only has to look at the queue of its own ticker.
+    '''
+
+    def __init__(self):
+        '''
+        Initializes empty queues.
+        '''
+
+        # Every open order in the order it was placed, and the same orders split by ticker
+        self._orders: dict[int, Order] = {}
+        self._tickerOrders: dict[str, dict[int, Order]] = {}
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of open orders.
+
+        :return: The number of open orders.
+        '''
+
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[Order]:
+        '''
+        Returns an iterator over the open orders, in the order they were placed.
+
+        :return: An iterator of orders.
+        '''
+
+        return iter(self._orders.values())
+
+    def __contains__(self, order: Order) -> bool:
+        '''
+        Checks whether an order is open.
+
+        :param order: The order.
+        :return: Whether the order is open.
+        '''
+
+        return id(order) in self._orders
+
+    def __iadd__(self, orders: Iterable[Order]) -> 'OpenOrders':
+        '''
+        Places orders, as with `extend`.
+
+        :param orders: The orders to place.
+        :return: The open orders.
+        '''
+
+        self.extend(orders)
+        return self
+
+    def append(self, order: Order) -> None:
+        '''
+        Places an order at the back of its ticker's queue.
+
+        :param order: The order to place.
+        :return: None
+        '''
+
+        self._orders[id(order)] = order
+
+        tickerOrders: Union[None, dict[int, Order]] = self._tickerOrders.get(order.ticker)
+        if tickerOrders == None:
+            tickerOrders = {}
+            self._tickerOrders[order.ticker] = tickerOrders
+        tickerOrders[id(order)] = order
+
+    def extend(self, orders: Iterable[Order]) -> None:
+        '''
+        Places orders at the back of their tickers' queues.
+
+        :param orders: The orders to place.
+        :return: None
+        '''
+
+        for order in orders:
+            self.append(order)
+
+    def remove(self, order: Order) -> None:
+        '''
+        Removes an open order.
+
+        :param order: The order to remove.
+        :return: None
+        '''
+
+        if self._orders.pop(id(order), None) == None:
+            raise ValueError('Order is not open')
+
+        tickerOrders: dict[int, Order] = self._tickerOrders[order.ticker]
+        del tickerOrders[id(order)]
+        if not tickerOrders:
+            del self._tickerOrders[order.ticker]
+
+    def getTickerOrders(self, ticker: str) -> list[Order]:
+        '''
+        Returns the open orders of a ticker, in the order they were placed.
+
+        The orders are copied into a list, so orders can be removed while iterating over it.
+
+        :param ticker: The stock ticker symbol.
+        :return: The ticker's open orders.
+        '''
+
+        tickerOrders: Union[None, dict[int, Order]] = self._tickerOrders.get(ticker)
+        return list(tickerOrders.values()) if tickerOrders != None else []
+
+class OrderLogView(Sequence):
+    '''
+    A read-only view of one or more append-only order logs as they stood at a single moment.
+
+    Only the orders that were in each log when the view was taken are visible, so no history is copied. Orders that
+    were still open at that moment are shown in the state they had then, and are only copied if they have since
+    been filled, rejected or cancelled.
+    '''
+
+    def __init__(self, segments: list[tuple[Sequence[Order], int]], openOrderStatuses: dict[int, FillStatus]):
+        '''
+        Initializes the view.
+
+        :param segments: The order logs to expose, each paired with how many of its orders are visible.
+        :param openOrderStatuses: The fill status of every open order at the moment of the view, keyed by order id.
+        '''
+
+        self._segments: list[tuple[Sequence[Order], int]] = segments
+        self._openOrderStatuses: dict[int, FillStatus] = openOrderStatuses
+        self._copiedOrders: dict[int, Order] = {}
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of orders visible in the view.
+
+        :return: The number of visible orders.
+        '''
+
+        return sum(length for _, length in self._segments)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Order, list[Order]]:
+        '''
+        Returns the order at the given position, or a list of orders for a slice.
+
+        :param index: The position of the order, or a slice of positions.
+        :return: The order as it stood when the view was taken, or a list of such orders.
+        '''
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0: index += len(self)
+        if index < 0:
+            raise IndexError('OrderLogView index out of range')
+
+        for orders, length in self._segments:
+            if index < length:
+                return self.__getOrderState__(orders[index])
+            index -= length
+
+        raise IndexError('OrderLogView index out of range')
+
+    def __iter__(self) -> Iterator[Order]:
+        '''
+        Returns an iterator over the visible orders.
+
+        :return: An iterator of orders as they stood when the view was taken.
+        '''
+
+        for orders, length in self._segments:
+            for index in range(length):
+                yield self.__getOrderState__(orders[index])
+
+    def __reduce__(self) -> tuple:
+        # Views are pickled as plain lists holding the orders as they stood when the view was taken
+        return (list, (list(self),))
+
+    def __getOrderState__(self, order: Order) -> Order:
+        '''
+        Returns an order as it stood when the view was taken.
+
+        :param order: The order from the underlying log.
+        :return: The order itself if it has not changed since, otherwise a copy in its earlier open state.
+        '''
+
+        fillStatus: Union[None, FillStatus] = self._openOrderStatuses.get(id(order))
+        if fillStatus == None or order.fillStatus == fillStatus:
+            return order
+
+        copiedOrder: Union[None, Order] = self._copiedOrders.get(id(order))
+        if copiedOrder == None:
+            copiedOrder = copy.copy(order)
+            copiedOrder.fillStatus = fillStatus
+            copiedOrder._unitsActuallyTraded = 0.0
+            copiedOrder._portfolioCashImpact = 0.0
+            copiedOrder._fillPrice = 0.0
+            copiedOrder._commission = 0.0
+            copiedOrder._closedEndTime = None
+            self._copiedOrders[id(order)] = copiedOrder
+
+        return copiedOrder
+
+    def snapshot(self, *orderLogs: Sequence[Order]) -> 'OrderLogView':
+        '''
+        Creates a view of other order logs taken at the same moment as this view.
+
+        :param orderLogs: Append-only order logs, or sequences copied for the view, shown one after the other.
+        :return: A view of the logs as they stand now, sharing this view's open order states.
+        '''
+
+        return OrderLogView([(orders, len(orders)) for orders in orderLogs], self._openOrderStatuses)
\ No newline at end of file
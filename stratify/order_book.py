@@ -0,0 +1,234 @@
+from .order import Order, ConditionalOrder, TrailingStopOrder, FillStatus
+from datetime import datetime
+from .data import TickerData
+from typing import Union
+import heapq
+
+class OrderBook():
+    '''
+    The resting conditional orders of a single ticker, kept in heaps sorted by trigger price.
+
+    Orders that trigger on a falling price are kept in a max-heap and orders that trigger on a rising price in a
+    min-heap, so matching a bar only pops the orders whose trigger prices lie within the bar's low and high. Trailing
+    stops are also kept in heaps sorted by their watermark, so only the ones the bar moves are updated.
+
+    Orders are never searched for in the heaps: when an order is cancelled or its trigger price changes, its version
+    is bumped and the entries holding an older version are skipped once they reach the top of a heap.
+    '''
+
+    def __init__(self, ticker: str, restingOrders: dict[int, Order]):
+        '''
+        Initializes an empty order book.
+
+        :param ticker: The stock ticker symbol.
+        :param restingOrders: Every order resting in any book, keyed by order id, shared with the broker.
+        '''
+
+        self.ticker: str = ticker
+
+        self._restingOrders: dict[int, Order] = restingOrders
+        self._numOrders: int = 0
+
+        # Heap entries are (sort key, version, order), versions increase so orders of equal keys are first in first out
+        self._fallingTriggers: list[tuple[float, int, ConditionalOrder]] = []
+        self._risingTriggers: list[tuple[float, int, ConditionalOrder]] = []
+        self._fallingWatermarks: list[tuple[float, int, ConditionalOrder]] = []
+        self._risingWatermarks: list[tuple[float, int, ConditionalOrder]] = []
+
+        self._versions: dict[int, int] = {}
+        self._sequence: int = 0
+
+        self._dateTime: Union[None, datetime] = None
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of orders resting in the book.
+
+        :return: The number of resting orders.
+        '''
+
+        return self._numOrders
+
+    def add(self, order: ConditionalOrder, tickerData: TickerData) -> Union[None, float]:
+        '''
+        Places an order in the book on the given bar.
+
+        An order that is already marketable at the bar's close is not rested, and is filled at the close instead.
+        Otherwise it is only matched against the bars after this one.
+
+        :param order: The order to place.
+        :param tickerData: The bar the order is placed on.
+        :return: The price to fill the order at right away, or None if the order rests in the book.
+        '''
+
+        self._dateTime = tickerData.dateTime if self._dateTime == None else max(self._dateTime, tickerData.dateTime)
+        self._restingOrders[id(order)] = order
+
+        order.__activate__(tickerData.close)
+        if self.__isCrossedBy__(order, tickerData.close):
+            fillPrice: Union[None, float] = order.__trigger__(tickerData.close)
+            if fillPrice != None:
+                return fillPrice
+
+        order._orderBook = self
+        self._numOrders += 1
+        self.__push__(order)
+        return None
+
+    def remove(self, order: ConditionalOrder) -> None:
+        '''
+        Takes an order out of the book, its heap entries are skipped from now on.
+
+        :param order: The resting order.
+        :return: None
+        '''
+
+        self._restingOrders.pop(id(order), None)
+        self.__detach__(order)
+
+    def match(self, tickerData: TickerData) -> list[tuple[ConditionalOrder, float]]:
+        '''
+        Finds the resting orders triggered by a bar, and updates the trailing stops with it.
+
+        Within a bar the price is assumed to move from the open to the low and then the high if the bar closed up, and
+        to the high and then the low otherwise, so the orders are triggered in the order the price reaches them. An
+        order is filled at its trigger price, or at the open if the bar gapped through it. Stop limit orders stopped
+        out by the bar without filling are only matched as limit orders from the next bar on. Bars that are not
+        later than the last bar the book has seen are ignored.
+
+        :param tickerData: The latest bar of the ticker.
+        :return: The triggered orders, each paired with the price to fill it at, which are no longer in the book.
+        '''
+
+        if self._numOrders == 0 or (self._dateTime != None and tickerData.dateTime <= self._dateTime):
+            return []
+        self._dateTime = tickerData.dateTime
+
+        triggeredOrders: list[tuple[ConditionalOrder, float]] = []
+        restedOrders: list[ConditionalOrder] = []
+
+        isFallingFirst: bool = tickerData.close >= tickerData.open
+        for isRising in ((False, True) if isFallingFirst else (True, False)):
+            triggers: list[tuple[float, int, ConditionalOrder]] = self._risingTriggers if isRising else self._fallingTriggers
+            while triggers:
+                key, version, order = triggers[0]
+                triggerPrice: float = key if isRising else -key
+                if self.__isValid__(order, version):
+                    if (isRising and triggerPrice > tickerData.high) or (not isRising and triggerPrice < tickerData.low):
+                        break
+                    price: float = max(tickerData.open, triggerPrice) if isRising else min(tickerData.open, triggerPrice)
+
+                    self.__detach__(order)
+                    fillPrice: Union[None, float] = order.__trigger__(price)
+                    if fillPrice != None:
+                        triggeredOrders.append((order, fillPrice))
+                    else:
+                        restedOrders.append(order)
+                heapq.heappop(triggers)
+
+        for order in restedOrders:
+            order._orderBook = self
+            self._numOrders += 1
+            self.__push__(order)
+
+        self.__updateWatermarks__(tickerData)
+        return triggeredOrders
+
+    def __updateWatermarks__(self, tickerData: TickerData) -> None:
+        '''
+        Moves the trailing stops whose watermark was passed by a bar.
+
+        :param tickerData: The latest bar of the ticker.
+        :return: None
+        '''
+
+        movedOrders: list[ConditionalOrder] = []
+        for watermarks, isRising in ((self._fallingWatermarks, False), (self._risingWatermarks, True)):
+            while watermarks:
+                key, version, order = watermarks[0]
+                if self.__isValid__(order, version):
+                    watermark: float = key if not isRising else -key
+                    if (not isRising and watermark >= tickerData.high) or (isRising and watermark <= tickerData.low):
+                        break
+                    order.__updateWatermark__(tickerData)
+                    movedOrders.append(order)
+                heapq.heappop(watermarks)
+
+        for order in movedOrders:
+            self.__push__(order)
+
+    def __push__(self, order: ConditionalOrder) -> None:
+        '''
+        Pushes an order's current trigger price, and watermark for trailing stops, onto the heaps under a new version.
+
+        :param order: The resting order.
+        :return: None
+        '''
+
+        # Versions are drawn from the sequence, so an order that re-enters the book never matches its old entries
+        self._sequence += 1
+        version: int = self._sequence
+        self._versions[id(order)] = version
+
+        if order.isTriggeredByRise: heapq.heappush(self._risingTriggers, (order.triggerPrice, version, order))
+        else: heapq.heappush(self._fallingTriggers, (-order.triggerPrice, version, order))
+
+        # Sell trailing stops are moved by highs above their watermark, buy trailing stops by lows below it
+        if isinstance(order, TrailingStopOrder):
+            if order.isTriggeredByRise: heapq.heappush(self._risingWatermarks, (-order.watermark, version, order))
+            else: heapq.heappush(self._fallingWatermarks, (order.watermark, version, order))
+
+        self.__compact__()
+
+    def __detach__(self, order: ConditionalOrder) -> None:
+        '''
+        Invalidates the heap entries of an order that leaves the book.
+
+        :param order: The order leaving the book.
+        :return: None
+        '''
+
+        if order._orderBook is not self:
+            return
+
+        order._orderBook = None
+        self._numOrders -= 1
+        self._versions.pop(id(order), None)
+
+    def __isValid__(self, order: ConditionalOrder, version: int) -> bool:
+        '''
+        Checks whether a heap entry still describes a resting order.
+
+        :param order: The order of the entry.
+        :param version: The version of the entry.
+        :return: Whether the entry is current.
+        '''
+
+        return order._orderBook is self and order.fillStatus == FillStatus.PENDING and self._versions.get(id(order)) == version
+
+    def __compact__(self) -> None:
+        '''
+        Rebuilds the heaps without their outdated entries once those outnumber the current ones.
+
+        :return: None
+        '''
+
+        heaps: tuple[list, ...] = (self._fallingTriggers, self._risingTriggers, self._fallingWatermarks, self._risingWatermarks)
+        if sum(len(heap) for heap in heaps) <= 4 * self._numOrders + 64:
+            return
+
+        for heap in heaps:
+            heap[:] = [entry for entry in heap if self.__isValid__(entry[2], entry[1])]
+            heapq.heapify(heap)
+
+    @staticmethod
+    def __isCrossedBy__(order: ConditionalOrder, price: float) -> bool:
+        '''
+        Checks whether a price reaches an order's trigger price.
+
+        :param order: The conditional order.
+        :param price: The price.
+        :return: Whether the order triggers at the price.
+        '''
+
+        return price >= order.triggerPrice if order.isTriggeredByRise else price <= order.triggerPrice
@@ -0,0 +1,10 @@
+from .source import DataSource
+
+# Remote Sources
+from .yfinance_source import YFinanceSource
+
+# File Sources
+from .file_source import FileSource
+from .csv_source import CSVSource
+from .parquet_source import ParquetSource
+from .arrow_source import ArrowSource
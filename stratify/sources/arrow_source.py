@@ -0,0 +1,24 @@
+from .parquet_source import __importPyArrow__
+from .file_source import FileSource
+from typing import Iterator, Any
+import pandas
+
+class ArrowSource(FileSource):
+    '''
+    Reads bars from Arrow IPC (Feather v2) files, memory mapping them so record batches are read without copying.
+    Requires pyarrow.
+    '''
+
+    def __readColumnNames__(self, path: str) -> list[str]:
+        pyarrow: Any = __importPyArrow__()
+        with pyarrow.memory_map(path) as arrowFile:
+            return list(pyarrow.ipc.open_file(arrowFile).schema.names)
+
+    def __readChunks__(self, path: str, columnNames: list[str]) -> Iterator[pandas.DataFrame]:
+        pyarrow: Any = __importPyArrow__()
+        with pyarrow.memory_map(path) as arrowFile:
+            reader: Any = pyarrow.ipc.open_file(arrowFile)
+            for batchIndex in range(reader.num_record_batches):
+                recordBatch: Any = reader.get_batch(batchIndex).select(columnNames)
+                for offset in range(0, recordBatch.num_rows, self.chunkSize):
+                    yield recordBatch.slice(offset, self.chunkSize).to_pandas()
@@ -0,0 +1,16 @@
+from .file_source import FileSource
+from typing import Iterator
+import pandas
+
+class CSVSource(FileSource):
+    '''
+    Reads bars from CSV files with a header row.
+    '''
+
+    def __readColumnNames__(self, path: str) -> list[str]:
+        return list(pandas.read_csv(path, nrows=0).columns)
+
+    def __readChunks__(self, path: str, columnNames: list[str]) -> Iterator[pandas.DataFrame]:
+        with pandas.read_csv(path, usecols=columnNames, chunksize=self.chunkSize) as reader:
+            for chunk in reader:
+                yield chunk
@@ -0,0 +1,294 @@
+from typing import Iterator, Union
+from datetime import datetime, tzinfo
+from abc import abstractmethod
+from .source import DataSource
+from ..data import TickerFeed, StreamingTickerFeed
+from ..data import __toVolumes__
+import numpy as np
+import itertools
+import pandas
+import glob
+import re
+import os
+
+class FileSource(DataSource):
+    '''
+    Base class for sources reading bars from local files, one chunk of rows at a time.
+
+    The path is either a single file holding every ticker, with a ticker column telling them apart, or a pattern
+    containing `{ticker}` (e.g. 'bars/{ticker}.csv' or 'bars/ticker={ticker}/bars.parquet') partitioning the bars
+    into a file per ticker.
+
+    Columns are found by name, case-insensitively: 'datetime', 'date', 'timestamp' or 'time' for the bar's date,
+    'ticker' or 'symbol' for its ticker, and 'open', 'close', 'low', 'high' and 'volume' for its prices and volume.
+    Files naming them otherwise map each field to their column name with `columns`.
+
+    Naive dates are read in the source's time zone, and every date is stored in UTC in the resulting feeds. Missing
+    volumes are read as 0.
+
+    Subclass this to read another file format, implementing `__readColumnNames__` and `__readChunks__`.
+    '''
+
+    BATCH_SIZE: int = 1000
+    DEFAULT_CHUNK_SIZE: int = 1_000_000
+    FIELDS: tuple[str, ...] = ('dateTime', 'ticker', 'open', 'close', 'low', 'high', 'volume')
+    FIELD_ALIASES: dict[str, tuple[str, ...]] = {'dateTime': ('datetime', 'date', 'timestamp', 'time'), 'ticker': ('ticker', 'symbol')}
+
+    def __init__(self, path: str,
+                 columns: Union[None, dict[str, str]] = None,
+                 timeZone: Union[None, str, tzinfo] = None,
+                 chunkSize: int = DEFAULT_CHUNK_SIZE):
+        '''
+        Initializes the file source.
+
+        :param path: The file to read, or a pattern containing `{ticker}` naming the file of each ticker.
+        :param columns: Optional mapping of fields ('dateTime', 'ticker', 'open', 'close', 'low', 'high', 'volume') to the file's column names.
+        :param timeZone: The time zone of naive dates in the files, None to leave them naive.
+        :param chunkSize: The number of rows read at once.
+        '''
+
+        self.path: str = path
+        self.columns: dict[str, str] = dict(columns) if columns != None else {}
+        self.timeZone: Union[None, str, tzinfo] = timeZone
+        self.chunkSize: int = chunkSize
+
+        unknownFields: list[str] = [field for field in self.columns if field not in FileSource.FIELDS]
+        if len(unknownFields) != 0:
+            raise ValueError(f'Unknown field(s) {", ".join(unknownFields)}, expected {", ".join(FileSource.FIELDS)}.')
+
+    @property
+    def isPartitioned(self) -> bool:
+        '''
+        Whether the bars are partitioned into a file per ticker.
+
+        :return: True if the path is a pattern containing `{ticker}`.
+        '''
+
+        return '{ticker}' in self.path
+
+    @abstractmethod
+    def __readColumnNames__(self, path: str) -> list[str]:
+        '''
+        Reads the names of a file's columns.
+
+        :param path: The file.
+        :return: The column names.
+        '''
+
+        pass
+
+    @abstractmethod
+    def __readChunks__(self, path: str, columnNames: list[str]) -> Iterator[pandas.DataFrame]:
+        '''
+        Reads a file one chunk of at most `chunkSize` rows at a time.
+
+        :param path: The file.
+        :param columnNames: The names of the columns to read.
+        :return: An iterator of DataFrames holding the columns of each chunk.
+        '''
+
+        pass
+
+    def getTickers(self) -> list[str]:
+        '''
+        Lists the tickers the files hold.
+
+        :return: The stock ticker symbols, in the order they are first found.
+        '''
+
+        if self.isPartitioned:
+            return list(self.__findPartitions__())
+
+        fieldColumns: dict[str, str] = self.__getFieldColumns__(self.path)
+        tickers: dict[str, None] = {}
+        for chunk in self.__readChunks__(self.path, [fieldColumns['ticker']]):
+            tickers.update(dict.fromkeys(pandas.unique(chunk[fieldColumns['ticker']].astype(str))))
+        return list(tickers)
+
+    def read(self, tickers: Union[None, list[str]] = None, start: Union[None, datetime] = None, end: Union[None, datetime] = None) -> dict[str, TickerFeed]:
+        '''
+        Reads the bars of tickers, ready to be added to an engine with `addTickerFeed`.
+
+        :param tickers: The stock ticker symbols to read, None to read every ticker.
+        :param start: The earliest datetime to include, or None to start from the first bar.
+        :param end: The datetime to stop before, or None to include every bar up to the last one.
+        :return: A TickerFeed for each ticker found, in time order.
+        '''
+
+        tickerColumns: dict[str, list[dict[str, np.ndarray]]] = {}
+        timeZones: dict[str, Union[None, tzinfo]] = {}
+
+        if self.isPartitioned:
+            partitions: dict[str, str] = self.__findPartitions__()
+            tickerChunks: Iterator[tuple[str, dict[str, np.ndarray], Union[None, tzinfo]]] = itertools.chain.from_iterable(
+                self.__readTickerChunks__(partitions[ticker], ticker, None, start, end) for ticker in (tickers if tickers != None else list(partitions)) if ticker in partitions)
+        else:
+            tickerChunks: Iterator[tuple[str, dict[str, np.ndarray], Union[None, tzinfo]]] = self.__readTickerChunks__(self.path, None, set(tickers) if tickers != None else None, start, end)
+
+        for ticker, columns, timeZone in tickerChunks:
+            tickerColumns.setdefault(ticker, []).append(columns)
+            timeZones[ticker] = timeZone
+
+        tickerFeeds: dict[str, TickerFeed] = {}
+        for ticker in (tickers if tickers != None else list(tickerColumns)):
+            chunks: list[dict[str, np.ndarray]] = tickerColumns.get(ticker, [])
+            if len(chunks) == 0:
+                tickerFeeds[ticker] = TickerFeed.fromArrays(ticker, *[np.empty(0, dtype=dtype) for dtype in ('datetime64[us]', np.float64, np.float64, np.float64, np.float64, np.int64)])
+                continue
+
+            tickerFeeds[ticker] = TickerFeed.fromArrays(ticker, *[np.concatenate([chunk[field] for chunk in chunks]) for field in FileSource.FIELDS if field != 'ticker'], timeZones.get(ticker)).sortedByDate()
+        return tickerFeeds
+
+    def stream(self, ticker: str, start: Union[None, datetime] = None, end: Union[None, datetime] = None) -> StreamingTickerFeed:
+        '''
+        Streams the bars of a ticker from disk one chunk at a time, for backtests of more data than fits in memory.
+        The bars of the ticker must be stored in time order.
+
+        :param ticker: The stock ticker symbol.
+        :param start: The earliest datetime to include, or None to start from the first bar.
+        :param end: The datetime to stop before, or None to include every bar up to the last one.
+        :return: A StreamingTickerFeed reading the ticker's bars every time it is iterated.
+        '''
+
+        def readChunks() -> Iterator[TickerFeed]:
+            if self.isPartitioned:
+                partitions: dict[str, str] = self.__findPartitions__()
+                tickerChunks: Iterator[tuple[str, dict[str, np.ndarray], Union[None, tzinfo]]] = self.__readTickerChunks__(partitions[ticker], ticker, None, start, end) if ticker in partitions else iter([])
+            else:
+                tickerChunks: Iterator[tuple[str, dict[str, np.ndarray], Union[None, tzinfo]]] = self.__readTickerChunks__(self.path, None, {ticker}, start, end)
+
+            for _, columns, timeZone in tickerChunks:
+                yield TickerFeed.fromArrays(ticker, *[columns[field] for field in FileSource.FIELDS if field != 'ticker'], timeZone)
+
+        return StreamingTickerFeed([ticker], readChunks)
+
+    def download(self, tickers: list[str], start: datetime, end: datetime, autoAdjust: bool = True) -> dict[str, TickerFeed]:
+        '''
+        Reads the bars of a batch of tickers, as stored in the files whatever `autoAdjust` asks for.
+        '''
+
+        return self.read(tickers, start, end)
+
+    def __findPartitions__(self) -> dict[str, str]:
+        '''
+        Finds the file of every ticker of a partitioned source.
+
+        :return: The file of each ticker.
+        '''
+
+        prefix, suffix = self.path.split('{ticker}', 1)
+        pattern: re.Pattern = re.compile(re.escape(prefix) + '(.+?)' + re.escape(suffix).replace(re.escape('{ticker}'), r'\1') + '$')
+
+        partitions: dict[str, str] = {}
+        for path in sorted(glob.glob(glob.escape(prefix) + '*' + glob.escape(suffix).replace(glob.escape('{ticker}'), '*'))):
+            match: Union[None, re.Match] = pattern.match(path)
+            if match != None and os.path.isfile(path):
+                partitions[match.group(1)] = path
+        return partitions
+
+    def __getFieldColumns__(self, path: str) -> dict[str, str]:
+        '''
+        Finds the column of a file holding each field.
+
+        :param path: The file.
+        :return: The column name of each field the file holds.
+        '''
+
+        columnNames: list[str] = self.__readColumnNames__(path)
+        lowerColumnNames: dict[str, str] = {str(columnName).lower(): columnName for columnName in columnNames}
+
+        fieldColumns: dict[str, str] = {}
+        for field in FileSource.FIELDS:
+            if field in self.columns:
+                if self.columns[field] not in columnNames:
+                    raise ValueError(f'Column \'{self.columns[field]}\' mapped to {field} not found in {path}.')
+                fieldColumns[field] = self.columns[field]
+                continue
+
+            for alias in FileSource.FIELD_ALIASES.get(field, (field,)):
+                if alias in lowerColumnNames:
+                    fieldColumns[field] = lowerColumnNames[alias]
+                    break
+
+        missingFields: list[str] = [field for field in FileSource.FIELDS if field not in fieldColumns and (field != 'ticker' or not self.isPartitioned)]
+        if len(missingFields) != 0:
+            raise ValueError(f'No column found for {", ".join(missingFields)} in {path}, map them with `columns`.')
+        return fieldColumns
+
+    def __readTickerChunks__(self, path: str,
+                             ticker: Union[None, str],
+                             tickers: Union[None, set[str]],
+                             start: Union[None, datetime],
+                             end: Union[None, datetime]) -> Iterator[tuple[str, dict[str, np.ndarray], Union[None, tzinfo]]]:
+        '''
+        Reads the bars of a file in chunks, splitting each chunk by ticker.
+
+        :param path: The file.
+        :param ticker: The ticker of every bar of a partitioned file, None to read the ticker column.
+        :param tickers: The tickers to keep, None to keep every ticker.
+        :param start: The earliest datetime to include, or None to start from the first bar.
+        :param end: The datetime to stop before, or None to include every bar up to the last one.
+        :return: An iterator of the ticker, the columns of its bars in file order and the time zone of their dates, for each ticker of each chunk.
+        '''
+
+        fieldColumns: dict[str, str] = self.__getFieldColumns__(path)
+        if ticker != None:
+            fieldColumns.pop('ticker', None)
+
+        for chunk in self.__readChunks__(path, list(fieldColumns.values())):
+            dateTimes, timeZone = self.__normalizeDateTimes__(chunk[fieldColumns['dateTime']])
+
+            isKept: np.ndarray = np.ones(len(chunk), dtype=bool)
+            if start != None: isKept &= dateTimes >= TickerFeed.__toDateTime64__(start)
+            if end != None: isKept &= dateTimes < TickerFeed.__toDateTime64__(end)
+
+            chunkTickers: Union[None, np.ndarray] = None
+            if ticker == None:
+                chunkTickers = chunk[fieldColumns['ticker']].to_numpy().astype(str)
+                if tickers != None: isKept &= np.isin(chunkTickers, list(tickers))
+
+            columns: dict[str, np.ndarray] = {'dateTime': dateTimes[isKept]}
+            for field in ('open', 'close', 'low', 'high'):
+                columns[field] = chunk[fieldColumns[field]].to_numpy(dtype=np.float64, na_value=np.nan)[isKept]
+            columns['volume'] = __toVolumes__(chunk[fieldColumns['volume']].to_numpy(dtype=np.float64, na_value=np.nan))[isKept]
+
+            if ticker != None:
+                yield ticker, columns, timeZone
+                continue
+
+            # Split the chunk by ticker, keeping each ticker's rows in file order
+            chunkTickers = chunkTickers[isKept]
+            uniqueTickers, tickerIds = np.unique(chunkTickers, return_inverse=True)
+            order: np.ndarray = np.argsort(tickerIds, kind='stable')
+            boundaries: np.ndarray = np.searchsorted(tickerIds[order], np.arange(len(uniqueTickers) + 1))
+            for tickerId, chunkTicker in enumerate(uniqueTickers.tolist()):
+                rows: np.ndarray = order[boundaries[tickerId]:boundaries[tickerId + 1]]
+                yield chunkTicker, {field: values[rows] for field, values in columns.items()}, timeZone
+
+    def __normalizeDateTimes__(self, dateTimes: pandas.Series) -> tuple[np.ndarray, Union[None, tzinfo]]:
+        '''
+        Converts a column of dates into naive UTC datetime64 values.
+
+        :param dateTimes: The column of dates.
+        :return: The naive UTC dates, and the time zone they were in, None if they were naive and the source has no time zone.
+        '''
+
+        dateTimeIndex: pandas.DatetimeIndex = pandas.DatetimeIndex(pandas.to_datetime(dateTimes, utc=dateTimes.dtype == object and self.timeZone == None and self.__hasOffsets__(dateTimes)))
+        if dateTimeIndex.tz == None and self.timeZone != None:
+            dateTimeIndex = dateTimeIndex.tz_localize(self.timeZone, ambiguous='infer', nonexistent='shift_forward')
+
+        timeZone: Union[None, tzinfo] = dateTimeIndex.tz
+        if timeZone != None:
+            dateTimeIndex = dateTimeIndex.tz_convert('UTC').tz_localize(None)
+        return dateTimeIndex.to_numpy(dtype='datetime64[us]'), timeZone
+
+    @staticmethod
+    def __hasOffsets__(dateTimes: pandas.Series) -> bool:
+        '''
+        Checks whether textual dates carry UTC offsets, which may differ between rows (e.g. across daylight saving).
+
+        :param dateTimes: The column of dates.
+        :return: True if the first date ends with a UTC offset.
+        '''
+
+        return len(dateTimes) != 0 and re.search(r'(Z|[+-]\d{2}:?\d{2})$', str(dateTimes.iloc[0])) != None
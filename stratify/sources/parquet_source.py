@@ -0,0 +1,33 @@
+from .file_source import FileSource
+from typing import Iterator, Any
+import pandas
+
+def __importPyArrow__() -> Any:
+    '''
+    Imports pyarrow, which Parquet and Arrow sources need but the rest of the library does not.
+
+    :return: The pyarrow module.
+    '''
+
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError as error:
+        raise ImportError('Reading Parquet and Arrow files requires pyarrow, install it with `pip install pyarrow`.') from error
+    return pyarrow
+
+class ParquetSource(FileSource):
+    '''
+    Reads bars from Parquet files, one record batch at a time from a memory mapped file. Requires pyarrow.
+    '''
+
+    def __readColumnNames__(self, path: str) -> list[str]:
+        pyarrow: Any = __importPyArrow__()
+        return list(pyarrow.parquet.read_schema(path, memory_map=True).names)
+
+    def __readChunks__(self, path: str, columnNames: list[str]) -> Iterator[pandas.DataFrame]:
+        pyarrow: Any = __importPyArrow__()
+        parquetFile: Any = pyarrow.parquet.ParquetFile(path, memory_map=True)
+        for recordBatch in parquetFile.iter_batches(batch_size=self.chunkSize, columns=columnNames):
+            yield recordBatch.to_pandas()
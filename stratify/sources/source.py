@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from ..data import TickerFeed
+from datetime import datetime
+
+class DataSource(ABC):
+    '''
+    Base class for sources of historical market data, used by `downloadMany` and `downloadData`.
+
+    Subclass this to load data from another provider or from local files. A source downloads a batch of up to
+    `BATCH_SIZE` tickers per call, and leaves the tickers it failed to download out of its result so they can be
+    retried.
+    '''
+
+    BATCH_SIZE: int = 1
+
+    @abstractmethod
+    def download(self, tickers: list[str], start: datetime, end: datetime, autoAdjust: bool = True) -> dict[str, TickerFeed]:
+        '''
+        Downloads the bars of a batch of tickers.
+
+        :param tickers: The stock ticker symbols, at most `BATCH_SIZE` of them.
+        :param start: The start date of the range (inclusive).
+        :param end: The end date of the range (exclusive).
+        :param autoAdjust: Whether to adjust prices for splits and dividends.
+        :return: A TickerFeed for every ticker that was downloaded, empty if the ticker has no bars in the range.
+        '''
+
+        pass
@@ -0,0 +1,26 @@
+from ..data import TickerFeed
+from datetime import datetime
+from .source import DataSource
+import yfinance
+import pandas
+
+class YFinanceSource(DataSource):
+    '''
+    Downloads daily bars from Yahoo Finance with yfinance, fetching every ticker of a batch in a single request.
+    '''
+
+    BATCH_SIZE: int = 100
+
+    def download(self, tickers: list[str], start: datetime, end: datetime, autoAdjust: bool = True) -> dict[str, TickerFeed]:
+        yfinanceData: pandas.DataFrame = yfinance.download(tickers, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), progress=False, auto_adjust=autoAdjust, group_by='column', multi_level_index=True)
+
+        tickerFeeds: dict[str, TickerFeed] = {}
+        for ticker in tickers:
+            # Tickers that failed to download are missing from the frame, or have no closing prices in it
+            if yfinanceData is None or ticker not in yfinanceData.columns.get_level_values(-1):
+                continue
+
+            tickerFeed: TickerFeed = TickerFeed.fromDataFrame(yfinanceData, ticker)
+            if len(tickerFeed) != 0:
+                tickerFeeds[ticker] = tickerFeed
+        return tickerFeeds
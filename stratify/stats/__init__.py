@@ -1,3 +1,4 @@
 from .statistics_manager import StatisticsManager
 from .statistic_tracker import StatisticTracker
+from .equity_curve import EquityCurve
 from .statistic_ids import StatID
\ No newline at end of file
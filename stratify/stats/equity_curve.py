@@ -0,0 +1,64 @@
+from ..data import __ColumnStore__
+from datetime import datetime
+import numpy as np
+
+class EquityCurve(__ColumnStore__):
+    '''
+    A growable columnar record of a strategy's value over time, shared by all of the strategy's statistic trackers.
+
+    The value of the strategy is appended once per update of its statistics into contiguous NumPy arrays, which are
+    preallocated and grown geometrically, so trackers can compute their statistics over the whole curve with NumPy
+    instead of each keeping its own list of values.
+    '''
+
+    INITIAL_CAPACITY: int = 256
+    COLUMN_NAMES: tuple[str, ...] = ('_dateTimes', '_values')
+
+    def __init__(self):
+        '''
+        Initializes an empty equity curve.
+        '''
+
+        super().__init__()
+
+        self._dateTimes: np.ndarray = np.empty(0, dtype='datetime64[us]')
+        self._values: np.ndarray = np.empty(0, dtype=np.float64)
+
+    def append(self, dateTime: datetime, value: float) -> None:
+        '''
+        Records the strategy's value at the end of the curve.
+
+        :param dateTime: The date and time of the bar the value was taken on.
+        :param value: The value of the strategy, its starting cash plus its net profit or loss including positions.
+        :return: None
+        '''
+
+        if self._size == 0:
+            self._timeZone = getattr(dateTime, 'tzinfo', None)
+
+        if self._size == len(self._values):
+            self.__reserve__(self._size + 1)
+
+        self._dateTimes[self._size] = EquityCurve.__toDateTime64__(dateTime)
+        self._values[self._size] = value
+        self._size += 1
+
+    @property
+    def dateTimes(self) -> np.ndarray:
+        '''
+        Returns the date and time of every point, in UTC if the dates had a time zone.
+
+        :return: A datetime64[us] array of dates.
+        '''
+
+        return self.__getColumnView__('_dateTimes')
+
+    @property
+    def values(self) -> np.ndarray:
+        '''
+        Returns the value of the strategy at every point.
+
+        :return: A float64 array of values.
+        '''
+
+        return self.__getColumnView__('_values')
@@ -19,4 +19,14 @@ class StatID():
     MAX_DRAWDOWN: str = 'max_drawdown'
 
     # Trade Statistics
-    TRADES: str = 'trades'
\ No newline at end of file
+    TRADES: str = 'trades'
+
+    # Risk Statistics
+    SHARPE_RATIO: str = 'sharpe_ratio'
+    SORTINO_RATIO: str = 'sortino_ratio'
+    CALMAR_RATIO: str = 'calmar_ratio'
+    OMEGA_RATIO: str = 'omega_ratio'
+    TAIL_RATIO: str = 'tail_ratio'
+    VALUE_AT_RISK: str = 'value_at_risk'
+    ROLLING_SHARPE_RATIO: str = 'rolling_sharpe_ratio'
+    MONTHLY_RETURNS: str = 'monthly_returns'
\ No newline at end of file
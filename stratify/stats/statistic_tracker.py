@@ -1,7 +1,9 @@
-from typing import Union, Any
+from typing import Union, Any, Mapping, Sequence
 from datetime import datetime
 from ..data import Position
 from ..order import Order
+from ..ledger import FillLedger
+from .equity_curve import EquityCurve
 
 class StatisticTracker():
     '''
@@ -33,14 +35,23 @@ class StatisticTracker():
         self.portfolioValue: float = 0.0
         self.commissionPercent: float = 0.0
         self.slippagePercent: float = 0.0
-        self.positions: dict[str, Position] = {}
-        self.orders: list[Order] = []
-        self.openOrders: list[Order] = []
-        self.closedOrders: list[Order] = []
+        self.positions: Mapping[str, Position] = {}
+        self.orders: Sequence[Order] = []
+        self.openOrders: Sequence[Order] = []
+        self.closedOrders: Sequence[Order] = []
         self.ssNetCashProfitOrLoss: float = 0.0 
         self.ssNetValueProfitOrLoss: float = 0.0
         self.ssCurrentValue: Union[None, float] = None
-        self.strategyOrdersMade: list[Order]
+        self.strategyOrdersMade: Sequence[Order]
+
+        # Every fill of the strategy's orders, shared by the strategy's trackers and appended to as the orders fill
+        self.fills: FillLedger = FillLedger()
+
+        # The strategy's value at every update, shared by the strategy's trackers and appended to before each `update`
+        self.equityCurve: EquityCurve = EquityCurve()
+
+        # Whether to keep running statistics updated on every bar instead of reading the curve, which is then empty
+        self.isOnline: bool = False
 
     def __updateStatisticsInfo__(self, ticker: str,
                                 dateTime: datetime,
@@ -53,16 +64,19 @@ class StatisticTracker():
                                 portfolioValue: float,
                                 commissionPercent: float,
                                 slippagePercent: float,
-                                positions: dict[str, Position],
-                                orders: list[Order],
-                                openOrders: list[Order],
-                                closedOrders: list[Order],
+                                positions: Mapping[str, Position],
+                                orders: Sequence[Order],
+                                openOrders: Sequence[Order],
+                                closedOrders: Sequence[Order],
                                 ssNetCashProfitOrLoss: float,
                                 ssNetValueProfitOrLoss: float,
-                                strategyOrdersMade: list[Order]) -> None:
+                                strategyOrdersMade: Sequence[Order]) -> None:
         '''
         Internal method to update the current market and portfolio state for the statistic tracker.
 
+        Positions and orders are read-only views of the state at this timestep and are shared with the
+        broker and the other trackers, so they must not be modified.
+
         :param ticker: The current ticker symbol being processed.
         :param dateTime: The current timestamp of the data point.
         :param open: The opening price of the ticker.
@@ -77,9 +91,10 @@ class StatisticTracker():
         :param positions: The current positions held in the portfolio.
         :param orders: The list of all orders issued during this time step.
         :param openOrders: The list of currently open orders.
-        :param closedOrders: The list of closed orders.
+        :param closedOrders: The list of closed orders, rebuilt from the broker's fill ledger as they are read.
         :param ssNetCashProfitOrLoss: The net profit or loss from the trades executed by this specific strategy being tracked.
         :param ssNetValueProfitOrLoss: The net profit or loss from the value of the positions held by this specific strategy being tracked.
+        :param strategyOrdersMade: The list of open and filled orders made by this specific strategy being tracked.
 
         :return: None
         '''
@@ -111,6 +126,17 @@ class StatisticTracker():
         self.ssNetValueProfitOrLoss = ssNetValueProfitOrLoss
         self.strategyOrdersMade = strategyOrdersMade
 
+    def __getstate__(self) -> dict[str, Any]:
+        '''
+        Returns the state used to pickle the tracker, e.g. to send it back from a worker process.
+
+        :return: The pickled state of the tracker.
+        '''
+
+        state: dict[str, Any] = dict(self.__dict__)
+        state['positions'] = dict(self.positions)
+        return state
+
     def start(self) -> None:
         '''
         Called once at the beginning of the backtest to initialize state.
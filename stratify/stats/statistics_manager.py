@@ -1,12 +1,11 @@
-from ..order import Order, BuyOrder, SellOrder, CloseOrder
+from ..order import Order, OrderSide, FillStatus, OrderLogView
+from typing import Union, Any, Mapping
 from .statistic_tracker import StatisticTracker
-from ..order import FillStatus
 from datetime import datetime
 from ..data import TickerData
-from ..data import TickerFeed
-from typing import Union, Any
 from ..data import Position
-import copy
+from ..ledger import FillLedger
+from .equity_curve import EquityCurve
 
 class StatisticsManager():
     '''
@@ -24,21 +23,51 @@ class StatisticsManager():
         '''
 
         self.hasStarted: bool = False
-        self.strategyOrdersMade: list[Order] = []
+
+        # The strategy's orders until they close, closed orders are only kept in the fill ledger
+        self._openOrders: dict[int, Order] = {}
 
         self._dateTime: Union[None, datetime] = None
-        self._tickerFeeds: Union[None, list[TickerFeed]] = None
+        self._currentBars: dict[str, TickerData] = {}
         self._statisticTrackers: list[StatisticTracker] = []
 
-    def setTickerFeeds(self, tickerFeeds: list[TickerFeed]) -> None:
+        # Running ledger of the strategy's fills, orders are handed over once by the broker when it fills them
+        self.fills: FillLedger = FillLedger()
+        self._newFills: list[Order] = []
+        self._netCashProfitOrLoss: float = 0.0
+        self._positionUnits: dict[str, int] = {}
+
+        # Value of the strategy at every update, shared by the strategy's trackers, left empty in online mode
+        self.equityCurve: EquityCurve = EquityCurve()
+        self.isOnline: bool = False
+        self._startingCash: Union[None, float] = None
+        self._currentValue: Union[None, float] = None
+
+    def setCurrentBars(self, currentBars: dict[str, TickerData]) -> None:
+        '''
+        Sets the mapping of the latest bar per ticker, kept up to date by the broker, used to value positions.
+
+        :param currentBars: Dictionary of the latest TickerData keyed by ticker.
+        :return: None
+        '''
+
+        self._currentBars = currentBars
+
+    def setOnline(self, isOnline: bool) -> None:
         '''
-        Sets the list of TickerFeed instances for the manager.
+        Sets whether statistics are computed online, each tracker keeping only a constant amount of running state
+        updated on every bar instead of computing its statistics over the equity curve at the end.
 
-        :param tickerFeeds: List of TickerFeed instances to set.
+        Online statistics use constant memory however long the run, and match the ones computed over the equity curve
+        to within floating point error. The equity curve is not recorded in online mode.
+
+        :param isOnline: Whether to compute statistics online.
         :return: None
         '''
 
-        self._tickerFeeds = tickerFeeds
+        self.isOnline = isOnline
+        for statisticTracker in self._statisticTrackers:
+            statisticTracker.isOnline = isOnline
 
     def addStatisticTracker(self, statisticTrackerClass: type[StatisticTracker]) -> None:
         '''
@@ -48,7 +77,11 @@ class StatisticsManager():
         :return: None
         '''
 
-        self._statisticTrackers.append(statisticTrackerClass())
+        statisticTracker: StatisticTracker = statisticTrackerClass()
+        statisticTracker.fills = self.fills
+        statisticTracker.equityCurve = self.equityCurve
+        statisticTracker.isOnline = self.isOnline
+        self._statisticTrackers.append(statisticTracker)
 
     def getStatistic(self, statisticID: str) -> Any:
         '''
@@ -78,75 +111,123 @@ class StatisticsManager():
 
         This method is intended to be called once per data point or time step to allow
         each statistic tracker to update internal state or metrics that do not require
-        the full market/portfolio context provided by `updateStatisticsInfo`.
+        the full market/portfolio context provided by `updateStatisticsInfo`. Unless statistics are computed online, the
+        strategy's current value is appended to the equity curve first, so trackers see it on the curve.
 
         :return: None
         '''
-        
+
+        if self._currentValue != None and not self.isOnline:
+            self.equityCurve.append(self._dateTime, self._currentValue)
+
         for statisticTracker in self._statisticTrackers:
             statisticTracker.update()
 
-    def __getTickerInfo__(self, ticker: str) -> TickerData:
+    def __getTickerInfo__(self, ticker: str) -> Union[None, TickerData]:
         '''
-        Retrieves TickerData for the given ticker at the current broker datetime.
+        Retrieves the latest TickerData for the given ticker.
 
         :param ticker: The stock ticker symbol.
-        :return: The matching TickerData object.
+        :return: The matching TickerData object, or None if no bar has been seen for the ticker yet.
+        '''
+
+        return self._currentBars.get(ticker)
+
+    @property
+    def strategyOrdersMade(self) -> OrderLogView:
+        '''
+        Returns a read-only view of the orders made by the strategy: the orders not yet recorded as closed, then the
+        filled orders rebuilt from the fill ledger. Rejected and cancelled orders are not kept.
+
+        :return: A view of the strategy's orders.
+        '''
+
+        openOrders: tuple[Order, ...] = tuple(self._openOrders.values())
+        return OrderLogView([(openOrders, len(openOrders)), (self.fills, len(self.fills))], {})
+
+    def __addOrder__(self, order: Order) -> None:
+        '''
+        Records an order made by the strategy, and hooks it up so it is handed back once it closes.
+
+        :param order: The order made by the strategy.
+        :return: None
+        '''
+
+        order._onClose = self.__onClose__
+        self._openOrders[id(order)] = order
+
+    def __onClose__(self, order: Order) -> None:
         '''
+        Called when one of the strategy's orders fills, is rejected or is cancelled.
 
-        tickerInfo: Union[None, TickerData] = None
-        for tickerFeed in self._tickerFeeds:
-            for tickerData in tickerFeed:
-                if tickerData.dateTime == self._dateTime and tickerData.ticker == ticker:
-                    tickerInfo = tickerData
-                    break
-            if tickerInfo != None:
-                break               
+        A filled order is recorded on the next update, so trackers see it from the bar after the one it filled on, as
+        with the strategy's cash and positions. Other orders are let go of right away.
 
-        return tickerInfo
+        :param order: The closed order.
+        :return: None
+        '''
+
+        if order.fillStatus in (FillStatus.FILLED, FillStatus.PARTIALLY_FILLED):
+            self._newFills.append(order)
+        else:
+            self._openOrders.pop(id(order), None)
+
+    def __recordFill__(self, order: Order) -> None:
+        '''
+        Records a filled strategy order into the fill ledger and the running cash impact and units held per ticker.
+
+        :param order: The filled order.
+        :return: None
+        '''
+
+        self.fills.appendOrder(order)
+        self._netCashProfitOrLoss += order._portfolioCashImpact
+
+        unitsDelta: int = 0
+        if order.side == OrderSide.BUY: unitsDelta = order._unitsActuallyTraded
+        elif order.side == OrderSide.SELL: unitsDelta = -order._unitsActuallyTraded
+
+        units: int = self._positionUnits.get(order.ticker, 0) + unitsDelta
+        if units != 0: self._positionUnits[order.ticker] = units
+        else: self._positionUnits.pop(order.ticker, None)
+
+    def __updateLedger__(self) -> None:
+        '''
+        Brings the running ledger up to date with the orders the broker filled since the last update, in the order
+        they filled. Each fill is recorded once, and orders that have not filled are never looked at. Recorded orders
+        are let go of, as the ledger rebuilds them when read.
+
+        :return: None
+        '''
+
+        for order in self._newFills:
+            self.__recordFill__(order)
+            self._openOrders.pop(id(order), None)
+        self._newFills.clear()
 
     def __calculateStrategyNetCashProfitOrLoss__(self) -> float:
         '''
-        Calculates the net cash profit or loss for the strategy based on all orders made by the strategy.
+        Calculates the net cash profit or loss for the strategy based on all orders filled for the strategy.
 
         :return: The net cash profit or loss as a float.
         '''
 
-        netCashProfitOrLoss: float = 0.0
-        for order in self.strategyOrdersMade:
-            if order.fillStatus in (FillStatus.FILLED, FillStatus.PARTIALLY_FILLED):
-                netCashProfitOrLoss += order._portfolioCashImpact
-        return netCashProfitOrLoss
+        return self._netCashProfitOrLoss
     
     def __calculateStrategyNetValueProfitOrLoss__(self) -> float:
         '''
         Calculates the net value profit or loss for the strategy, including cash and positions.
+        Positions are valued at the latest close of their ticker, which is O(held tickers).
 
         :return: The net value profit or loss as a float.
         '''
 
         netValueProfitOrLoss: float = self.__calculateStrategyNetCashProfitOrLoss__()
-        
-        strategyPositions: dict[str, Position] = dict()
-        for order in self.strategyOrdersMade:
-            if order.fillStatus in (FillStatus.FILLED, FillStatus.PARTIALLY_FILLED):
-                if isinstance(order, BuyOrder):
-                    position: Position = strategyPositions.get(order.ticker, Position(order.ticker))
-                    position.units += order._unitsActuallyTraded
-                    strategyPositions[order.ticker] = position
-                elif isinstance(order, (SellOrder, CloseOrder)):
-                    position: Position = strategyPositions.get(order.ticker, Position(order.ticker))
-                    position.units -= order._unitsActuallyTraded
-                    strategyPositions[order.ticker] = position
-
-        for ticker in strategyPositions:
-            positionTicker: str = ticker
-            positionUnits: int = strategyPositions[ticker].units
-
-            tickerData: TickerData = self.__getTickerInfo__(positionTicker)
-            positionCashValue: float = tickerData.close * positionUnits
-
-            netValueProfitOrLoss += positionCashValue
+
+        for ticker, units in self._positionUnits.items():
+            tickerData: Union[None, TickerData] = self.__getTickerInfo__(ticker)
+            if tickerData != None:
+                netValueProfitOrLoss += tickerData.close * units
 
         return netValueProfitOrLoss
 
@@ -161,10 +242,10 @@ class StatisticsManager():
                                 portfolioValue: float,
                                 commissionPercent: float,
                                 slippagePercent: float,
-                                positions: dict[str, Position],
-                                orders: list[Order],
-                                openOrders: list[Order],
-                                closedOrders: list[Order]) -> None:
+                                positions: Mapping[str, Position],
+                                orders: OrderLogView,
+                                openOrders: OrderLogView,
+                                closedOrders: OrderLogView) -> None:
         '''
         Updates all registered StatisticTrackers with the latest market and portfolio state.
 
@@ -179,16 +260,78 @@ class StatisticsManager():
         :param portfolioValue: Current total portfolio value.
         :param commissionPercent: Commission percentage for trades.
         :param slippagePercent: Max slippage percentage for trades.
-        :param positions: Dictionary of current positions keyed by ticker.
-        :param orders: List of all orders issued at this timestep.
-        :param openOrders: List of currently open orders.
-        :param closedOrders: List of closed orders.
+        :param positions: Read-only mapping of current positions keyed by ticker.
+        :param orders: Read-only view of all orders issued at this timestep.
+        :param openOrders: Read-only view of currently open orders.
+        :param closedOrders: Read-only view of closed orders.
         
         :return: None
         '''
 
         self._dateTime = dateTime
 
+        self.__updateLedger__()
+        strategyOrdersMade: OrderLogView = openOrders.snapshot(tuple(self._openOrders.values()), self.fills)
+        ssNetCashProfitOrLoss: float = self.__calculateStrategyNetCashProfitOrLoss__()
+        ssNetValueProfitOrLoss: float = self.__calculateStrategyNetValueProfitOrLoss__()
+
+        self.__updateStatisticTrackers__(ticker,
+                                         dateTime,
+                                         open,
+                                         close,
+                                         low,
+                                         high,
+                                         volume,
+                                         portfolioCash,
+                                         portfolioValue,
+                                         commissionPercent,
+                                         slippagePercent,
+                                         positions,
+                                         orders,
+                                         openOrders,
+                                         closedOrders,
+                                         ssNetCashProfitOrLoss,
+                                         ssNetValueProfitOrLoss,
+                                         strategyOrdersMade)
+
+    def __updateStatisticTrackers__(self, ticker: str,
+                                    dateTime: datetime,
+                                    open: float,
+                                    close: float,
+                                    low: float,
+                                    high: float,
+                                    volume: int,
+                                    portfolioCash: float,
+                                    portfolioValue: float,
+                                    commissionPercent: float,
+                                    slippagePercent: float,
+                                    positions: Mapping[str, Position],
+                                    orders: OrderLogView,
+                                    openOrders: OrderLogView,
+                                    closedOrders: OrderLogView,
+                                    ssNetCashProfitOrLoss: float,
+                                    ssNetValueProfitOrLoss: float,
+                                    strategyOrdersMade: OrderLogView) -> None:
+        '''
+        Passes the market and portfolio state to every registered StatisticTracker, with the strategy's profit or loss
+        already calculated, see `updateStatisticsInfo` for the parameters.
+
+        Engines that calculate the strategy's profit or loss themselves, like the vectorized backtest engine, call this
+        directly instead of `updateStatisticsInfo`.
+
+        :param ssNetCashProfitOrLoss: The net cash profit or loss of the strategy's filled orders.
+        :param ssNetValueProfitOrLoss: The net profit or loss of the strategy including the value of its positions.
+        :param strategyOrdersMade: Read-only view of the strategy's open and filled orders.
+        :return: None
+        '''
+
+        self._dateTime = dateTime
+
+        # The strategy's value is taken the way the trackers take it, relative to the first non zero cash seen
+        if not self._startingCash:
+            self._startingCash = portfolioCash
+        self._currentValue = self._startingCash + ssNetValueProfitOrLoss
+
         for statisticTracker in self._statisticTrackers:
             statisticTracker.__updateStatisticsInfo__(ticker, 
                                                 dateTime,
@@ -205,9 +348,9 @@ class StatisticsManager():
                                                 orders,
                                                 openOrders,
                                                 closedOrders,
-                                                self.__calculateStrategyNetCashProfitOrLoss__(),
-                                                self.__calculateStrategyNetValueProfitOrLoss__(),
-                                                copy.deepcopy(self.strategyOrdersMade))
+                                                ssNetCashProfitOrLoss,
+                                                ssNetValueProfitOrLoss,
+                                                strategyOrdersMade)
             
     def end(self) -> None:
         '''
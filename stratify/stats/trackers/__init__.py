@@ -10,4 +10,24 @@ from .volatility import VolatilityTracker
 from .drawdown import DrawdownTracker
 
 # Trade Statistics
-from .trades import TradesTracker
\ No newline at end of file
+from .trades import TradesTracker
+
+# Risk Statistics, not tracked by default, add them with `addStatistic`
+from .risk_tracker import RiskTracker
+from .sharpe_ratio import SharpeRatioTracker
+from .sortino_ratio import SortinoRatioTracker
+from .calmar_ratio import CalmarRatioTracker
+from .omega_ratio import OmegaRatioTracker
+from .tail_ratio import TailRatioTracker
+from .value_at_risk import ValueAtRiskTracker
+from .rolling_sharpe_ratio import RollingSharpeRatioTracker
+from .monthly_returns import MonthlyReturnsTracker
+
+RISK_STATISTIC_TRACKERS: tuple[type[RiskTracker], ...] = (SharpeRatioTracker,
+                                                          SortinoRatioTracker,
+                                                          CalmarRatioTracker,
+                                                          OmegaRatioTracker,
+                                                          TailRatioTracker,
+                                                          ValueAtRiskTracker,
+                                                          RollingSharpeRatioTracker,
+                                                          MonthlyReturnsTracker)
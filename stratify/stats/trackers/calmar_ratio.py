@@ -0,0 +1,18 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+import numpy as np
+
+class CalmarRatioTracker(RiskTracker):
+    def __init__(self):
+        super().__init__('calmar_ratio')
+
+        self.calmarRatio: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.calmarRatio = analytics.calmarRatio(values, periodsPerYear)
+
+    def getStats(self) -> float:
+        return self.calmarRatio
+
+    def getStatsStr(self) -> str:
+        return f'Calmar Ratio: {self.calmarRatio:.2f}'
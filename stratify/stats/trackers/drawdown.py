@@ -2,7 +2,7 @@ from ..statistic_tracker import StatisticTracker
 from datetime import timedelta
 from datetime import datetime
 from typing import Union, Any
-import os
+import numpy as np
 
 class DrawdownTracker(StatisticTracker):
     HOURS_IN_DAY: int = 24
@@ -18,56 +18,66 @@ class DrawdownTracker(StatisticTracker):
         self.maxDrawdownPercent: float = 0.0
         self.drawdownDuration: timedelta = timedelta()
 
-        self.__portfolioValues__: list[float] = []
-        self.__drawdowns__: list[tuple[float, float, timedelta]] = []
-
-        self.__peak__: float = 0.0
-        self.__peakIndex__: Union[None, int] = None
-        self.__drawdownStartTime__: Union[None, datetime] = None
-
-    def start(self) -> None:
-        self.__peak__ = self.startingValue
-        self.__peakIndex__ = 0
-        self.__drawdownStartTime__ = self.dateTime
-
-    def __calculateDrawdown__(self, drawdownIndexOffest: int = 2) -> None:
-        drawdownEndTime: datetime = self.dateTime
-        drawdownDuration: timedelta = drawdownEndTime - self.__drawdownStartTime__
-
-        drawdownEndIndex: int = len(self.__portfolioValues__) - drawdownIndexOffest
-        drawdownPeriodValues: list[float] = self.__portfolioValues__[self.__peakIndex__:drawdownEndIndex + 1]
-        trough: float = min(drawdownPeriodValues)
-
-        peak: float = drawdownPeriodValues[0]
+        # Latest high of the curve and the lowest value since, in online mode
+        self.__peak__: Union[None, float] = None
+        self.__peakTime__: Union[None, datetime] = None
+        self.__trough__: Union[None, float] = None
 
+    def __recordDrawdown__(self, peak: float, trough: float, drawdownDuration: timedelta) -> None:
         drawdownValue: float = peak - trough
         drawdownPercent: float = ((peak - trough) / peak) * 100
 
         if drawdownValue > 0 and drawdownDuration > timedelta():
-            self.__drawdowns__.append((drawdownValue, drawdownPercent, drawdownDuration))
+            if drawdownValue > self.maxDrawdownValue:
+                self.maxDrawdownValue = drawdownValue
+                self.drawdownDuration = drawdownDuration
+            self.maxDrawdownPercent = max(self.maxDrawdownPercent, drawdownPercent)
 
     def update(self) -> None:
-        self.__portfolioValues__.append(self.ssCurrentValue)
+        if not self.isOnline:
+            return
 
-        if self.ssCurrentValue > self.__peak__:
-            self.__calculateDrawdown__()
+        if self.__peak__ == None or self.ssCurrentValue > self.__peak__:
+            if self.__peak__ != None:
+                self.__recordDrawdown__(self.__peak__, self.__trough__, self.dateTime - self.__peakTime__)
 
             self.__peak__ = self.ssCurrentValue
-            self.__peakIndex__ = len(self.__portfolioValues__) - 1
-            self.__drawdownStartTime__ = self.dateTime
+            self.__peakTime__ = self.dateTime
+            self.__trough__ = self.ssCurrentValue
+        else:
+            self.__trough__ = min(self.__trough__, self.ssCurrentValue)
 
     def end(self) -> None:
-        if self.ssCurrentValue < self.__peak__:
-            self.__calculateDrawdown__(drawdownIndexOffest=1)
-
-        drawdownValues: list[float] = [drawdown[0] for drawdown in self.__drawdowns__]
-        drawdownPercents: list[float] = [drawdown[1] for drawdown in self.__drawdowns__]
-        drawdownDurations: list[timedelta] = [drawdown[2] for drawdown in self.__drawdowns__]
-
-        if self.__drawdowns__:
-            self.maxDrawdownValue = max(drawdownValues)
-            self.maxDrawdownPercent = max(drawdownPercents)
-            self.drawdownDuration = drawdownDurations[drawdownValues.index(self.maxDrawdownValue)]
+        if self.isOnline:
+            if self.__peak__ != None and self.ssCurrentValue < self.__peak__:
+                self.__recordDrawdown__(self.__peak__, self.__trough__, self.dateTime - self.__peakTime__)
+            return
+
+        values: np.ndarray = self.equityCurve.values
+        dateTimes: np.ndarray = self.equityCurve.dateTimes
+        if len(values) == 0:
+            return
+
+        # A drawdown runs from each new high of the curve to the next, its depth measured to the lowest value between
+        peakIndices: np.ndarray = np.concatenate(([0], np.flatnonzero(values[1:] > np.maximum.accumulate(values)[:-1]) + 1))
+        peaks: np.ndarray = values[peakIndices]
+        troughs: np.ndarray = np.minimum.reduceat(values, peakIndices)
+        durations: np.ndarray = np.diff(dateTimes[np.concatenate((peakIndices, [len(values) - 1]))])
+
+        # The drawdown after the last high only counts if the curve ends below it
+        if values[-1] >= peaks[-1]:
+            peaks, troughs, durations = peaks[:-1], troughs[:-1], durations[:-1]
+
+        drawdownValues: np.ndarray = peaks - troughs
+        drawdownPercents: np.ndarray = ((peaks - troughs) / peaks) * 100
+        isDrawdown: np.ndarray = (drawdownValues > 0) & (durations > np.timedelta64(0, 'us'))
+
+        if isDrawdown.any():
+            drawdownValues, drawdownPercents, durations = drawdownValues[isDrawdown], drawdownPercents[isDrawdown], durations[isDrawdown]
+            maxDrawdownIndex: int = int(np.argmax(drawdownValues))
+            self.maxDrawdownValue = float(drawdownValues[maxDrawdownIndex])
+            self.maxDrawdownPercent = float(drawdownPercents.max())
+            self.drawdownDuration = durations[maxDrawdownIndex].astype('timedelta64[us]').item()
 
     def getStats(self) -> dict[str, Any]:
         return {'value': self.maxDrawdownValue, 'percent': self.maxDrawdownPercent, 'duration': self.drawdownDuration}
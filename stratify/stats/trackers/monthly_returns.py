@@ -0,0 +1,26 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+from typing import Any
+import numpy as np
+
+class MonthlyReturnsTracker(RiskTracker):
+    MONTH_NAMES: tuple[str, ...] = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+    def __init__(self):
+        super().__init__('monthly_returns')
+
+        self.years: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.monthlyReturnsPercent: np.ndarray = np.zeros((0, 12))
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.years, monthlyReturns = analytics.monthlyReturns(values, dateTimes)
+        self.monthlyReturnsPercent = monthlyReturns * 100.0
+
+    def getStats(self) -> dict[str, Any]:
+        return {'years': self.years, 'percent': self.monthlyReturnsPercent}
+
+    def getStatsStr(self) -> str:
+        rows: list[str] = ['Monthly Returns (%):', '   Year ' + ' '.join(f'{monthName:>7}' for monthName in MonthlyReturnsTracker.MONTH_NAMES)]
+        for year, yearReturns in zip(self.years.tolist(), self.monthlyReturnsPercent):
+            rows.append(f'   {year} ' + ' '.join(f'{monthReturn:>7.2f}' if not np.isnan(monthReturn) else f'{"":>7}' for monthReturn in yearReturns))
+        return '\n'.join(rows)
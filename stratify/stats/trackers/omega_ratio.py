@@ -0,0 +1,20 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+import numpy as np
+
+class OmegaRatioTracker(RiskTracker):
+    THRESHOLD: float = 0.0
+
+    def __init__(self):
+        super().__init__('omega_ratio')
+
+        self.omegaRatio: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.omegaRatio = analytics.omegaRatio(returns, OmegaRatioTracker.THRESHOLD)
+
+    def getStats(self) -> float:
+        return self.omegaRatio
+
+    def getStatsStr(self) -> str:
+        return f'Omega Ratio: {self.omegaRatio:.2f}'
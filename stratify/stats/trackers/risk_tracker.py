@@ -0,0 +1,32 @@
+from ..statistic_tracker import StatisticTracker
+from ... import analytics
+import numpy as np
+
+class RiskTracker(StatisticTracker):
+    '''
+    Base class for the risk statistics, computed at the end of a run over the strategy's value at the end of each timestamp.
+
+    Subclass this and implement `compute` instead of `end`. The statistics need the recorded equity curve, so they
+    cannot be computed online.
+    '''
+
+    def start(self) -> None:
+        if self.isOnline:
+            raise ValueError(f"'{self.statisticID}' is computed over the equity curve, which is not recorded when computing statistics online")
+
+    def end(self) -> None:
+        values, dateTimes = analytics.getTimestampValues(self.equityCurve.values, self.equityCurve.dateTimes)
+        self.compute(values, dateTimes, analytics.getReturns(values), analytics.getPeriodsPerYear(dateTimes))
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        '''
+        Computes the statistic once the run ends.
+
+        :param values: The strategy's value at the end of each timestamp.
+        :param dateTimes: The dates of each timestamp, as datetime64 values.
+        :param returns: The returns between consecutive values.
+        :param periodsPerYear: The number of timestamps per year, estimated from their dates.
+        :return: None
+        '''
+
+        pass
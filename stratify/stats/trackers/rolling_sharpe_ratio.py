@@ -0,0 +1,31 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+from typing import Any
+import numpy as np
+
+class RollingSharpeRatioTracker(RiskTracker):
+    WINDOW: int = 63
+    RISK_FREE_RATE: float = 0.0
+
+    def __init__(self):
+        super().__init__('rolling_sharpe_ratio')
+
+        self.dateTimes: np.ndarray = np.zeros(0, dtype='datetime64[us]')
+        self.sharpeRatios: np.ndarray = np.zeros(0)
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        # The ratio of every window is dated at the end of its last return
+        self.sharpeRatios = analytics.rollingSharpeRatio(returns, RollingSharpeRatioTracker.WINDOW, RollingSharpeRatioTracker.RISK_FREE_RATE, periodsPerYear)
+        self.dateTimes = dateTimes[len(dateTimes) - len(self.sharpeRatios):]
+
+    def getStats(self) -> dict[str, Any]:
+        return {'window': RollingSharpeRatioTracker.WINDOW, 'date_times': self.dateTimes, 'sharpe_ratios': self.sharpeRatios}
+
+    def getStatsStr(self) -> str:
+        if len(self.sharpeRatios) == 0:
+            return f'Rolling Sharpe Ratio ({RollingSharpeRatioTracker.WINDOW} periods): NONE'
+
+        return (f'Rolling Sharpe Ratio ({RollingSharpeRatioTracker.WINDOW} periods):\n'
+                f'   Min: {np.nanmin(self.sharpeRatios):.2f}\n'
+                f'   Median: {np.nanmedian(self.sharpeRatios):.2f}\n'
+                f'   Max: {np.nanmax(self.sharpeRatios):.2f}')
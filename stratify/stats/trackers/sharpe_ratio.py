@@ -0,0 +1,20 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+import numpy as np
+
+class SharpeRatioTracker(RiskTracker):
+    RISK_FREE_RATE: float = 0.0
+
+    def __init__(self):
+        super().__init__('sharpe_ratio')
+
+        self.sharpeRatio: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.sharpeRatio = analytics.sharpeRatio(returns, SharpeRatioTracker.RISK_FREE_RATE, periodsPerYear)
+
+    def getStats(self) -> float:
+        return self.sharpeRatio
+
+    def getStatsStr(self) -> str:
+        return f'Sharpe Ratio: {self.sharpeRatio:.2f}'
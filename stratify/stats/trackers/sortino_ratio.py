@@ -0,0 +1,20 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+import numpy as np
+
+class SortinoRatioTracker(RiskTracker):
+    RISK_FREE_RATE: float = 0.0
+
+    def __init__(self):
+        super().__init__('sortino_ratio')
+
+        self.sortinoRatio: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.sortinoRatio = analytics.sortinoRatio(returns, SortinoRatioTracker.RISK_FREE_RATE, periodsPerYear)
+
+    def getStats(self) -> float:
+        return self.sortinoRatio
+
+    def getStatsStr(self) -> str:
+        return f'Sortino Ratio: {self.sortinoRatio:.2f}'
@@ -0,0 +1,20 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+import numpy as np
+
+class TailRatioTracker(RiskTracker):
+    PERCENTILE: float = 95.0
+
+    def __init__(self):
+        super().__init__('tail_ratio')
+
+        self.tailRatio: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.tailRatio = analytics.tailRatio(returns, TailRatioTracker.PERCENTILE)
+
+    def getStats(self) -> float:
+        return self.tailRatio
+
+    def getStatsStr(self) -> str:
+        return f'Tail Ratio: {self.tailRatio:.2f}'
@@ -1,9 +1,8 @@
-from ...order import Order, FillStatus, BuyOrder, SellOrder, CloseOrder
 from ..statistic_tracker import StatisticTracker
 from datetime import timedelta
 from collections import deque
-from typing import Union
 from typing import Any
+import numpy as np
 
 class TradesTracker(StatisticTracker):
     HOURS_IN_DAY: int = 24
@@ -27,52 +26,55 @@ class TradesTracker(StatisticTracker):
         self.averageTradeHoldingPeriod: timedelta = timedelta()
 
     def end(self) -> None:
-        closedStrategyOrders: list[Order] = []
-        for order in self.strategyOrdersMade:
-            if order.fillStatus in (FillStatus.FILLED, FillStatus.PARTIALLY_FILLED):
-                closedStrategyOrders.append(order)
+        # Fills are read straight from the columns of the strategy's fill ledger, with their dates in seconds
+        tickerIds: list[int] = self.fills.tickerIds.tolist()
+        sides: list[int] = self.fills.sides.tolist()
+        units: list[int] = self.fills.units.tolist()
+        cashImpacts: list[float] = self.fills.cashImpacts.tolist()
+        fillSeconds: list[float] = (self.fills.dateTimes.astype(np.int64) / 1e6).tolist()
 
         tradeProfits: list[float] = []
         totalHoldingTimeSeconds: float = 0.0
 
-        # Calculate won/lost trades
-        buyOrders: deque = deque()
-        sellOrders: deque = deque()
-
-        for order in closedStrategyOrders:
-            if isinstance(order, BuyOrder): buyOrders.append(order)
-            elif isinstance(order, (SellOrder, CloseOrder)): sellOrders.append(order)
+        # Sells are only matched with buys of the same ticker, so each ticker id gets its own buy and sell queues,
+        # each queue entry holding a fill with its unmatched units and cash impact
+        tickerFills: dict[int, tuple[deque, deque]] = {}
+        for fillIndex, side in enumerate(sides):
+            buyFills, sellFills = tickerFills.setdefault(tickerIds[fillIndex], (deque(), deque()))
+            if side == 1: buyFills.append((fillIndex, units[fillIndex], cashImpacts[fillIndex]))
+            else: sellFills.append((fillIndex, units[fillIndex], cashImpacts[fillIndex]))
 
-        while sellOrders and buyOrders:
-            sellOrder: Union[SellOrder, CloseOrder] = sellOrders.popleft()
-            matchingBuyOrder: BuyOrder = buyOrders.popleft()
+        # Calculate won/lost trades
+        for buyFills, sellFills in tickerFills.values():
+            while sellFills and buyFills:
+                sellFill, sellUnits, sellCashImpact = sellFills.popleft()
+                buyFill, buyUnits, buyCashImpact = buyFills.popleft()
 
-            matchedUnits: int  = min(sellOrder.units, matchingBuyOrder.units)
+                matchedUnits: int  = min(sellUnits, buyUnits)
 
-            cashImpactPerSellUnit: float = sellOrder._portfolioCashImpact / sellOrder.units
-            cashImpactPerBuyUnit: float = matchingBuyOrder._portfolioCashImpact / matchingBuyOrder.units
+                cashImpactPerSellUnit: float = sellCashImpact / sellUnits
+                cashImpactPerBuyUnit: float = buyCashImpact / buyUnits
 
-            cashImpactSellOrder: float = matchedUnits * cashImpactPerSellUnit
-            cashImpactBuyOrder: float = matchedUnits * cashImpactPerBuyUnit
+                cashImpactSellFill: float = matchedUnits * cashImpactPerSellUnit
+                cashImpactBuyFill: float = matchedUnits * cashImpactPerBuyUnit
 
-            self.totalTrades += 1
+                self.totalTrades += 1
 
-            tradeProfit: float = cashImpactSellOrder + cashImpactBuyOrder
-            if tradeProfit > TradesTracker.EPSILON: self.wonTrades += 1
-            else: self.lostTrades += 1
-            tradeProfits.append(tradeProfit)
+                tradeProfit: float = cashImpactSellFill + cashImpactBuyFill
+                if tradeProfit > TradesTracker.EPSILON: self.wonTrades += 1
+                else: self.lostTrades += 1
+                tradeProfits.append(tradeProfit)
 
-            totalHoldingTimeSeconds += (sellOrder._closedEndTime - matchingBuyOrder._openedStartTime).total_seconds()
+                # A trade is held from its opening fill to its closing fill, the sell opening it for a short trade
+                totalHoldingTimeSeconds += abs(fillSeconds[sellFill] - fillSeconds[buyFill])
 
-            sellOrder.units -= matchedUnits
-            matchingBuyOrder.units -= matchedUnits
+                sellUnits -= matchedUnits
+                buyUnits -= matchedUnits
 
-            if sellOrder.units != 0:
-                sellOrder._portfolioCashImpact = sellOrder.units * cashImpactPerSellUnit
-                sellOrders.appendleft(sellOrder)
-            if matchingBuyOrder.units != 0:
-                matchingBuyOrder._portfolioCashImpact = matchingBuyOrder.units * cashImpactPerBuyUnit
-                buyOrders.appendleft(matchingBuyOrder)
+                if sellUnits != 0:
+                    sellFills.appendleft((sellFill, sellUnits, sellUnits * cashImpactPerSellUnit))
+                if buyUnits != 0:
+                    buyFills.appendleft((buyFill, buyUnits, buyUnits * cashImpactPerBuyUnit))
 
         # Calculate final win rate
         self.winRate = (self.wonTrades / self.totalTrades if self.totalTrades != 0 else 0.0) * 100.0
@@ -0,0 +1,25 @@
+from .risk_tracker import RiskTracker
+from ... import analytics
+from typing import Any
+import numpy as np
+
+class ValueAtRiskTracker(RiskTracker):
+    CONFIDENCE: float = 0.95
+
+    def __init__(self):
+        super().__init__('value_at_risk')
+
+        self.valueAtRiskPercent: float = 0.0
+        self.conditionalValueAtRiskPercent: float = 0.0
+
+    def compute(self, values: np.ndarray, dateTimes: np.ndarray, returns: np.ndarray, periodsPerYear: float) -> None:
+        self.valueAtRiskPercent = analytics.valueAtRisk(returns, ValueAtRiskTracker.CONFIDENCE) * 100.0
+        self.conditionalValueAtRiskPercent = analytics.conditionalValueAtRisk(returns, ValueAtRiskTracker.CONFIDENCE) * 100.0
+
+    def getStats(self) -> dict[str, Any]:
+        return {'confidence': ValueAtRiskTracker.CONFIDENCE, 'percent': self.valueAtRiskPercent, 'conditional_percent': self.conditionalValueAtRiskPercent}
+
+    def getStatsStr(self) -> str:
+        return (f'Value at Risk Statistics ({ValueAtRiskTracker.CONFIDENCE:.0%} confidence):\n'
+                f'   Value at Risk: {round(self.valueAtRiskPercent, 2)}%\n'
+                f'   Conditional Value at Risk: {round(self.conditionalValueAtRiskPercent, 2)}%')
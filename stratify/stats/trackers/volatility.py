@@ -1,5 +1,7 @@
 from ..statistic_tracker import StatisticTracker
+from typing import Union
 import numpy as np
+import math
 
 class VolatilityTracker(StatisticTracker):
     def __init__(self):
@@ -7,23 +9,41 @@ class VolatilityTracker(StatisticTracker):
 
         self.volatilityPercent: float = 0.0
 
-        self._returns: list[float] = []
-        self._portfolioValues: list[float] = []
+        # Running mean and sum of squared deviations of the returns in online mode, see Welford's algorithm
+        self.__previousValue__: Union[None, float] = None
+        self.__numReturns__: int = 0
+        self.__meanReturn__: float = 0.0
+        self.__sumSquaredDeviations__: float = 0.0
 
     def update(self) -> None:
-        self._portfolioValues.append(self.ssCurrentValue)
+        if not self.isOnline:
+            return
+
+        if self.__previousValue__ != None:
+            currentReturn: float = (self.ssCurrentValue - self.__previousValue__) / self.__previousValue__ if self.__previousValue__ != 0 else 0.0
+
+            self.__numReturns__ += 1
+            deviation: float = currentReturn - self.__meanReturn__
+            self.__meanReturn__ += deviation / self.__numReturns__
+            self.__sumSquaredDeviations__ += deviation * (currentReturn - self.__meanReturn__)
+
+        self.__previousValue__ = self.ssCurrentValue
 
     def end(self) -> None:
-        for i in range(1, len(self._portfolioValues)):
-            currentValue: float = self._portfolioValues[i]
-            previousValue: float = self._portfolioValues[i - 1]
-            currentReturn: float = (currentValue - previousValue) / previousValue if previousValue != 0 else 0.0
-            self._returns.append(currentReturn)
+        if self.isOnline:
+            self.volatilityPercent = math.sqrt(self.__sumSquaredDeviations__ / (self.__numReturns__ - 1)) * 100.0 if self.__numReturns__ > 1 else 0.0
+            return
+
+        values: np.ndarray = self.equityCurve.values
+        previousValues: np.ndarray = values[:-1]
+
+        # Returns from a zero value are taken as zero
+        returns: np.ndarray = np.divide(np.diff(values), previousValues, out=np.zeros(len(previousValues)), where=previousValues != 0)
 
-        self.volatilityPercent = float(np.std(np.array(self._returns), ddof=1)) * 100.0 if len(self._returns) > 1 else 0.0
+        self.volatilityPercent = float(np.std(returns, ddof=1)) * 100.0 if len(returns) > 1 else 0.0
 
     def getStats(self) -> float:
         return self.volatilityPercent
     
     def getStatsStr(self) -> str:
-        return f'Volatility: {self.volatilityPercent:.2f}%'
\ No newline at end of file
+        return f'Volatility: {self.volatilityPercent:.2f}%'
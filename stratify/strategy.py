@@ -1,14 +1,37 @@
-from .order import Order, BuyOrder, SellOrder, CloseOrder
+from .order import Order, BuyOrder, SellOrder, CloseOrder, OrderSide, LimitOrder, StopOrder, StopLimitOrder, TrailingStopOrder
+from .indicators import Indicator, BoundIndicator
+from .data import TickerData, TickerFeed, TickerHistory, StreamingTickerFeed, BarAggregator
+from datetime import datetime, timedelta
 from .stats import StatisticsManager
-from datetime import datetime
 from typing import Union, Any
 from .stats import trackers
+import numpy as np
 
 class Strategy():
     '''
     Base class for defining trading strategies.
     '''
 
+    DEFAULT_HISTORY_WINDOW: int = 100
+
+    # Attributes holding the current bar, set by the engine before every call to `next`
+    BAR_FIELDS: tuple[str, ...] = ('ticker', 'dateTime', 'open', 'close', 'low', 'high', 'volume')
+
+    DEFAULT_STATISTIC_TRACKERS: tuple[type, ...] = (
+        # Basic Performance Statistics
+        trackers.TotalReturnTracker,
+        trackers.AnnualizedReturnTracker,
+        trackers.StartingCashTracker,
+        trackers.FinalPortfolioValueTracker,
+        trackers.NetProfitOrLossTracker,
+        trackers.VolatilityTracker,
+
+        # Drawdown Statistics
+        trackers.DrawdownTracker,
+
+        # Trade Statistics
+        trackers.TradesTracker)
+
     def __init__(self):
         '''
         Initializes a new strategy instance.
@@ -26,20 +49,170 @@ class Strategy():
         self._orders: list[Order] = []
         self._hasStarted: bool = False
 
+        # Every ticker the strategy has placed a buy order for, in the order they were first bought
+        self._boughtTickers: dict[str, None] = {}
+        self._params: dict[str, Any] = {}
+
+        # Number of latest bars kept per ticker for `history`, set it in `__init__` or pass it as a parameter to change it
+        self.historyWindow: int = Strategy.DEFAULT_HISTORY_WINDOW
+
+        self._tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = []
+        self._tickerHistories: dict[str, TickerHistory] = {}
+        self._tickerBarCounts: dict[str, int] = {}
+        self._indicators: list[BoundIndicator] = []
+        self._timeframes: list[Timeframe] = []
+
     def __addDefaultStatisticTrackers__(self):
-        # Basic Performance Statistics
-        self._statisticsManager.addStatisticTracker(trackers.TotalReturnTracker)
-        self._statisticsManager.addStatisticTracker(trackers.AnnualizedReturnTracker)
-        self._statisticsManager.addStatisticTracker(trackers.StartingCashTracker)
-        self._statisticsManager.addStatisticTracker(trackers.FinalPortfolioValueTracker)
-        self._statisticsManager.addStatisticTracker(trackers.NetProfitOrLossTracker)
-        self._statisticsManager.addStatisticTracker(trackers.VolatilityTracker)
+        # Trackers already added, e.g. by an earlier run or by a parallel run handing its trackers to a worker, are not added again
+        addedTrackerClasses: set[type] = {type(statisticTracker) for statisticTracker in self._statisticsManager._statisticTrackers}
+        for statisticTrackerClass in Strategy.DEFAULT_STATISTIC_TRACKERS:
+            if statisticTrackerClass not in addedTrackerClasses:
+                self._statisticsManager.addStatisticTracker(statisticTrackerClass)
 
-        # Drawdown Statistics
-        self._statisticsManager.addStatisticTracker(trackers.DrawdownTracker)
+    def setParams(self, params: dict[str, Any]) -> None:
+        '''
+        Overrides the strategy's tunable parameters.
 
-        # Trade Statistics
-        self._statisticsManager.addStatisticTracker(trackers.TradesTracker)
+        Parameters are the plain attributes a strategy sets in its `__init__`, so the defaults are whatever
+        `__init__` assigns and each parameter is read back as `self.<name>`. Methods, private attributes (starting
+        with an underscore) and the fields of the current bar are not parameters and cannot be set.
+
+        :param params: Dictionary of parameter values keyed by attribute name.
+        :return: None
+        '''
+
+        for name in params:
+            if not self.__isParam__(name):
+                raise AttributeError(f'{type(self).__name__} has no parameter \'{name}\'.')
+
+        for name, value in params.items():
+            setattr(self, name, value)
+            self._params[name] = value
+
+    def __isParam__(self, name: str) -> bool:
+        '''
+        Checks whether an attribute is a declared parameter of the strategy, see `setParams`.
+
+        :param name: The name of the attribute.
+        :return: True if the attribute can be set as a parameter.
+        '''
+
+        return not name.startswith('_') and name in vars(self) and name not in Strategy.BAR_FIELDS
+
+    def addIndicator(self, indicator: Indicator, precompute: bool = True) -> BoundIndicator:
+        '''
+        Declares an indicator, intended to be called in `start`.
+
+        Every ticker gets its own copy of the indicator, updated with each of the ticker's bars before `next` is called.
+        An indicator declared later, e.g. in `next`, is updated from each ticker's next bar on. Precomputed values are
+        looked up by the bar's position in its feed, so they still include every earlier bar.
+        Reading an attribute of the returned indicator (e.g. `self.sma.value`) reads the current ticker's copy, and
+        `self.sma['AAPL']` returns another ticker's copy.
+
+        :param indicator: The indicator to declare (e.g. `indicators.SMA(20)`).
+        :param precompute: Whether a backtest may precompute each ticker's values over its whole feed with NumPy, instead of updating them bar by bar.
+        :return: The indicator bound to the strategy.
+        '''
+
+        boundIndicator: BoundIndicator = BoundIndicator(indicator, self, precompute)
+        self._indicators.append(boundIndicator)
+        return boundIndicator
+
+    def addTimeframe(self, interval: timedelta, origin: Union[None, datetime] = None) -> 'Timeframe':
+        '''
+        Declares a longer timeframe the strategy reads bars of, intended to be called in `start`.
+
+        The backtest's bars are aggregated into bars of the timeframe as they are stepped through, as
+        `TickerFeed.resample` does, and only completed bars are ever visible, so the timeframe never looks ahead.
+
+        :param interval: The length of the timeframe's bars (e.g. `timedelta(hours=1)`).
+        :param origin: A datetime the timeframe's bars end at, defaults to midnight UTC on 1970-01-01.
+        :return: The timeframe, to read its bars from and declare indicators on.
+        '''
+
+        timeframe: Timeframe = Timeframe(self, interval, origin)
+        self._timeframes.append(timeframe)
+        return timeframe
+
+    def history(self, ticker: Union[None, str] = None, field: str = 'close', n: Union[None, int] = None) -> np.ndarray:
+        '''
+        Returns the latest values of a bar field for a ticker, up to the current bar, oldest first.
+
+        At most `historyWindow` bars are kept per ticker. The values are a read-only NumPy view, into the ticker's feed
+        in a backtest or into a ring buffer otherwise, so nothing is copied. They are only valid during the current
+        call to `next`, copy them to keep them.
+
+        :param ticker: The stock ticker symbol, defaults to the current ticker.
+        :param field: One of 'open', 'close', 'low', 'high' or 'volume'.
+        :param n: The number of latest values, defaults to the whole window. Fewer are returned until enough bars were seen.
+        :return: A read-only array of the values.
+        '''
+
+        if ticker == None:
+            ticker = self.ticker
+
+        tickerHistory: Union[None, TickerHistory] = self._tickerHistories.get(ticker)
+        if tickerHistory == None:
+            return np.empty(0, dtype=np.int64 if field == 'volume' else np.float64)
+        return tickerHistory.get(field, n)
+
+    def __setTickerFeeds__(self, tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]]) -> None:
+        '''
+        Sets the ticker feeds of the backtest, which indicators and histories read ahead from.
+
+        :param tickerFeeds: The ticker feeds of the backtest.
+        :return: None
+        '''
+
+        self._tickerFeeds = tickerFeeds
+
+    def __getTickerFeed__(self, ticker: str) -> Union[None, TickerFeed]:
+        '''
+        Finds every bar of a ticker in the backtest's ticker feeds, in the order the backtest steps through them.
+
+        :param ticker: The stock ticker symbol.
+        :return: A ticker feed holding only the ticker's bars, or None if the ticker is not in exactly one feed or is streamed.
+        '''
+
+        tickerFeeds: list[Union[TickerFeed, StreamingTickerFeed]] = [tickerFeed for tickerFeed in self._tickerFeeds if ticker in tickerFeed._tickerIds]
+        if len(tickerFeeds) != 1 or isinstance(tickerFeeds[0], StreamingTickerFeed):
+            return None
+
+        return tickerFeeds[0].getByTicker(ticker)
+
+    def __getBarIndex__(self, ticker: str) -> int:
+        '''
+        Gets the position of a ticker's current bar among the ticker's bars, which is its index in the ticker feed
+        returned by `__getTickerFeed__`.
+
+        :param ticker: The stock ticker symbol.
+        :return: The index of the ticker's current bar, -1 before its first bar.
+        '''
+
+        return self._tickerBarCounts.get(ticker, 0) - 1
+
+    def __updateBar__(self, tickerData: TickerData) -> None:
+        '''
+        Updates the ticker's history and the declared indicators with the next bar.
+
+        :param tickerData: The next bar.
+        :return: None
+        '''
+
+        self._tickerBarCounts[tickerData.ticker] = self._tickerBarCounts.get(tickerData.ticker, 0) + 1
+
+        if self.historyWindow > 0:
+            tickerHistory: Union[None, TickerHistory] = self._tickerHistories.get(tickerData.ticker)
+            if tickerHistory == None:
+                tickerHistory = TickerHistory(self.historyWindow, self.__getTickerFeed__(tickerData.ticker))
+                self._tickerHistories[tickerData.ticker] = tickerHistory
+            tickerHistory.update(tickerData)
+
+        for boundIndicator in self._indicators:
+            boundIndicator.__update__(tickerData)
+
+        for timeframe in self._timeframes:
+            timeframe.__update__(tickerData)
 
     def start(self) -> None:
         '''
@@ -71,30 +244,112 @@ class Strategy():
 
         pass
 
-    def buy(self, units: int = 1) -> Order:
+    def buy(self, units: int = 1, limitPrice: Union[None, float] = None, stopPrice: Union[None, float] = None, trailAmount: Union[None, float] = None, trailPercent: Union[None, float] = None) -> Order:
         '''
         Places a buy order for the current ticker.
 
+        Without prices this is a market order filled at the bar's close. With a limit price, a stop price, both, or a
+        trail, it is a limit, stop, stop limit or trailing stop order resting in the broker's order book.
+
         :param units: Number of units to buy.
-        :return: The created BuyOrder object.
+        :param limitPrice: The highest price to buy at.
+        :param stopPrice: The price the market has to rise to before buying.
+        :param trailAmount: The distance the stop price trails above the lowest price.
+        :param trailPercent: The distance the stop price trails above the lowest price, as a decimal (e.g., 0.05 for 5%).
+        :return: The created order object.
         '''
 
-        order: BuyOrder = BuyOrder(self.ticker, units)
-        self._orders.append(order)
-        self._statisticsManager.strategyOrdersMade.append(order)
-        return order
+        return self.__placeOrder__(self.__createOrder__(OrderSide.BUY, units, limitPrice, stopPrice, trailAmount, trailPercent))
 
-    def sell(self, units: int = 1) -> Order:
+    def sell(self, units: int = 1, limitPrice: Union[None, float] = None, stopPrice: Union[None, float] = None, trailAmount: Union[None, float] = None, trailPercent: Union[None, float] = None) -> Order:
         '''
         Places a sell order for the current ticker.
 
+        Without prices this is a market order filled at the bar's close. With a limit price, a stop price, both, or a
+        trail, it is a limit, stop, stop limit or trailing stop order resting in the broker's order book.
+
         :param units: Number of units to sell.
-        :return: The created SellOrder object.
+        :param limitPrice: The lowest price to sell at.
+        :param stopPrice: The price the market has to fall to before selling.
+        :param trailAmount: The distance the stop price trails below the highest price.
+        :param trailPercent: The distance the stop price trails below the highest price, as a decimal (e.g., 0.05 for 5%).
+        :return: The created order object.
+        '''
+
+        return self.__placeOrder__(self.__createOrder__(OrderSide.SELL, units, limitPrice, stopPrice, trailAmount, trailPercent))
+
+    def __createOrder__(self, side: OrderSide, units: int, limitPrice: Union[None, float], stopPrice: Union[None, float], trailAmount: Union[None, float], trailPercent: Union[None, float]) -> Order:
+        '''
+        Creates the order type matching the given prices, for the current ticker.
+
+        :param side: Whether the order buys or sells.
+        :param units: Number of units to trade.
+        :param limitPrice: The worst price to trade at.
+        :param stopPrice: The price that triggers the order.
+        :param trailAmount: The distance the stop price trails the best price.
+        :param trailPercent: The distance the stop price trails the best price, as a decimal.
+        :return: The created order object.
+        '''
+
+        if trailAmount != None or trailPercent != None:
+            if limitPrice != None or stopPrice != None:
+                raise ValueError('A trailing stop order cannot also have a limit or stop price')
+            return TrailingStopOrder(self.ticker, units, trailAmount, trailPercent, side)
+
+        if limitPrice != None and stopPrice != None: return StopLimitOrder(self.ticker, units, stopPrice, limitPrice, side)
+        if limitPrice != None: return LimitOrder(self.ticker, units, limitPrice, side)
+        if stopPrice != None: return StopOrder(self.ticker, units, stopPrice, side)
+        return BuyOrder(self.ticker, units) if side == OrderSide.BUY else SellOrder(self.ticker, units)
+
+    def oco(self, *orders: Order) -> None:
+        '''
+        Links orders so that once any of them fills, the others are cancelled (one-cancels-other).
+
+        :param orders: The orders to link.
+        :return: None
+        '''
+
+        for order in orders:
+            order._ocoOrders = orders
+
+    def bracket(self, units: int, stopLoss: float, takeProfit: float, limitPrice: Union[None, float] = None) -> tuple[Order, Order, Order]:
         '''
+        Places a buy order for the current ticker with a stop loss and a take profit attached.
+
+        The stop loss and take profit sell orders are only placed once the buy order fills, for the units it bought,
+        and are one-cancels-other. They are cancelled if the buy order is rejected or cancelled.
+
+        :param units: Number of units to buy.
+        :param stopLoss: The price to sell at a loss at, with a stop order.
+        :param takeProfit: The price to sell at a profit at, with a limit order.
+        :param limitPrice: The highest price to buy at, defaults to buying at the bar's close.
+        :return: The created entry, stop loss and take profit order objects.
+        '''
+
+        entryOrder: Order = self.buy(units, limitPrice=limitPrice)
+        stopLossOrder: StopOrder = StopOrder(self.ticker, units, stopLoss, OrderSide.SELL)
+        takeProfitOrder: LimitOrder = LimitOrder(self.ticker, units, takeProfit, OrderSide.SELL)
+
+        self.oco(stopLossOrder, takeProfitOrder)
+        entryOrder._children = (stopLossOrder, takeProfitOrder)
+        for order in entryOrder._children:
+            order._openedStartTime = self.dateTime
+            self._statisticsManager.__addOrder__(order)
+        return entryOrder, stopLossOrder, takeProfitOrder
 
-        order: SellOrder = SellOrder(self.ticker, units)
+    def __placeOrder__(self, order: Order) -> Order:
+        '''
+        Hands an order to the broker, dated by the current bar, and records it as made by the strategy.
+
+        :param order: The order to place.
+        :return: The placed order.
+        '''
+
+        order._openedStartTime = self.dateTime
         self._orders.append(order)
-        self._statisticsManager.strategyOrdersMade.append(order)
+        if order.side == OrderSide.BUY:
+            self._boughtTickers[order.ticker] = None
+        self._statisticsManager.__addOrder__(order)
         return order
 
     def closePosition(self) -> Order:
@@ -104,23 +359,17 @@ class Strategy():
         :return: The created CloseOrder object.
         '''
 
-        order: CloseOrder = CloseOrder(self.ticker)
-        self._orders.append(order)
-        self._statisticsManager.strategyOrdersMade.append(order)
-        return order
+        return self.__placeOrder__(CloseOrder(self.ticker))
     
     def closeAllPositions(self) -> None:
         '''
-        Closes all open positions by placing CloseOrders for each ticker.
+        Closes all open positions by placing a CloseOrder for each ticker the strategy has placed a buy order for.
 
         :return: None
         '''
 
-        for order in self._statisticsManager.strategyOrdersMade:
-            if isinstance(order, BuyOrder):
-                closeOrder: CloseOrder = CloseOrder(order.ticker)
-                self._orders.append(closeOrder)
-                self._statisticsManager.strategyOrdersMade.append(closeOrder)
+        for ticker in self._boughtTickers:
+            self.__placeOrder__(CloseOrder(ticker))
     
     def getStatistic(self, statisticID: str) -> Any:
         '''
@@ -130,4 +379,163 @@ class Strategy():
         :return: The value or object associated with the specified statistic ID.
         '''
         
-        return self._statisticsManager.getStatistic(statisticID)
\ No newline at end of file
+        return self._statisticsManager.getStatistic(statisticID)
+
+class Timeframe():
+    '''
+    A longer timeframe declared by a strategy with `Strategy.addTimeframe`, aggregating each ticker's bars into bars
+    of the timeframe's interval as the backtest steps through them.
+
+    Its history, latest bar and indicators only ever hold completed bars, so they can be read in `next` without
+    looking ahead. A bar is completed by the bar dated at the end of its interval.
+    '''
+
+    def __init__(self, strategy: Strategy, interval: timedelta, origin: Union[None, datetime] = None):
+        '''
+        Initializes the timeframe.
+
+        :param strategy: The strategy that declared the timeframe.
+        :param interval: The length of the timeframe's bars.
+        :param origin: A datetime the timeframe's bars end at, defaults to midnight UTC on 1970-01-01.
+        '''
+
+        self._strategy: Strategy = strategy
+        self.interval: timedelta = interval
+        self.origin: Union[None, datetime] = origin
+
+        self._barAggregators: dict[str, BarAggregator] = {}
+        self._latestBars: dict[str, TickerData] = {}
+        self._tickerHistories: dict[str, TickerHistory] = {}
+        self._completedBarCounts: dict[str, int] = {}
+        self._indicators: list[BoundIndicator] = []
+
+    @property
+    def ticker(self) -> Union[None, str]:
+        '''
+        The strategy's current ticker, which the timeframe's indicators read from by default.
+
+        :return: The stock ticker symbol.
+        '''
+
+        return self._strategy.ticker
+
+    def addIndicator(self, indicator: Indicator, precompute: bool = True) -> BoundIndicator:
+        '''
+        Declares an indicator updated with the timeframe's completed bars, see `Strategy.addIndicator`.
+
+        :param indicator: The indicator to declare (e.g. `indicators.SMA(20)`).
+        :param precompute: Whether a backtest may precompute each ticker's values over its whole resampled feed.
+        :return: The indicator bound to the timeframe.
+        '''
+
+        boundIndicator: BoundIndicator = BoundIndicator(indicator, self, precompute)
+        self._indicators.append(boundIndicator)
+        return boundIndicator
+
+    def bar(self, ticker: Union[None, str] = None) -> Union[None, TickerData]:
+        '''
+        Returns the latest completed bar of a ticker.
+
+        :param ticker: The stock ticker symbol, defaults to the current ticker.
+        :return: The bar, or None until the ticker's first bar of the timeframe is completed.
+        '''
+
+        return self._latestBars.get(ticker if ticker != None else self._strategy.ticker)
+
+    def history(self, ticker: Union[None, str] = None, field: str = 'close', n: Union[None, int] = None) -> np.ndarray:
+        '''
+        Returns the latest values of a field of a ticker's completed bars, oldest first, see `Strategy.history`.
+
+        :param ticker: The stock ticker symbol, defaults to the current ticker.
+        :param field: One of 'open', 'close', 'low', 'high' or 'volume'.
+        :param n: The number of latest values, defaults to the strategy's whole history window.
+        :return: A read-only array of the values.
+        '''
+
+        tickerHistory: Union[None, TickerHistory] = self._tickerHistories.get(ticker if ticker != None else self._strategy.ticker)
+        if tickerHistory == None:
+            return np.empty(0, dtype=np.int64 if field == 'volume' else np.float64)
+        return tickerHistory.get(field, n)
+
+    def __getTickerFeed__(self, ticker: str) -> Union[None, TickerFeed]:
+        '''
+        Resamples the ticker's feed to the timeframe, giving every bar the timeframe completes in a backtest in order.
+
+        :param ticker: The stock ticker symbol.
+        :return: The resampled feed of the ticker, or None if the strategy has no feed of the ticker.
+        '''
+
+        tickerFeed: Union[None, TickerFeed] = self._strategy.__getTickerFeed__(ticker)
+        return tickerFeed.resample(self.interval, self.origin) if tickerFeed != None else None
+
+    def __getBarIndex__(self, ticker: str) -> int:
+        '''
+        Gets the position of a ticker's latest completed bar in the resampled feed returned by `__getTickerFeed__`.
+
+        :param ticker: The stock ticker symbol.
+        :return: The index of the ticker's latest completed bar, -1 before its first bar is completed.
+        '''
+
+        return self._completedBarCounts.get(ticker, 0) - 1
+
+    def __update__(self, tickerData: TickerData) -> None:
+        '''
+        Aggregates the next bar of a ticker, updating the history and indicators with the bars it completes.
+
+        :param tickerData: The next bar.
+        :return: None
+        '''
+
+        barAggregator: Union[None, BarAggregator] = self._barAggregators.get(tickerData.ticker)
+        if barAggregator == None:
+            barAggregator = BarAggregator(self.interval, self.origin)
+            self._barAggregators[tickerData.ticker] = barAggregator
+
+        for completedBar in barAggregator.update(tickerData):
+            self._latestBars[completedBar.ticker] = completedBar
+            self._completedBarCounts[completedBar.ticker] = self._completedBarCounts.get(completedBar.ticker, 0) + 1
+
+            if self._strategy.historyWindow > 0:
+                tickerHistory: Union[None, TickerHistory] = self._tickerHistories.get(completedBar.ticker)
+                if tickerHistory == None:
+                    tickerHistory = TickerHistory(self._strategy.historyWindow, self.__getTickerFeed__(completedBar.ticker))
+                    self._tickerHistories[completedBar.ticker] = tickerHistory
+                tickerHistory.update(completedBar)
+
+            for boundIndicator in self._indicators:
+                boundIndicator.__update__(completedBar)
+
+class VectorStrategy(Strategy):
+    '''
+    Base class for strategies that are pure functions of price history, backtested with the `VectorizedBacktestEngine`.
+
+    Instead of placing orders bar by bar in `next`, a vector strategy returns an array with one signal per bar of a
+    ticker feed from `signals`. Depending on `signalType` a signal is either the number of units to order on that bar
+    (positive to buy, negative to sell, 0 for no order), or the number of units the strategy wants to hold after it.
+    '''
+
+    # Signal types, see `signalType`
+    ORDERS: str = 'orders'
+    TARGETS: str = 'targets'
+
+    def __init__(self):
+        '''
+        Initializes a new vector strategy instance.
+        '''
+
+        super().__init__()
+
+        self.signalType: str = VectorStrategy.ORDERS
+
+    def signals(self, tickerFeed: TickerFeed) -> np.ndarray:
+        '''
+        Computes the signal of every bar in a ticker feed.
+        Intended to be overridden by custom strategies.
+
+        Orders are executed at the close of the bar they are signalled on, like orders placed in `Strategy.next`.
+
+        :param tickerFeed: The ticker feed, in time order. Use its columns (e.g. `tickerFeed.closes`) to compute the signals.
+        :return: An integer array with the signal of each bar of the feed.
+        '''
+
+        return np.zeros(len(tickerFeed), dtype=np.int64)
@@ -1,4 +1,5 @@
 from .. import stratify
+import numpy as np
 
 class MyTestStrategy_BuyAndHold(stratify.Strategy):
     def __init__(self):
@@ -24,4 +25,43 @@ class MyTestStrategy_BuyAndSellFlip(stratify.Strategy):
         else: 
             self.sell(units=10)
             if self.flip == 20:
-                self.flip = 0
\ No newline at end of file
+                self.flip = 0
+
+class MyTestStrategy_PeriodicFlip(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.period: int = 3
+        self.units: int = 10
+        self.bars: dict[str, int] = {}
+
+    def next(self):
+        bar: int = self.bars.get(self.ticker, 0) + 1
+        self.bars[self.ticker] = bar
+
+        if bar % self.period == 0:
+            self.buy(units=self.units)
+        elif bar % self.period == 1:
+            self.sell(units=self.units)
+
+class MyTestVectorStrategy_PeriodicFlip(stratify.VectorStrategy):
+    def __init__(self):
+        super().__init__()
+
+        self.period: int = 3
+        self.units: int = 10
+
+    def signals(self, tickerFeed):
+        bars: np.ndarray = np.arange(1, len(tickerFeed) + 1)
+        return np.where(bars % self.period == 0, self.units, np.where(bars % self.period == 1, -self.units, 0))
+
+class MyTestVectorStrategy_TargetSteps(stratify.VectorStrategy):
+    def __init__(self):
+        super().__init__()
+
+        self.units: int = 10
+        self.signalType = stratify.VectorStrategy.TARGETS
+
+    def signals(self, tickerFeed):
+        steps: np.ndarray = np.arange(len(tickerFeed)) // 6
+        return np.where(steps % 4 != 3, self.units * (1 + steps % 3), 0)
@@ -0,0 +1,53 @@
+from datetime import datetime
+from ... import stratify
+import numpy as np
+import math
+
+def test_analytics():
+    # Create a curve of known returns, and a batch of two curves holding it and its opposite returns
+    returns: np.ndarray = np.array([0.01, -0.02, 0.03, 0.01, -0.01, 0.02, -0.03, 0.02])
+    values: np.ndarray = 1000.0 * np.cumprod(np.concatenate(([1.0], 1.0 + returns)))
+    batchValues: np.ndarray = np.stack((values, 1000.0 * np.cumprod(np.concatenate(([1.0], 1.0 - returns)))))
+
+    # Check that returns are recovered from the curve
+    assert np.allclose(stratify.analytics.getReturns(values), returns), 'Returns should be recovered from the curve'
+    assert list(stratify.analytics.getReturns(np.array([0.0, 10.0, 20.0]))) == [0.0, 1.0], 'Returns from a zero value should be zero'
+
+    # Check each statistic of a single curve against its definition
+    meanReturn: float = float(np.mean(returns))
+    assert math.isclose(stratify.analytics.sharpeRatio(returns, periodsPerYear=4), meanReturn / float(np.std(returns, ddof=1)) * 2), 'Sharpe ratio should be the annualized mean over deviation'
+    assert math.isclose(stratify.analytics.sortinoRatio(returns, periodsPerYear=4), meanReturn / math.sqrt((0.02 ** 2 + 0.01 ** 2 + 0.03 ** 2) / 8) * 2), 'Sortino ratio should only count downside deviation'
+    assert math.isclose(stratify.analytics.omegaRatio(returns), 0.09 / 0.06), 'Omega ratio should be gains over losses'
+    assert math.isclose(stratify.analytics.maxDrawdown(values), 1 - values[7] / values[6]), 'Max drawdown should be the largest fall from a high'
+    assert math.isclose(stratify.analytics.annualizedReturn(values, periodsPerYear=4), (values[-1] / values[0]) ** 0.5 - 1), 'Annualized return should compound over the years of the curve'
+    assert math.isclose(stratify.analytics.calmarRatio(values, periodsPerYear=4), stratify.analytics.annualizedReturn(values, periodsPerYear=4) / stratify.analytics.maxDrawdown(values)), 'Calmar ratio should be annualized return over max drawdown'
+    assert math.isclose(stratify.analytics.valueAtRisk(returns, 0.75), -float(np.quantile(returns, 0.25))), 'Value at risk should be the loss at the confidence quantile'
+    assert math.isclose(stratify.analytics.conditionalValueAtRisk(returns, 0.75), (0.02 + 0.03) / 2), 'Conditional value at risk should be the mean loss past the value at risk'
+    assert math.isclose(stratify.analytics.tailRatio(returns, 90.0), abs(float(np.percentile(returns, 90))) / abs(float(np.percentile(returns, 10)))), 'Tail ratio should compare the tails of the returns'
+    assert math.isnan(stratify.analytics.sharpeRatio(np.zeros(5))), 'Sharpe ratio of constant returns should be undefined'
+
+    # Check that a batch of curves gives the statistics of each curve
+    batchSharpeRatios: np.ndarray = stratify.analytics.sharpeRatio(stratify.analytics.getReturns(batchValues))
+    assert batchSharpeRatios.shape == (2,) and math.isclose(batchSharpeRatios[0], stratify.analytics.sharpeRatio(returns)), 'Batch statistics should be computed per curve'
+    assert np.allclose(stratify.analytics.maxDrawdown(batchValues), [stratify.analytics.maxDrawdown(curveValues) for curveValues in batchValues]), 'Batch max drawdowns should be computed per curve'
+
+    # Check that rolling Sharpe ratios match the Sharpe ratio of every window
+    rollingSharpeRatios: np.ndarray = stratify.analytics.rollingSharpeRatio(returns, 4, periodsPerYear=4)
+    assert np.allclose(rollingSharpeRatios, [stratify.analytics.sharpeRatio(returns[start:start + 4], periodsPerYear=4) for start in range(5)]), 'Rolling Sharpe ratios should match each window'
+    assert np.isnan(stratify.analytics.rollingSharpeRatio(np.full(6, 0.01), 3)).all(), 'Windows of constant returns should be undefined'
+
+def test_analytics_monthlyReturns():
+    # Create a daily curve from mid January to March, growing 1% a day in February and flat otherwise
+    dateTimes: np.ndarray = np.arange(np.datetime64('2021-01-15'), np.datetime64('2021-03-11')).astype('datetime64[us]')
+    values: np.ndarray = np.where(dateTimes < np.datetime64('2021-02-01'), 100.0, 100.0 * 1.01 ** np.minimum(np.arange(len(dateTimes)) - 16, 28))
+
+    # Check that each month is returned from the end of the previous month, in a table of years by months
+    years, monthlyReturns = stratify.analytics.monthlyReturns(values, dateTimes)
+    assert list(years) == [2021] and monthlyReturns.shape == (1, 12), 'Table should hold a row per year'
+    assert math.isclose(monthlyReturns[0, 0], 0.0, abs_tol=1e-12) and math.isclose(monthlyReturns[0, 1], 1.01 ** 28 - 1) and math.isclose(monthlyReturns[0, 2], 0.0, abs_tol=1e-12), 'Months should be returned from the previous month end'
+    assert np.isnan(monthlyReturns[0, 3:]).all(), 'Months without values should be NaN'
+
+    # Check that curves are reduced to a value per timestamp and periods per year are estimated from their dates
+    timestampValues, timestampDateTimes = stratify.analytics.getTimestampValues(np.array([1.0, 2.0, 3.0]), np.array(['2021-01-01', '2021-01-01', '2021-01-02'], dtype='datetime64[us]'))
+    assert list(timestampValues) == [2.0, 3.0] and len(timestampDateTimes) == 2, 'Only the last value of a timestamp should be kept'
+    assert math.isclose(stratify.analytics.getPeriodsPerYear(dateTimes), 365.25), 'Daily dates should have a period per day'
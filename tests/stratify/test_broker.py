@@ -0,0 +1,115 @@
+from datetime import datetime
+from ... import stratify
+
+def test_BrokerStandard_portfolioValue():
+    # Create a broker with some starting cash
+    broker: stratify.BrokerStandard = stratify.BrokerStandard()
+    broker.setCash(10000)
+
+    # Check default values before any bars have been seen
+    assert broker.getPortfolioValue() == 10000, 'Portfolio value should equal cash before any positions are held'
+    assert broker.getPosition('AAPL') == 0, 'Position should be 0 for a ticker that was never traded'
+    assert broker.getCurrentBar('AAPL') is None, 'Current bar should be None for a ticker that was never seen'
+
+    # Buy into a position on the first bar
+    tickerData: stratify.TickerData = stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1), open=100, close=100, low=50, high=150, volume=1000)
+    broker.__updateCurrentBar__(tickerData)
+    broker._openOrders.append(stratify.order.BuyOrder('AAPL', 10))
+    broker.__executeOrders__(tickerData)
+
+    assert broker.getPosition('AAPL') == 10, 'Position should hold the 10 bought units'
+    assert broker.getCurrentBar('AAPL') is tickerData, 'Current bar should be the latest bar seen for the ticker'
+    assert broker.cash == 9000, 'Buying 10 units at $100 should cost $1,000'
+    assert broker.getPortfolioValue() == 10000, 'Portfolio value should be unchanged right after buying at the close'
+
+    # Check that the position is marked to the close of each new bar
+    broker.__updateCurrentBar__(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 2), open=100, close=120, low=50, high=150, volume=1000))
+    assert broker.getPortfolioValue() == 10200, 'Portfolio value should include the position marked to the latest close'
+
+    # Check that bars of other tickers do not change the value of the position
+    broker.__updateCurrentBar__(stratify.TickerData(ticker='GOOG', dateTime=datetime(2001, 1, 2), open=10, close=20, low=5, high=30, volume=1000))
+    assert broker.getPortfolioValue() == 10200, 'Bars of tickers without a position should not change the portfolio value'
+
+    # Sell part of the position and check the value is still consistent
+    tickerData = stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 3), open=120, close=110, low=50, high=150, volume=1000)
+    broker.__updateCurrentBar__(tickerData)
+    broker._openOrders.append(stratify.order.SellOrder('AAPL', 4))
+    broker.__executeOrders__(tickerData)
+
+    assert broker.getPosition('AAPL') == 6, 'Position should hold the 6 remaining units'
+    assert broker.cash == 9440, 'Selling 4 units at $110 should return $440'
+    assert broker.getPortfolioValue() == 10100, 'Portfolio value should equal cash plus the remaining position at the latest close'
+
+def test_BrokerStandard_orderBook():
+    broker: stratify.BrokerStandard = stratify.BrokerStandard()
+    broker.setCash(10000)
+
+    def executeBar(day: int, open: float, close: float, low: float, high: float, orders: list[stratify.order.Order] = []) -> None:
+        tickerData: stratify.TickerData = stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day), open=open, close=close, low=low, high=high, volume=1000)
+        broker.__updateCurrentBar__(tickerData)
+        broker._openOrders += orders
+        broker.__executeOrders__(tickerData)
+
+    # Place a buy limit order below the close, and far away orders that no bar reaches
+    buyLimit: stratify.order.LimitOrder = stratify.order.LimitOrder('AAPL', 10, 95, stratify.order.OrderSide.BUY)
+    farOrders: list[stratify.order.Order] = [stratify.order.LimitOrder('AAPL', 1, 10 - index * 0.01, stratify.order.OrderSide.BUY) for index in range(100)]
+    executeBar(1, 100, 100, 98, 102, [buyLimit])
+    executeBar(2, 100, 100, 98, 102, farOrders)
+    assert buyLimit.fillStatus == stratify.order.FillStatus.PENDING, 'Limit order should rest until the price reaches its limit'
+    assert len(broker._orderBooks['AAPL']) == 101, 'Resting orders should be kept in the ticker\'s order book'
+    assert len(broker.__getOrdersSnapshot__()[1]) == 101, 'Resting orders should be open orders'
+
+    # Check that a bar gapping below the limit fills at the open
+    executeBar(3, 94, 96, 93, 97)
+    assert buyLimit.fillStatus == stratify.order.FillStatus.FILLED, 'Limit order should fill once the bar\'s low reaches its limit'
+    assert buyLimit._portfolioCashImpact == -940, 'Limit order gapped through should fill at the open'
+    assert len(broker._orderBooks['AAPL']._fallingTriggers) == 100, 'Matching a bar should only pop the orders it triggered'
+
+    # Check that orders marketable when placed fill at the close
+    marketableLimit: stratify.order.LimitOrder = stratify.order.LimitOrder('AAPL', 1, 100, stratify.order.OrderSide.SELL)
+    executeBar(4, 96, 101, 95, 102, [marketableLimit])
+    assert marketableLimit._portfolioCashImpact == 101, 'Marketable limit order should fill at the close'
+
+    # Check that filling one of an OCO pair cancels the other, at the trigger price of the filled one
+    takeProfit: stratify.order.LimitOrder = stratify.order.LimitOrder('AAPL', 4, 110, stratify.order.OrderSide.SELL)
+    stopLoss: stratify.order.StopOrder = stratify.order.StopOrder('AAPL', 4, 90)
+    takeProfit._ocoOrders = stopLoss._ocoOrders = [takeProfit, stopLoss]
+    executeBar(5, 101, 101, 100, 102, [takeProfit, stopLoss])
+    executeBar(6, 101, 105, 89, 111)
+    assert stopLoss.fillStatus == stratify.order.FillStatus.FILLED and stopLoss._portfolioCashImpact == 360, 'Stop order should fill at its stop, reached before the high on an up bar'
+    assert takeProfit.fillStatus == stratify.order.FillStatus.CANCELLED, 'Filling an OCO order should cancel the other'
+    assert len(broker._orderBooks['AAPL']) == 100 and broker.getPosition('AAPL') == 5, 'Cancelled OCO order should leave the order book'
+
+    # Check that a trailing stop follows the highs and fills once the price falls back by its trail
+    trailingStop: stratify.order.TrailingStopOrder = stratify.order.TrailingStopOrder('AAPL', 5, trailAmount=5)
+    executeBar(7, 105, 105, 104, 106, [trailingStop])
+    executeBar(8, 105, 118, 104, 120)
+    executeBar(9, 118, 117, 116, 119)
+    assert trailingStop.fillStatus == stratify.order.FillStatus.PENDING and trailingStop.triggerPrice == 115, 'Trailing stop should trail the highest high'
+    executeBar(10, 117, 112, 110, 118)
+    assert trailingStop._portfolioCashImpact == 575 and broker.getPosition('AAPL') == 0, 'Trailing stop should fill at its trailed stop'
+
+    # Check that cancelled resting orders leave the order book
+    for order in farOrders:
+        order.cancel()
+    assert len(broker._orderBooks['AAPL']) == 0 and len(broker.__getOrdersSnapshot__()[1]) == 0, 'Cancelled orders should leave the order book'
+
+def test_BrokerStandard_executeOrders():
+    broker: stratify.BrokerStandard = stratify.BrokerStandard()
+    broker.setCash(10000)
+
+    # Place several orders for two tickers, one of them cancelled
+    orders: list[stratify.order.Order] = [stratify.order.BuyOrder('AAPL', 1), stratify.order.BuyOrder('AAPL', 2), stratify.order.BuyOrder('GOOG', 3), stratify.order.BuyOrder('AAPL', 4), stratify.order.BuyOrder('AAPL', 5)]
+    orders[3].cancel()
+    broker._openOrders += orders
+
+    tickerData: stratify.TickerData = stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1), open=100, close=100, low=50, high=150, volume=1000)
+    broker.__updateCurrentBar__(tickerData)
+    broker.__executeOrders__(tickerData)
+
+    # Check that every order of the ticker executed in order, without executing the cancelled one
+    closedOrders: stratify.order.OrderLogView = broker.__getOrdersSnapshot__()[2]
+    assert [order.fillStatus for order in closedOrders] == [stratify.order.FillStatus.FILLED] * 3, 'Every open order of the ticker should be executed'
+    assert [(order.ticker, order.units) for order in closedOrders] == [('AAPL', 1), ('AAPL', 2), ('AAPL', 5)], 'Orders should be executed in the order they were placed'
+    assert orders[3].fillStatus == stratify.order.FillStatus.CANCELLED and broker.getPosition('AAPL') == 8, 'Cancelled order should be dropped without being executed'
+    assert list(broker._openOrders) == [orders[2]], 'Orders of other tickers should stay open'
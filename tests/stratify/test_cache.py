@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from ... import stratify
+import numpy as np
+import tempfile
+import os
+
+def makeDownload(downloads: list[tuple[datetime, datetime]]):
+    # Fake download of one daily bar per day, closing at the day of the month, recording every range requested
+    def download(ticker: str, start: datetime, end: datetime, autoAdjust: bool) -> stratify.TickerFeed:
+        downloads.append((start, end))
+        dateTimes: np.ndarray = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D'))
+        closes: np.ndarray = np.array([dateTime.item().day for dateTime in dateTimes], dtype=np.float64) + (0.0 if autoAdjust else 0.5)
+        return stratify.TickerFeed.fromArrays(ticker, dateTimes, closes, closes, closes, closes, np.full(len(dateTimes), 100))
+    return download
+
+def test_DataCache():
+    with tempfile.TemporaryDirectory() as directory:
+        cache: stratify.DataCache = stratify.DataCache(directory)
+        downloads: list[tuple[datetime, datetime]] = []
+        download = makeDownload(downloads)
+
+        # Check that a miss downloads the range and a repeated request is served from disk
+        tickerFeed: stratify.TickerFeed = cache.getOrDownload('AAPL', datetime(2020, 1, 10), datetime(2020, 1, 20), download)
+        assert len(tickerFeed) == 10, 'Cached feed should hold one bar per day of the range'
+        assert cache.getOrDownload('AAPL', datetime(2020, 1, 12), datetime(2020, 1, 15), download) == tickerFeed.getByDateRange(datetime(2020, 1, 12), datetime(2020, 1, 15)), 'Cache hit should return the bars of the range'
+        assert downloads == [(datetime(2020, 1, 10), datetime(2020, 1, 20))], 'Cache hit should not download anything'
+
+        # Check that only the missing parts of a wider range are downloaded
+        tickerFeed = cache.getOrDownload('AAPL', datetime(2020, 1, 5), datetime(2020, 1, 25), download)
+        assert downloads[1:] == [(datetime(2020, 1, 5), datetime(2020, 1, 10)), (datetime(2020, 1, 20), datetime(2020, 1, 25))], 'Only the missing ranges should be downloaded'
+        assert list(tickerFeed.closes) == list(range(5, 25)), 'Cached feed should hold every bar of the range once, in time order'
+        assert not tickerFeed.closes.flags.writeable, 'Cache hits should be memory mapped read-only'
+
+        # Check that adjustment modes are cached separately
+        assert cache.get('AAPL', datetime(2020, 1, 5), datetime(2020, 1, 25), autoAdjust=False) == None, 'Unadjusted prices should not be served from the adjusted entry'
+        assert cache.getOrDownload('AAPL', datetime(2020, 1, 5), datetime(2020, 1, 6), download, autoAdjust=False).closes[0] == 5.5, 'Unadjusted entry should hold unadjusted prices'
+
+        # Check that stale entries are downloaded again over their whole range
+        staleCache: stratify.DataCache = stratify.DataCache(directory, timeToLive=timedelta(0))
+        assert staleCache.get('AAPL', datetime(2020, 1, 10), datetime(2020, 1, 20)) == None, 'Stale entry should not be served'
+        staleCache.getOrDownload('AAPL', datetime(2020, 1, 10), datetime(2020, 1, 20), download)
+        assert downloads[-1] == (datetime(2020, 1, 5), datetime(2020, 1, 25)), 'Stale entry should be downloaded again over its whole range'
+
+        # Check that bars apart from a fresh entry's range do not replace its bars
+        cache.put('AAPL', download('AAPL', datetime(2020, 3, 1), datetime(2020, 3, 5), True), datetime(2020, 3, 1), datetime(2020, 3, 5))
+        assert cache.get('AAPL', datetime(2020, 1, 5), datetime(2020, 1, 25)) != None, 'Entry should keep its bars when put bars apart from it'
+        assert cache.get('AAPL', datetime(2020, 3, 1), datetime(2020, 3, 5)) == None, 'Bars apart from the entry should not be cached'
+
+        # Check that entries are replaced without leaving the old or temporary entries behind
+        assert sorted(os.listdir(directory)) == ['AAPL_adjusted', 'AAPL_raw'], 'Replacing entries should not leave other directories behind'
+
+        # Check that an empty download raises and is not cached
+        emptyDownload = lambda ticker, start, end, autoAdjust: stratify.TickerFeed()
+        try:
+            cache.getOrDownload('MSFT', datetime(2020, 1, 10), datetime(2020, 1, 20), emptyDownload)
+            assert False, 'An empty download should raise a ValueError'
+        except ValueError:
+            pass
+        assert cache.get('MSFT', datetime(2020, 1, 10), datetime(2020, 1, 20)) == None, 'An empty download should not be cached'
+
+                # Check that clearing a ticker removes its entries
+        cache.clear('AAPL')
+        assert cache.get('AAPL', datetime(2020, 1, 10), datetime(2020, 1, 20)) == None, 'Cleared entry should not be served'
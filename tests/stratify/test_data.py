@@ -1,5 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone, time
 from ... import stratify
+import numpy as np
+import pickle
+import pandas
+import dataclasses
 import copy
 
 def test_TickerData():
@@ -116,6 +120,15 @@ def test_TickerFeed():
     assert str(tickerFeed) == 'TickerFeed:{TickerData(ticker=AAPL, dateTime=2001-01-01 00:00:00, open=100.00, close=200.00, low=50.00, high=300.00, volume=1000) ... 6 others ... TickerData(ticker=AAPL, dateTime=2001-01-01 00:00:00, open=100.00, close=200.00, low=50.00, high=300.00, volume=1000)}', 'String representation of TickerFeed does not match expected format'
     assert repr(tickerFeed) == 'TickerFeed:{TickerData(ticker=AAPL, dateTime=2001-01-01 00:00:00, open=100.00, close=200.00, low=50.00, high=300.00, volume=1000) ... 6 others ... TickerData(ticker=AAPL, dateTime=2001-01-01 00:00:00, open=100.00, close=200.00, low=50.00, high=300.00, volume=1000)}', 'String representation of TickerFeed does not match expected format'
 
+    # Check that the materialized feed cannot be mutated, as changes would not reach the feed
+    try:
+        tickerFeed.feed.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2006, 1, 1), open=100, close=200, low=50, high=300, volume=1000))
+        assert False, 'Appending to TickerFeed.feed should raise a TypeError'
+    except TypeError:
+        pass
+    assert len(tickerFeed) == 8, 'TickerFeed should still contain 8 items'
+    assert copy.deepcopy(tickerFeed.feed) == tickerFeed.feed, 'Copies of TickerFeed.feed should hold the same items'
+
     tickerFeed.feed = tickerFeed.feed[:2]
     assert len(tickerFeed) == 2, 'TickerFeed should contain 2 items after slicing to first 2 items'
 
@@ -151,4 +164,196 @@ def test_Position():
 
     # Check inequality with different ticker
     unequalPosition: stratify.data.Position = stratify.data.Position(ticker='AAPL', units=10)
-    assert position != unequalPosition, 'Unequal Position objects should not be equal'
\ No newline at end of file
+    assert position != unequalPosition, 'Unequal Position objects should not be equal'
+
+    # Check that positions are immutable and updated through withUnits
+    try:
+        unequalPosition.units = 20
+        assert False, 'Assigning to Position.units should raise'
+    except dataclasses.FrozenInstanceError:
+        pass
+    updatedPosition: stratify.data.Position = unequalPosition.withUnits(20)
+    assert updatedPosition == stratify.data.Position(ticker='AAPL', units=20), 'withUnits should return the position with the new units'
+    assert unequalPosition.units == 10, 'withUnits should leave the original position unchanged'
+
+def test_TickerFeed_fromArrays():
+    dateTimes: np.ndarray = np.array(['2001-01-03', '2001-01-01', '2001-01-02'], dtype='datetime64[us]')
+    opens: np.ndarray = np.array([100.0, 101.0, 102.0])
+    closes: np.ndarray = np.array([200.0, 201.0, 202.0])
+    lows: np.ndarray = np.array([50.0, 51.0, 52.0])
+    highs: np.ndarray = np.array([300.0, 301.0, 302.0])
+    volumes: np.ndarray = np.array([1000, 1001, 1002], dtype=np.int64)
+
+    # Create a TickerFeed directly from column arrays
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed.fromArrays('AAPL', dateTimes, opens, closes, lows, highs, volumes)
+
+    # Check that columns with matching dtypes are adopted without copying
+    assert len(tickerFeed) == 3, 'TickerFeed should contain 3 items'
+    assert np.shares_memory(tickerFeed._closes, closes), 'Float64 columns should be adopted without copying'
+    assert np.shares_memory(tickerFeed._volumes, volumes), 'Int64 columns should be adopted without copying'
+
+    # Check that bars are materialized as TickerData objects on access
+    assert tickerFeed[0] == stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 3), open=100, close=200, low=50, high=300, volume=1000), 'First item should match the first row of the arrays'
+    assert tickerFeed[-1] == stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 2), open=102, close=202, low=52, high=302, volume=1002), 'Last item should match the last row of the arrays'
+    assert tickerFeed.getByFirstDate() == datetime(2001, 1, 1), 'Earliest date in TickerFeed should be 2001-01-01'
+    assert tickerFeed.getByLastDate() == datetime(2001, 1, 3), 'Latest date in TickerFeed should be 2001-01-03'
+
+    # Check that slicing returns a TickerFeed sharing the same columns
+    slicedTickerFeed: stratify.TickerFeed = tickerFeed[1:]
+    assert isinstance(slicedTickerFeed, stratify.TickerFeed), 'Slicing a TickerFeed should return a TickerFeed'
+    assert len(slicedTickerFeed) == 2, 'Sliced TickerFeed should contain 2 items'
+    assert np.shares_memory(slicedTickerFeed._closes, closes), 'Sliced TickerFeed should share the original columns'
+
+    # Check sorting by date keeps the data of each bar together
+    sortedTickerFeed: stratify.TickerFeed = tickerFeed.sortedByDate()
+    assert [tickerData.dateTime for tickerData in sortedTickerFeed] == [datetime(2001, 1, 1), datetime(2001, 1, 2), datetime(2001, 1, 3)], 'Sorted TickerFeed should be in time order'
+    assert [tickerData.volume for tickerData in sortedTickerFeed] == [1001, 1002, 1000], 'Sorting should move whole bars'
+    assert sortedTickerFeed.sortedByDate() is sortedTickerFeed, 'Sorting an already sorted TickerFeed should return it unchanged'
+
+    # Check that a pickled TickerFeed round trips
+    assert pickle.loads(pickle.dumps(tickerFeed)) == tickerFeed, 'Unpickled TickerFeed should equal the original'
+
+def test_TickerFeed_fromDataFrame():
+    dateTimes: pandas.DatetimeIndex = pandas.DatetimeIndex(['2001-01-01', '2001-01-02', '2001-01-03'], name='Date')
+    fields: dict[str, list[float]] = {'Close': [200.0, 201.0, np.nan], 'High': [300.0, 301.0, np.nan], 'Low': [50.0, 51.0, np.nan], 'Open': [100.0, 101.0, np.nan], 'Volume': [1000, 1001, 0]}
+    expectedTickerFeed: stratify.TickerFeed = stratify.TickerFeed([stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1), open=100, close=200, low=50, high=300, volume=1000),
+                                                                  stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 2), open=101, close=201, low=51, high=301, volume=1001)])
+
+    # Check a flat DataFrame, skipping the bar without a closing price
+    flatDataFrame: pandas.DataFrame = pandas.DataFrame(fields, index=dateTimes)
+    assert stratify.TickerFeed.fromDataFrame(flatDataFrame, 'AAPL') == expectedTickerFeed, 'Flat DataFrame should convert to the expected bars'
+
+    # Check a MultiIndex DataFrame laid out like yfinance's, holding a second ticker
+    multiIndexDataFrame: pandas.DataFrame = pandas.concat({'AAPL': flatDataFrame, 'GOOG': flatDataFrame * 2}, axis=1).swaplevel(axis=1)
+    assert stratify.TickerFeed.fromDataFrame(multiIndexDataFrame, 'AAPL') == expectedTickerFeed, 'MultiIndex DataFrame should convert the ticker\'s columns'
+    assert stratify.TickerFeed.fromDataFrame(multiIndexDataFrame, 'GOOG')[1].close == 402, 'MultiIndex DataFrame should convert the other ticker\'s columns'
+
+    # Check that bars with a closing price but no volume are given a volume of 0
+    noVolumeDataFrame: pandas.DataFrame = flatDataFrame.astype({'Volume': np.float64})
+    noVolumeDataFrame.loc[dateTimes[1], 'Volume'] = np.nan
+    assert list(stratify.TickerFeed.fromDataFrame(noVolumeDataFrame, 'AAPL').volumes) == [1000, 0], 'Missing volumes should be converted to 0'
+    noVolumeDataFrame = noVolumeDataFrame.astype({'Volume': 'Int64'})
+    assert list(stratify.TickerFeed.fromDataFrame(noVolumeDataFrame, 'AAPL').volumes) == [1000, 0], 'Missing nullable integer volumes should be converted to 0'
+
+    # Check that timezone aware dates are kept
+    awareDataFrame: pandas.DataFrame = flatDataFrame.tz_localize('America/New_York')
+    awareTickerFeed: stratify.TickerFeed = stratify.TickerFeed.fromDataFrame(awareDataFrame, 'AAPL')
+    assert awareTickerFeed[0].dateTime == awareDataFrame.index[0], 'Timezone aware dates should round trip'
+
+    # Check that the yfinance layout of the stored AAPL download converts to the same bars as the feed
+    with open('tests/stratify/test_engine_downloadData_AAPL_20_1_1_24_1_1_data.pkl', 'rb') as pickleFile:
+        historicalTickerFeedAAPL: stratify.TickerFeed = pickle.load(pickleFile)
+    historicalDataFrame: pandas.DataFrame = pandas.DataFrame({('Close', 'AAPL'): historicalTickerFeedAAPL.closes,
+                                                              ('High', 'AAPL'): historicalTickerFeedAAPL.highs,
+                                                              ('Low', 'AAPL'): historicalTickerFeedAAPL.lows,
+                                                              ('Open', 'AAPL'): historicalTickerFeedAAPL.opens,
+                                                              ('Volume', 'AAPL'): historicalTickerFeedAAPL.volumes}, index=pandas.DatetimeIndex(historicalTickerFeedAAPL.dateTimes))
+    convertedTickerFeed: stratify.TickerFeed = stratify.TickerFeed.fromDataFrame(historicalDataFrame, 'AAPL')
+    assert np.array_equal(convertedTickerFeed.dateTimes, historicalTickerFeedAAPL.dateTimes), 'Converted download should have the stored dates'
+    assert np.array_equal(convertedTickerFeed.closes, historicalTickerFeedAAPL.closes), 'Converted download should have the stored closing prices'
+    assert np.array_equal(convertedTickerFeed.volumes, historicalTickerFeedAAPL.volumes), 'Converted download should have the stored volumes'
+
+def test_TickerFeed_resample():
+    # Create a feed of two interleaved tickers with a minute bar each, dated when the bar closes
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for minute in range(1, 13):
+        for tickerIndex, ticker in enumerate(['AAPL', 'GOOG']):
+            price: float = 100.0 * (tickerIndex + 1) + minute
+            tickerFeed.append(stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, 1, 9, 30) + timedelta(minutes=minute), open=price - 0.5, close=price, low=price - 1.0, high=price + 1.0, volume=minute))
+
+    # Check that 5 minute bars aggregate the bars of each interval, dated at its end
+    resampledTickerFeed: stratify.TickerFeed = tickerFeed.resample(timedelta(minutes=5))
+    assert [(tickerData.ticker, tickerData.dateTime.minute) for tickerData in resampledTickerFeed] == [('AAPL', 35), ('GOOG', 35), ('AAPL', 40), ('GOOG', 40), ('AAPL', 45), ('GOOG', 45)], 'Resampled bars should be dated at the end of their interval, in time order'
+    assert resampledTickerFeed[2] == stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1, 9, 40), open=105.5, close=110, low=105, high=111, volume=6 + 7 + 8 + 9 + 10), 'Resampled bar should aggregate the bars of its interval'
+    assert resampledTickerFeed[5].close == 212 and resampledTickerFeed[5].volume == 11 + 12, 'Last resampled bar should hold the bars of its incomplete interval'
+
+    # Check that bars aggregated one at a time match the resampled feed
+    barAggregator: stratify.data.BarAggregator = stratify.data.BarAggregator(timedelta(minutes=5))
+    aggregatedBars: list[stratify.TickerData] = [bar for tickerData in tickerFeed.getByTicker('AAPL') for bar in barAggregator.update(tickerData)]
+    assert aggregatedBars == list(resampledTickerFeed.getByTicker('AAPL'))[:2], 'Aggregated bars should match the resampled bars they complete'
+
+    # Check that each bar is aligned to the latest resampled bar dated no later than it
+    alignedIndices: np.ndarray = resampledTickerFeed.alignTo(tickerFeed)
+    assert list(alignedIndices[:10]) == [-1] * 8 + [0, 1], 'Bars should only be aligned to resampled bars that are closed'
+    assert all(resampledTickerFeed[index].dateTime <= tickerData.dateTime and resampledTickerFeed[index].ticker == tickerData.ticker for index, tickerData in zip(alignedIndices[8:].tolist(), list(tickerFeed)[8:])), 'Aligned bars should be of the same ticker and not later'
+
+def test_TickerFeed_resampleSessions():
+    # Create a feed of hourly bars in UTC spanning two New York sessions, including pre and post market bars
+    dateTimes: list[datetime] = [datetime(2021, 3, 12, 13, 0, tzinfo=timezone.utc) + timedelta(hours=hour) for hour in range(10)] + [datetime(2021, 3, 15, 13, 0, tzinfo=timezone.utc) + timedelta(hours=hour) for hour in range(10)]
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed([stratify.TickerData(ticker='AAPL', dateTime=dateTime, open=index, close=index + 0.5, low=index - 1.0, high=index + 1.0, volume=1) for index, dateTime in enumerate(dateTimes)])
+
+    # Check that each session holds the bars closing within its hours, in New York time across daylight saving time
+    sessionTickerFeed: stratify.TickerFeed = tickerFeed.resampleSessions(time(9, 30), time(16, 0), 'America/New_York')
+    assert len(sessionTickerFeed) == 2, 'There should be a bar per session'
+    assert sessionTickerFeed[0].dateTime == datetime(2021, 3, 12, 21, 0, tzinfo=timezone.utc) and sessionTickerFeed[0].volume == 7, 'Session in standard time should hold the bars from 10:00 to 16:00'
+    assert sessionTickerFeed[1].dateTime == datetime(2021, 3, 15, 20, 0, tzinfo=timezone.utc) and sessionTickerFeed[1].volume == 7, 'Session in daylight saving time should hold the bars from 10:00 to 16:00'
+    assert sessionTickerFeed[1].open == 11 and sessionTickerFeed[1].close == 17.5, 'Session bar should open with its first bar and close with its last'
+
+def test_TickAggregator():
+    # Create trades of two tickers every 20 seconds from 9:30, with a trade of AAPL arriving 10 seconds late
+    startDateTime: datetime = datetime(2001, 1, 1, 9, 30, tzinfo=timezone.utc)
+    ticks: list[stratify.Tick] = [stratify.Tick(ticker, startDateTime + timedelta(seconds=20 * index), 100.0 + index, index) for index in range(9) for ticker in ['AAPL', 'GOOG']]
+    ticks.insert(9, stratify.Tick('AAPL', startDateTime + timedelta(seconds=70), 90.0, 100))
+
+    # Check that minute bars are completed by the first tick after their end and delay
+    tickAggregator: stratify.TickAggregator = stratify.TickAggregator(interval=timedelta(minutes=1), maxDelay=timedelta(seconds=30))
+    completedBars: list[list[stratify.TickerData]] = [tickAggregator.update(tick) for tick in ticks]
+    assert [index for index, bars in enumerate(completedBars) if bars] == [4, 11, 17], 'Bars should be completed by the first tick after their end and delay'
+    assert completedBars[4] == [stratify.TickerData(ticker='AAPL', dateTime=startDateTime, open=100, close=100, low=100, high=100, volume=0),
+                                stratify.TickerData(ticker='GOOG', dateTime=startDateTime, open=100, close=100, low=100, high=100, volume=0)], 'Ticks at the end of an interval should be in its bar'
+    assert completedBars[17][0] == stratify.TickerData(ticker='AAPL', dateTime=startDateTime + timedelta(minutes=2), open=90, close=106, low=90, high=106, volume=100 + 4 + 5 + 6), 'Late tick should open its bar without changing its close'
+
+    # Check that ticks of completed bars are dropped, and bars left open are flushed
+    tickAggregator.update(stratify.Tick('AAPL', startDateTime + timedelta(seconds=30), 200.0, 100))
+    assert tickAggregator.numLateTicks == 1, 'Ticks of completed bars should be dropped'
+    flushedBars: list[stratify.TickerData] = tickAggregator.flush()
+    assert [(tickerData.ticker, tickerData.dateTime.minute, tickerData.volume) for tickerData in flushedBars] == [('AAPL', 33, 15), ('GOOG', 33, 15)], 'Partial bars should be flushed'
+    assert tickAggregator.flush() == [], 'Flushed bars should not be held'
+
+    # Check that volume and tick bars are completed by the tick reaching their size
+    volumeAggregator: stratify.TickAggregator = stratify.TickAggregator(volume=10)
+    volumeBars: list[stratify.TickerData] = [bar for tick in ticks if tick.ticker == 'GOOG' for bar in volumeAggregator.update(tick)]
+    assert [(tickerData.volume, tickerData.dateTime.minute, tickerData.dateTime.second) for tickerData in volumeBars] == [(10, 31, 20), (11, 32, 0), (15, 32, 40)], 'Volume bars should be dated at the tick completing them'
+    tickBarAggregator: stratify.TickAggregator = stratify.TickAggregator(numTicks=4)
+    tickBars: list[stratify.TickerData] = [bar for tick in ticks for bar in tickBarAggregator.update(tick)]
+    assert [(tickerData.ticker, tickerData.open, tickerData.close) for tickerData in tickBars] == [('AAPL', 100, 103), ('GOOG', 100, 103), ('AAPL', 104, 107), ('GOOG', 104, 107)], 'Tick bars should hold a fixed number of ticks'
+    assert tickBarAggregator.numLateTicks == 1, 'Ticks older than the previous tick of their ticker should be dropped'
+    assert [tickerData.close for tickerData in tickBarAggregator.flush()] == [108, 108], 'Partial tick bars should be flushed'
+
+    # Check that exactly one bar size is required
+    try:
+        stratify.TickAggregator(interval=timedelta(minutes=1), volume=10)
+        assert False, 'Several bar sizes should raise an error'
+    except ValueError:
+        pass
+
+def test_RingBuffer():
+    ringBuffer: stratify.data.RingBuffer = stratify.data.RingBuffer(3)
+
+    # Check that values are held in order until the buffer is full
+    assert ringBuffer.append(1.0) == None, 'Appending to a buffer that is not full should not drop a value'
+    ringBuffer.append(2.0)
+    assert len(ringBuffer) == 2 and not ringBuffer.isFull, 'Buffer should hold 2 values'
+    assert list(ringBuffer.latest()) == [1.0, 2.0], 'Latest values should be in chronological order'
+    assert list(ringBuffer.latest(3)) == [1.0, 2.0], 'A count within the capacity should return the values held so far'
+
+    # Check that the oldest value is dropped once the buffer is full
+    ringBuffer.append(3.0)
+    assert ringBuffer.isFull, 'Buffer should be full'
+    assert ringBuffer.append(4.0) == 1.0, 'Appending to a full buffer should drop the oldest value'
+    assert ringBuffer.append(5.0) == 2.0, 'Appending to a full buffer should drop the oldest value'
+    assert list(ringBuffer.latest()) == [3.0, 4.0, 5.0], 'Latest values should wrap around in chronological order'
+    assert list(ringBuffer.latest(2)) == [4.0, 5.0], 'A count should return only the latest values'
+
+    # Check that reading more values than the capacity raises, as with a ticker history's window
+    try:
+        ringBuffer.latest(4)
+        assert False, 'Reading more values than the capacity should raise a ValueError'
+    except ValueError:
+        pass
+    assert ringBuffer[0] == 3.0 and ringBuffer[-1] == 5.0, 'Indexing should count from the oldest value'
+
+    # Check that latest values are read-only views
+    latestValues: np.ndarray = ringBuffer.latest()
+    assert not latestValues.flags.writeable, 'Latest values should be read-only'
+    assert latestValues.base is not None, 'Latest values should be a view'
@@ -1,6 +1,15 @@
+from ..my_test_strategies import MyTestStrategy_BuyAndHold, MyTestStrategy_BuyAndSellFlip, MyTestStrategy_PeriodicFlip
+from ..my_test_strategies import MyTestVectorStrategy_PeriodicFlip, MyTestVectorStrategy_TargetSteps
+from datetime import timedelta
 from datetime import datetime
 from ... import stratify
+from typing import Any, Iterator
+from functools import partial
+import numpy as np
+import threading
+import tempfile
 import pickle
+import math
 
 def test_downloadData():
     # Load static data from pickle file (this data should never change, as it is historical data)
@@ -17,4 +26,313 @@ def test_downloadData():
     assert isinstance(tickerFeedAPPL, stratify.TickerFeed), 'Downloaded data is not a TickerFeed'
     assert len(tickerFeedAPPL) == len(historicalTickerFeedAAPL), 'TickerFeed length mismatch'
     assert tickerFeedAPPL.getByFirstDate() == historicalTickerFeedAAPL.getByFirstDate(), 'First date mismatch'
-    assert tickerFeedAPPL.getByLastDate() == historicalTickerFeedAAPL.getByLastDate(), 'Last date mismatch'
\ No newline at end of file
+    assert tickerFeedAPPL.getByLastDate() == historicalTickerFeedAAPL.getByLastDate(), 'Last date mismatch'
+
+class MyTestFileSource(stratify.sources.DataSource):
+    # Serves the stored AAPL download under any ticker, failing the first request of tickers starting with 'FLAKY'
+    BATCH_SIZE: int = 2
+
+    def __init__(self):
+        with open('tests/stratify/test_engine_downloadData_AAPL_20_1_1_24_1_1_data.pkl', 'rb') as pickleFile:
+            self.tickerFeedAAPL: stratify.TickerFeed = pickle.load(pickleFile)
+        self.requests: list[list[str]] = []
+        self.requestedRanges: list[tuple[datetime, datetime]] = []
+        self.requestedTickers: set[str] = set()
+        self.lock: threading.Lock = threading.Lock()
+
+    def download(self, tickers: list[str], start: datetime, end: datetime, autoAdjust: bool = True) -> dict[str, stratify.TickerFeed]:
+        with self.lock:
+            retriedTickers: set[str] = self.requestedTickers.intersection(tickers)
+            self.requestedTickers.update(tickers)
+            self.requests.append(tickers)
+            self.requestedRanges.append((start, end))
+
+        tickerFeed: stratify.TickerFeed = self.tickerFeedAAPL.getByDateRange(start, end)
+        return {ticker: stratify.TickerFeed.fromArrays(ticker, tickerFeed.dateTimes, tickerFeed.opens, tickerFeed.closes, tickerFeed.lows, tickerFeed.highs, tickerFeed.volumes)
+                for ticker in tickers if ticker in retriedTickers or not ticker.startswith('FLAKY')}
+
+def test_downloadMany():
+    source: MyTestFileSource = MyTestFileSource()
+    tickers: list[str] = ['AAPL', 'MSFT', 'FLAKY', 'GOOG', 'AAPL']
+
+    # Download the tickers in batches of two, the flaky ticker only succeeding when retried
+    tickerFeeds: dict[str, stratify.TickerFeed] = stratify.downloadMany(tickers, datetime(2021, 1, 1), datetime(2022, 1, 1), source=source, backoff=0)
+
+    # Check that every ticker is downloaded once per batch, and only the failed ticker is retried
+    assert list(tickerFeeds) == ['AAPL', 'MSFT', 'FLAKY', 'GOOG'], 'Every distinct ticker should be downloaded, in order'
+    assert sorted(source.requests) == [['AAPL', 'MSFT'], ['FLAKY'], ['FLAKY', 'GOOG']], 'Tickers should be requested in batches, retrying only failed tickers'
+    assert all(len(tickerFeed) == 252 and tickerFeed._tickers == [ticker] for ticker, tickerFeed in tickerFeeds.items()), 'Each TickerFeed should hold the ticker\'s bars of the range'
+
+    # Check that tickers failing every attempt raise an error
+    try:
+        stratify.downloadMany(['FLAKY_NEW'], datetime(2021, 1, 1), datetime(2022, 1, 1), source=source, retries=0)
+        assert False, 'Failed download should raise an error'
+    except RuntimeError:
+        pass
+
+    # Check that cached tickers are not downloaded again
+    with tempfile.TemporaryDirectory() as directory:
+        cache: stratify.DataCache = stratify.DataCache(directory)
+        stratify.downloadMany(['AAPL', 'MSFT'], datetime(2021, 1, 1), datetime(2022, 1, 1), cache=cache, source=source)
+        requestCount: int = len(source.requests)
+        cachedTickerFeed: stratify.TickerFeed = stratify.downloadData('MSFT', datetime(2021, 6, 1), datetime(2022, 1, 1), cache=cache, source=source)
+        assert len(source.requests) == requestCount, 'Cached ticker should not be downloaded again'
+        assert cachedTickerFeed == tickerFeeds['MSFT'].getByDateRange(datetime(2021, 6, 1)), 'Cached ticker should hold the downloaded bars'
+
+        # Check that only the part of the range the cache does not hold is downloaded, next to a ticker it does not hold
+        requestCount = len(source.requests)
+        tickerFeeds = stratify.downloadMany(['MSFT', 'GOOG'], datetime(2021, 1, 1), datetime(2022, 6, 1), cache=cache, source=source)
+        assert sorted(zip(map(tuple, source.requests[requestCount:]), source.requestedRanges[requestCount:])) == [(('GOOG',), (datetime(2021, 1, 1), datetime(2022, 6, 1))), (('MSFT',), (datetime(2022, 1, 1), datetime(2022, 6, 1)))], 'Partially cached ticker should only download the missing range'
+        assert np.array_equal(tickerFeeds['MSFT'].dateTimes, tickerFeeds['GOOG'].dateTimes) and np.array_equal(tickerFeeds['MSFT'].closes, tickerFeeds['GOOG'].closes), 'Partially cached ticker should hold every bar of the range'
+
+def test_mergeTickerFeeds():
+    # Create ticker feeds with interleaved, partially overlapping and unsorted timestamps
+    tickerFeedAAPL: stratify.TickerFeed = stratify.TickerFeed()
+    tickerFeedAAPL.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 3), open=100, close=200, low=50, high=300, volume=1000))
+    tickerFeedAAPL.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1), open=100, close=200, low=50, high=300, volume=1000))
+    tickerFeedAAPL.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 2), open=100, close=200, low=50, high=300, volume=1000))
+
+    tickerFeedGOOG: stratify.TickerFeed = stratify.TickerFeed()
+    tickerFeedGOOG.append(stratify.TickerData(ticker='GOOG', dateTime=datetime(2001, 1, 2), open=100, close=200, low=50, high=300, volume=1000))
+    tickerFeedGOOG.append(stratify.TickerData(ticker='GOOG', dateTime=datetime(2001, 1, 4), open=100, close=200, low=50, high=300, volume=1000))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeedAAPL)
+    backtestEngine.addTickerFeed(tickerFeedGOOG)
+
+    mergedTickerFeeds: list = list(backtestEngine.__mergeTickerFeeds__())
+
+    # Check that timestamps are unique and yielded in chronological order
+    assert [dateTime for dateTime, _ in mergedTickerFeeds] == [datetime(2001, 1, 1), datetime(2001, 1, 2), datetime(2001, 1, 3), datetime(2001, 1, 4)], 'Merged timestamps should be unique and in chronological order'
+
+    # Check that bars sharing a timestamp are grouped in the order their feeds were added
+    assert [[tickerData.ticker for tickerData in bars] for _, bars in mergedTickerFeeds] == [['AAPL'], ['AAPL', 'GOOG'], ['AAPL'], ['GOOG']], 'Bars should be grouped by timestamp in feed order'
+
+    # Check that every bar carries the timestamp it was grouped under
+    for dateTime, bars in mergedTickerFeeds:
+        assert all(tickerData.dateTime == dateTime for tickerData in bars), 'Grouped bars should share the same timestamp'
+
+def createTickerFeeds() -> list[stratify.TickerFeed]:
+    # Create deterministic ticker feeds for backtests that do not depend on downloaded data
+    tickerFeeds: list[stratify.TickerFeed] = []
+    for tickerIndex, ticker in enumerate(['AAPL', 'GOOG', 'MSFT']):
+        tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+        for day in range(60):
+            close: float = 100.0 + 10.0 * tickerIndex + 5.0 * math.sin(day / (3.0 + tickerIndex)) + 0.1 * day
+            tickerFeed.append(stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, 1) + timedelta(days=day), open=close - 1.0, close=close, low=close - 2.0, high=close + 2.0, volume=1000))
+        tickerFeeds.append(tickerFeed)
+    return tickerFeeds
+
+def streamTickerFeed(tickerFeed: stratify.TickerFeed, chunkSize: int) -> stratify.StreamingTickerFeed:
+    # Stream a ticker feed in chunks, as slices of the feed
+    return stratify.StreamingTickerFeed(tickerFeed._tickers, lambda: (tickerFeed[chunkStart:chunkStart + chunkSize] for chunkStart in range(0, len(tickerFeed), chunkSize)))
+
+def runBacktest(strategyClasses: list[type[stratify.Strategy]], parallel: bool = False, streamed: bool = False, subAccounts: bool = False) -> stratify.BacktestEngine:
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    for tickerFeed in createTickerFeeds():
+        backtestEngine.addTickerFeed(streamTickerFeed(tickerFeed, 7) if streamed else tickerFeed)
+    for strategyClass in strategyClasses:
+        backtestEngine.addStrategy(strategyClass)
+
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.broker.setCommissionPercent(0.001)
+    backtestEngine.broker.setSlippagePercent(0.0)
+
+    if parallel: backtestEngine.runParallel(maxWorkers=2)
+    else: backtestEngine.run(subAccounts=subAccounts)
+    return backtestEngine
+
+def getComparableStatistics(strategy: stratify.Strategy) -> dict[str, Any]:
+    statistics: dict[str, Any] = {}
+    for statisticID in (stratify.StatID.TOTAL_RETURN, stratify.StatID.ANNUALIZED_RETURN, stratify.StatID.STARTING_CASH,
+                        stratify.StatID.FINAL_PORTFOLIO_VALUE, stratify.StatID.NET_PROFIT_OR_LOSS, stratify.StatID.VOLATILITY,
+                        stratify.StatID.MAX_DRAWDOWN, stratify.StatID.TRADES):
+        statistics[statisticID] = strategy.getStatistic(statisticID)
+    return statistics
+
+def test_runParallel():
+    strategyClasses: list[type[stratify.Strategy]] = [MyTestStrategy_BuyAndHold, MyTestStrategy_BuyAndSellFlip]
+
+    # Run every strategy in parallel, each with its own broker
+    parallelBacktestEngine: stratify.BacktestEngine = runBacktest(strategyClasses, parallel=True)
+
+    # Check each strategy's statistics match a serial run of that strategy on its own
+    for strategy, strategyClass in zip(parallelBacktestEngine.strategies, strategyClasses):
+        serialBacktestEngine: stratify.BacktestEngine = runBacktest([strategyClass])
+        assert getComparableStatistics(strategy) == getComparableStatistics(serialBacktestEngine.strategies[0]), f'Parallel statistics of {strategyClass.__name__} should match a serial run'
+
+    assert parallelBacktestEngine.strategies[1].getStatistic(stratify.StatID.TRADES)['total'] > 0, 'The flip strategy should have made trades'
+
+    # Check that running in parallel after a serial run does not add the default trackers a second time
+    rerunBacktestEngine: stratify.BacktestEngine = runBacktest(strategyClasses)
+    rerunBacktestEngine.runParallel(maxWorkers=2)
+    statisticIDs: list[str] = [statisticTracker.statisticID for statisticTracker in rerunBacktestEngine.strategies[0]._statisticsManager._statisticTrackers]
+    assert len(statisticIDs) == len(set(statisticIDs)), 'Every default tracker should only be added once'
+
+def test_BacktestEngine_subAccounts():
+    strategyClasses: list[type[stratify.Strategy]] = [MyTestStrategy_BuyAndHold, MyTestStrategy_BuyAndSellFlip, MyTestStrategy_PeriodicFlip]
+
+    # Run every strategy in one pass over the feeds, each with its own sub-account
+    backtestEngine: stratify.BacktestEngine = runBacktest(strategyClasses, subAccounts=True)
+    assert len({id(broker) for broker in backtestEngine.brokers}) == 3, 'Every strategy should trade through its own broker'
+    assert backtestEngine.broker.cash == 10000 and backtestEngine.broker.getPosition('AAPL') == 0, 'Engine broker should only be the template of the sub-accounts'
+
+    # Check each strategy's statistics match a run of that strategy on its own
+    for strategy, broker, strategyClass in zip(backtestEngine.strategies, backtestEngine.brokers, strategyClasses):
+        serialBacktestEngine: stratify.BacktestEngine = runBacktest([strategyClass])
+        assert getComparableStatistics(strategy) == getComparableStatistics(serialBacktestEngine.strategies[0]), f'Sub-account statistics of {strategyClass.__name__} should match a run on its own'
+        assert broker.cash == serialBacktestEngine.broker.cash, f'Sub-account of {strategyClass.__name__} should end with the cash of a run on its own'
+
+    # Check that without sub-accounts the strategies share the engine's broker
+    sharedBacktestEngine: stratify.BacktestEngine = runBacktest(strategyClasses)
+    assert all(broker is sharedBacktestEngine.broker for broker in sharedBacktestEngine.brokers), 'Strategies should share the engine broker by default'
+
+class MyTestEndlessFeed(stratify.feeds.BarFeed):
+    # Repeats the bars of a feed forever, one day later each time, with an empty batch between days, recording whether it was closed
+    def __init__(self, tickerFeed: stratify.TickerFeed):
+        self.tickerFeed: stratify.TickerFeed = tickerFeed
+        self.isClosed: bool = False
+
+    async def bars(self):
+        day: int = 0
+        while True:
+            tickerData: stratify.TickerData = self.tickerFeed[day % len(self.tickerFeed)]
+            yield [stratify.TickerData(ticker=tickerData.ticker, dateTime=self.tickerFeed[0].dateTime + timedelta(days=day), open=tickerData.open, close=tickerData.close, low=tickerData.low, high=tickerData.high, volume=tickerData.volume)]
+            day += 1
+            yield []
+
+    async def close(self) -> None:
+        self.isClosed = True
+
+def test_PaperTradingEngine():
+    strategyClasses: list[type[stratify.Strategy]] = [MyTestStrategy_BuyAndHold, MyTestStrategy_BuyAndSellFlip, MyTestStrategy_PeriodicFlip]
+
+    # Paper trade every strategy on the replayed feeds, each with its own sub-account
+    paperTradingEngine: stratify.PaperTradingEngine = stratify.PaperTradingEngine()
+    for tickerFeed in createTickerFeeds():
+        paperTradingEngine.addTickerFeed(tickerFeed)
+    for strategyClass in strategyClasses:
+        paperTradingEngine.addStrategy(strategyClass)
+    paperTradingEngine.broker.setCash(10000)
+    paperTradingEngine.broker.setCommissionPercent(0.001)
+    paperTradingEngine.broker.setSlippagePercent(0.0)
+    paperTradingEngine.run(subAccounts=True)
+
+    # Check each strategy's statistics match a backtest of that strategy on the same bars
+    for strategy, strategyClass in zip(paperTradingEngine.strategies, strategyClasses):
+        backtestEngine: stratify.BacktestEngine = runBacktest([strategyClass])
+        assert getComparableStatistics(strategy) == getComparableStatistics(backtestEngine.strategies[0]), f'Paper trading statistics of {strategyClass.__name__} should match a backtest'
+    assert 0 < paperTradingEngine.maxLatency < 1, 'Latency of every timestamp should be measured'
+
+    # Check that a session on an endless feed runs until stopped, skips empty batches, and closes the feed
+    endlessFeed: MyTestEndlessFeed = MyTestEndlessFeed(createTickerFeeds()[0])
+    endlessPaperTradingEngine: stratify.PaperTradingEngine = stratify.PaperTradingEngine(endlessFeed)
+    endlessPaperTradingEngine.addStrategy(MyTestStrategy_BuyAndSellFlip)
+    endlessPaperTradingEngine.broker.setCash(10000)
+
+    class MyStoppingStrategy(stratify.Strategy):
+        def next(self):
+            if self.dateTime >= datetime(2001, 4, 10): endlessPaperTradingEngine.stop()
+
+    endlessPaperTradingEngine.addStrategy(MyStoppingStrategy)
+    endlessPaperTradingEngine.run()
+    assert endlessFeed.isClosed, 'Feed should be closed once the session ends'
+    assert endlessPaperTradingEngine.broker._dateTime == datetime(2001, 4, 10), 'Session should stop after the timestamp it was stopped on'
+    assert endlessPaperTradingEngine.strategies[0].getStatistic(stratify.StatID.TRADES)['total'] > 0, 'Strategy should trade on the endless feed'
+
+def test_StreamingTickerFeed():
+    strategyClasses: list[type[stratify.Strategy]] = [MyTestStrategy_BuyAndSellFlip, MyTestStrategy_PeriodicFlip]
+
+    # Check that streamed feeds are backtested like feeds held in memory
+    for strategyClass in strategyClasses:
+        streamedStatistics: dict[str, Any] = getComparableStatistics(runBacktest([strategyClass], streamed=True).strategies[0])
+        assert streamedStatistics == getComparableStatistics(runBacktest([strategyClass]).strategies[0]), f'{strategyClass.__name__} statistics should not depend on streaming the feeds'
+
+    # Check that streamed feeds read their dates from their chunks
+    tickerFeed: stratify.TickerFeed = createTickerFeeds()[0]
+    streamingTickerFeed: stratify.StreamingTickerFeed = streamTickerFeed(tickerFeed, 7)
+    assert streamingTickerFeed.getByFirstDate() == tickerFeed.getByFirstDate(), 'First date should be read from the first chunk'
+    assert streamingTickerFeed.getByLastDate() == tickerFeed.getByLastDate(), 'Last date should be read from the last chunk'
+    assert list(streamingTickerFeed) == list(tickerFeed), 'Streamed bars should match the feed'
+
+    # Check that adding streamed feeds to an engine reads each feed's first chunk only once
+    chunkReads: list[str] = []
+    def readChunks(addedTickerFeed: stratify.TickerFeed) -> Iterator[stratify.TickerFeed]:
+        chunkReads.append(addedTickerFeed._tickers[0])
+        yield addedTickerFeed
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    addedTickerFeeds: list[stratify.TickerFeed] = createTickerFeeds()
+    for addedTickerFeed in addedTickerFeeds:
+        backtestEngine.addTickerFeed(stratify.StreamingTickerFeed(addedTickerFeed._tickers, partial(readChunks, addedTickerFeed)))
+    assert chunkReads == [addedTickerFeed._tickers[0] for addedTickerFeed in addedTickerFeeds], 'Each streamed feed should be read once to find its first date'
+
+    # Check that out of order chunks and engines needing whole feeds are rejected
+    reversedTickerFeed: stratify.StreamingTickerFeed = stratify.StreamingTickerFeed(['AAPL'], lambda: iter([tickerFeed[7:], tickerFeed[:7]]))
+    try:
+        list(reversedTickerFeed)
+        assert False, 'Out of order chunks should raise an error'
+    except ValueError:
+        pass
+    try:
+        stratify.VectorizedBacktestEngine().addTickerFeed(streamingTickerFeed)
+        assert False, 'Vectorized engine should reject streamed feeds'
+    except TypeError:
+        pass
+
+def runVectorizedBacktest(strategyClass: type[stratify.VectorStrategy], params: dict[str, Any], cash: float) -> stratify.VectorizedBacktestEngine:
+    vectorizedBacktestEngine: stratify.VectorizedBacktestEngine = stratify.VectorizedBacktestEngine()
+    for tickerFeed in createTickerFeeds():
+        vectorizedBacktestEngine.addTickerFeed(tickerFeed)
+    vectorizedBacktestEngine.addStrategy(strategyClass, params)
+
+    vectorizedBacktestEngine.broker.setCash(cash)
+    vectorizedBacktestEngine.broker.setCommissionPercent(0.001)
+    vectorizedBacktestEngine.broker.setSlippagePercent(0.0)
+
+    vectorizedBacktestEngine.run()
+    return vectorizedBacktestEngine
+
+def assertStatisticsClose(statistics: dict[str, Any], expectedStatistics: dict[str, Any], message: str) -> None:
+    for statisticID, expectedStatistic in expectedStatistics.items():
+        if isinstance(expectedStatistic, dict):
+            assertStatisticsClose(statistics[statisticID], expectedStatistic, message)
+        elif isinstance(expectedStatistic, float):
+            assert math.isclose(statistics[statisticID], expectedStatistic, rel_tol=1e-9, abs_tol=1e-9), f'{message} ({statisticID})'
+        else:
+            assert statistics[statisticID] == expectedStatistic, f'{message} ({statisticID})'
+
+def test_VectorizedBacktestEngine():
+    # Check that order signals match the event driven engine, with plenty of cash, with orders over the bar volume and with cash running out
+    for params, cash in (({'period': 3, 'units': 10}, 100000), ({'period': 2, 'units': 2000}, 100000), ({'period': 4, 'units': 25}, 2500)):
+        backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+        for tickerFeed in createTickerFeeds():
+            backtestEngine.addTickerFeed(tickerFeed)
+        backtestEngine.addStrategy(MyTestStrategy_PeriodicFlip, params)
+        backtestEngine.broker.setCash(cash)
+        backtestEngine.broker.setCommissionPercent(0.001)
+        backtestEngine.run()
+
+        vectorizedBacktestEngine: stratify.VectorizedBacktestEngine = runVectorizedBacktest(MyTestVectorStrategy_PeriodicFlip, params, cash)
+        assertStatisticsClose(getComparableStatistics(vectorizedBacktestEngine.strategies[0]),
+                              getComparableStatistics(backtestEngine.strategies[0]),
+                              f'Vectorized statistics should match the event driven engine for {params} with {cash} cash')
+        assert vectorizedBacktestEngine.strategies[0].getStatistic(stratify.StatID.TRADES)['total'] > 0, 'The strategy should have made trades'
+
+    # Check that target positions hold the targeted units when every order can be filled
+    vectorizedBacktestEngine: stratify.VectorizedBacktestEngine = runVectorizedBacktest(MyTestVectorStrategy_TargetSteps, {'units': 10}, 100000)
+    ordersMade: list[stratify.order.Order] = vectorizedBacktestEngine.strategies[0]._statisticsManager.strategyOrdersMade
+    unitsHeld: dict[str, int] = {}
+    for order in ordersMade:
+        assert order.fillStatus == stratify.order.FillStatus.FILLED, 'Every target order should be filled'
+        unitsHeld[order.ticker] = unitsHeld.get(order.ticker, 0) + (order.units if isinstance(order, stratify.order.BuyOrder) else -order.units)
+    assert unitsHeld == {'AAPL': 10, 'GOOG': 10, 'MSFT': 10}, 'Positions should end at the last target'
+
+    # Check that target positions are repaired when cash runs out, never selling more than is held
+    vectorizedBacktestEngine = runVectorizedBacktest(MyTestVectorStrategy_TargetSteps, {'units': 10}, 2000)
+    ordersMade = vectorizedBacktestEngine.strategies[0]._statisticsManager.strategyOrdersMade
+    assert any(order.fillStatus in (stratify.order.FillStatus.PARTIALLY_FILLED, stratify.order.FillStatus.REJECTED) for order in ordersMade), 'Some target orders should be limited by cash'
+    unitsHeld = {}
+    for order in ordersMade:
+        unitsHeld[order.ticker] = unitsHeld.get(order.ticker, 0) + (order._unitsActuallyTraded if isinstance(order, stratify.order.BuyOrder) else -order._unitsActuallyTraded)
+        assert unitsHeld[order.ticker] >= 0, 'Units held should never be negative'
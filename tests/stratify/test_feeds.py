@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from ... import stratify
+import asyncio
+import pytest
+import time
+
+def createTickerFeed(ticker: str, days: list[int]) -> stratify.TickerFeed:
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for day in days:
+        tickerFeed.append(stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, 1) + timedelta(days=day), open=100.0, close=100.0 + day, low=99.0, high=101.0 + day, volume=1000))
+    return tickerFeed
+
+async def collectBars(feed: stratify.feeds.BarFeed) -> list[list[stratify.TickerData]]:
+    return [timestampTickerData async for timestampTickerData in feed.bars()]
+
+def test_ReplayFeed():
+    # Check that the bars of every feed are replayed in time order, grouped by timestamp
+    replayFeed: stratify.feeds.ReplayFeed = stratify.feeds.ReplayFeed([createTickerFeed('AAPL', [0, 2, 1]), createTickerFeed('MSFT', [1, 3])])
+    replayedBars: list[list[stratify.TickerData]] = asyncio.run(collectBars(replayFeed))
+    assert [[(tickerData.ticker, tickerData.close) for tickerData in timestampTickerData] for timestampTickerData in replayedBars] == [[('AAPL', 100.0)], [('AAPL', 101.0), ('MSFT', 101.0)], [('AAPL', 102.0)], [('MSFT', 103.0)]], 'Bars should be replayed in time order, grouped by timestamp'
+
+    # Check that a replay speed paces the bars, three days replayed at a day per 50 milliseconds
+    pacedReplayFeed: stratify.feeds.ReplayFeed = stratify.feeds.ReplayFeed([createTickerFeed('AAPL', [0, 1, 2, 3])], speed=timedelta(days=1).total_seconds() / 0.05)
+    startTime: float = time.perf_counter()
+    assert len(asyncio.run(collectBars(pacedReplayFeed))) == 4, 'Every bar should be replayed'
+    assert time.perf_counter() - startTime >= 0.15, 'Bars should be replayed no faster than the replay speed'
+
+    # Check that invalid speeds are rejected
+    with pytest.raises(ValueError):
+        stratify.feeds.ReplayFeed([], speed=0)
+
+async def streamTicks(ticks: list[stratify.Tick]):
+    for tick in ticks:
+        yield tick
+
+def test_TickBarFeed():
+    # Create trades of two tickers every 20 seconds, completing two minute bars of each and leaving one open
+    ticks: list[stratify.Tick] = [stratify.Tick(ticker, datetime(2001, 1, 1, 9, 30) + timedelta(seconds=20 * index), 100.0 + index, 1) for index in range(1, 8) for ticker in ['AAPL', 'GOOG']]
+    tickBarFeed: stratify.feeds.TickBarFeed = stratify.feeds.TickBarFeed(streamTicks(ticks), stratify.TickAggregator(interval=timedelta(minutes=1)))
+
+    # Check that bars are yielded grouped by timestamp, the open bars once the ticks end
+    aggregatedBars: list[list[stratify.TickerData]] = asyncio.run(collectBars(tickBarFeed))
+    assert [[(tickerData.ticker, tickerData.dateTime.minute, tickerData.volume) for tickerData in timestampTickerData] for timestampTickerData in aggregatedBars] == [[('AAPL', 31, 3), ('GOOG', 31, 3)], [('AAPL', 32, 3), ('GOOG', 32, 3)], [('AAPL', 33, 1), ('GOOG', 33, 1)]], 'Bars should be grouped by timestamp, partial bars flushed at the end'
+
+    # Check that strategies can be paper traded on the aggregated bars
+    paperTradingEngine: stratify.PaperTradingEngine = stratify.PaperTradingEngine(stratify.feeds.TickBarFeed(streamTicks(ticks), stratify.TickAggregator(numTicks=2)))
+    paperTradingEngine.addStrategy(stratify.Strategy)
+    paperTradingEngine.broker.setCash(10000)
+    paperTradingEngine.run()
+    assert paperTradingEngine.broker._dateTime == datetime(2001, 1, 1, 9, 32, 20), 'Every aggregated bar should be traded on'
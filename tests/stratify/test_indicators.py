@@ -0,0 +1,125 @@
+from .test_engine import createTickerFeeds
+from ... import stratify
+from typing import Any
+import numpy as np
+import math
+
+class MyIndicatorStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.precompute: bool = True
+        self.values: dict[str, list[Any]] = {}
+
+    def start(self):
+        self.sma = self.addIndicator(stratify.indicators.SMA(5), self.precompute)
+        self.macd = self.addIndicator(stratify.indicators.MACD(3, 6, 4), self.precompute)
+
+    def next(self):
+        self.values.setdefault(self.ticker, []).append((self.sma.value, self.macd.signal, self.macd.isReady))
+
+class MyLateIndicatorStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.bars: int = 0
+        self.values: dict[str, list[Any]] = {}
+
+    def next(self):
+        self.bars += 1
+        if self.bars == 10:
+            self.sma = self.addIndicator(stratify.indicators.SMA(5))
+        if self.bars > 12:
+            self.values.setdefault(self.ticker, []).append((self.dateTime, self.sma.value))
+
+def createIndicators() -> list[stratify.indicators.Indicator]:
+    return [stratify.indicators.SMA(5),
+            stratify.indicators.SMA(4, field='volume'),
+            stratify.indicators.EMA(5),
+            stratify.indicators.RollingStd(5),
+            stratify.indicators.RollingStd(5, ddof=1),
+            stratify.indicators.Bollinger(5, 2.0),
+            stratify.indicators.RSI(5),
+            stratify.indicators.MACD(3, 6, 4),
+            stratify.indicators.ATR(5)]
+
+def test_Indicator_precompute():
+    tickerFeed: stratify.TickerFeed = createTickerFeeds()[0]
+
+    # Check that precomputed values match values updated bar by bar
+    for indicator in createIndicators():
+        precomputedValues: dict[str, np.ndarray] = indicator.precompute(tickerFeed)
+        assert set(precomputedValues.keys()) == set(indicator.OUTPUTS), f'{type(indicator).__name__} should precompute every output'
+
+        for barIndex, tickerData in enumerate(tickerFeed):
+            indicator.update(tickerData)
+            for output in indicator.OUTPUTS:
+                value: Any = getattr(indicator, output)
+                precomputedValue: float = float(precomputedValues[output][barIndex])
+                if value == None:
+                    assert math.isnan(precomputedValue), f'{type(indicator).__name__}.{output} should not be ready on bar {barIndex}'
+                else:
+                    assert math.isclose(value, precomputedValue, rel_tol=1e-9, abs_tol=1e-9), f'{type(indicator).__name__}.{output} should match its precomputed value on bar {barIndex}'
+
+        assert indicator.isReady, f'{type(indicator).__name__} should be ready after the whole feed'
+
+def test_Indicator_values():
+    closes: np.ndarray = np.asarray(createTickerFeeds()[0].closes)
+    tickerFeed: stratify.TickerFeed = createTickerFeeds()[0]
+
+    # Check simple moving average and rolling standard deviation against their definitions
+    assert np.allclose(stratify.indicators.SMA(5).precompute(tickerFeed)['value'][4:], [closes[i - 4:i + 1].mean() for i in range(4, len(closes))]), 'SMA should average the last 5 closes'
+    assert np.allclose(stratify.indicators.RollingStd(5).precompute(tickerFeed)['value'][4:], [closes[i - 4:i + 1].std() for i in range(4, len(closes))]), 'RollingStd should be the population standard deviation of the last 5 closes'
+
+    # Check the exponential moving average recursion and seed
+    ema: stratify.indicators.EMA = stratify.indicators.EMA(5)
+    expectedValue: float = closes[:5].mean()
+    for barIndex, tickerData in enumerate(tickerFeed):
+        ema.update(tickerData)
+        if barIndex > 4: expectedValue += (2.0 / 6.0) * (closes[barIndex] - expectedValue)
+        if barIndex >= 4: assert math.isclose(ema.value, expectedValue), 'EMA should follow its recursion'
+
+    # Check the relative strength index bounds
+    rsiValues: np.ndarray = stratify.indicators.RSI(5).precompute(tickerFeed)['value'][5:]
+    assert ((rsiValues >= 0.0) & (rsiValues <= 100.0)).all(), 'RSI should be between 0 and 100'
+
+def test_Strategy_addIndicator():
+    strategyValues: list[dict[str, list[Any]]] = []
+    for precompute in (True, False):
+        backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+        for tickerFeed in createTickerFeeds():
+            backtestEngine.addTickerFeed(tickerFeed)
+        backtestEngine.addStrategy(MyIndicatorStrategy, {'precompute': precompute})
+        backtestEngine.broker.setCash(10000)
+        backtestEngine.run()
+        strategyValues.append(backtestEngine.strategies[0].values)
+
+    precomputedValues, updatedValues = strategyValues
+
+    # Check that each ticker's indicator only sees that ticker's bars
+    for ticker, tickerFeed in zip(['AAPL', 'GOOG', 'MSFT'], createTickerFeeds()):
+        closes: np.ndarray = np.asarray(tickerFeed.closes)
+        smaValues: list[Any] = [value[0] for value in updatedValues[ticker][:len(closes)]]
+        assert smaValues[:4] == [None] * 4, 'SMA should not be ready before 5 bars'
+        assert np.allclose(smaValues[4:], [closes[i - 4:i + 1].mean() for i in range(4, len(closes))]), f'SMA of {ticker} should average its own closes'
+
+    # Check that precomputed values match values updated bar by bar in a backtest
+    for ticker in updatedValues:
+        for precomputedValue, updatedValue in zip(precomputedValues[ticker], updatedValues[ticker]):
+            for precomputedOutput, updatedOutput in zip(precomputedValue, updatedValue):
+                if isinstance(updatedOutput, float): assert math.isclose(precomputedOutput, updatedOutput, rel_tol=1e-9), 'Precomputed indicator values should match updated ones'
+                else: assert precomputedOutput == updatedOutput, 'Precomputed indicator readiness should match updated ones'
+
+    # Check that an indicator declared after the first bars is precomputed in line with the bars it is updated with
+    backtestEngine = stratify.BacktestEngine()
+    for tickerFeed in createTickerFeeds():
+        backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyLateIndicatorStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+
+    for ticker, tickerFeed in zip(['AAPL', 'GOOG', 'MSFT'], createTickerFeeds()):
+        smaValues: np.ndarray = stratify.indicators.SMA(5).precompute(tickerFeed)['value']
+        barIndices: dict[Any, int] = {tickerData.dateTime: barIndex for barIndex, tickerData in enumerate(tickerFeed)}
+        lateValues: list[Any] = backtestEngine.strategies[0].values[ticker]
+        assert all(math.isclose(value, smaValues[barIndices[dateTime]]) for dateTime, value in lateValues), f'Late SMA of {ticker} should match the precomputed value of each bar'
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta, timezone
+from ... import stratify
+import numpy as np
+import pickle
+import gc
+
+class MyLedgerStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 1: self.buy(10)
+        if self.dateTime.day == 3: self.sell(4)
+        if self.dateTime.day == 4: self.closePosition()
+
+class MyOtherLedgerStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 4: self.buy(5)
+
+class MyTickerTradesStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.ticker == 'AAPL' and self.dateTime.day == 1: self.buy(10)
+        if self.ticker == 'GOOG' and self.dateTime.day == 3: self.buy(10)
+        if self.ticker == 'GOOG' and self.dateTime.day == 4: self.sell(10)
+
+class MyHoldingStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 1: self.buy(10)
+
+class MyShortTradesStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 2: self.sell(5)
+        if self.dateTime.day == 4: self.buy(5)
+
+class MyOrderRetentionStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 1: self.buy(10)
+        if self.dateTime.day == 2: self.sell(20, limitPrice=1000)
+        if self.dateTime.day == 3: self.sell(4)
+        if self.dateTime.day == 4: self.closePosition()
+        if self.dateTime.day == 5: self.sell(1)
+
+class MyProfitOrLossTracker(stratify.StatisticTracker):
+    def __init__(self):
+        super().__init__('profit_or_loss')
+
+        self.profitsOrLosses: list[tuple[float, float]] = []
+
+    def update(self) -> None:
+        self.profitsOrLosses.append((self.ssNetCashProfitOrLoss, self.ssNetValueProfitOrLoss))
+
+    def getStats(self) -> list[tuple[float, float]]:
+        return self.profitsOrLosses
+
+def test_FillLedger():
+    # Record fills of two tickers, with time zone aware dates
+    fillLedger: stratify.FillLedger = stratify.FillLedger()
+    for day in range(20):
+        fillLedger.append('AAPL' if day % 2 == 0 else 'GOOG', datetime(2001, 1, day + 1, tzinfo=timezone(timedelta(hours=-5))), stratify.order.OrderSide.BUY if day % 3 == 0 else stratify.order.OrderSide.SELL, day + 1, 100.0 + day, 1.0, -100.0 * day)
+
+    # Check that every column holds the fills in the order they were recorded
+    assert len(fillLedger) == 20, 'Ledger should hold every fill'
+    assert fillLedger.tickers == ['AAPL', 'GOOG'] and list(fillLedger.tickerIds[:3]) == [0, 1, 0], 'Tickers should be stored as ids'
+    assert fillLedger.dateTimes[0] == np.datetime64('2001-01-01T05:00'), 'Dates should be stored in UTC'
+    assert list(fillLedger.sides[:4]) == [1, -1, -1, 1], 'Sides should be stored as +1 for buys and -1 for sells'
+    assert list(fillLedger.units[-2:]) == [19, 20] and fillLedger.prices[-1] == 119.0, 'Units and prices should be stored per fill'
+    assert fillLedger.cashImpacts.sum() == -100.0 * sum(range(20)) and fillLedger.commissions.sum() == 20.0, 'Cash impacts and commissions should be stored per fill'
+
+    # Check that the columns are read-only, and that pickling trims the unused capacity
+    assert not fillLedger.units.flags.writeable, 'Ledger columns should be read-only'
+    unpickledLedger: stratify.FillLedger = pickle.loads(pickle.dumps(fillLedger))
+    assert len(unpickledLedger._units) == 20 and list(unpickledLedger.units) == list(fillLedger.units), 'Pickled ledger should hold only its fills'
+
+def test_FillLedger_strategy():
+    # Create a daily feed and trade it with market orders
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for day in range(1, 6):
+        tickerFeed.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day), open=100, close=100 + 10 * day, low=90, high=160, volume=1000))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyLedgerStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.broker.setCommissionPercent(0.01)
+    backtestEngine.run()
+    strategy: MyLedgerStrategy = backtestEngine.strategies[0]
+
+    # Check that orders are slotted and dated by the bars they were placed and filled on
+    buyOrder: stratify.order.Order = strategy._statisticsManager.strategyOrdersMade[0]
+    assert not hasattr(buyOrder, '__dict__'), 'Orders should be slotted'
+    assert buyOrder._openedStartTime == buyOrder._closedEndTime == datetime(2001, 1, 1), 'Order should be dated by the bar it filled on'
+
+    # Check that every fill of the strategy is in its ledger, with its price and commission
+    fills: stratify.FillLedger = strategy._statisticsManager.fills
+    assert list(fills.units) == [10, 4, 6] and list(fills.sides) == [1, -1, -1], 'Ledger should hold every fill of the strategy'
+    assert list(fills.prices) == [110, 130, 140], 'Fills should be priced at the close'
+    assert np.allclose(fills.commissions, [11, 5.2, 8.4]), 'Fills should record the commission paid'
+    assert np.allclose(fills.cashImpacts, [-1111, 514.8, 831.6]), 'Fills should record their cash impact'
+
+    # Check that trades are read from the ledger, held for the bars between their fills
+    trades: dict = strategy.getStatistic(stratify.StatID.TRADES)
+    assert trades['total'] == 2 and trades['won'] == 2, 'Both sells should close a winning trade'
+    assert trades['avg_holding_period'] == timedelta(days=2.5), 'Holding period should be measured in bar time'
+
+def test_FillLedger_tickerTrades():
+    # Create daily feeds of two tickers, one bought and held while the other is bought and sold later
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    for ticker, firstClose in (('AAPL', 100), ('GOOG', 50)):
+        backtestEngine.addTickerFeed(stratify.TickerFeed([stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, day), open=firstClose, close=firstClose + 10 * day, low=firstClose - 10, high=firstClose + 60, volume=1000) for day in range(1, 6)]))
+    backtestEngine.addStrategy(MyTickerTradesStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: MyTickerTradesStrategy = backtestEngine.strategies[0]
+
+    # Check that the sell is only matched with the buy of its own ticker
+    trades: dict = strategy.getStatistic(stratify.StatID.TRADES)
+    assert trades['total'] == 1 and trades['won'] == 1, 'The sell should close one winning trade'
+    assert trades['avg_profit_per_trade'] == 100, 'Trade should be priced by the fills of its own ticker'
+    assert trades['avg_holding_period'] == timedelta(days=1), 'Trade should be held from the buy of its own ticker'
+
+def test_FillLedger_shortTrades():
+    # Create a daily feed, sold by one strategy out of the position another strategy holds in the shared broker
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed([stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day), open=100, close=100 - 10 * day, low=40, high=100, volume=1000) for day in range(1, 6)])
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyHoldingStrategy)
+    backtestEngine.addStrategy(MyShortTradesStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: MyShortTradesStrategy = backtestEngine.strategies[1]
+
+    # Check that a trade opened by a sell is held from the sell to the buy closing it
+    trades: dict = strategy.getStatistic(stratify.StatID.TRADES)
+    assert trades['total'] == 1 and trades['won'] == 1, 'Buying back below the sell should close one winning trade'
+    assert trades['avg_holding_period'] == timedelta(days=2), 'Short trade should be held from its sell to its buy'
+
+def test_FillLedger_profitOrLoss():
+    # Create a daily feed closing 10 higher every day, traded by two strategies sharing a broker
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for day in range(1, 6):
+        tickerFeed.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day), open=100, close=100 + 10 * day, low=90, high=160, volume=1000))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyLedgerStrategy)
+    backtestEngine.addStrategy(MyOtherLedgerStrategy)
+    backtestEngine.addStatistic(MyProfitOrLossTracker)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.broker.setCommissionPercent(0.01)
+    backtestEngine.run()
+    strategy, otherStrategy = backtestEngine.strategies
+
+    # Buy 10 at 110 (-1111), sell 4 at 130 (+514.8) and close 6 at 140 (+831.6), each fill seen from the next bar on
+    profitsOrLosses: list[tuple[float, float]] = strategy.getStatistic('profit_or_loss')
+    expectedProfitsOrLosses: list[tuple[float, float]] = [(0, 0), (-1111, -1111 + 10 * 120), (-1111, -1111 + 10 * 130), (-596.2, -596.2 + 6 * 140), (235.4, 235.4)]
+    assert np.allclose(profitsOrLosses, expectedProfitsOrLosses), 'Ledger should hold the cash and value profit or loss of the strategy\'s fills'
+    assert list(strategy._statisticsManager.fills.units) == [10, 4, 6], 'Each fill should be recorded once'
+
+    # Check that fills of a strategy sharing the broker are only recorded for that strategy
+    otherProfitsOrLosses: list[tuple[float, float]] = otherStrategy.getStatistic('profit_or_loss')
+    assert np.allclose(otherProfitsOrLosses[-1], (-707, -707 + 5 * 150)), 'Other strategy should only see its own buy of 5 at 140'
+    assert list(otherStrategy._statisticsManager.fills.units) == [5], 'Other strategy\'s ledger should only hold its own fill'
+
+def test_FillLedger_closedOrders():
+    # Create a daily feed of a ticker no other test trades, traded with market orders, a limit order that keeps resting and a rejected sell
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for day in range(1, 7):
+        tickerFeed.append(stratify.TickerData(ticker='RETAINED', dateTime=datetime(2001, 1, day), open=100, close=100 + 10 * day, low=90, high=160, volume=1000))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyOrderRetentionStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: MyOrderRetentionStrategy = backtestEngine.strategies[0]
+
+    # Check that only the resting limit order is still alive, closed orders are not kept by the broker or the statistics
+    gc.collect()
+    liveOrders: list[stratify.order.Order] = [liveObject for liveObject in gc.get_objects() if isinstance(liveObject, stratify.order.Order) and liveObject.ticker == 'RETAINED']
+    assert [type(order) for order in liveOrders] == [stratify.order.LimitOrder], 'Closed orders should not be kept once recorded in the ledger'
+    del liveOrders
+
+    # Check that closed orders are rebuilt from the ledger
+    closedOrders: list[stratify.order.Order] = list(strategy._statisticsManager.strategyOrdersMade)[1:]
+    assert [(type(order), order.units, order._unitsActuallyTraded, order.fillStatus) for order in closedOrders] == [(stratify.order.BuyOrder, 10, 10, stratify.order.FillStatus.FILLED),
+                                                                                                                  (stratify.order.SellOrder, 4, 4, stratify.order.FillStatus.FILLED),
+                                                                                                                  (stratify.order.SellOrder, 6, 6, stratify.order.FillStatus.FILLED)], 'Closed orders should be rebuilt from the ledger'
+    assert closedOrders[1]._openedStartTime == closedOrders[1]._closedEndTime == datetime(2001, 1, 3) and closedOrders[1]._fillPrice == 130, 'Rebuilt orders should keep their dates and price'
+    assert len(backtestEngine.broker.__getOrdersSnapshot__()[2]) == 3, 'Broker should read its closed orders from its ledger'
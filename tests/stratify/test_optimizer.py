@@ -0,0 +1,125 @@
+from ..my_test_strategies import MyTestStrategy_PeriodicFlip
+from .test_engine import createTickerFeeds
+from ... import stratify
+from datetime import datetime
+from typing import Any
+import tempfile
+import pandas
+import pytest
+import os
+
+class MyRecordedStrategy_PeriodicFlip(MyTestStrategy_PeriodicFlip):
+    # Records every trial it is backtested in as a file named after its period
+    def __init__(self):
+        super().__init__()
+
+        self.recordDirectory: str = ''
+
+    def start(self):
+        open(os.path.join(self.recordDirectory, str(self.period)), 'w').close()
+
+def createOptimizer(paramSpace: dict[str, list[Any]], targetStatisticID: str = stratify.StatID.TOTAL_RETURN) -> stratify.Optimizer:
+    optimizer: stratify.Optimizer = stratify.Optimizer(MyTestStrategy_PeriodicFlip, paramSpace, targetStatisticID)
+    for tickerFeed in createTickerFeeds():
+        optimizer.addTickerFeed(tickerFeed)
+
+    optimizer.broker.setCash(10000)
+    optimizer.broker.setCommissionPercent(0.001)
+    optimizer.broker.setSlippagePercent(0.0)
+    return optimizer
+
+def runBacktest(params: dict[str, Any]) -> stratify.Strategy:
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    for tickerFeed in createTickerFeeds():
+        backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyTestStrategy_PeriodicFlip, params)
+
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.broker.setCommissionPercent(0.001)
+    backtestEngine.broker.setSlippagePercent(0.0)
+
+    backtestEngine.run()
+    return backtestEngine.strategies[0]
+
+def test_Optimizer_gridSearch():
+    paramSpace: dict[str, list[Any]] = {'period': [2, 3, 4], 'units': [5, 10]}
+    results: pandas.DataFrame = createOptimizer(paramSpace).gridSearch(maxWorkers=2)
+
+    # Check that every combination was backtested and ranked from best to worst
+    assert len(results) == 6, 'Every combination of parameters should be backtested'
+    assert list(results.index) == [1, 2, 3, 4, 5, 6], 'Results should be indexed by rank'
+    assert results['target'].is_monotonic_decreasing, 'Results should be ranked by descending target'
+    assert set(zip(results['period'], results['units'])) == {(2, 5), (2, 10), (3, 5), (3, 10), (4, 5), (4, 10)}, 'Results should hold every combination'
+
+    # Check that each trial matches a serial backtest with the same parameters
+    for _, row in results.iterrows():
+        strategy: stratify.Strategy = runBacktest({'period': row['period'], 'units': row['units']})
+        assert row['target'] == strategy.getStatistic(stratify.StatID.TOTAL_RETURN), 'Trial target should match a serial backtest'
+        assert row[stratify.StatID.FINAL_PORTFOLIO_VALUE] == strategy.getStatistic(stratify.StatID.FINAL_PORTFOLIO_VALUE), 'Trial statistics should match a serial backtest'
+
+def test_Optimizer_randomSearch():
+    paramSpace: dict[str, list[Any]] = {'period': [2, 3, 4, 5], 'units': [5, 10, 20]}
+
+    # Check that sampled combinations are distinct and reproducible
+    results: pandas.DataFrame = createOptimizer(paramSpace).randomSearch(5, seed=7, maxWorkers=2)
+    assert len(results) == 5, 'The requested number of trials should be backtested'
+    assert len(set(zip(results['period'], results['units']))) == 5, 'Sampled combinations should be distinct'
+    reproducedResults: pandas.DataFrame = createOptimizer(paramSpace).randomSearch(5, seed=7, maxWorkers=2)
+    assert results[['period', 'units', 'target']].equals(reproducedResults[['period', 'units', 'target']]), 'Sampling should be reproducible with a seed'
+
+    # Check that the number of trials is capped at the size of the parameter space
+    assert len(createOptimizer(paramSpace).randomSearch(100, seed=7, maxWorkers=2)) == 12, 'Trials should be capped at the number of combinations'
+
+def test_Optimizer_successiveHalving():
+    paramSpace: dict[str, list[Any]] = {'period': [2, 3, 4, 5, 6], 'units': [1, 5, 10, 20]}
+    results: pandas.DataFrame = createOptimizer(paramSpace).successiveHalving(reductionFactor=3, minBudget=0.1, maxWorkers=2)
+
+    # Check that every combination is reported once, with survivors of later rounds ranked first
+    assert len(results) == 20, 'Every combination should be reported'
+    assert results['budget'].is_monotonic_decreasing, 'Combinations backtested on more data should rank first'
+    assert list(results['budget'].value_counts().sort_index()) == [14, 4, 2], 'Each round should keep a third of the combinations'
+
+    # Check that the finalists were backtested on every bar
+    for _, row in results[results['budget'] == 1.0].iterrows():
+        strategy: stratify.Strategy = runBacktest({'period': row['period'], 'units': row['units']})
+        assert row['target'] == strategy.getStatistic(stratify.StatID.TOTAL_RETURN), 'Finalists should be backtested on every bar'
+
+    # Check that feeds starting after the first rounds' budgets are skipped in those rounds
+    lateOptimizer: stratify.Optimizer = createOptimizer(paramSpace)
+    lateTickerFeed: stratify.TickerFeed = createTickerFeeds()[0].getByDateRange(start=datetime(2001, 2, 20))
+    lateTickerFeed.feed = [stratify.TickerData('LATE', tickerData.dateTime, tickerData.open, tickerData.close, tickerData.low, tickerData.high, tickerData.volume) for tickerData in lateTickerFeed]
+    lateOptimizer.addTickerFeed(lateTickerFeed)
+    lateResults: pandas.DataFrame = lateOptimizer.successiveHalving(reductionFactor=3, minBudget=0.1, maxWorkers=2)
+    assert len(lateResults) == 20, 'Every combination should be reported when a feed starts late'
+
+def test_Optimizer_dictionaryTarget():
+    paramSpace: dict[str, list[Any]] = {'period': [2, 3], 'units': [5]}
+
+    # Check that an untracked target statistic is rejected before the worker pool is created
+    misspelledOptimizer: stratify.Optimizer = createOptimizer(paramSpace, 'total_retrun')
+    misspelledOptimizer.__createExecutor__ = lambda maxWorkers: pytest.fail('No trial should run for an untracked target statistic')
+    with pytest.raises(ValueError):
+        misspelledOptimizer.gridSearch(maxWorkers=2)
+
+    # Check that a dictionary statistic needs a key to rank by, and that the first trial stops the rest of the grid
+    with tempfile.TemporaryDirectory() as directory:
+        recordedParamSpace: dict[str, list[Any]] = {'period': list(range(2, 66)), 'units': [5], 'recordDirectory': [directory]}
+        recordedOptimizer: stratify.Optimizer = stratify.Optimizer(MyRecordedStrategy_PeriodicFlip, recordedParamSpace, stratify.StatID.MAX_DRAWDOWN)
+        for tickerFeed in createTickerFeeds():
+            recordedOptimizer.addTickerFeed(tickerFeed)
+        recordedOptimizer.broker.setCash(10000)
+        with pytest.raises(ValueError):
+            recordedOptimizer.gridSearch(maxWorkers=1)
+        assert os.listdir(directory) == ['2'], 'Only the first trial should run before its target is checked'
+
+    # Check that a missing target key is rejected
+    missingKeyOptimizer: stratify.Optimizer = createOptimizer(paramSpace, stratify.StatID.MAX_DRAWDOWN)
+    missingKeyOptimizer.targetKey = 'percentage'
+    with pytest.raises(ValueError):
+        missingKeyOptimizer.gridSearch(maxWorkers=2)
+
+    optimizer: stratify.Optimizer = createOptimizer(paramSpace, stratify.StatID.MAX_DRAWDOWN)
+    optimizer.targetKey = 'percent'
+    optimizer.maximize = False
+    results: pandas.DataFrame = optimizer.gridSearch(maxWorkers=2)
+    assert results['target'].is_monotonic_increasing, 'Trials should be ranked by the target key'
@@ -10,7 +10,7 @@ def test_BuyOrder():
     assert order.units == 10
     assert order.fillStatus == stratify.order.FillStatus.PENDING
     assert order._portfolioCashImpact == 0.0
-    assert isinstance(order._openedStartTime, datetime)
+    assert order._openedStartTime is None, 'Order should only be dated by the bar it is placed on'
     assert order._closedEndTime is None
 
     # Check cancel order
@@ -30,7 +30,7 @@ def test_SellOrder():
     assert order.units == 10
     assert order.fillStatus == stratify.order.FillStatus.PENDING
     assert order._portfolioCashImpact == 0.0
-    assert isinstance(order._openedStartTime, datetime)
+    assert order._openedStartTime is None, 'Order should only be dated by the bar it is placed on'
     assert order._closedEndTime is None
 
     # Check cancel order
@@ -50,7 +50,7 @@ def test_CloseOrder():
     assert order.units == 10
     assert order.fillStatus == stratify.order.FillStatus.PENDING
     assert order._portfolioCashImpact == 0.0
-    assert isinstance(order._openedStartTime, datetime)
+    assert order._openedStartTime is None, 'Order should only be dated by the bar it is placed on'
     assert order._closedEndTime is None
 
     # Check cancel order
@@ -59,4 +59,103 @@ def test_CloseOrder():
 
     # Check default units
     order = stratify.order.CloseOrder('GOOGL')
-    assert order.units == 1
\ No newline at end of file
+    assert order.units == 1
+
+def test_OrderLogView():
+    closedOrder: stratify.order.Order = stratify.order.BuyOrder('AAPL', 10)
+    closedOrder.fillStatus = stratify.order.FillStatus.FILLED
+    openOrder: stratify.order.Order = stratify.order.SellOrder('AAPL', 5)
+    orderLog: list[stratify.order.Order] = [closedOrder, openOrder]
+
+    # Create a view while the sell order is still open
+    orderLogView: stratify.order.OrderLogView = stratify.order.OrderLogView([(orderLog, len(orderLog))], {id(openOrder): openOrder.fillStatus})
+    assert len(orderLogView) == 2, 'View should contain 2 orders'
+    assert orderLogView[0] is closedOrder, 'Closed orders should be shared, not copied'
+    assert orderLogView[1] is openOrder, 'Unchanged open orders should be shared, not copied'
+
+    # Fill the open order and add a new order to the log after the view was taken
+    openOrder.fillStatus = stratify.order.FillStatus.FILLED
+    openOrder._portfolioCashImpact = 500.0
+    orderLog.append(stratify.order.BuyOrder('GOOG', 1))
+
+    # Check that the view still shows the log as it stood when it was taken
+    assert len(orderLogView) == 2, 'Orders added after the view was taken should not be visible'
+    assert orderLogView[1] is not openOrder, 'Orders changed after the view was taken should be copied on read'
+    assert orderLogView[1].fillStatus == stratify.order.FillStatus.PENDING, 'Copied order should keep its earlier fill status'
+    assert orderLogView[1]._portfolioCashImpact == 0.0, 'Copied order should keep its earlier cash impact'
+    assert [order.ticker for order in orderLogView] == ['AAPL', 'AAPL'], 'Iterating the view should yield the visible orders'
+
+    # Check that a snapshot of another log taken at the same moment shares the open order states
+    snapshotView: stratify.order.OrderLogView = orderLogView.snapshot(orderLog)
+    assert len(snapshotView) == 3, 'Snapshot should contain every order currently in the log'
+    assert snapshotView[1].fillStatus == stratify.order.FillStatus.PENDING, 'Snapshot should share the open order states of the view'
+
+def test_ConditionalOrder():
+    # Check the direction each order type triggers in, and its trigger price
+    buyLimit: stratify.order.LimitOrder = stratify.order.LimitOrder('AAPL', 10, 95, stratify.order.OrderSide.BUY)
+    sellLimit: stratify.order.LimitOrder = stratify.order.LimitOrder('AAPL', 10, 105, stratify.order.OrderSide.SELL)
+    assert not buyLimit.isTriggeredByRise and buyLimit.triggerPrice == 95, 'Buy limit order should trigger when the price falls to its limit'
+    assert sellLimit.isTriggeredByRise and sellLimit.triggerPrice == 105, 'Sell limit order should trigger when the price rises to its limit'
+
+    buyStop: stratify.order.StopOrder = stratify.order.StopOrder('AAPL', 10, 105, stratify.order.OrderSide.BUY)
+    sellStop: stratify.order.StopOrder = stratify.order.StopOrder('AAPL', 10, 95)
+    assert buyStop.isTriggeredByRise and buyStop.side == stratify.order.OrderSide.BUY, 'Buy stop order should trigger when the price rises to its stop'
+    assert not sellStop.isTriggeredByRise and sellStop.side == stratify.order.OrderSide.SELL, 'Stop orders should sell by default'
+
+    # Check that every conditional order sells by default, and that the base class cannot be instantiated
+    assert all(order.side == stratify.order.OrderSide.SELL for order in (stratify.order.LimitOrder('AAPL', 10, 105), stratify.order.StopOrder('AAPL', 10, 95), stratify.order.StopLimitOrder('AAPL', 10, 95, 94), stratify.order.TrailingStopOrder('AAPL', 10, trailAmount=5))), 'Conditional orders should sell by default'
+    try:
+        stratify.order.ConditionalOrder('AAPL', 10, stratify.order.OrderSide.BUY)
+        assert False, 'ConditionalOrder without a trigger should not be instantiable'
+    except TypeError:
+        pass
+
+    # Check that a stop limit order fills once stopped within its limit, and otherwise rests as a limit order
+    stopLimit: stratify.order.StopLimitOrder = stratify.order.StopLimitOrder('AAPL', 10, 95, 94)
+    assert stopLimit.__trigger__(90) is None, 'Stop limit order stopped below its limit should not fill'
+    assert stopLimit.isTriggeredByRise and stopLimit.triggerPrice == 94, 'Stopped sell stop limit order should rest as a sell limit order'
+    assert stopLimit.__trigger__(94.5) == 94.5, 'Stopped stop limit order should fill once its limit is reached'
+
+    # Check that a trailing stop follows the best price seen
+    trailingStop: stratify.order.TrailingStopOrder = stratify.order.TrailingStopOrder('AAPL', 10, trailPercent=0.1)
+    trailingStop.__activate__(100)
+    assert trailingStop.triggerPrice == 90, 'Trailing stop should start below the price it was placed at'
+    assert not trailingStop.__updateWatermark__(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1), open=100, close=95, low=80, high=99, volume=10)), 'Lower highs should not move a sell trailing stop'
+    assert trailingStop.__updateWatermark__(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 2), open=100, close=95, low=80, high=120, volume=10)), 'Higher highs should move a sell trailing stop'
+    assert trailingStop.triggerPrice == 108, 'Trailing stop should trail below the highest high'
+
+    try:
+        stratify.order.TrailingStopOrder('AAPL', 10, trailAmount=1, trailPercent=0.1)
+        assert False, 'Trailing stop with both a trail amount and percent should raise a ValueError'
+    except ValueError:
+        pass
+
+    # Check that cancelling an order cancels the orders attached to it, but not the ones already closed
+    parentOrder: stratify.order.Order = stratify.order.BuyOrder('AAPL', 10)
+    parentOrder._children = [sellLimit, sellStop]
+    sellStop.fillStatus = stratify.order.FillStatus.FILLED
+    parentOrder.cancel()
+    assert sellLimit.fillStatus == stratify.order.FillStatus.CANCELLED, 'Attached order should be cancelled with its parent'
+    assert sellStop.fillStatus == stratify.order.FillStatus.FILLED, 'Cancelling should not cascade to attached orders that already filled'
+
+def test_OpenOrders():
+    openOrders: stratify.order.OpenOrders = stratify.order.OpenOrders()
+    orders: list[stratify.order.Order] = [stratify.order.BuyOrder('AAPL'), stratify.order.BuyOrder('GOOG'), stratify.order.SellOrder('AAPL')]
+    openOrders += orders[:2]
+    openOrders.append(orders[2])
+
+    # Check that orders are kept in the order they were placed, overall and per ticker
+    assert list(openOrders) == orders and len(openOrders) == 3, 'Open orders should be kept in the order they were placed'
+    assert openOrders.getTickerOrders('AAPL') == [orders[0], orders[2]], 'Ticker orders should only hold the ticker\'s orders, in order'
+    assert openOrders.getTickerOrders('MSFT') == [], 'Ticker without orders should have no open orders'
+
+    # Check that orders can be removed while iterating over a ticker's orders
+    for order in openOrders.getTickerOrders('AAPL'):
+        openOrders.remove(order)
+    assert list(openOrders) == [orders[1]] and orders[0] not in openOrders, 'Removed orders should no longer be open'
+
+    try:
+        openOrders.remove(orders[0])
+        assert False, 'Removing an order that is not open should raise a ValueError'
+    except ValueError:
+        pass
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from ... import stratify
+import numpy as np
+import tempfile
+import pandas
+import pytest
+import os
+
+def createBars() -> pandas.DataFrame:
+    # Minute bars of two tickers interleaved in time, in New York time around the start of daylight saving time
+    dateTimes: pandas.DatetimeIndex = pandas.date_range('2021-03-14 01:58', periods=4, freq='min', tz='America/New_York')
+    return pandas.DataFrame({'Symbol': ['AAPL', 'MSFT'] * 4,
+                             'Timestamp': dateTimes.repeat(2).strftime('%Y-%m-%d %H:%M'),
+                             'Open': np.arange(8, dtype=np.float64) + 100,
+                             'Close': np.arange(8, dtype=np.float64) + 101,
+                             'Low': np.arange(8, dtype=np.float64) + 99,
+                             'High': np.arange(8, dtype=np.float64) + 102,
+                             'Vol': np.arange(8) * 10})
+
+def assertSourceReadsBars(source: stratify.sources.FileSource) -> None:
+    # Check that every ticker is read in time order, with its dates normalized to UTC
+    tickerFeeds: dict[str, stratify.TickerFeed] = source.read()
+    assert sorted(tickerFeeds) == ['AAPL', 'MSFT'], 'Every ticker should be read'
+    assert list(tickerFeeds['AAPL'].closes) == [101, 103, 105, 107], 'Ticker should hold its own bars, in file order'
+    assert list(tickerFeeds['MSFT'].volumes) == [10, 30, 50, 70], 'Volumes should be read from the mapped column'
+    assert tickerFeeds['AAPL'][0].dateTime == datetime(2021, 3, 14, 6, 58, tzinfo=timezone.utc), 'Naive dates should be read in the source\'s time zone'
+    assert tickerFeeds['AAPL'][2].dateTime == datetime(2021, 3, 14, 7, 0, tzinfo=timezone.utc), 'Dates after the time zone change should be normalized to UTC'
+
+    # Check that reading tickers and date ranges filters the bars
+    tickerFeeds = source.read(['MSFT', 'GOOG'], start=datetime(2021, 3, 14, 6, 59), end=datetime(2021, 3, 14, 7, 1))
+    assert list(tickerFeeds) == ['MSFT', 'GOOG'], 'Only the requested tickers should be read'
+    assert list(tickerFeeds['MSFT'].closes) == [104, 106], 'Only the bars in the date range should be read'
+    assert len(tickerFeeds['GOOG']) == 0, 'Missing ticker should be read as an empty feed'
+
+def test_CSVSource():
+    with tempfile.TemporaryDirectory() as directory:
+        bars: pandas.DataFrame = createBars()
+        bars.to_csv(os.path.join(directory, 'bars.csv'), index=False)
+
+        # Read a single file in chunks smaller than the file, mapping the volume column
+        source: stratify.sources.CSVSource = stratify.sources.CSVSource(os.path.join(directory, 'bars.csv'), columns={'volume': 'Vol'}, timeZone='America/New_York', chunkSize=3)
+        assert source.getTickers() == ['AAPL', 'MSFT'], 'Tickers should be listed in the order they are found'
+        assertSourceReadsBars(source)
+
+        # Read the same bars partitioned into a file per ticker
+        for ticker, tickerBars in bars.groupby('Symbol'):
+            os.makedirs(os.path.join(directory, f'ticker={ticker}'))
+            tickerBars.drop(columns='Symbol').to_csv(os.path.join(directory, f'ticker={ticker}', 'bars.csv'), index=False)
+        partitionedSource: stratify.sources.CSVSource = stratify.sources.CSVSource(os.path.join(directory, 'ticker={ticker}', 'bars.csv'), columns={'volume': 'Vol'}, timeZone='America/New_York', chunkSize=3)
+        assert partitionedSource.getTickers() == ['AAPL', 'MSFT'], 'Tickers should be listed from the partitions'
+        assertSourceReadsBars(partitionedSource)
+
+        # Check that a ticker streamed from the file holds the same bars
+        streamingTickerFeed: stratify.StreamingTickerFeed = source.stream('MSFT')
+        assert list(streamingTickerFeed) == list(source.read(['MSFT'])['MSFT']), 'Streamed ticker should hold the bars read'
+        assert [len(chunk) for chunk in streamingTickerFeed.chunks()] == [1, 2, 1], 'Streamed ticker should be read one chunk at a time'
+
+        # Check that missing volumes are read as 0
+        bars.loc[1, 'Vol'] = np.nan
+        bars.to_csv(os.path.join(directory, 'bars_missing_volume.csv'), index=False)
+        missingVolumeSource: stratify.sources.CSVSource = stratify.sources.CSVSource(os.path.join(directory, 'bars_missing_volume.csv'), columns={'volume': 'Vol'}, chunkSize=3)
+        assert list(missingVolumeSource.read(['MSFT'])['MSFT'].volumes) == [0, 30, 50, 70], 'Missing volumes should be read as 0'
+
+        # Check that missing columns are reported
+        with pytest.raises(ValueError):
+            stratify.sources.CSVSource(os.path.join(directory, 'bars.csv')).read()
+
+        # Check that the source can be downloaded from and its feeds backtested
+        tickerFeeds: dict[str, stratify.TickerFeed] = stratify.downloadMany(['AAPL', 'MSFT'], datetime(2021, 1, 1), datetime(2022, 1, 1), source=source)
+        backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+        backtestEngine.broker.setCash(10000)
+        for tickerFeed in tickerFeeds.values():
+            backtestEngine.addTickerFeed(tickerFeed)
+        backtestEngine.addStrategy(stratify.Strategy)
+        backtestEngine.run()
+        assert len(backtestEngine.tickerFeeds) == 2, 'Every feed read should be added to the engine'
+
+def test_ParquetSource():
+    pytest.importorskip('pyarrow')
+    with tempfile.TemporaryDirectory() as directory:
+        createBars().to_parquet(os.path.join(directory, 'bars.parquet'), row_group_size=3)
+        assertSourceReadsBars(stratify.sources.ParquetSource(os.path.join(directory, 'bars.parquet'), columns={'volume': 'Vol'}, timeZone='America/New_York', chunkSize=2))
+
+        # Check that missing volumes are read as 0
+        bars: pandas.DataFrame = createBars().astype({'Vol': 'Int64'})
+        bars.loc[1, 'Vol'] = pandas.NA
+        bars.to_parquet(os.path.join(directory, 'bars_missing_volume.parquet'))
+        missingVolumeSource: stratify.sources.ParquetSource = stratify.sources.ParquetSource(os.path.join(directory, 'bars_missing_volume.parquet'), columns={'volume': 'Vol'})
+        assert list(missingVolumeSource.read(['MSFT'])['MSFT'].volumes) == [0, 30, 50, 70], 'Missing volumes should be read as 0'
+
+def test_ArrowSource():
+    pytest.importorskip('pyarrow')
+    with tempfile.TemporaryDirectory() as directory:
+        createBars().to_feather(os.path.join(directory, 'bars.arrow'), chunksize=3)
+        assertSourceReadsBars(stratify.sources.ArrowSource(os.path.join(directory, 'bars.arrow'), columns={'volume': 'Vol'}, timeZone='America/New_York', chunkSize=2))
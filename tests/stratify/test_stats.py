@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from ... import stratify
+from typing import Any
+import numpy as np
+import pytest
+import pickle
+import math
+
+class MyEquityCurveStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+    def next(self):
+        if self.dateTime.day == 1: self.buy(10)
+
+def test_EquityCurve():
+    # Record more values than the initial capacity, with time zone aware dates
+    equityCurve: stratify.stats.EquityCurve = stratify.stats.EquityCurve()
+    for day in range(300):
+        equityCurve.append(datetime(2001, 1, 1, tzinfo=timezone(timedelta(hours=-5))) + timedelta(days=day), 1000.0 + day)
+
+    # Check that the columns hold every value in order, in UTC
+    assert len(equityCurve) == 300 and equityCurve.values[-1] == 1299.0, 'Curve should hold every value in order'
+    assert equityCurve.dateTimes[0] == np.datetime64('2001-01-01T05:00'), 'Dates should be stored in UTC'
+    assert not equityCurve.values.flags.writeable, 'Curve columns should be read-only'
+
+    # Check that pickling trims the unused capacity
+    unpickledEquityCurve: stratify.stats.EquityCurve = pickle.loads(pickle.dumps(equityCurve))
+    assert len(unpickledEquityCurve._values) == 300 and list(unpickledEquityCurve.values) == list(equityCurve.values), 'Pickled curve should hold only its values'
+
+def test_EquityCurve_trackers():
+    # Create a daily feed that rises, falls into a drawdown, recovers past its high and ends in a smaller drawdown
+    closes: list[float] = [100, 104, 110, 103, 95, 99, 112, 115, 108, 113]
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed([stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day + 1), open=close, close=close, low=close, high=close, volume=1000) for day, close in enumerate(closes)])
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyEquityCurveStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: stratify.Strategy = backtestEngine.strategies[0]
+
+    # Check that a single curve holding a value per bar is shared by every tracker
+    equityCurve: stratify.stats.EquityCurve = strategy._statisticsManager.equityCurve
+    values: list[float] = equityCurve.values.tolist()
+    assert len(values) == len(closes), 'Curve should hold a value per bar'
+    assert all(statisticTracker.equityCurve is equityCurve for statisticTracker in strategy._statisticsManager._statisticTrackers), 'Trackers should share the curve'
+    assert values[-1] == strategy._statisticsManager._statisticTrackers[0].ssCurrentValue, 'Curve should end at the strategy\'s value'
+
+    # Check that volatility is the sample deviation of the curve's returns
+    returns: list[float] = [(values[index] - values[index - 1]) / values[index - 1] for index in range(1, len(values))]
+    meanReturn: float = sum(returns) / len(returns)
+    volatility: float = math.sqrt(sum((currentReturn - meanReturn) ** 2 for currentReturn in returns) / (len(returns) - 1)) * 100.0
+    assert math.isclose(strategy.getStatistic(stratify.StatID.VOLATILITY), volatility), 'Volatility should be computed from the curve'
+
+    # Check that the max drawdown is the deepest fall between two highs, or after the last high
+    drawdowns: list[tuple[float, float, timedelta]] = []
+    peakIndex: int = 0
+    for index in range(1, len(values) + 1):
+        if index == len(values) or values[index] > values[peakIndex]:
+            trough: float = min(values[peakIndex:index])
+            if trough < values[peakIndex]:
+                drawdowns.append((values[peakIndex] - trough, (values[peakIndex] - trough) / values[peakIndex] * 100, timedelta(days=min(index, len(values) - 1) - peakIndex)))
+            peakIndex = index
+    maxDrawdown: tuple[float, float, timedelta] = max(drawdowns)
+    assert len(drawdowns) == 2, 'Both drawdowns should be found'
+    assert strategy.getStatistic(stratify.StatID.MAX_DRAWDOWN) == {'value': maxDrawdown[0], 'percent': max(drawdown[1] for drawdown in drawdowns), 'duration': maxDrawdown[2]}, 'Max drawdown should be computed from the curve'
+
+def test_onlineStatistics():
+    # Create a daily feed of several drawdowns, the deepest not the longest and after the last high
+    closes: list[float] = [100, 104, 110, 103, 95, 99, 112, 115, 108, 113, 111, 109, 107, 110, 114, 120, 101, 117]
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed([stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day + 1), open=close, close=close, low=close, high=close, volume=1000) for day, close in enumerate(closes)])
+
+    strategies: list[stratify.Strategy] = []
+    for onlineStatistics in (False, True):
+        backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+        backtestEngine.addTickerFeed(tickerFeed)
+        backtestEngine.addStrategy(MyEquityCurveStrategy)
+        backtestEngine.broker.setCash(10000)
+        backtestEngine.run(onlineStatistics=onlineStatistics)
+        strategies.append(backtestEngine.strategies[0])
+    batchStrategy, onlineStrategy = strategies
+
+    # Check that online statistics keep no curve and match the ones computed over the curve
+    assert len(onlineStrategy._statisticsManager.equityCurve) == 0, 'Online statistics should not record the curve'
+    assert math.isclose(onlineStrategy.getStatistic(stratify.StatID.VOLATILITY), batchStrategy.getStatistic(stratify.StatID.VOLATILITY), rel_tol=1e-9), 'Online volatility should match the batch volatility'
+    for statisticID in (stratify.StatID.MAX_DRAWDOWN, stratify.StatID.TOTAL_RETURN, stratify.StatID.ANNUALIZED_RETURN, stratify.StatID.TRADES):
+        assert onlineStrategy.getStatistic(statisticID) == batchStrategy.getStatistic(statisticID), f'Online {statisticID} should match the batch statistic'
+    assert batchStrategy.getStatistic(stratify.StatID.MAX_DRAWDOWN)['duration'] == timedelta(days=2), 'Deepest drawdown, after the last high, should be found'
+
+def test_riskStatistics():
+    # Create daily feeds of two tickers, so the curve is updated twice per timestamp
+    tickerFeeds: list[stratify.TickerFeed] = []
+    for tickerIndex, ticker in enumerate(['AAPL', 'GOOG']):
+        tickerFeeds.append(stratify.TickerFeed([stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, 1) + timedelta(days=day), open=100, close=100.0 + 10 * math.sin(day / (5 + tickerIndex)) + 0.2 * day, low=80, high=130, volume=1000) for day in range(120)]))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    for tickerFeed in tickerFeeds:
+        backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyEquityCurveStrategy)
+    for statisticTrackerClass in stratify.stats.trackers.RISK_STATISTIC_TRACKERS:
+        backtestEngine.addStatistic(statisticTrackerClass)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: stratify.Strategy = backtestEngine.strategies[0]
+
+    # Check that risk statistics are tracked once added, over the strategy's value at the end of each timestamp
+    equityCurve: stratify.stats.EquityCurve = strategy._statisticsManager.equityCurve
+    values: np.ndarray = equityCurve.values[1::2]
+    returns: np.ndarray = stratify.analytics.getReturns(values)
+    periodsPerYear: float = stratify.analytics.getPeriodsPerYear(equityCurve.dateTimes[1::2])
+    assert math.isclose(periodsPerYear, 365.25), 'Daily timestamps should have a period per day'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.SHARPE_RATIO), stratify.analytics.sharpeRatio(returns, periodsPerYear=periodsPerYear)), 'Sharpe ratio should be tracked'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.SORTINO_RATIO), stratify.analytics.sortinoRatio(returns, periodsPerYear=periodsPerYear)), 'Sortino ratio should be tracked'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.CALMAR_RATIO), stratify.analytics.calmarRatio(values, periodsPerYear)), 'Calmar ratio should be tracked'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.OMEGA_RATIO), stratify.analytics.omegaRatio(returns)), 'Omega ratio should be tracked'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.TAIL_RATIO), stratify.analytics.tailRatio(returns)), 'Tail ratio should be tracked'
+    assert math.isclose(strategy.getStatistic(stratify.StatID.VALUE_AT_RISK)['conditional_percent'], stratify.analytics.conditionalValueAtRisk(returns) * 100.0), 'Value at risk should be tracked'
+
+    # Check that rolling and monthly statistics are dated by the curve
+    rollingSharpeRatios: dict[str, Any] = strategy.getStatistic(stratify.StatID.ROLLING_SHARPE_RATIO)
+    assert len(rollingSharpeRatios['sharpe_ratios']) == len(returns) - rollingSharpeRatios['window'] + 1, 'There should be a ratio per window'
+    assert rollingSharpeRatios['date_times'][-1] == equityCurve.dateTimes[-1], 'Last window should be dated at the end of the curve'
+    monthlyReturns: dict[str, Any] = strategy.getStatistic(stratify.StatID.MONTHLY_RETURNS)
+    assert list(monthlyReturns['years']) == [2001] and not np.isnan(monthlyReturns['percent'][0, :4]).any() and np.isnan(monthlyReturns['percent'][0, 4:]).all(), 'Every month of the curve should be returned'
+    assert math.isclose(np.prod(1 + monthlyReturns['percent'][0, :4] / 100.0), values[-1] / values[0]), 'Monthly returns should compound to the total return of the curve'
+
+    # Check that risk statistics are not tracked by default, and cannot be computed online
+    defaultBacktestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    defaultBacktestEngine.addTickerFeed(tickerFeeds[0])
+    defaultBacktestEngine.addStrategy(MyEquityCurveStrategy)
+    defaultBacktestEngine.broker.setCash(10000)
+    defaultBacktestEngine.run()
+    assert defaultBacktestEngine.strategies[0].getStatistic(stratify.StatID.SHARPE_RATIO) == None, 'Risk statistics should not be tracked by default'
+
+    onlineBacktestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    onlineBacktestEngine.addTickerFeed(tickerFeeds[0])
+    onlineBacktestEngine.addStrategy(MyEquityCurveStrategy)
+    onlineBacktestEngine.addStatistic(stratify.stats.trackers.SharpeRatioTracker)
+    onlineBacktestEngine.broker.setCash(10000)
+    with pytest.raises(ValueError):
+        onlineBacktestEngine.run(onlineStatistics=True)
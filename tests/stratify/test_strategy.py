@@ -2,6 +2,7 @@ from datetime import timedelta
 from typing import Union, Any
 from datetime import datetime
 from ... import stratify
+import numpy as np
 
 class MyStrategy(stratify.Strategy):
     '''
@@ -110,4 +111,172 @@ def test_Strategy():
     assert maxDrawdownPercent == 0.0, 'Max Drawdown Percent should be equal to 0.0'
 
     drawdownDuration: timedelta = drawdown['duration']
-    assert drawdownDuration == timedelta(), 'Drawdown Duration should be equal to an empty timedelta object'
\ No newline at end of file
+    assert drawdownDuration == timedelta(), 'Drawdown Duration should be equal to an empty timedelta object'
+
+def test_Strategy_setParams():
+    strategy = MyStrategy()
+    strategy.period = 3
+
+    # Check that existing attributes are overridden and recorded
+    strategy.setParams({'period': 5})
+    assert strategy.period == 5, 'Parameter should be overridden'
+    assert strategy._params == {'period': 5}, 'Overridden parameters should be recorded'
+
+    # Check that unknown parameters are rejected
+    try:
+        strategy.setParams({'unknown': 1})
+        assert False, 'Setting an unknown parameter should raise an AttributeError'
+    except AttributeError:
+        pass
+    assert not hasattr(strategy, 'unknown'), 'Unknown parameter should not be set'
+
+    # Check that methods, private state and bar fields are not parameters
+    for name in ('next', 'buy', '_orders', '_statisticsManager', 'close', 'ticker'):
+        try:
+            strategy.setParams({name: 1})
+            assert False, f'Setting \'{name}\' as a parameter should raise an AttributeError'
+        except AttributeError:
+            pass
+    assert callable(strategy.next) and isinstance(strategy._orders, list), 'Rejected parameters should not be set'
+
+    # Check that no parameter is set if any of them is rejected
+    try:
+        strategy.setParams({'period': 7, '_orders': 1})
+        assert False, 'Setting a private attribute should raise an AttributeError'
+    except AttributeError:
+        pass
+    assert strategy.period == 5, 'Valid parameters should not be set when another one is rejected'
+
+class MyHistoryStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.historyWindow = 5
+        self.closes: dict[str, list[float]] = {}
+        self.histories: list[tuple[str, list[float], list[int]]] = []
+
+    def next(self):
+        self.closes.setdefault(self.ticker, []).append(self.close)
+        self.histories.append((self.ticker, list(self.history(n=3)), list(self.history(field='volume'))))
+
+def test_Strategy_history():
+    # Create a feed holding two interleaved tickers and a feed holding a third one
+    tickerFeeds: list[stratify.TickerFeed] = [stratify.TickerFeed(), stratify.TickerFeed()]
+    for day in range(12):
+        for tickerIndex, ticker in enumerate(['AAPL', 'GOOG', 'MSFT']):
+            tickerData: stratify.TickerData = stratify.TickerData(ticker=ticker, dateTime=datetime(2001, 1, 1) + timedelta(days=day), open=1.0, close=100.0 * (tickerIndex + 1) + day, low=1.0, high=1.0, volume=day)
+            tickerFeeds[tickerIndex // 2].append(tickerData)
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    for tickerFeed in tickerFeeds:
+        backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyHistoryStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: MyHistoryStrategy = backtestEngine.strategies[0]
+
+    # Check that each ticker's history holds its own latest bars, bounded by the requested count and the window
+    barsSeen: dict[str, int] = {}
+    for ticker, closes, volumes in strategy.histories[:36]:
+        barsSeen[ticker] = barsSeen.get(ticker, 0) + 1
+        assert closes == strategy.closes[ticker][:barsSeen[ticker]][-3:], f'History of {ticker} should hold its latest 3 closes'
+        assert volumes == list(range(barsSeen[ticker]))[-5:], f'History of {ticker} should hold its latest volumes up to the window'
+
+    # Check that histories are read-only views that are not copied
+    history: np.ndarray = strategy.history('AAPL', 'close')
+    assert not history.flags.writeable and history.base is not None, 'History should be a read-only view'
+
+    # Check that histories are kept in ring buffers when the ticker's feed is not known
+    strategy = MyHistoryStrategy()
+    for day in range(8):
+        strategy.__updateBar__(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1) + timedelta(days=day), open=1.0, close=float(day), low=1.0, high=1.0, volume=day))
+    assert list(strategy.history('AAPL')) == [3.0, 4.0, 5.0, 6.0, 7.0], 'History should hold the latest closes up to the window'
+    assert len(strategy.history('GOOG')) == 0, 'History of an unseen ticker should be empty'
+
+    # Check that counts beyond the window are rejected
+    try:
+        strategy.history('AAPL', 'close', 6)
+        assert False, 'Reading more bars than the window should raise a ValueError'
+    except ValueError:
+        pass
+
+class MyTimeframeStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.precompute: bool = True
+        self.bars: list[tuple[datetime, Union[None, stratify.TickerData], list[float], Union[None, float]]] = []
+
+    def start(self):
+        self.hourly: stratify.strategy.Timeframe = self.addTimeframe(timedelta(hours=1))
+        self.hourlySMA: stratify.indicators.BoundIndicator = self.hourly.addIndicator(stratify.indicators.SMA(2), precompute=self.precompute)
+
+    def next(self):
+        self.bars.append((self.dateTime, self.hourly.bar(), list(self.hourly.history(n=3)), self.hourlySMA.value))
+
+def test_Strategy_addTimeframe():
+    # Create a feed of 15 minute bars, missing the bar closing the third hour
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for quarter in range(1, 21):
+        if quarter != 12:
+            tickerFeed.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1) + timedelta(minutes=15 * quarter), open=quarter, close=quarter + 0.5, low=quarter - 1.0, high=quarter + 1.0, volume=quarter))
+
+    for precompute in (True, False):
+        backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+        backtestEngine.addTickerFeed(tickerFeed)
+        backtestEngine.addStrategy(MyTimeframeStrategy, {'precompute': precompute})
+        backtestEngine.broker.setCash(10000)
+        backtestEngine.run()
+        strategy: MyTimeframeStrategy = backtestEngine.strategies[0]
+
+        # Check that the latest bar is always the latest completed hour, completed by the bar closing it or else by the next hour's first bar
+        for dateTime, bar, closes, sma in strategy.bars:
+            latestHour: datetime = dateTime.replace(minute=0)
+            assert (bar.dateTime if bar != None else None) == (latestHour if latestHour.hour != 0 else None), f'Latest hourly bar at {dateTime} should be the hour ending at {latestHour}'
+
+        dateTime, bar, closes, sma = strategy.bars[-1]
+        assert bar == stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, 1, 5), open=17, close=20.5, low=16, high=21, volume=17 + 18 + 19 + 20), 'Latest hourly bar should aggregate the hour\'s bars'
+        assert closes == [11.5, 16.5, 20.5], 'Hourly history should hold the closes of completed hours'
+        assert sma == (16.5 + 20.5) / 2, 'Hourly indicator should be updated with completed hours'
+
+        # Check the bar completed by the first bar of the next hour, when the bar closing its hour is missing
+        completedBars: list[stratify.TickerData] = [bar for dateTime, bar, closes, sma in strategy.bars if dateTime == datetime(2001, 1, 1, 3, 15)]
+        assert completedBars[0].dateTime == datetime(2001, 1, 1, 3) and completedBars[0].close == 11.5, 'Hour missing its closing bar should be completed by the next hour\'s first bar'
+
+class MyBracketStrategy(stratify.Strategy):
+    def __init__(self):
+        super().__init__()
+
+        self.orders: list[stratify.order.Order] = []
+
+    def next(self):
+        if self.dateTime == datetime(2001, 1, 1):
+            self.orders.extend(self.bracket(10, stopLoss=95, takeProfit=110))
+            self.orders.extend(self.bracket(10, stopLoss=80, takeProfit=120, limitPrice=90))
+        elif self.dateTime == datetime(2001, 1, 3):
+            self.orders[3].cancel()
+
+def test_Strategy_bracket():
+    # Create a feed that rallies through the take profit after a few bars
+    tickerFeed: stratify.TickerFeed = stratify.TickerFeed()
+    for day, (open, close, low, high) in enumerate([(100, 100, 99, 101), (100, 104, 98, 105), (104, 106, 103, 107), (107, 111, 106, 112), (111, 111, 110, 112)], start=1):
+        tickerFeed.append(stratify.TickerData(ticker='AAPL', dateTime=datetime(2001, 1, day), open=open, close=close, low=low, high=high, volume=1000))
+
+    backtestEngine: stratify.BacktestEngine = stratify.BacktestEngine()
+    backtestEngine.addTickerFeed(tickerFeed)
+    backtestEngine.addStrategy(MyBracketStrategy)
+    backtestEngine.broker.setCash(10000)
+    backtestEngine.run()
+    strategy: MyBracketStrategy = backtestEngine.strategies[0]
+    entryOrder, stopLossOrder, takeProfitOrder, limitEntryOrder, limitStopLossOrder, limitTakeProfitOrder = strategy.orders
+
+    # Check that the filled entry placed its exits, and the take profit cancelled the stop loss
+    assert entryOrder.fillStatus == stratify.order.FillStatus.FILLED, 'Market entry should fill at the close'
+    assert takeProfitOrder.fillStatus == stratify.order.FillStatus.FILLED and takeProfitOrder._portfolioCashImpact == 1100, 'Take profit should fill at its limit'
+    assert stopLossOrder.fillStatus == stratify.order.FillStatus.CANCELLED, 'Stop loss should be cancelled once the take profit fills'
+    assert backtestEngine.broker.getPosition('AAPL') == 0, 'Position should be closed by the take profit'
+    assert strategy.getStatistic(stratify.StatID.TRADES)['won'] == 1, 'Bracket should count as a won trade'
+
+    # Check that cancelling an unfilled entry cancels its exits
+    assert limitEntryOrder.fillStatus == stratify.order.FillStatus.CANCELLED, 'Unfilled limit entry should be cancelled'
+    assert limitStopLossOrder.fillStatus == limitTakeProfitOrder.fillStatus == stratify.order.FillStatus.CANCELLED, 'Exits of a cancelled entry should be cancelled'
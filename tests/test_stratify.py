@@ -2,19 +2,31 @@ from .my_test_strategies import MyTestStrategy_BuyAndHold, MyTestStrategy_BuyAnd
 from datetime import timedelta
 from datetime import datetime
 from .. import stratify
+import numpy as np
 from typing import Any
+import pickle
 import math
 
 tickers: list[str] = ['AAPL', 'META', 'GOOG', 'NVDA', 'MSFT', 'TSLA']
 
+# Number of bars between the stretches of the stored history each ticker is built from, about a month of trading days
+TICKER_OFFSET_BARS: int = 21
+
 def test_stratify():
-    startDate: datetime = datetime(2024, 1, 1)
-    endDate: datetime = datetime(2024, 5, 1)
+    startDate: datetime = datetime(2023, 1, 1)
+    endDate: datetime = datetime(2023, 5, 1)
+
+    # Load the stored AAPL history, so the test does not depend on downloaded data
+    with open('tests/stratify/test_engine_downloadData_AAPL_20_1_1_24_1_1_data.pkl', 'rb') as pickleFile:
+        historicalTickerFeedAAPL: stratify.TickerFeed = pickle.load(pickleFile)
 
-    # Download historical ticker feeds
+    # Build a feed per ticker on the dates of the backtest, each from a different stretch of the stored history
+    dateTimes: np.ndarray = historicalTickerFeedAAPL.getByDateRange(startDate, endDate).dateTimes
+    startIndex: int = len(historicalTickerFeedAAPL.getByDateRange(end=startDate))
     tickerFeedList: list[stratify.TickerFeed] = []
-    for ticker in tickers:
-        tickerFeed: stratify.TickerFeed = stratify.downloadData(ticker, startDate, endDate)
+    for tickerIndex, ticker in enumerate(tickers):
+        bars: stratify.TickerFeed = historicalTickerFeedAAPL[startIndex - tickerIndex * TICKER_OFFSET_BARS:startIndex - tickerIndex * TICKER_OFFSET_BARS + len(dateTimes)]
+        tickerFeed: stratify.TickerFeed = stratify.TickerFeed.fromArrays(ticker, dateTimes, bars.opens, bars.closes, bars.lows, bars.highs, bars.volumes)
         tickerFeedList.append(tickerFeed)
 
     # Create backtest engine
@@ -75,16 +87,16 @@ def test_stratify():
     largestLossTrade: float = trades['largest_loss']
     avgTradeHoldingPeriod: timedelta = trades['avg_holding_period']
 
-    assert math.isclose(round(totalReturn, 2), -8.09, abs_tol=0.1) == True, 'Total return should be approximately -8.09%.'
-    assert math.isclose(round(annualizedReturn, 2) , -22.81, abs_tol=0.1) == True, 'Annualized return should be approximately -22.81%.'
+    assert math.isclose(round(totalReturn, 2), 35.44, abs_tol=0.1) == True, 'Total return should be approximately 35.44%.'
+    assert math.isclose(round(annualizedReturn, 2) , 162.06, abs_tol=0.1) == True, 'Annualized return should be approximately 162.06%.'
     assert startingCash == 10000, 'Starting cash should be $10,000.'
-    assert math.isclose(round(finalPortfolioValue, 2), 12842.90, abs_tol=0.1) == True, 'Final portfolio value should be approximately $12,842.90.'
-    assert math.isclose(round(netProfitOrLoss, 2), -809.08, abs_tol=0.1) == True, 'Net profit/loss should be approximately $-809.08.'
-    assert math.isclose(round(volatility, 2), 0.53, abs_tol=0.01) == True, 'Volatility percent should be approximately 0.53%.'
+    assert math.isclose(round(finalPortfolioValue, 2), 11234.73, abs_tol=0.1) == True, 'Final portfolio value should be approximately $11,234.73.'
+    assert math.isclose(round(netProfitOrLoss, 2), 3543.62, abs_tol=0.1) == True, 'Net profit/loss should be approximately $3,543.62.'
+    assert math.isclose(round(volatility, 2), 0.58, abs_tol=0.01) == True, 'Volatility percent should be approximately 0.58%.'
 
-    assert math.isclose(round(maxDrawdown, 2), 1606.58, abs_tol=0.1) == True, 'Maximum drawdown should be approximately $1,606.58.'
-    assert math.isclose(round(maxDrawdownPercent, 2), 15.28, abs_tol=0.1) == True, 'Maximum drawdown percent should be approximately 15.28%.'
-    assert maxDrawdownDuration == timedelta(days=98), 'Maximum drawdown duration should be approximately 98 days.'
+    assert math.isclose(round(maxDrawdown, 2), 792.56, abs_tol=0.1) == True, 'Maximum drawdown should be approximately $792.56.'
+    assert math.isclose(round(maxDrawdownPercent, 2), 6.39, abs_tol=0.1) == True, 'Maximum drawdown percent should be approximately 6.39%.'
+    assert maxDrawdownDuration == timedelta(days=29), 'Maximum drawdown duration should be approximately 29 days.'
 
     assert totalTrades == 0, 'Total trades should be 0.'
     assert wonTrades == 0, 'Total trades won should be 0.'
@@ -118,22 +130,22 @@ def test_stratify():
     largestLossTrade: float = trades['largest_loss']
     avgTradeHoldingPeriod: timedelta = trades['avg_holding_period']
 
-    assert math.isclose(round(totalReturn, 2), 36.52, abs_tol=0.1) == True, 'Total return should be approximately 36.52%.'
-    assert math.isclose(round(annualizedReturn, 2), 159.99, abs_tol=0.1) == True, 'Annualized return should be approximately 159.99%.'
+    assert math.isclose(round(totalReturn, 2), -23.09, abs_tol=0.1) == True, 'Total return should be approximately -23.09%.'
+    assert math.isclose(round(annualizedReturn, 2), -56.56, abs_tol=0.1) == True, 'Annualized return should be approximately -56.56%.'
     assert startingCash == 10000, 'Starting cash should be $10,000.'
-    assert math.isclose(round(finalPortfolioValue, 2), 12842.90, abs_tol=0.1) == True, 'Final portfolio value should be approximately $12,842.90.'
-    assert math.isclose(round(netProfitOrLoss, 2), 3651.98, abs_tol=0.1) == True, 'Net profit/loss should be approximately $3,651.98.'
-    assert math.isclose(round(volatility, 2), 0.55, abs_tol=0.01) == True, 'Volatility percent should be approximately 0.55%.'
-
-    assert math.isclose(round(maxDrawdown, 2), 825.61, abs_tol=0.1) == True, 'Maximum drawdown should be approximately $825.61.'
-    assert math.isclose(round(maxDrawdownPercent, 2), 5.75, abs_tol=0.1) == True, 'Maximum drawdown percent should be approximately 5.75%.'
-    assert maxDrawdownDuration == timedelta(days=20), 'Maximum drawdown duration should be approximately 20 days.'
-
-    assert totalTrades == 149, 'Total trades should be 149.'
-    assert wonTrades == 77, 'Total trades won should be 77.'
-    assert lostTrades == 72, 'Total trades lost should be 72.'
-    assert math.isclose(round(tradesWinRate, 2), 51.68, abs_tol=0.1) == True, 'The trade win rate should be 51.68%.'
-    assert math.isclose(round(avgProfitPerTrade, 2), 21.73, abs_tol=0.1) == True, 'The average profit per trade should be $21.73.'
-    assert math.isclose(round(largestWinTrade, 2), 4496.85, abs_tol=0.1) == True, 'The largest win trade should be $4496.85.'
-    assert math.isclose(round(largestLossTrade, 2), -4547.35, abs_tol=0.1) == True, 'The largest losing trade should be $-4547.35.'
-    assert avgTradeHoldingPeriod > timedelta(seconds=1.0), 'The average holding period for a trade should be above 1 second.'
\ No newline at end of file
+    assert math.isclose(round(finalPortfolioValue, 2), 11234.73, abs_tol=0.1) == True, 'Final portfolio value should be approximately $11,234.73.'
+    assert math.isclose(round(netProfitOrLoss, 2), -2308.89, abs_tol=0.1) == True, 'Net profit/loss should be approximately $-2,308.89.'
+    assert math.isclose(round(volatility, 2), 0.69, abs_tol=0.01) == True, 'Volatility percent should be approximately 0.69%.'
+
+    assert math.isclose(round(maxDrawdown, 2), 2308.89, abs_tol=0.1) == True, 'Maximum drawdown should be approximately $2,308.89.'
+    assert math.isclose(round(maxDrawdownPercent, 2), 23.09, abs_tol=0.1) == True, 'Maximum drawdown percent should be approximately 23.09%.'
+    assert maxDrawdownDuration == timedelta(days=115), 'Maximum drawdown duration should be approximately 115 days.'
+
+    assert totalTrades == 177, 'Total trades should be 177.'
+    assert wonTrades == 73, 'Total trades won should be 73.'
+    assert lostTrades == 104, 'Total trades lost should be 104.'
+    assert math.isclose(round(tradesWinRate, 2), 41.24, abs_tol=0.1) == True, 'The trade win rate should be 41.24%.'
+    assert math.isclose(round(avgProfitPerTrade, 2), -11.68, abs_tol=0.1) == True, 'The average profit per trade should be $-11.68.'
+    assert math.isclose(round(largestWinTrade, 2), 118.47, abs_tol=0.1) == True, 'The largest win trade should be $118.47.'
+    assert math.isclose(round(largestLossTrade, 2), -131.50, abs_tol=0.1) == True, 'The largest losing trade should be $-131.50.'
+    assert timedelta(days=6) < avgTradeHoldingPeriod < timedelta(days=7), 'The average holding period for a trade should be between 6 and 7 days.'
\ No newline at end of file